@@ -1,7 +1,8 @@
 from typing import Generator
+
+from app.core.config import settings
 from app.db.session import SessionLocal
-from app.messaging.kafka import KafkaProducer
-from app.storage.enum import StorageType
+from app.messaging.base import BaseProducer
 from app.services.workflow import WorkflowService
 
 
@@ -18,28 +19,31 @@ def get_workflow_service() -> WorkflowService:
     Dependency provider for WorkflowService.
 
     Returns:
-        WorkflowService: An instance of WorkflowService configured with POSTGRES storage.
+        WorkflowService: An instance of WorkflowService using settings.STORAGE_TYPE.
     """
-    return WorkflowService(StorageType.POSTGRES)
+    return WorkflowService(settings.STORAGE_TYPE)
 
 
-# Shared Kafka producer instance — initialized once at app startup via lifespan().
-_kafka_producer: KafkaProducer | None = None
+# Shared broker producer instance — initialized once at app startup via lifespan().
+# Kafka by default; the in-memory broker when MESSAGE_BROKER=in_memory.
+_kafka_producer: BaseProducer | None = None
 
 
-def set_kafka_producer(producer: KafkaProducer) -> None:
-    """Set the shared Kafka producer (called from lifespan startup)."""
+def set_kafka_producer(producer: BaseProducer) -> None:
+    """Set the shared broker producer (called from lifespan startup)."""
     global _kafka_producer
     _kafka_producer = producer
 
 
-def get_kafka_producer() -> KafkaProducer:
+def get_kafka_producer() -> BaseProducer:
     """
-    Dependency provider for the shared KafkaProducer.
+    Dependency provider for the shared broker producer.
 
     Returns:
-        KafkaProducer: The singleton Kafka producer started at app startup.
+        BaseProducer: The singleton producer started at app startup.
     """
     if _kafka_producer is None:
-        raise RuntimeError("Kafka producer not initialized. App startup may have failed.")
+        raise RuntimeError(
+            "Kafka producer not initialized. App startup may have failed."
+        )
     return _kafka_producer
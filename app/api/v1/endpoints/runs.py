@@ -1,45 +1,140 @@
+from datetime import datetime
+from datetime import timezone
+
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
 from fastapi import Query
 
 from app.api.deps import get_workflow_service
-from app.cache.redis_cache import cache_get, cache_set
-from app.core.config import settings
+from app.archive.store import get_run_archive
+from app.blob.offload import resolve_output
+from app.cache.cancellation import cancel_run
+from app.cache.cancellation import cancel_workflow_runs
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import CancelRunsRequest
 from app.services.workflow import WorkflowService
 
 router = APIRouter()
 
 
-@router.get("/{run_id}")
-async def get_run(
+@router.post("/cancel")
+async def cancel_workflow_runs_endpoint(
+    request: CancelRunsRequest,
+    service: WorkflowService = Depends(get_workflow_service),
+):
+    """
+    Cancel every run of a workflow triggered up to now.
+
+    Queued runs are skipped by workers when dequeued; running runs are
+    interrupted by the worker executing them.
+    """
+    if not service.load_workflow(request.workflow_id):
+        raise HTTPException(
+            status_code=404, detail=f"Workflow {request.workflow_id} not found"
+        )
+    try:
+        cutoff = cancel_workflow_runs(request.workflow_id)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to cancel runs: {e}")
+    return {
+        "workflow_id": request.workflow_id,
+        "cancelled_before": datetime.fromtimestamp(cutoff, timezone.utc).isoformat(),
+        "status": "cancelling",
+    }
+
+
+@router.post("/{run_id}/cancel")
+async def cancel_run_endpoint(
     run_id: str, service: WorkflowService = Depends(get_workflow_service)
 ):
-    """Get workflow run details"""
-    # Check cache first
-    cache_key = f"run:{run_id}"
-    cached = cache_get(cache_key)
-    if cached:
-        return cached
+    """
+    Cancel a workflow run.
 
+    A pending run is marked CANCELLED immediately; a running run is
+    interrupted by its worker, which records the final status.
+    """
     run = service.load_workflow_run(run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Workflow run not found")
+    if run.status not in (WorkflowStatus.PENDING, WorkflowStatus.RUNNING):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Workflow run already finished ({run.status.value})",
+        )
+
+    try:
+        cancel_run(run_id)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to cancel run: {e}")
+
+    if run.status == WorkflowStatus.PENDING:
+        service.mark_run_cancelled(run)
+    return {
+        "run_id": run_id,
+        "status": "cancelled"
+        if run.status == WorkflowStatus.CANCELLED
+        else "cancelling",
+    }
+
+
+@router.get("/{run_id}")
+async def get_run(
+    run_id: str,
+    resolve: bool = Query(
+        default=False, description="Inline outputs kept in the blob store"
+    ),
+    service: WorkflowService = Depends(get_workflow_service),
+):
+    """
+    Get workflow run details.
+
+    Large step outputs are returned as blob references unless resolve is
+    set; fetch one with GET /runs/{run_id}/steps/{step_name}/output.
+    Runs moved to the archive are served from it.
+    """
+    run = service.load_workflow_run(run_id) or get_run_archive().get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    if resolve:
+        try:
+            service.resolve_outputs(run)
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    return run.model_dump()
 
-    # Cache for 10s (runs change status so short TTL)
-    run_data = run.model_dump()
-    cache_set(cache_key, run_data, ttl=10)
-    return run_data
+
+@router.get("/{run_id}/steps/{step_name}/output")
+async def get_step_output(
+    run_id: str,
+    step_name: str,
+    service: WorkflowService = Depends(get_workflow_service),
+):
+    """Get the output of one step, loading it from the blob store if needed"""
+    run = service.load_workflow_run(run_id) or get_run_archive().get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    result = run.step_results.get(step_name)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Step {step_name} has no result")
+    try:
+        return resolve_output(result.output, service.blob_store)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.get("/")
 async def list_runs(
     limit: int = Query(default=50, ge=1, le=200, description="Max items per page"),
-    cursor: str | None = Query(default=None, description="Cursor for pagination (uuid)"),
+    cursor: str
+    | None = Query(default=None, description="Cursor for pagination (uuid)"),
     service: WorkflowService = Depends(get_workflow_service),
 ):
     """List workflow runs with cursor-based pagination"""
-    runs, next_cursor = service.list_runs_paginated(limit=limit, cursor=cursor)
+    try:
+        runs, next_cursor = service.list_runs_paginated(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "items": runs,
         "next_cursor": next_cursor,
@@ -0,0 +1,89 @@
+"""
+Workflow schedule endpoints.
+
+Schedules are fired by the scheduler service (app.scheduler.main); every
+change is announced on the schedule-changed topic so the scheduler leader
+updates its timer heap without polling the table.
+"""
+import logging
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import HTTPException
+
+from app.api.deps import get_kafka_producer
+from app.api.deps import get_workflow_service
+from app.core.config import settings
+from app.messaging.base import BaseProducer
+from app.messaging.events import ScheduleChangedEvent
+from app.schemas.schedule import WorkflowSchedule
+from app.services.workflow import WorkflowService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _publish_change(
+    producer: BaseProducer, schedule_id: str, deleted: bool = False
+) -> None:
+    """Announce a schedule change; the scheduler's periodic resync covers failures."""
+    try:
+        event = ScheduleChangedEvent(schedule_id=schedule_id, deleted=deleted)
+        await producer.send(
+            topic=settings.KAFKA_TOPIC_SCHEDULE_CHANGED,
+            value=event.model_dump(),
+            key=schedule_id,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish schedule change {schedule_id}: {e}")
+
+
+@router.post("/")
+async def create_schedule(
+    schedule: WorkflowSchedule,
+    service: WorkflowService = Depends(get_workflow_service),
+    producer: BaseProducer = Depends(get_kafka_producer),
+):
+    """Create a cron schedule for a workflow"""
+    if not service.load_workflow(schedule.workflow_id):
+        raise HTTPException(
+            status_code=404, detail=f"Workflow {schedule.workflow_id} not found"
+        )
+    service.create_schedule(schedule)
+    await _publish_change(producer, schedule.uuid)
+    return {
+        "message": "Schedule created successfully",
+        "schedule_id": schedule.uuid,
+    }
+
+
+@router.get("/")
+async def list_schedules(service: WorkflowService = Depends(get_workflow_service)):
+    """List all workflow schedules"""
+    return service.list_schedules()
+
+
+@router.get("/{schedule_id}")
+async def get_schedule(
+    schedule_id: str, service: WorkflowService = Depends(get_workflow_service)
+):
+    """Get a workflow schedule"""
+    schedule = service.load_schedule(schedule_id)
+    if not schedule:
+        raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found")
+    return schedule
+
+
+@router.delete("/{schedule_id}")
+async def delete_schedule(
+    schedule_id: str,
+    service: WorkflowService = Depends(get_workflow_service),
+    producer: BaseProducer = Depends(get_kafka_producer),
+):
+    """Delete a workflow schedule"""
+    if not service.delete_schedule(schedule_id):
+        raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found")
+    await _publish_change(producer, schedule_id, deleted=True)
+    return {"message": "Schedule deleted successfully", "schedule_id": schedule_id}
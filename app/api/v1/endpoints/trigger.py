@@ -1,14 +1,16 @@
 """
 Workflow trigger endpoint.
 """
-import asyncio
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import HTTPException
 
-from app.api.deps import get_workflow_service, get_kafka_producer
-from app.core.config import settings
-from app.messaging.kafka import KafkaProducer
+from app.api.deps import get_kafka_producer
+from app.api.deps import get_workflow_service
+from app.messaging.base import BaseProducer
+from app.messaging.events import trigger_topic
 from app.messaging.events import WorkflowTriggerEvent
 from app.schemas.common import WorkflowStatus
 from app.schemas.run import WorkflowRun
@@ -22,15 +24,15 @@ router = APIRouter()
 async def trigger_workflow(
     request: TriggerRequest,
     service: WorkflowService = Depends(get_workflow_service),
-    producer: KafkaProducer = Depends(get_kafka_producer),
+    producer: BaseProducer = Depends(get_kafka_producer),
 ):
     """
-    Trigger a workflow execution asynchronously via Kafka.
+    Trigger a workflow execution asynchronously via the message broker.
 
     This endpoint:
     1. Validates the workflow exists
     2. Creates a workflow run with PENDING status
-    3. Publishes a trigger event to Kafka
+    3. Publishes a trigger event to the lane topic of the requested priority
     4. Returns immediately with the run ID
 
     The actual execution happens in the worker service.
@@ -53,20 +55,23 @@ async def trigger_workflow(
     # Save run to database
     service.create_workflow_run(run)
 
-    # Publish trigger event to Kafka
+    # Publish trigger event to the broker
     try:
         event = WorkflowTriggerEvent(
             run_id=run.uuid,
             workflow_id=request.workflow_id,
             payload=request.payload,
+            priority=request.priority,
+            max_concurrency=workflow.max_concurrency,
+            triggered_at=run.started_at,
         )
         await producer.send(
-            topic=settings.KAFKA_TOPIC_WORKFLOW_TRIGGER,
+            topic=trigger_topic(request.priority),
             value=event.model_dump(),
             key=run.uuid,
         )
     except Exception as e:
-        # If Kafka fails, update run status to FAILED
+        # If the broker fails, update run status to FAILED
         run.status = WorkflowStatus.FAILED
         run.error = f"Failed to queue workflow: {str(e)}"
         service.workflow_run_repository.update_workflow_run(run)
@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import workflows, runs, trigger
+from app.api.v1.endpoints import runs
+from app.api.v1.endpoints import schedules
+from app.api.v1.endpoints import trigger
+from app.api.v1.endpoints import workflows
 
 api_router = APIRouter()
 api_router.include_router(workflows.router, prefix="/workflows", tags=["workflows"])
 api_router.include_router(runs.router, prefix="/runs", tags=["runs"])
 api_router.include_router(trigger.router, prefix="/trigger", tags=["trigger"])
+api_router.include_router(schedules.router, prefix="/schedules", tags=["schedules"])
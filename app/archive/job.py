@@ -0,0 +1,187 @@
+"""
+Moves cold run partitions from Postgres to the archive.
+
+Archival works on whole partitions (see app.db.partitions) rather than
+deleting rows: once a period ended more than ARCHIVE_AFTER_DAYS ago, its
+workflow_runs and workflow_step_results partitions are detached, every
+run they hold (whatever its status) is written to the archive, and the
+detached tables are dropped.
+
+Detaching first means no run changes while it is being copied; between
+the detach and the end of the copy, the period's runs are in neither the
+live tables nor the archive. A detached table is only dropped after all
+of its runs are durable in the archive, so a crash in between leaves it
+behind, and the next pass archives it again (a run archived twice is
+served from either copy).
+
+Callers pass a keep_going callback, checked before every batch: when it
+returns False (e.g. the caller lost its lease), the job stops without
+dropping the period it was copying, leaving it to the next pass.
+"""
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Callable
+
+from sqlalchemy import Connection
+from sqlalchemy import Engine
+from sqlalchemy import text
+
+from app.archive.store import RunArchive
+from app.core.config import settings
+from app.db.partitions import attached_partitions
+from app.db.partitions import lock_partitions
+from app.db.partitions import partition_name
+from app.db.partitions import partition_period
+from app.db.partitions import PARTITIONED_TABLES
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import StepResult
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def detach_cold_partitions(
+    engine: Engine, now: datetime | None = None
+) -> list[datetime]:
+    """
+    Detach the partitions of periods ready for archival.
+
+    Args:
+        engine (Engine): The database engine.
+        now (datetime | None): The current time (defaults to now, UTC).
+
+    Returns:
+        list[datetime]: Start of every period whose detached tables await
+            archival, including ones left by an interrupted pass.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(
+        days=settings.ARCHIVE_AFTER_DAYS
+    )
+    period = timedelta(days=settings.RUN_PARTITION_DAYS)
+    with engine.begin() as conn:
+        lock_partitions(conn)
+        for table in PARTITIONED_TABLES:
+            for name in attached_partitions(conn, table):
+                start = partition_period(name)
+                if start is not None and start + period <= cutoff:
+                    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        detached = conn.execute(
+            text(
+                "SELECT relname FROM pg_class WHERE relkind = 'r' "
+                "AND NOT relispartition "
+                "AND relname ~ '^workflow_runs_p[0-9]{8}$'"
+            )
+        ).scalars()
+        return sorted(partition_period(name) for name in detached)
+
+
+def _read_runs(
+    conn: Connection, start: datetime, after: str, limit: int
+) -> list[WorkflowRun]:
+    """Read a batch of runs and step results from a period's detached tables."""
+    runs_table = partition_name("workflow_runs", start)
+    rows = (
+        conn.execute(
+            text(
+                f"SELECT * FROM {runs_table} WHERE uuid > :after "
+                "ORDER BY uuid LIMIT :limit"
+            ),
+            {"after": after, "limit": limit},
+        )
+        .mappings()
+        .all()
+    )
+    runs = {row["uuid"]: WorkflowRun.model_validate(dict(row)) for row in rows}
+    if not runs:
+        return []
+    steps_table = partition_name("workflow_step_results", start)
+    exists = conn.execute(
+        text("SELECT to_regclass(:name)"), {"name": steps_table}
+    ).scalar()
+    if exists is not None:
+        results = conn.execute(
+            text(
+                f"SELECT * FROM {steps_table} WHERE run_uuid = ANY(:uuids) ORDER BY id"
+            ),
+            {"uuids": list(runs)},
+        ).mappings()
+        for result in results:
+            run = runs[result["run_uuid"]]
+            run.step_results[result["step_name"]] = StepResult.model_validate(
+                dict(result)
+            )
+    return list(runs.values())
+
+
+def archive_period(
+    engine: Engine,
+    archive: RunArchive,
+    start: datetime,
+    keep_going: Callable[[], bool] = lambda: True,
+) -> int | None:
+    """
+    Archive the runs of a detached period, then drop its tables.
+
+    Runs are written in segments of ARCHIVE_BATCH_SIZE runs.
+
+    Args:
+        engine (Engine): The database engine.
+        archive (RunArchive): The archive.
+        start (datetime): The period start.
+        keep_going (Callable[[], bool]): Checked before every batch.
+
+    Returns:
+        int | None: Number of runs archived, or None if stopped by keep_going
+            (the period's tables are then kept).
+    """
+    archived = 0
+    after = ""
+    with engine.connect() as conn:
+        while True:
+            if not keep_going():
+                logger.warning(
+                    f"Stopped archiving the period starting {start:%Y-%m-%d}"
+                )
+                return None
+            runs = _read_runs(conn, start, after, settings.ARCHIVE_BATCH_SIZE)
+            if not runs:
+                break
+            archive.append(runs)
+            archived += len(runs)
+            after = runs[-1].uuid
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(table, start)}"))
+    logger.info(f"Archived {archived} runs of the period starting {start:%Y-%m-%d}")
+    return archived
+
+
+def archive_runs(
+    engine: Engine,
+    archive: RunArchive,
+    now: datetime | None = None,
+    keep_going: Callable[[], bool] = lambda: True,
+) -> int:
+    """
+    Archive every period that ended more than ARCHIVE_AFTER_DAYS ago.
+
+    Args:
+        engine (Engine): The database engine.
+        archive (RunArchive): The archive.
+        now (datetime | None): The current time (defaults to now, UTC).
+        keep_going (Callable[[], bool]): Checked before every batch.
+
+    Returns:
+        int: Number of runs archived (from periods archived completely).
+    """
+    if settings.ARCHIVE_AFTER_DAYS is None:
+        return 0
+    archived = 0
+    for start in detach_cold_partitions(engine, now):
+        count = archive_period(engine, archive, start, keep_going)
+        if count is None:
+            break
+        archived += count
+    return archived
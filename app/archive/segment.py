@@ -0,0 +1,227 @@
+"""
+Compressed, append-only segment files of archived runs.
+
+A segment is written once, by one archival batch, as two files:
+
+- <name>.seg: zlib-compressed blocks of JSON lines, one run per line,
+  runs sorted by uuid and up to ARCHIVE_BLOCK_RUNS per block;
+- <name>.idx: JSON with the first uuid, offset and length of each block
+  (a sparse index), the started_at range of the segment and a bloom
+  filter of its uuids.
+
+The index is renamed into place after the data is synced, and the
+directory is synced after the rename, so a segment without an index is
+incomplete and ignored. A lookup checks the bloom
+filter, bisects the block index and decompresses one block read from
+the memory-mapped data file.
+"""
+import base64
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+
+from app.storage.durability import atomic_write
+
+# Bloom filter sizing: ~1% false positives
+BLOOM_BITS_PER_ITEM = 10
+BLOOM_HASHES = 7
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings, backed by a bytearray.
+    """
+
+    def __init__(self, size_bits: int, bits: bytes | None = None):
+        """
+        Initialize the filter.
+
+        Args:
+            size_bits (int): Number of bits.
+            bits (bytes | None): Existing filter content.
+        """
+        self.size_bits = max(size_bits, 8)
+        self.bits = (
+            bytearray(bits)
+            if bits is not None
+            else bytearray((self.size_bits + 7) // 8)
+        )
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.sha256(key.encode()).digest()
+        for i in range(BLOOM_HASHES):
+            yield int.from_bytes(digest[i * 4 : i * 4 + 4], "little") % self.size_bits
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(key))
+
+
+@dataclass
+class SegmentIndex:
+    """
+    Index of a segment.
+
+    Attributes:
+        count (int): Number of runs.
+        min_started_at (str): Earliest run start.
+        max_started_at (str): Latest run start.
+        first_uuids (list[str]): First uuid of each block.
+        offsets (list[int]): Offset of each block in the data file.
+        lengths (list[int]): Compressed length of each block.
+        bloom (BloomFilter): Filter of the segment's uuids.
+    """
+
+    count: int
+    min_started_at: str
+    max_started_at: str
+    first_uuids: list[str]
+    offsets: list[int]
+    lengths: list[int]
+    bloom: BloomFilter
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "min_started_at": self.min_started_at,
+            "max_started_at": self.max_started_at,
+            "blocks": list(zip(self.first_uuids, self.offsets, self.lengths)),
+            "bloom_bits": self.bloom.size_bits,
+            "bloom": base64.b64encode(self.bloom.bits).decode(),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "SegmentIndex":
+        blocks = data["blocks"]
+        return cls(
+            count=data["count"],
+            min_started_at=data["min_started_at"],
+            max_started_at=data["max_started_at"],
+            first_uuids=[block[0] for block in blocks],
+            offsets=[block[1] for block in blocks],
+            lengths=[block[2] for block in blocks],
+            bloom=BloomFilter(data["bloom_bits"], base64.b64decode(data["bloom"])),
+        )
+
+
+def _fsync_write(path: Path, data: bytes) -> None:
+    """Write a file and sync it to disk before returning."""
+    with open(path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def write_segment(
+    directory: Path, name: str, runs: list[dict[str, Any]], block_runs: int
+) -> Path:
+    """
+    Write runs as a new segment.
+
+    Args:
+        directory (Path): The archive directory.
+        name (str): The segment name (without extension).
+        runs (list[dict[str, Any]]): JSON-ready runs, each with "uuid" and "started_at".
+        block_runs (int): Maximum runs per block.
+
+    Returns:
+        Path: The index file path.
+    """
+    runs = sorted(runs, key=lambda run: run["uuid"])
+    bloom = BloomFilter(len(runs) * BLOOM_BITS_PER_ITEM)
+    first_uuids, offsets, lengths = [], [], []
+    chunks = []
+    offset = 0
+    for start in range(0, len(runs), block_runs):
+        block = runs[start : start + block_runs]
+        data = zlib.compress(b"\n".join(json.dumps(run).encode() for run in block))
+        first_uuids.append(block[0]["uuid"])
+        offsets.append(offset)
+        lengths.append(len(data))
+        chunks.append(data)
+        offset += len(data)
+        for run in block:
+            bloom.add(run["uuid"])
+
+    started = [run["started_at"] for run in runs]
+    index = SegmentIndex(
+        count=len(runs),
+        min_started_at=min(started),
+        max_started_at=max(started),
+        first_uuids=first_uuids,
+        offsets=offsets,
+        lengths=lengths,
+        bloom=bloom,
+    )
+    _fsync_write(directory / f"{name}.seg", b"".join(chunks))
+    index_path = directory / f"{name}.idx"
+    atomic_write(index_path, json.dumps(index.to_json()).encode())
+    return index_path
+
+
+class Segment:
+    """
+    Read access to one segment; the data file is memory-mapped on first read.
+    """
+
+    def __init__(self, index_path: Path):
+        """
+        Load a segment index.
+
+        Args:
+            index_path (Path): The segment's .idx file.
+        """
+        self.name = index_path.stem
+        self.data_path = index_path.with_suffix(".seg")
+        self.index = SegmentIndex.from_json(json.loads(index_path.read_bytes()))
+        self._mmap: mmap.mmap | None = None
+
+    def _block(self, position: int) -> list[dict[str, Any]]:
+        if self._mmap is None:
+            with open(self.data_path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset = self.index.offsets[position]
+        data = zlib.decompress(
+            self._mmap[offset : offset + self.index.lengths[position]]
+        )
+        return [json.loads(line) for line in data.split(b"\n")]
+
+    def get(self, uuid: str) -> dict[str, Any] | None:
+        """
+        Look up a run.
+
+        Args:
+            uuid (str): The run UUID.
+
+        Returns:
+            dict[str, Any] | None: The archived run, or None if not in this segment.
+        """
+        if uuid not in self.index.bloom:
+            return None
+        position = bisect.bisect_right(self.index.first_uuids, uuid) - 1
+        if position < 0:
+            return None
+        for run in self._block(position):
+            if run["uuid"] == uuid:
+                return run
+        return None
+
+    def scan(self) -> Iterator[dict[str, Any]]:
+        """Iterate over every run of the segment, in uuid order."""
+        for position in range(len(self.index.offsets)):
+            yield from self._block(position)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
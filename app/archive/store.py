@@ -0,0 +1,147 @@
+"""
+Archive of cold workflow runs, kept as compressed segment files.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Iterator
+
+from app.archive.segment import Segment
+from app.archive.segment import write_segment
+from app.core.config import settings
+from app.schemas.run import WorkflowRun
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RunArchive:
+    """
+    Reads and appends archived runs.
+
+    Segment indexes are loaded at startup and when a lookup misses (at most
+    every ARCHIVE_REFRESH_SECONDS), so segments written by the archival job
+    in another process are found without a restart.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the archive.
+
+        Args:
+            path (str): The archive directory (shared by the scheduler and the API).
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._segments: dict[str, Segment] = {}
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self.refresh()
+
+    def refresh(self) -> int:
+        """
+        Load the indexes of segments not seen yet.
+
+        Returns:
+            int: Number of segments added.
+        """
+        with self._lock:
+            self._refreshed_at = time.monotonic()
+            added = 0
+            for index_path in sorted(self.path.glob("*.idx")):
+                if index_path.stem not in self._segments:
+                    self._segments[index_path.stem] = Segment(index_path)
+                    added += 1
+            return added
+
+    def append(self, runs: list[WorkflowRun]) -> str:
+        """
+        Write runs to a new segment.
+
+        Args:
+            runs (list[WorkflowRun]): Runs to archive.
+
+        Returns:
+            str: The segment name.
+        """
+        name = f"runs-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        write_segment(
+            self.path,
+            name,
+            [run.model_dump(mode="json") for run in runs],
+            settings.ARCHIVE_BLOCK_RUNS,
+        )
+        self.refresh()
+        logger.info(f"Archived {len(runs)} runs to segment {name}")
+        return name
+
+    def _find(self, uuid: str) -> WorkflowRun | None:
+        for segment in list(self._segments.values()):
+            run = segment.get(uuid)
+            if run is not None:
+                return WorkflowRun.model_validate(run)
+        return None
+
+    def get(self, uuid: str) -> WorkflowRun | None:
+        """
+        Look up an archived run.
+
+        Args:
+            uuid (str): The run UUID.
+
+        Returns:
+            WorkflowRun | None: The run, or None if it is not archived.
+        """
+        run = self._find(uuid)
+        # Misses are common (runs not archived yet), so the directory is
+        # listed again only once the last listing is old enough
+        stale = (
+            time.monotonic() - self._refreshed_at >= settings.ARCHIVE_REFRESH_SECONDS
+        )
+        if run is None and stale and self.refresh():
+            run = self._find(uuid)
+        return run
+
+    def scan(
+        self, since: str | None = None, until: str | None = None
+    ) -> Iterator[WorkflowRun]:
+        """
+        Iterate over archived runs, skipping segments outside a started_at range.
+
+        Args:
+            since (str | None): Earliest started_at (ISO), inclusive.
+            until (str | None): Latest started_at (ISO), inclusive.
+
+        Yields:
+            WorkflowRun: Archived runs in the range.
+        """
+        for segment in list(self._segments.values()):
+            if since and segment.index.max_started_at < since:
+                continue
+            if until and segment.index.min_started_at > until:
+                continue
+            for run in segment.scan():
+                if (not since or run["started_at"] >= since) and (
+                    not until or run["started_at"] <= until
+                ):
+                    yield WorkflowRun.model_validate(run)
+
+
+_archive: RunArchive | None = None
+
+
+def get_run_archive() -> RunArchive:
+    """
+    Get or create the process-wide run archive.
+
+    Returns:
+        RunArchive: The archive at settings.ARCHIVE_PATH.
+    """
+    global _archive
+    if _archive is None:
+        _archive = RunArchive(settings.ARCHIVE_PATH)
+    return _archive
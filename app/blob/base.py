@@ -0,0 +1,78 @@
+"""
+Content-addressed storage for large step outputs.
+
+Blobs are keyed by the SHA-256 of their content, so identical outputs are
+stored once and a key always refers to the same bytes.
+
+Since a blob may be shared by many runs, deleting a run does not delete
+its blobs. Instead, storing content that already exists refreshes the
+blob's last use, and the scheduler sweeps blobs unused for
+BLOB_RETENTION_DAYS (see delete_unused_since).
+"""
+from abc import ABC
+from abc import abstractmethod
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class BlobRef(BaseModel):
+    """
+    Reference to a step output kept in the blob store.
+
+    Attributes:
+        key (str): SHA-256 hex digest of the serialized output.
+        size (int): Size of the serialized output in bytes.
+        output_type (str): Type of the referenced output (e.g. "webhook").
+    """
+
+    type: Literal["blob"] = "blob"
+    key: str
+    size: int
+    output_type: str
+
+
+class BaseBlobStore(ABC):
+    """
+    Abstract base class for blob stores.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob.
+
+        Args:
+            data (bytes): The content.
+
+        Returns:
+            str: The blob key (SHA-256 hex digest of the content).
+        """
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """
+        Retrieve a blob.
+
+        Args:
+            key (str): The blob key.
+
+        Returns:
+            bytes | None: The content, or None if not found.
+        """
+        ...
+
+    @abstractmethod
+    def delete_unused_since(self, cutoff: datetime) -> int:
+        """
+        Delete the blobs last stored before a time.
+
+        Args:
+            cutoff (datetime): Blobs not stored (or stored again) since are deleted.
+
+        Returns:
+            int: Number of blobs deleted.
+        """
+        ...
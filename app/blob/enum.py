@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class BlobStoreType(str, Enum):
+    """
+    Enum for different blob store types.
+    """
+
+    FILE_SYSTEM = "file_system"
+    # Add more blob store types (e.g. object storage) as needed
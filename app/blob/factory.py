@@ -0,0 +1,33 @@
+from app.blob.base import BaseBlobStore
+from app.blob.enum import BlobStoreType
+from app.blob.filesystem import FileBlobStore
+from app.core.config import settings
+
+
+class BlobStoreFactory:
+    """
+    Factory class for creating blob store instances.
+    """
+
+    @staticmethod
+    def create_store(store_type: BlobStoreType) -> BaseBlobStore:
+        if store_type == BlobStoreType.FILE_SYSTEM:
+            return FileBlobStore(settings.BLOB_STORE_PATH)
+        else:
+            raise ValueError(f"Unknown blob store type: {store_type}")
+
+
+_store: BaseBlobStore | None = None
+
+
+def get_blob_store() -> BaseBlobStore:
+    """
+    Get or create the process-wide blob store.
+
+    Returns:
+        BaseBlobStore: The store configured by settings.BLOB_STORE.
+    """
+    global _store
+    if _store is None:
+        _store = BlobStoreFactory.create_store(BlobStoreType(settings.BLOB_STORE))
+    return _store
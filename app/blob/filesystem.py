@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from app.blob.base import BaseBlobStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FileBlobStore(BaseBlobStore):
+    """
+    Blob store on a local (or shared) filesystem.
+
+    Blobs are written to <root>/<key[:2]>/<key> through a temporary file
+    and an atomic rename, so readers never see partial content and
+    concurrent writers of the same content are harmless. A blob's
+    modification time is its last use: storing existing content touches it.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store.
+
+        Args:
+            root (str): Directory holding the blobs.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid blob key: {key}")
+        return self.root / key[:2] / key
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob, only touching it when the content already exists.
+
+        Args:
+            data (bytes): The content.
+
+        Returns:
+            str: The blob key.
+        """
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        try:
+            os.utime(path)
+            return key
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Retrieve a blob.
+
+        Args:
+            key (str): The blob key.
+
+        Returns:
+            bytes | None: The content, or None if not found.
+        """
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete_unused_since(self, cutoff: datetime) -> int:
+        """
+        Delete the blobs (and leftover temporary files) last used before a time.
+
+        Args:
+            cutoff (datetime): Blobs with an older modification time are deleted.
+
+        Returns:
+            int: Number of blobs deleted.
+        """
+        deleted = 0
+        for path in self.root.glob("*/*"):
+            try:
+                if path.stat().st_mtime < cutoff.timestamp():
+                    path.unlink()
+                    deleted += not path.name.startswith(".tmp-")
+            except FileNotFoundError:
+                continue
+        logger.info(f"Deleted {deleted} blobs unused since {cutoff:%Y-%m-%d}")
+        return deleted
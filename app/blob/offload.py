@@ -0,0 +1,60 @@
+"""
+Moving large step outputs to the blob store and back.
+"""
+import json
+import logging
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.blob.base import BaseBlobStore
+from app.blob.base import BlobRef
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def offload_output(output: BaseModel, store: BaseBlobStore) -> BaseModel:
+    """
+    Replace an output with a blob reference when it is over the threshold.
+
+    Args:
+        output (BaseModel): A step output.
+        store (BaseBlobStore): The blob store.
+
+    Returns:
+        BaseModel: A BlobRef, or the output itself if it is small enough.
+    """
+    if isinstance(output, BlobRef):
+        return output
+    data = output.model_dump_json().encode()
+    if len(data) < settings.BLOB_OFFLOAD_MIN_BYTES:
+        return output
+    key = store.put(data)
+    logger.info(f"Offloaded {len(data)} byte {output.type} output to blob {key}")
+    return BlobRef(key=key, size=len(data), output_type=output.type)
+
+
+def resolve_output(output: Any, store: BaseBlobStore) -> Any:
+    """
+    Load the content of a blob reference.
+
+    Args:
+        output (Any): A step output, BlobRef or its JSON form.
+        store (BaseBlobStore): The blob store.
+
+    Returns:
+        Any: The referenced output as JSON data; other outputs unchanged.
+
+    Raises:
+        LookupError: If the referenced blob is missing.
+    """
+    if isinstance(output, dict) and output.get("type") == "blob":
+        output = BlobRef.model_validate(output)
+    if not isinstance(output, BlobRef):
+        return output
+    data = store.get(output.key)
+    if data is None:
+        raise LookupError(f"Blob {output.key} not found")
+    return json.loads(data)
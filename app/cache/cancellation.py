@@ -0,0 +1,143 @@
+"""
+Run cancellation flags shared between the API and workers through Redis.
+
+Two kinds of keys are kept, each expiring CANCEL_FLAG_RETENTION_SECONDS
+after it was written:
+    - "cancel:run:<run ID>" for a cancelled run (single-run cancel), and
+    - "cancel:workflow:<workflow ID>" holding a cutoff in UTC epoch seconds
+      (bulk cancel): every run of the workflow triggered at or before the
+      cutoff counts as cancelled.
+
+The API writes them with the sync client; workers read them with the
+asyncio client through CancellationChecker, which keeps a local cache so
+the per-run check is usually a dict lookup.
+"""
+import logging
+import time
+
+from app.cache.redis_cache import get_async_redis_client
+from app.cache.redis_cache import get_redis_client
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CANCELLED_RUN_PREFIX = "cancel:run:"
+CANCELLED_WORKFLOW_PREFIX = "cancel:workflow:"
+
+
+def cancel_run(run_id: str) -> None:
+    """
+    Flag a single run as cancelled.
+
+    Args:
+        run_id: The UUID of the run.
+    """
+    get_redis_client().set(
+        CANCELLED_RUN_PREFIX + run_id, 1, ex=settings.CANCEL_FLAG_RETENTION_SECONDS
+    )
+
+
+def cancel_workflow_runs(workflow_id: str) -> float:
+    """
+    Flag every run of a workflow triggered up to now as cancelled.
+
+    Args:
+        workflow_id: The UUID of the workflow.
+
+    Returns:
+        float: The cutoff recorded for the workflow (UTC epoch seconds).
+    """
+    cutoff = time.time()
+    get_redis_client().set(
+        CANCELLED_WORKFLOW_PREFIX + workflow_id,
+        cutoff,
+        ex=settings.CANCEL_FLAG_RETENTION_SECONDS,
+    )
+    return cutoff
+
+
+class CancellationChecker:
+    """
+    Worker-side view of the cancellation flags.
+
+    Positive answers are cached for good (a cancelled run stays cancelled);
+    negative answers are cached for CANCEL_CHECK_CACHE_SECONDS. Redis errors
+    are treated as "not cancelled" so an outage never blocks execution.
+    """
+
+    def __init__(self, cache_seconds: float | None = None):
+        """
+        Initialize the checker.
+
+        Args:
+            cache_seconds: How long a negative answer is trusted. Defaults to settings.
+        """
+        self._cache_seconds = cache_seconds or settings.CANCEL_CHECK_CACHE_SECONDS
+        self._cancelled: set[str] = set()
+        self._checked_at: dict[str, float] = {}
+
+    async def is_cancelled(
+        self, run_id: str, workflow_id: str, triggered_at: float | None = None
+    ) -> bool:
+        """
+        Check whether a run has been cancelled.
+
+        Args:
+            run_id: The UUID of the run.
+            workflow_id: The UUID of the run's workflow.
+            triggered_at: When the run was triggered (UTC epoch seconds), used
+                for bulk cancellation by workflow.
+
+        Returns:
+            bool: True if the run is cancelled.
+        """
+        cancelled = await self.check_many({run_id: (workflow_id, triggered_at)})
+        return run_id in cancelled
+
+    async def check_many(self, runs: dict[str, tuple[str, float | None]]) -> set[str]:
+        """
+        Check many runs with at most one Redis round-trip.
+
+        Args:
+            runs: Mapping of run ID -> (workflow ID, triggered_at).
+
+        Returns:
+            set[str]: The IDs of the cancelled runs.
+        """
+        now = time.monotonic()
+        cancelled = {run_id for run_id in runs if run_id in self._cancelled}
+        stale = [
+            run_id
+            for run_id in runs
+            if run_id not in cancelled
+            and now - self._checked_at.get(run_id, float("-inf")) >= self._cache_seconds
+        ]
+        if not stale:
+            return cancelled
+
+        try:
+            keys = [CANCELLED_RUN_PREFIX + run_id for run_id in stale]
+            keys += [CANCELLED_WORKFLOW_PREFIX + runs[run_id][0] for run_id in stale]
+            values = await get_async_redis_client().mget(keys)
+        except Exception as e:
+            logger.warning(f"Redis cancellation check error: {e}")
+            return cancelled
+
+        for run_id, flag, cutoff in zip(stale, values, values[len(stale) :]):
+            triggered_at = runs[run_id][1]
+            if flag is not None or (
+                cutoff is not None
+                and (triggered_at is None or triggered_at <= float(cutoff))
+            ):
+                self._cancelled.add(run_id)
+                self._checked_at.pop(run_id, None)
+                cancelled.add(run_id)
+            else:
+                self._checked_at[run_id] = now
+        return cancelled
+
+    def forget(self, run_id: str) -> None:
+        """Drop cached state for a run that is no longer tracked."""
+        self._cancelled.discard(run_id)
+        self._checked_at.pop(run_id, None)
@@ -0,0 +1,99 @@
+"""
+Redis-backed token buckets shared by all workers.
+
+Each bucket is a hash of (tokens, last refill time on the Redis server
+clock). Acquiring reserves a token even when the bucket is empty, letting
+the balance go negative, and returns how long the caller must wait for
+its reservation. Every caller therefore needs a single round-trip, and
+callers are served in arrival order at a steady rate. A caller that gives
+up before using its token (cancelled or timed out while waiting) refunds
+it, so the callers queued behind it do not wait for a call never made.
+"""
+import logging
+
+from app.cache.redis_cache import get_async_redis_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now_ms
+tokens = math.min(burst, tokens + (now_ms - ts) * rate / 1000) - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+if tokens >= 0 then
+    return 0
+end
+return math.ceil(-tokens / rate * 1000)
+"""
+
+_REFUND_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+if not state[1] then
+    return 0
+end
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local refill = (now_ms - tonumber(state[2])) * rate / 1000
+local tokens = math.min(burst, tonumber(state[1]) + refill + 1)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+return 1
+"""
+
+
+class RateLimiter:
+    """
+    Client for distributed token buckets.
+
+    Redis errors fail open (no wait) so a Redis outage degrades to
+    unthrottled calls instead of stalling every run.
+    """
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return f"ratelimit:{name}"
+
+    async def reserve(self, name: str, rate: float, burst: int) -> float:
+        """
+        Reserve one token.
+
+        Args:
+            name: The bucket name (e.g. a host or URL prefix).
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+
+        Returns:
+            float: Seconds to wait before using the token (0 if available now).
+        """
+        try:
+            client = get_async_redis_client()
+            wait_ms = await client.eval(
+                _RESERVE_SCRIPT, 1, self._key(name), rate, burst
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limiter error for {name}: {e}")
+            return 0.0
+        return int(wait_ms) / 1000
+
+    async def refund(self, name: str, rate: float, burst: int) -> None:
+        """
+        Give back a reserved token that will not be used.
+
+        Args:
+            name: The bucket name.
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+        """
+        try:
+            client = get_async_redis_client()
+            await client.eval(_REFUND_SCRIPT, 1, self._key(name), rate, burst)
+        except Exception as e:
+            logger.warning(f"Redis rate limiter refund error for {name}: {e}")
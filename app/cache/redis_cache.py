@@ -8,7 +8,7 @@ import json
 import logging
 from typing import Any
 
-import redis
+import redis.asyncio
 
 from app.core.config import settings
 
@@ -16,6 +16,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 _redis_client: redis.Redis | None = None
+_async_redis_client: redis.asyncio.Redis | None = None
 
 
 def get_redis_client() -> redis.Redis:
@@ -36,10 +37,40 @@ def get_redis_client() -> redis.Redis:
             socket_timeout=5,
             retry_on_timeout=True,
         )
-        logger.info(f"Redis client created: {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+        logger.info(
+            f"Redis client created: {settings.REDIS_HOST}:{settings.REDIS_PORT}"
+        )
     return _redis_client
 
 
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """
+    Get or create the singleton asyncio Redis client.
+
+    Used by the worker so Redis round-trips do not block the event loop.
+    The client keeps a connection pool shared by all coroutines.
+
+    Returns:
+        redis.asyncio.Redis: A pooled asyncio Redis client instance.
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = redis.asyncio.Redis(
+            host=settings.REDIS_HOST,
+            port=int(settings.REDIS_PORT),
+            db=0,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+        logger.info(
+            f"Async Redis client created: {settings.REDIS_HOST}:{settings.REDIS_PORT}"
+        )
+    return _async_redis_client
+
+
 def cache_get(key: str) -> dict | None:
     """
     Get a value from the cache.
@@ -90,6 +121,22 @@ def cache_delete(key: str) -> None:
         logger.warning(f"Redis cache_delete error for key={key}: {e}")
 
 
+def cache_delete_many(keys: list[str]) -> None:
+    """
+    Delete several values from the cache in one call.
+
+    Args:
+        keys: The cache keys to delete.
+    """
+    if not keys:
+        return
+    try:
+        client = get_redis_client()
+        client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Redis cache_delete_many error for {len(keys)} keys: {e}")
+
+
 def cache_delete_pattern(pattern: str) -> None:
     """
     Delete all keys matching a pattern.
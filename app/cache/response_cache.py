@@ -0,0 +1,196 @@
+"""
+Two-level memoization of webhook responses.
+
+Entries live in a bounded in-process LRU in front of Redis, so repeated
+lookups within a worker skip the network entirely and other workers share
+each response through Redis. Concurrent misses for the same key in one
+process collapse into a single fetch whose result all callers receive.
+A caller only inherits an outcome that is not specific to the caller
+that ran the fetch: if that caller was cancelled, or its fetch timed out
+(each caller's fetch carries its own time budget), the waiting callers
+retry, one of them fetching in turn.
+Redis errors fail open: the response is fetched and kept locally.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+from app.cache.redis_cache import get_async_redis_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A fetch returns the value to share and its TTL in seconds (None = do not cache)
+Fetch = Callable[[], Awaitable[tuple[dict[str, Any], float | None]]]
+
+
+def request_key(method: str, url: str, headers: dict[str, str], body: Any) -> str:
+    """
+    Cache key of a rendered request.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The rendered URL.
+        headers (dict[str, str]): The request headers (names are case-insensitive).
+        body (Any): The rendered request body.
+
+    Returns:
+        str: A SHA-256 hex digest of the request.
+    """
+    canonical = json.dumps(
+        [method.upper(), url, sorted((k.lower(), v) for k, v in headers.items()), body],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def cache_control_ttl(cache_control: str | None) -> float | None:
+    """
+    Freshness lifetime allowed by a Cache-Control header.
+
+    Args:
+        cache_control (str | None): The header value.
+
+    Returns:
+        float | None: s-maxage or max-age in seconds; 0 if the response must
+        not be reused; None if the header does not say.
+    """
+    if not cache_control:
+        return None
+    directives = {}
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(float(directives[name]), 0)
+            except ValueError:
+                return 0
+    return None
+
+
+class ResponseCache:
+    """
+    In-process LRU plus Redis cache with single-flight fetches.
+    """
+
+    def __init__(self, max_size: int, prefix: str = "webhook:response"):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of entries kept in process.
+            prefix (str): Redis key prefix.
+        """
+        self._max_size = max_size
+        self._prefix = prefix
+        self._local: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _get_local(self, key: str) -> dict[str, Any] | None:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _put_local(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self._max_size:
+            self._local.popitem(last=False)
+
+    async def _get_remote(self, key: str) -> tuple[dict[str, Any], float] | None:
+        try:
+            pipe = get_async_redis_client().pipeline(transaction=False)
+            pipe.get(f"{self._prefix}:{key}")
+            pipe.pttl(f"{self._prefix}:{key}")
+            raw, ttl_ms = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis response cache read error for {key}: {e}")
+            return None
+        if raw is None or ttl_ms <= 0:
+            return None
+        return json.loads(raw), ttl_ms / 1000
+
+    async def _put_remote(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        try:
+            await get_async_redis_client().set(
+                f"{self._prefix}:{key}",
+                json.dumps(value, default=str),
+                px=math.ceil(ttl * 1000),
+            )
+        except Exception as e:
+            logger.warning(f"Redis response cache write error for {key}: {e}")
+
+    async def get_or_fetch(self, key: str, fetch: Fetch) -> tuple[dict[str, Any], bool]:
+        """
+        Get a cached value, or fetch and cache it.
+
+        Args:
+            key (str): The cache key.
+            fetch (Fetch): Produces the value and its TTL on a miss.
+
+        Returns:
+            tuple[dict[str, Any], bool]: The value, and whether it was served
+            without calling fetch (cached, or shared from a concurrent fetch).
+        """
+        while True:
+            value = self._get_local(key)
+            if value is not None:
+                return value, True
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                # Shielded so a cancelled waiter does not cancel the shared fetch
+                return await asyncio.shield(inflight), True
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling() or not inflight.cancelled():
+                    raise
+                # The fetching caller was cancelled, not this one
+            except TimeoutError:
+                # The fetching caller's budget ran out; this one's may not have
+                pass
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            remote = await self._get_remote(key)
+            if remote is not None:
+                value, ttl = remote
+                self._put_local(key, value, ttl)
+                future.set_result(value)
+                return value, True
+
+            value, ttl = await fetch()
+            if ttl:
+                self._put_local(key, value, ttl)
+                await self._put_remote(key, value, ttl)
+            future.set_result(value)
+            return value, False
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters re-raise it; mark it retrieved for when there are none
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,124 @@
+"""
+Redis-backed distributed semaphore with lease expiry.
+
+Each semaphore is a sorted set of lease tokens scored by their expiry
+time (Redis server clock). Expired leases are purged on every acquire,
+so a crashed worker only holds its slots until the lease runs out.
+"""
+import logging
+import uuid
+
+from app.cache.redis_cache import get_async_redis_client
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_ACQUIRE_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local lease_ms = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_ms)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], now_ms + lease_ms, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], lease_ms)
+    return 1
+end
+return 0
+"""
+
+_RENEW_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local lease_ms = tonumber(ARGV[1])
+local renewed = redis.call('ZADD', KEYS[1], 'XX', 'CH', now_ms + lease_ms, ARGV[2])
+redis.call('PEXPIRE', KEYS[1], lease_ms)
+return renewed
+"""
+
+
+class DistributedSemaphore:
+    """
+    Counting semaphore shared by all workers through Redis.
+
+    Redis errors fail open (the lease is granted with a warning) so a Redis
+    outage degrades to unlimited concurrency instead of stalling every run.
+    """
+
+    def __init__(self, lease_seconds: int | None = None):
+        """
+        Initialize the semaphore client.
+
+        Args:
+            lease_seconds: Lease duration; holders must renew before it elapses.
+                Defaults to settings.
+        """
+        self.lease_seconds = lease_seconds or settings.WORKFLOW_SEMAPHORE_LEASE_SECONDS
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return f"semaphore:{name}"
+
+    async def acquire(self, name: str, limit: int) -> str | None:
+        """
+        Try to take a slot without waiting.
+
+        Args:
+            name: The semaphore name (e.g. 'workflow:<uuid>').
+            limit: Maximum concurrent holders.
+
+        Returns:
+            str | None: A lease token if a slot was taken, else None.
+        """
+        token = uuid.uuid4().hex
+        try:
+            client = get_async_redis_client()
+            acquired = await client.eval(
+                _ACQUIRE_SCRIPT,
+                1,
+                self._key(name),
+                limit,
+                self.lease_seconds * 1000,
+                token,
+            )
+        except Exception as e:
+            logger.warning(f"Redis semaphore acquire error for {name}: {e}")
+            return token
+        return token if acquired else None
+
+    async def renew(self, name: str, token: str) -> bool:
+        """
+        Extend a held lease.
+
+        Args:
+            name: The semaphore name.
+            token: The lease token returned by acquire.
+
+        Returns:
+            bool: False if the lease had already expired.
+        """
+        try:
+            client = get_async_redis_client()
+            renewed = await client.eval(
+                _RENEW_SCRIPT, 1, self._key(name), self.lease_seconds * 1000, token
+            )
+        except Exception as e:
+            logger.warning(f"Redis semaphore renew error for {name}: {e}")
+            return True
+        if not renewed:
+            logger.warning(f"Semaphore lease {name} expired before renewal")
+        return bool(renewed)
+
+    async def release(self, name: str, token: str) -> None:
+        """
+        Release a held lease.
+
+        Args:
+            name: The semaphore name.
+            token: The lease token returned by acquire.
+        """
+        try:
+            client = get_async_redis_client()
+            await client.zrem(self._key(name), token)
+        except Exception as e:
+            logger.warning(f"Redis semaphore release error for {name}: {e}")
@@ -2,9 +2,27 @@ from abc import ABC
 from abc import abstractmethod
 from typing import Any
 
+from pydantic import BaseModel
+from pydantic import Field
+
 from app.connector.enum import ConnectorType
 
 
+class BaseWorkflowStep(BaseModel):
+    """
+    Fields shared by every step definition.
+
+    Attributes:
+        name (str): Unique step name; its output is exposed to later steps under it.
+        timeout (float | None): Maximum step duration in seconds. Defaults to
+            settings.DEFAULT_STEP_TIMEOUT_SECONDS, and is further capped by the
+            workflow deadline.
+    """
+
+    name: str
+    timeout: float | None = Field(default=None, gt=0)
+
+
 class BaseConnector(ABC):
     """Base class for all workflow connectors."""
 
@@ -12,13 +30,17 @@ class BaseConnector(ABC):
         self.type: ConnectorType = type
 
     @abstractmethod
-    async def execute(self, config: Any, context: dict[str, Any]) -> dict[str, Any]:
+    async def execute(
+        self, config: Any, context: dict[str, Any], timeout: float | None = None
+    ) -> dict[str, Any]:
         """
         Execute the connector logic.
 
         Args:
             config (Any): The step configuration.
             context (dict[str, Any]): The execution context.
+            timeout (float | None): Seconds left for this step. The engine enforces
+                it; connectors pass it to their own clients so I/O is bounded too.
 
         Returns:
             dict[str, Any]: The execution result.
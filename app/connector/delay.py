@@ -2,40 +2,17 @@
 import asyncio
 import logging
 from typing import Any
-from typing import Literal
-
-from pydantic import BaseModel
 
 from .enum import ConnectorType
 from app.connector.base import BaseConnector
+from app.connector.delay_models import DelayOutput
+from app.connector.delay_models import DelayWorkflowStep
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class DelayConfig(BaseModel):
-    """Configuration for Delay connector."""
-
-    duration: int
-
-
-class DelayWorkflowStep(BaseModel):
-    """definition of a Delay step in a workflow."""
-
-    type: Literal[ConnectorType.DELAY] = ConnectorType.DELAY
-    name: str
-    config: DelayConfig
-
-
-class DelayOutput(BaseModel):
-    """Output model for Delay connector."""
-
-    type: Literal[ConnectorType.DELAY] = ConnectorType.DELAY
-    duration: int
-    message: str
-
-
 class DelayConnector(BaseConnector):
     """Connector that waits for a specified duration."""
 
@@ -43,7 +20,10 @@ class DelayConnector(BaseConnector):
         super().__init__(ConnectorType.DELAY)
 
     async def execute(
-        self, step: DelayWorkflowStep, context: dict[str, Any]
+        self,
+        step: DelayWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
     ) -> DelayOutput:
         """
         Wait for specified duration.
@@ -51,6 +31,7 @@ class DelayConnector(BaseConnector):
         Args:
             step (DelayWorkflowStep): The step configuration.
             context (dict[str, Any]): The execution context.
+            timeout (float | None): Unused; the engine cancels the sleep on timeout.
 
         Returns:
             DelayOutput: The output containing duration and message.
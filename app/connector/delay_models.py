@@ -0,0 +1,28 @@
+# Delay Connector: step and output models
+from typing import Literal
+
+from pydantic import BaseModel
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+
+
+class DelayConfig(BaseModel):
+    """Configuration for Delay connector."""
+
+    duration: int
+
+
+class DelayWorkflowStep(BaseWorkflowStep):
+    """definition of a Delay step in a workflow."""
+
+    type: Literal[ConnectorType.DELAY] = ConnectorType.DELAY
+    config: DelayConfig
+
+
+class DelayOutput(BaseModel):
+    """Output model for Delay connector."""
+
+    type: Literal[ConnectorType.DELAY] = ConnectorType.DELAY
+    duration: int
+    message: str
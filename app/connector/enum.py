@@ -6,3 +6,9 @@ class ConnectorType(StrEnum):
 
     DELAY = "delay"
     WEBHOOK = "webhook"
+    MAP = "map"
+    SUBWORKFLOW = "subworkflow"
+    SWITCH = "switch"
+    TRANSFORM = "transform"
+    KAFKA_PUBLISH = "kafka_publish"
+    REDIS = "redis"
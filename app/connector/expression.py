@@ -0,0 +1,199 @@
+"""
+Safe boolean/arithmetic expressions over the execution context.
+
+Expressions use a subset of Python syntax, e.g.
+    payload.amount > 100 and fetch.status_code == 200
+    payload.country in ["US", "CA"] or len(payload.items) == 0
+
+Names and attribute/index access read from the context (dict keys, list
+positions, step output fields) and yield None when missing; names and
+keys starting with an underscore are refused. Only
+literals, boolean logic, comparisons, arithmetic, conditional
+expressions and a few pure built-in functions are allowed, and string
+or list repetition (*) is capped at MAX_REPEAT_LENGTH items (% only
+works on numbers, not as string formatting). An
+expression is parsed, checked and compiled once into a Python function,
+so evaluating it costs about as much as the equivalent inline code.
+"""
+import ast
+from collections.abc import Mapping
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+from typing import Callable
+
+from pydantic import BaseModel
+
+FUNCTIONS: dict[str, Callable] = {
+    "len": len,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "round": round,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "any": any,
+    "all": all,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot, ast.IfExp,
+    ast.Constant, ast.Name, ast.Load, ast.Attribute, ast.Subscript,
+    ast.List, ast.Tuple, ast.Dict, ast.Call,
+)  # fmt: skip
+
+_CONTEXT_ARG = "_ctx"
+
+# Longest string or sequence an expression may build with *
+MAX_REPEAT_LENGTH = 10_000
+
+
+def _get(value: Any, key: Any) -> Any:
+    """Read a key, index or output field, returning None when missing."""
+    if isinstance(key, str) and key.startswith("_"):
+        raise ValueError(f"Private key '{key}' in expression")
+    if isinstance(value, Mapping):
+        return value.get(key)
+    if isinstance(value, BaseModel):
+        return getattr(value, key, None) if isinstance(key, str) else None
+    if (
+        isinstance(value, Sequence)
+        and not isinstance(value, str)
+        and isinstance(key, int)
+    ):
+        return value[key] if -len(value) <= key < len(value) else None
+    return None
+
+
+def _mul(left: Any, right: Any) -> Any:
+    """Multiply, refusing to repeat a string or sequence past MAX_REPEAT_LENGTH."""
+    for sequence, count in ((left, right), (right, left)):
+        if isinstance(sequence, (str, bytes, list, tuple)) and isinstance(count, int):
+            if len(sequence) * count > MAX_REPEAT_LENGTH:
+                raise ValueError(
+                    f"Repetition longer than {MAX_REPEAT_LENGTH} items in expression"
+                )
+    return left * right
+
+
+def _mod(left: Any, right: Any) -> Any:
+    """Modulo, refusing %-formatting (whose field widths are unbounded too)."""
+    if isinstance(left, (str, bytes)):
+        raise ValueError("String formatting with % in expression")
+    return left % right
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Route context reads through _get, and * and % through _mul and _mod."""
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        return ast.Call(
+            func=ast.Name(id="_get", ctx=ast.Load()),
+            args=[ast.Name(id=_CONTEXT_ARG, ctx=ast.Load()), ast.Constant(node.id)],
+            keywords=[],
+        )
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        return ast.Call(
+            func=ast.Name(id="_get", ctx=ast.Load()),
+            args=[self.visit(node.value), ast.Constant(node.attr)],
+            keywords=[],
+        )
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        return ast.Call(
+            func=ast.Name(id="_get", ctx=ast.Load()),
+            args=[self.visit(node.value), self.visit(node.slice)],
+            keywords=[],
+        )
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        helper = {ast.Mult: "_mul", ast.Mod: "_mod"}.get(type(node.op))
+        if helper is None:
+            return node
+        return ast.Call(
+            func=ast.Name(id=helper, ctx=ast.Load()),
+            args=[node.left, node.right],
+            keywords=[],
+        )
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        # The function name is checked in _validate; keep it a plain global
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+def _validate(tree: ast.AST, expression: str) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(
+                f"Unsupported syntax '{type(node).__name__}' "
+                f"in expression '{expression}'"
+            )
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise ValueError(
+                f"Private attribute '{node.attr}' in expression '{expression}'"
+            )
+        if (
+            isinstance(node, ast.Subscript)
+            and isinstance(node.slice, ast.Constant)
+            and isinstance(node.slice.value, str)
+            and node.slice.value.startswith("_")
+        ):
+            raise ValueError(
+                f"Private key '{node.slice.value}' in expression '{expression}'"
+            )
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name)
+            or node.func.id not in FUNCTIONS
+            or node.keywords
+        ):
+            raise ValueError(f"Unsupported function call in expression '{expression}'")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Callable[[Mapping[str, Any]], Any]:
+    """
+    Compile an expression into a function of the execution context.
+
+    Args:
+        expression (str): The expression source.
+
+    Returns:
+        Callable[[Mapping[str, Any]], Any]: Evaluates the expression for a context.
+
+    Raises:
+        ValueError: If the expression is malformed or uses unsupported syntax.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression '{expression}': {e.msg}") from e
+    _validate(tree, expression)
+
+    body = _Rewriter().visit(tree).body
+    function = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=_CONTEXT_ARG)],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=body,
+        )
+    )
+    ast.fix_missing_locations(function)
+    code = compile(function, f"<expression {expression!r}>", "eval")
+    return eval(
+        code,
+        {"__builtins__": {}, "_get": _get, "_mul": _mul, "_mod": _mod, **FUNCTIONS},
+    )
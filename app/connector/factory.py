@@ -1,22 +1,24 @@
-from app.connector.delay import DelayConnector
 from app.connector.enum import ConnectorType
-from app.connector.webhook import WebhookConnector
-
-CONNECTORS = [DelayConnector(), WebhookConnector()]
+from app.connector.registry import registry
+from app.messaging.base import BaseProducer
 
 
 class ConnectorFactory:
     """
     Factory class to create instances of different connectors based on the type.
+
+    Connectors come from the connector registry (built-ins and entry point
+    plugins) and are imported and created the first time they are needed.
     """
 
     @staticmethod
-    def get_instance(connector_type: ConnectorType):
+    def get_instance(connector_type: str):
         """
         Create an instance of the specified connector type.
 
         Args:
-            connector_type (ConnectorType): The type of connector to create.
+            connector_type (str): The type of connector to create (a
+                ConnectorType or a plugin's type).
 
         Returns:
             BaseConnector: An instance of the specified connector.
@@ -24,7 +26,17 @@ class ConnectorFactory:
         Raises:
             ValueError: If the connector type is unknown.
         """
-        for connector in CONNECTORS:
-            if connector.type == connector_type:
-                return connector
-        raise ValueError(f"Unknown connector type: {connector_type}")
+        return registry.get(connector_type)
+
+    @staticmethod
+    def set_producer(producer: BaseProducer | None) -> None:
+        """
+        Bind the producer used by connectors that publish to the broker.
+
+        The worker calls this with its started producer, so publish steps
+        reuse its connection and batching instead of opening their own.
+
+        Args:
+            producer (BaseProducer | None): The started producer, or None to unbind.
+        """
+        ConnectorFactory.get_instance(ConnectorType.KAFKA_PUBLISH).producer = producer
@@ -0,0 +1,121 @@
+"""
+Per-host latency tracking and budgets for hedged webhook requests.
+
+A hedge is a second, identical request sent when the first has not
+answered within the host's observed latency percentile; whichever
+answers first wins. Each request earns the host WEBHOOK_HEDGE_BUDGET_RATIO
+hedge credits and each hedge spends one, so hedges stay within that
+fraction of the host's traffic. Statistics are kept per worker process.
+"""
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Credits a host can save up while hedging is not needed
+MAX_HEDGE_CREDIT = 10.0
+
+# Log each host's win rate every this many hedges
+REPORT_EVERY = 100
+
+
+@dataclass
+class HostStats:
+    """
+    Hedging state of one host.
+
+    Attributes:
+        latencies (deque[float]): Recent request latencies in seconds.
+        credit (float): Hedges currently allowed by the budget.
+        requests (int): Requests made.
+        hedges (int): Hedges sent.
+        wins (int): Hedges that answered before the original request.
+    """
+
+    latencies: deque = field(
+        default_factory=lambda: deque(maxlen=settings.WEBHOOK_HEDGE_WINDOW)
+    )
+    credit: float = 0.0
+    requests: int = 0
+    hedges: int = 0
+    wins: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.hedges if self.hedges else 0.0
+
+
+class HedgeTracker:
+    """
+    Latency percentiles, hedge budgets and win rates per host.
+    """
+
+    def __init__(self):
+        self._hosts: dict[str, HostStats] = {}
+
+    def _host(self, host: str) -> HostStats:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = HostStats()
+        return stats
+
+    def record_request(self, host: str) -> None:
+        """Count a request and earn the host its share of hedge credit."""
+        stats = self._host(host)
+        stats.requests += 1
+        stats.credit = min(
+            stats.credit + settings.WEBHOOK_HEDGE_BUDGET_RATIO, MAX_HEDGE_CREDIT
+        )
+
+    def record_latency(self, host: str, seconds: float) -> None:
+        """Record a request's latency (for a cancelled one, how long it had run)."""
+        self._host(host).latencies.append(seconds)
+
+    def hedge_delay(self, host: str, percentile: float) -> float | None:
+        """
+        Delay after which to hedge a request to a host.
+
+        Args:
+            host: The host.
+            percentile: Latency percentile to wait for, e.g. 0.95.
+
+        Returns:
+            float | None: Seconds to wait, or None while there are too few samples.
+        """
+        latencies = self._host(host).latencies
+        if len(latencies) < settings.WEBHOOK_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(math.ceil(percentile * len(ordered)) - 1, len(ordered) - 1)]
+
+    def try_hedge(self, host: str) -> bool:
+        """
+        Spend one hedge credit if the budget allows.
+
+        Returns:
+            bool: Whether a hedge may be sent.
+        """
+        stats = self._host(host)
+        if stats.credit < 1:
+            return False
+        stats.credit -= 1
+        stats.hedges += 1
+        return True
+
+    def record_outcome(self, host: str, hedge_won: bool) -> None:
+        """Record which request of a hedged pair answered first."""
+        stats = self._host(host)
+        if hedge_won:
+            stats.wins += 1
+        if stats.hedges % REPORT_EVERY == 0:
+            logger.info(
+                f"Hedging {host}: {stats.hedges} hedges over "
+                f"{stats.requests} requests, "
+                f"win rate {stats.win_rate:.1%}"
+            )
@@ -0,0 +1,84 @@
+# Kafka Publish Connector
+import logging
+from collections import ChainMap
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+from .enum import ConnectorType
+from app.connector.base import BaseConnector
+from app.connector.kafka_publish_models import KafkaPublishOutput
+from app.connector.kafka_publish_models import KafkaPublishWorkflowStep
+from app.connector.template import render
+from app.connector.template import resolve_path
+from app.messaging.base import BaseProducer
+from app.messaging.events import is_internal_topic
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class KafkaPublishConnector(BaseConnector):
+    """Connector that publishes messages with the worker's producer."""
+
+    def __init__(self):
+        super().__init__(ConnectorType.KAFKA_PUBLISH)
+        # Bound by the worker (ConnectorFactory.set_producer) once started
+        self.producer: BaseProducer | None = None
+
+    async def execute(
+        self,
+        step: KafkaPublishWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+    ) -> KafkaPublishOutput:
+        """
+        Render and publish the message(s).
+
+        Args:
+            step (KafkaPublishWorkflowStep): The step configuration.
+            context (dict[str, Any]): The execution context.
+            timeout (float | None): Unused; the engine enforces it.
+
+        Returns:
+            KafkaPublishOutput: The topic and number of messages published.
+
+        Raises:
+            RuntimeError: If no producer is bound.
+            ValueError: If the topic renders to an internal topic, or the items
+                path does not resolve to a list.
+        """
+        if self.producer is None:
+            raise RuntimeError("Kafka publish steps need a started producer")
+
+        config = step.config
+        topic = str(render(config.topic, context))
+        if is_internal_topic(topic):
+            raise ValueError(f"Cannot publish to internal topic {topic}")
+        if config.items is None:
+            scopes = [context]
+        else:
+            items = resolve_path(context, config.items)
+            if not isinstance(items, list):
+                raise ValueError(f"Kafka publish items '{config.items}' is not a list")
+            scopes = [
+                ChainMap({"item": item, "index": index}, context)
+                for index, item in enumerate(items)
+            ]
+
+        messages = [
+            (
+                str(render(config.key, scope)) if config.key else None,
+                to_jsonable_python(render(config.value, scope)),
+            )
+            for scope in scopes
+        ]
+        if len(messages) == 1:
+            key, value = messages[0]
+            await self.producer.send(topic, value, key=key)
+        else:
+            await self.producer.send_many(topic, messages)
+
+        logger.info(f"Published {len(messages)} messages to {topic}")
+        return KafkaPublishOutput(topic=topic, count=len(messages))
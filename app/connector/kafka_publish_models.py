@@ -0,0 +1,50 @@
+# Kafka Publish Connector: step and output models
+from typing import Any
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import model_validator
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+from app.messaging.events import is_internal_topic
+
+
+class KafkaPublishConfig(BaseModel):
+    """
+    Configuration for Kafka Publish connector.
+
+    Attributes:
+        topic (str): Destination topic; may contain placeholders. The
+            service's own topics (e.g. workflow.trigger) are rejected.
+        key (str | None): Message key template (e.g. "${payload.order_id}").
+        value (dict[str, Any]): Message value template.
+        items (str | None): Context path of a list; when set, one message is
+            published per element (with "${item}" and "${index}") in one batch.
+    """
+
+    topic: str
+    key: str | None = None
+    value: dict[str, Any]
+    items: str | None = None
+
+    @model_validator(mode="after")
+    def validate_topic(self) -> "KafkaPublishConfig":
+        if is_internal_topic(self.topic):
+            raise ValueError(f"Cannot publish to internal topic {self.topic}")
+        return self
+
+
+class KafkaPublishWorkflowStep(BaseWorkflowStep):
+    """Definition of a Kafka Publish step in a workflow."""
+
+    type: Literal[ConnectorType.KAFKA_PUBLISH] = ConnectorType.KAFKA_PUBLISH
+    config: KafkaPublishConfig
+
+
+class KafkaPublishOutput(BaseModel):
+    """Output model for Kafka Publish connector."""
+
+    type: Literal[ConnectorType.KAFKA_PUBLISH] = ConnectorType.KAFKA_PUBLISH
+    topic: str
+    count: int
@@ -0,0 +1,104 @@
+# Map Connector
+import asyncio
+import logging
+from collections import ChainMap
+from typing import Any
+
+from .enum import ConnectorType
+from app.connector.base import BaseConnector
+from app.connector.map_models import MapOutput
+from app.connector.map_models import MapWorkflowStep
+from app.connector.template import resolve_path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MapConnector(BaseConnector):
+    """Connector that runs a step for every item of a list."""
+
+    def __init__(self):
+        super().__init__(ConnectorType.MAP)
+
+    async def execute(
+        self,
+        step: MapWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+    ) -> MapOutput:
+        """
+        Run the inner step for each item with bounded parallelism.
+
+        At most `concurrency` workers are started; each pulls the next item
+        index, so memory stays proportional to the concurrency rather than
+        to the number of items.
+
+        Args:
+            step (MapWorkflowStep): The step configuration.
+            context (dict[str, Any]): The execution context.
+            timeout (float | None): Seconds left for the whole map step.
+
+        Returns:
+            MapOutput: The ordered item results.
+
+        Raises:
+            ValueError: If the items path does not resolve to a list.
+            RuntimeError: If an item fails and allow_failures is not set.
+        """
+        # Imported here: the factory imports this module to register it
+        from app.connector.factory import ConnectorFactory
+
+        config = step.config
+        items = resolve_path(context, config.items)
+        if not isinstance(items, list):
+            raise ValueError(f"Map items '{config.items}' is not a list")
+
+        inner = config.step
+        connector = ConnectorFactory.get_instance(inner.type)
+        item_timeout = inner.timeout or timeout
+        results: list[Any] = [None] * len(items)
+        errors: dict[int, str] = {}
+        indices = iter(range(len(items)))
+
+        async def run_item(index: int) -> None:
+            item_context = ChainMap({"item": items[index], "index": index}, context)
+            try:
+                async with asyncio.timeout(inner.timeout):
+                    output = await connector.execute(
+                        inner, item_context, timeout=item_timeout
+                    )
+            except Exception as e:
+                error = str(e) or f"Item {index} timed out after {inner.timeout}s"
+                if not config.allow_failures:
+                    raise RuntimeError(f"Map item {index} failed: {error}") from e
+                errors[index] = error
+                return
+            if config.result_path:
+                results[index] = resolve_path(output, config.result_path)
+            else:
+                results[index] = output.model_dump(mode="json", exclude={"type"})
+
+        async def worker() -> None:
+            for index in indices:
+                await run_item(index)
+
+        logger.info(
+            f"Mapping {inner.type} step over {len(items)} items "
+            f"(concurrency {config.concurrency})"
+        )
+        try:
+            async with asyncio.TaskGroup() as group:
+                for _ in range(min(config.concurrency, len(items))):
+                    group.create_task(worker())
+        except ExceptionGroup as group_error:
+            # Surface the first item failure; the other workers were cancelled
+            raise group_error.exceptions[0] from None
+
+        return MapOutput(
+            count=len(items),
+            succeeded=len(items) - len(errors),
+            failed=len(errors),
+            results=results,
+            errors=errors,
+        )
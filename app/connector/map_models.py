@@ -0,0 +1,59 @@
+# Map Connector: step and output models
+from typing import Any
+from typing import Literal
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+from pydantic import Field
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+
+if TYPE_CHECKING:
+    # Resolved by app.schemas.workflow once every step model is registered
+    from app.schemas.workflow import WorkflowStep
+
+
+class MapConfig(BaseModel):
+    """
+    Configuration for Map connector.
+
+    Attributes:
+        items (str): Context path of the list to iterate, e.g. "payload.orders".
+        step (WorkflowStep): Step run once per item. Its placeholders can use
+            "${item...}" and "${index}" besides the usual context.
+        concurrency (int): Maximum items processed at once.
+        result_path (str | None): Path into each item's output to keep, e.g.
+            "response_data.id". Defaults to the whole output.
+        allow_failures (bool): Record failed items and carry on instead of
+            failing the step on the first error.
+    """
+
+    items: str
+    step: "WorkflowStep"
+    concurrency: int = Field(default=10, ge=1)
+    result_path: str | None = None
+    allow_failures: bool = False
+
+
+class MapWorkflowStep(BaseWorkflowStep):
+    """Definition of a Map step in a workflow."""
+
+    type: Literal[ConnectorType.MAP] = ConnectorType.MAP
+    config: MapConfig
+
+
+class MapOutput(BaseModel):
+    """
+    Output model for Map connector.
+
+    Item results are kept in input order without their step envelope;
+    errors are only stored for the items that failed.
+    """
+
+    type: Literal[ConnectorType.MAP] = ConnectorType.MAP
+    count: int
+    succeeded: int
+    failed: int
+    results: list[Any]
+    errors: dict[int, str] = Field(default_factory=dict)
@@ -0,0 +1,93 @@
+# Redis Connector
+import json
+import logging
+from collections import ChainMap
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+
+from .enum import ConnectorType
+from app.cache.redis_cache import get_async_redis_client
+from app.connector.base import BaseConnector
+from app.connector.redis_command_models import RedisCommand
+from app.connector.redis_command_models import RedisOutput
+from app.connector.redis_command_models import RedisWorkflowStep
+from app.connector.template import render
+from app.connector.template import resolve_path
+from app.core.config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _encode(value: Any) -> str:
+    """Encode a rendered value for Redis."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(to_jsonable_python(value))
+
+
+class RedisConnector(BaseConnector):
+    """Connector that writes to Redis through the shared asyncio client pool."""
+
+    def __init__(self):
+        super().__init__(ConnectorType.REDIS)
+
+    async def execute(
+        self,
+        step: RedisWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+    ) -> RedisOutput:
+        """
+        Render and run the command(s) in one pipelined round-trip.
+
+        Args:
+            step (RedisWorkflowStep): The step configuration.
+            context (dict[str, Any]): The execution context.
+            timeout (float | None): Unused; the engine enforces it.
+
+        Returns:
+            RedisOutput: The command and number of writes.
+
+        Raises:
+            ValueError: If the items path does not resolve to a list.
+        """
+        config = step.config
+        if config.items is None:
+            scopes = [context]
+        else:
+            items = resolve_path(context, config.items)
+            if not isinstance(items, list):
+                raise ValueError(f"Redis items '{config.items}' is not a list")
+            scopes = [
+                ChainMap({"item": item, "index": index}, context)
+                for index, item in enumerate(items)
+            ]
+
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        for scope in scopes:
+            key = f"{settings.REDIS_STEP_KEY_PREFIX}{render(config.key, scope)}"
+            value = render(config.value, scope)
+            command = config.command
+            if command == RedisCommand.SET:
+                pipe.set(key, _encode(value), ex=config.ttl)
+            elif command == RedisCommand.PUBLISH:
+                pipe.publish(key, _encode(value))
+            elif command == RedisCommand.LPUSH:
+                pipe.lpush(key, _encode(value))
+            elif command == RedisCommand.RPUSH:
+                pipe.rpush(key, _encode(value))
+            elif command == RedisCommand.XADD:
+                pipe.xadd(key, {field: _encode(v) for field, v in value.items()})
+            elif command == RedisCommand.HSET:
+                pipe.hset(
+                    key, mapping={field: _encode(v) for field, v in value.items()}
+                )
+            if config.ttl and command != RedisCommand.SET:
+                pipe.expire(key, config.ttl)
+        await pipe.execute()
+
+        logger.info(f"Ran {len(scopes)} Redis {config.command} commands")
+        return RedisOutput(command=config.command, count=len(scopes))
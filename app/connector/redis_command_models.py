@@ -0,0 +1,69 @@
+# Redis Connector: step and output models
+from enum import StrEnum
+from typing import Any
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import model_validator
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+
+
+class RedisCommand(StrEnum):
+    """Enumeration of supported Redis commands."""
+
+    SET = "set"
+    PUBLISH = "publish"
+    LPUSH = "lpush"
+    RPUSH = "rpush"
+    XADD = "xadd"
+    HSET = "hset"
+
+
+class RedisConfig(BaseModel):
+    """
+    Configuration for Redis connector.
+
+    Attributes:
+        command (RedisCommand): The write to perform.
+        key (str): Key, channel (PUBLISH) or stream (XADD) template. It is
+            written under REDIS_STEP_KEY_PREFIX, away from the service's own keys.
+        value (Any): Value template. Non-string values are JSON-encoded; XADD
+            and HSET take a mapping of fields.
+        ttl (int | None): Expiry in seconds applied to the key (not PUBLISH).
+        items (str | None): Context path of a list; when set, the command runs
+            once per element (with "${item}" and "${index}") in one pipeline.
+    """
+
+    command: RedisCommand
+    key: str
+    value: Any
+    ttl: int | None = Field(default=None, gt=0)
+    items: str | None = None
+
+    @model_validator(mode="after")
+    def validate_value(self) -> "RedisConfig":
+        if self.command in (RedisCommand.XADD, RedisCommand.HSET) and not isinstance(
+            self.value, dict
+        ):
+            raise ValueError(f"{self.command} requires a mapping value")
+        if self.command == RedisCommand.PUBLISH and self.ttl is not None:
+            raise ValueError("ttl does not apply to publish")
+        return self
+
+
+class RedisWorkflowStep(BaseWorkflowStep):
+    """Definition of a Redis step in a workflow."""
+
+    type: Literal[ConnectorType.REDIS] = ConnectorType.REDIS
+    config: RedisConfig
+
+
+class RedisOutput(BaseModel):
+    """Output model for Redis connector."""
+
+    type: Literal[ConnectorType.REDIS] = ConnectorType.REDIS
+    command: RedisCommand
+    count: int
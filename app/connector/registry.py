@@ -0,0 +1,181 @@
+"""
+Registry of connector types.
+
+Each connector is described by a ConnectorSpec naming, as "module:attr"
+paths, its connector class and its step and output models. Registering
+a spec imports its step model (to check the type) and the workflow
+schemas import the output models; a connector is only imported and
+instantiated the first time a step of its type runs. Built-in models
+live in "<connector>_models" modules, apart from the connectors and
+their clients (httpx, redis, ...), so the API and the scheduler never
+import a connector they do not run.
+
+Built-in connectors are registered here. Other packages add connectors
+through the "workflow_automation.connectors" entry point group, each
+entry point resolving to a ConnectorSpec, e.g. in pyproject.toml:
+
+    [tool.poetry.plugins."workflow_automation.connectors"]
+    s3 = "my_connectors.s3_spec:SPEC"
+
+Plugins should do the same and define their step and output models in a
+module separate from the connector.
+"""
+import importlib
+import logging
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any
+from typing import get_args
+
+from app.connector.base import BaseConnector
+from app.connector.enum import ConnectorType
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "workflow_automation.connectors"
+
+
+@dataclass(frozen=True)
+class ConnectorSpec:
+    """
+    Description of a connector type.
+
+    Attributes:
+        type (str): The step type, matching the models' "type" literal.
+        connector (str): "module:Class" of the BaseConnector implementation.
+        step (str): "module:Class" of the step model.
+        output (str): "module:Class" of the output model.
+    """
+
+    type: str
+    connector: str
+    step: str
+    output: str
+
+
+def _builtin(
+    connector_type: ConnectorType, module: str, name: str, output: str | None = None
+) -> ConnectorSpec:
+    path = f"app.connector.{module}"
+    return ConnectorSpec(
+        type=connector_type,
+        connector=f"{path}:{name}Connector",
+        step=f"{path}_models:{name}WorkflowStep",
+        output=f"{path}_models:{output or name + 'Output'}",
+    )
+
+
+BUILTIN_CONNECTORS = [
+    _builtin(ConnectorType.WEBHOOK, "webhook", "Webhook", output="WebhookResponse"),
+    _builtin(ConnectorType.DELAY, "delay", "Delay"),
+    _builtin(ConnectorType.MAP, "map", "Map"),
+    _builtin(ConnectorType.SUBWORKFLOW, "subworkflow", "Subworkflow"),
+    _builtin(ConnectorType.SWITCH, "switch", "Switch"),
+    _builtin(ConnectorType.TRANSFORM, "transform", "Transform"),
+    _builtin(ConnectorType.KAFKA_PUBLISH, "kafka_publish", "KafkaPublish"),
+    _builtin(ConnectorType.REDIS, "redis_command", "Redis"),
+]
+
+
+def load_object(path: str) -> Any:
+    """
+    Import the object named by a "module:attr" path.
+
+    Args:
+        path (str): The object path.
+
+    Returns:
+        Any: The object.
+    """
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class ConnectorRegistry:
+    """
+    Connector specs by type, with connectors instantiated on first use.
+    """
+
+    def __init__(
+        self, specs: list[ConnectorSpec] | None = None, load_plugins: bool = True
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            specs (list[ConnectorSpec]): Specs to register.
+            load_plugins (bool): Whether to add specs from installed entry points.
+        """
+        self._specs: dict[str, ConnectorSpec] = {}
+        self._instances: dict[str, BaseConnector] = {}
+        for spec in specs or []:
+            self.register(spec)
+        if load_plugins:
+            self._load_plugins()
+
+    def register(self, spec: ConnectorSpec) -> None:
+        """
+        Register a connector type.
+
+        Args:
+            spec (ConnectorSpec): The connector spec.
+
+        Raises:
+            ValueError: If the type is already registered, or does not match
+                the step model's "type" literal.
+        """
+        if spec.type in self._specs:
+            raise ValueError(f"Connector type already registered: {spec.type}")
+        step_types = get_args(load_object(spec.step).model_fields["type"].annotation)
+        if spec.type not in step_types:
+            raise ValueError(
+                f"Connector type {spec.type} does not match the type of {spec.step}"
+            )
+        self._specs[spec.type] = spec
+
+    def _load_plugins(self) -> None:
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                spec = entry_point.load()
+                self.register(spec)
+            except Exception as e:
+                logger.error(f"Skipping connector plugin {entry_point.name}: {e}")
+                continue
+            logger.info(f"Registered connector plugin {entry_point.name} ({spec.type})")
+
+    def get(self, connector_type: str) -> BaseConnector:
+        """
+        Get the connector of a type, importing and creating it on first use.
+
+        Args:
+            connector_type (str): The step type.
+
+        Returns:
+            BaseConnector: The shared connector instance.
+
+        Raises:
+            ValueError: If the type is not registered.
+        """
+        connector = self._instances.get(connector_type)
+        if connector is None:
+            spec = self._specs.get(connector_type)
+            if spec is None:
+                raise ValueError(f"Unknown connector type: {connector_type}")
+            connector = self._instances[connector_type] = load_object(spec.connector)()
+        return connector
+
+    def is_loaded(self, connector_type: str) -> bool:
+        """Whether the connector of a type has been created."""
+        return connector_type in self._instances
+
+    def step_models(self) -> list[type]:
+        """Step models of all registered types, in registration order."""
+        return [load_object(spec.step) for spec in self._specs.values()]
+
+    def output_models(self) -> list[type]:
+        """Output models of all registered types, in registration order."""
+        return [load_object(spec.output) for spec in self._specs.values()]
+
+
+registry = ConnectorRegistry(BUILTIN_CONNECTORS)
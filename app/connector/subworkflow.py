@@ -0,0 +1,162 @@
+# Sub-workflow Connector
+import asyncio
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from .enum import ConnectorType
+from app.connector.base import BaseConnector
+from app.connector.subworkflow_models import SubworkflowMode
+from app.connector.subworkflow_models import SubworkflowOutput
+from app.connector.subworkflow_models import SubworkflowWorkflowStep
+from app.connector.template import render
+from app.schemas.common import WorkflowStatus
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExecutionScope:
+    """
+    The engine executing the current task's steps.
+
+    Attributes:
+        engine (Any): The WorkflowService running the plan.
+        call_stack (tuple[str, ...]): UUIDs of the workflows being executed,
+            outermost first, used to reject recursive sub-workflows.
+    """
+
+    engine: Any
+    call_stack: tuple[str, ...]
+
+
+# Set by the engine around plan execution; inherited by tasks it spawns
+current_scope: ContextVar[ExecutionScope | None] = ContextVar(
+    "current_scope", default=None
+)
+
+
+class SubworkflowConnector(BaseConnector):
+    """Connector that runs another workflow as a step."""
+
+    def __init__(self):
+        super().__init__(ConnectorType.SUBWORKFLOW)
+
+    async def execute(
+        self,
+        step: SubworkflowWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+    ) -> SubworkflowOutput:
+        """
+        Run the referenced workflow and return its step outputs.
+
+        Args:
+            step (SubworkflowWorkflowStep): The step configuration.
+            context (dict[str, Any]): The execution context.
+            timeout (float | None): Seconds left for the step; the engine
+                cancels the child when it elapses.
+
+        Returns:
+            SubworkflowOutput: The child's status and step outputs.
+
+        Raises:
+            RuntimeError: If called outside the engine, or the child fails.
+            ValueError: If the workflow does not exist or calls itself.
+            TimeoutError: If the child times out.
+        """
+        scope = current_scope.get()
+        if scope is None:
+            raise RuntimeError(
+                "Subworkflow steps can only run inside the workflow engine"
+            )
+
+        config = step.config
+        if config.workflow_id in scope.call_stack:
+            cycle = " -> ".join((*scope.call_stack, config.workflow_id))
+            raise ValueError(f"Recursive subworkflow: {cycle}")
+
+        plan = scope.engine.get_plan(config.workflow_id)
+        if plan is None:
+            raise ValueError(f"Workflow {config.workflow_id} not found")
+
+        payload = (
+            render(config.payload, context)
+            if config.payload is not None
+            else context["payload"]
+        )
+        if config.mode == SubworkflowMode.ASYNC:
+            return await self._dispatch(scope, plan, payload, config.wait)
+
+        logger.info(f"Running subworkflow {config.workflow_id} inline")
+        step_results = {}
+        child_context = {"payload": payload}
+        deadline_at = (
+            asyncio.get_running_loop().time() + plan.workflow.deadline
+            if plan.workflow.deadline
+            else None
+        )
+        failed = await scope.engine.run_plan(
+            plan, child_context, step_results, deadline_at
+        )
+        if failed is not None:
+            self._raise_failure(
+                config.workflow_id,
+                failed.status,
+                f"step {failed.step_name}: {failed.error}",
+            )
+        return SubworkflowOutput(
+            workflow_id=config.workflow_id,
+            status=WorkflowStatus.SUCCESS,
+            outputs=self._outputs(step_results),
+        )
+
+    async def _dispatch(
+        self, scope: ExecutionScope, plan: Any, payload: dict[str, Any], wait: bool
+    ) -> SubworkflowOutput:
+        """Run the child as its own run through the broker."""
+        dispatcher = scope.engine.dispatcher
+        if dispatcher is None:
+            raise RuntimeError("Asynchronous subworkflows need a worker dispatcher")
+
+        run_id = await dispatcher.dispatch(plan.workflow, payload, wait=wait)
+        if not wait:
+            return SubworkflowOutput(
+                workflow_id=plan.workflow_id,
+                status=WorkflowStatus.PENDING,
+                run_id=run_id,
+            )
+
+        completed = await dispatcher.wait(run_id)
+        status = WorkflowStatus(completed.status)
+        if status != WorkflowStatus.SUCCESS:
+            self._raise_failure(plan.workflow_id, status, completed.error)
+        run = scope.engine.load_workflow_run(run_id)
+        if run:
+            scope.engine.resolve_outputs(run)
+        return SubworkflowOutput(
+            workflow_id=plan.workflow_id,
+            status=status,
+            run_id=run_id,
+            outputs=self._outputs(run.step_results) if run else {},
+        )
+
+    @staticmethod
+    def _outputs(step_results: dict[str, Any]) -> dict[str, Any]:
+        """Step outputs of a child keyed by step name, without their envelopes."""
+        return {
+            name: result.output.model_dump(mode="json", exclude={"type"})
+            for name, result in step_results.items()
+            if result.output is not None
+        }
+
+    @staticmethod
+    def _raise_failure(workflow_id: str, status: Any, error: str | None) -> None:
+        """Fail the step with the child's status (step or run status)."""
+        message = f"Subworkflow {workflow_id} {status.value}: {error}"
+        if status == WorkflowStatus.TIMED_OUT:
+            raise TimeoutError(message)
+        raise RuntimeError(message)
@@ -0,0 +1,56 @@
+# Sub-workflow Connector: step and output models
+from enum import StrEnum
+from typing import Any
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import Field
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+from app.schemas.common import WorkflowStatus
+
+
+class SubworkflowMode(StrEnum):
+    """How a sub-workflow is executed."""
+
+    INLINE = "inline"
+    ASYNC = "async"
+
+
+class SubworkflowConfig(BaseModel):
+    """
+    Configuration for Subworkflow connector.
+
+    Attributes:
+        workflow_id (str): UUID of the workflow to run.
+        payload (dict[str, Any] | None): Child payload; placeholders are
+            rendered against the parent context. Defaults to the parent payload.
+        mode (SubworkflowMode): INLINE runs the child's steps in this task
+            with no run record; ASYNC creates a child run and dispatches it
+            through the broker.
+        wait (bool): In ASYNC mode, wait for the child run's completion
+            event instead of returning right after dispatch.
+    """
+
+    workflow_id: str
+    payload: dict[str, Any] | None = None
+    mode: SubworkflowMode = SubworkflowMode.INLINE
+    wait: bool = True
+
+
+class SubworkflowWorkflowStep(BaseWorkflowStep):
+    """Definition of a Subworkflow step in a workflow."""
+
+    type: Literal[ConnectorType.SUBWORKFLOW] = ConnectorType.SUBWORKFLOW
+    config: SubworkflowConfig
+
+
+class SubworkflowOutput(BaseModel):
+    """Output model for Subworkflow connector."""
+
+    type: Literal[ConnectorType.SUBWORKFLOW] = ConnectorType.SUBWORKFLOW
+    workflow_id: str
+    status: WorkflowStatus
+    run_id: str | None = None
+    outputs: dict[str, Any] = Field(default_factory=dict)
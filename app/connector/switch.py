@@ -0,0 +1,52 @@
+# Switch Connector
+import logging
+from typing import Any
+
+from .enum import ConnectorType
+from app.connector.base import BaseConnector
+from app.connector.expression import compile_expression
+from app.connector.switch_models import SwitchOutput
+from app.connector.switch_models import SwitchWorkflowStep
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SwitchConnector(BaseConnector):
+    """Connector that selects which later steps run."""
+
+    def __init__(self):
+        super().__init__(ConnectorType.SWITCH)
+
+    async def execute(
+        self,
+        step: SwitchWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+    ) -> SwitchOutput:
+        """
+        Evaluate the cases and pick a branch.
+
+        Args:
+            step (SwitchWorkflowStep): The step configuration.
+            context (dict[str, Any]): The execution context.
+            timeout (float | None): Unused; evaluation does no I/O.
+
+        Returns:
+            SwitchOutput: The matched case index (None for default) and the
+            selected and skipped step names. The engine skips the latter.
+        """
+        config = step.config
+        case_index = None
+        selected = config.default
+        for index, case in enumerate(config.cases):
+            if compile_expression(case.when)(context):
+                case_index = index
+                selected = case.then
+                break
+
+        chosen = set(selected)
+        skipped = [name for name in config.targets if name not in chosen]
+        logger.info(f"Switch {step.name} selected {selected or 'no steps'}")
+        return SwitchOutput(case=case_index, selected=list(selected), skipped=skipped)
@@ -0,0 +1,68 @@
+# Switch Connector: step and output models
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import field_validator
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+from app.connector.expression import compile_expression
+
+
+class SwitchCase(BaseModel):
+    """
+    A branch of a Switch step.
+
+    Attributes:
+        when (str): Expression over the context, e.g. "payload.amount > 100".
+        then (list[str]): Names of the later steps to run when it is true.
+    """
+
+    when: str
+    then: list[str] = Field(default_factory=list)
+
+    @field_validator("when")
+    @classmethod
+    def validate_when(cls, value: str) -> str:
+        compile_expression(value)
+        return value
+
+
+class SwitchConfig(BaseModel):
+    """
+    Configuration for Switch connector.
+
+    The first case whose expression is true selects its steps; the steps
+    of every other branch are skipped. With no true case the default
+    steps are selected. Steps not named by any branch always run.
+
+    Attributes:
+        cases (list[SwitchCase]): Branches, evaluated in order.
+        default (list[str]): Steps to run when no case matches.
+    """
+
+    cases: list[SwitchCase]
+    default: list[str] = Field(default_factory=list)
+
+    @property
+    def targets(self) -> list[str]:
+        """Names of every step controlled by this switch, in order."""
+        names = [name for case in self.cases for name in case.then] + self.default
+        return list(dict.fromkeys(names))
+
+
+class SwitchWorkflowStep(BaseWorkflowStep):
+    """Definition of a Switch step in a workflow."""
+
+    type: Literal[ConnectorType.SWITCH] = ConnectorType.SWITCH
+    config: SwitchConfig
+
+
+class SwitchOutput(BaseModel):
+    """Output model for Switch connector."""
+
+    type: Literal[ConnectorType.SWITCH] = ConnectorType.SWITCH
+    case: int | None
+    selected: list[str]
+    skipped: list[str]
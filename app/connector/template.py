@@ -0,0 +1,84 @@
+"""
+Context path lookup and "${...}" placeholder rendering shared by connectors.
+
+A path is a dot-separated list of keys into the execution context, e.g.
+"payload.items" or "fetch.response_data.0.id". Mappings are indexed by
+key, sequences by integer position, and step outputs (pydantic models)
+by attribute.
+"""
+import re
+from collections.abc import Mapping
+from collections.abc import Sequence
+from typing import Any
+
+from pydantic import BaseModel
+
+_PLACEHOLDER = re.compile(r"\$\{([^}]+)\}")
+
+_MISSING = object()
+
+
+def resolve_path(context: Mapping[str, Any], path: str, default: Any = None) -> Any:
+    """
+    Look up a dotted path in the execution context.
+
+    Args:
+        context (Mapping[str, Any]): The execution context.
+        path (str): Dot-separated keys, e.g. "payload.items".
+        default (Any): Returned when any part of the path is missing.
+
+    Returns:
+        Any: The value at the path, or the default.
+    """
+    value: Any = context
+    for part in path.split("."):
+        if isinstance(value, Mapping):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, BaseModel):
+            value = getattr(value, part, _MISSING)
+        elif (
+            isinstance(value, Sequence)
+            and not isinstance(value, str)
+            and part.lstrip("-").isdigit()
+        ):
+            index = int(part)
+            value = value[index] if -len(value) <= index < len(value) else _MISSING
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            return default
+    return value
+
+
+def render(data: Any, context: Mapping[str, Any]) -> Any:
+    """
+    Replace "${path}" placeholders in data with context values.
+
+    A string that is exactly one placeholder is replaced by the raw value
+    (keeping its type); placeholders embedded in a longer string are
+    formatted with str(). Unresolved placeholders are left as they are.
+
+    Args:
+        data (Any): A dict, list or string possibly containing placeholders.
+        context (Mapping[str, Any]): The execution context.
+
+    Returns:
+        Any: The data with placeholders replaced.
+    """
+    if isinstance(data, dict):
+        return {k: render(v, context) for k, v in data.items()}
+    if isinstance(data, list):
+        return [render(item, context) for item in data]
+    if not isinstance(data, str) or "${" not in data:
+        return data
+
+    whole = _PLACEHOLDER.fullmatch(data)
+    if whole:
+        value = resolve_path(context, whole.group(1), _MISSING)
+        return data if value is _MISSING else value
+
+    def substitute(match: re.Match) -> str:
+        value = resolve_path(context, match.group(1), _MISSING)
+        return match.group(0) if value is _MISSING else str(value)
+
+    return _PLACEHOLDER.sub(substitute, data)
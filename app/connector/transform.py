@@ -0,0 +1,211 @@
+# Transform Connector
+import asyncio
+import json
+import logging
+import multiprocessing
+from collections import ChainMap
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from pydantic import BaseModel
+
+from .enum import ConnectorType
+from app.connector.base import BaseConnector
+from app.connector.expression import compile_expression
+from app.connector.template import resolve_path
+from app.connector.transform_models import AggregateFunction
+from app.connector.transform_models import TransformOp
+from app.connector.transform_models import TransformOperation
+from app.connector.transform_models import TransformOutput
+from app.connector.transform_models import TransformWorkflowStep
+from app.core.config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _scope(element: Any, index: int) -> Mapping[str, Any]:
+    fields = element if isinstance(element, Mapping) else {}
+    return ChainMap({"item": element, "index": index}, fields)
+
+
+def apply_operations(data: Any, operations: list[TransformOperation]) -> Any:
+    """
+    Run a transform pipeline.
+
+    Module-level so it can run in a worker process; expressions are
+    compiled once per process (compile_expression is cached).
+
+    Args:
+        data (Any): Plain JSON data.
+        operations (list[TransformOperation]): The pipeline stages.
+
+    Returns:
+        Any: The transformed data.
+
+    Raises:
+        ValueError: If a list operation is applied to a non-list.
+    """
+    for operation in operations:
+        op = operation.op
+        if op != TransformOp.AGGREGATE and not isinstance(data, list):
+            raise ValueError(
+                f"Transform {op} expects a list, got {type(data).__name__}"
+            )
+        evaluate = compile_expression(operation.expr) if operation.expr else None
+
+        if op == TransformOp.FILTER:
+            data = [
+                element
+                for index, element in enumerate(data)
+                if evaluate(_scope(element, index))
+            ]
+        elif op == TransformOp.MAP:
+            data = [
+                evaluate(_scope(element, index)) for index, element in enumerate(data)
+            ]
+        elif op == TransformOp.SORT:
+            keys = [
+                evaluate(_scope(element, index)) for index, element in enumerate(data)
+            ]
+            order = sorted(
+                range(len(data)), key=keys.__getitem__, reverse=operation.reverse
+            )
+            data = [data[index] for index in order]
+        elif op == TransformOp.LIMIT:
+            data = data[: operation.count]
+        elif op == TransformOp.GROUP_BY:
+            groups: dict[str, list[Any]] = {}
+            for index, element in enumerate(data):
+                groups.setdefault(str(evaluate(_scope(element, index))), []).append(
+                    element
+                )
+            data = groups
+        elif op == TransformOp.AGGREGATE:
+            data = _aggregate(data, operation.function, evaluate)
+    return data
+
+
+def _aggregate(data: Any, function: AggregateFunction, evaluate: Any) -> Any:
+    if not isinstance(data, list):
+        raise ValueError(
+            f"Transform aggregate expects a list, got {type(data).__name__}"
+        )
+    if function == AggregateFunction.COUNT and evaluate is None:
+        return len(data)
+    values = [evaluate(_scope(element, index)) for index, element in enumerate(data)]
+    values = [value for value in values if value is not None]
+    if function == AggregateFunction.COUNT:
+        return len(values)
+    if function == AggregateFunction.SUM:
+        return sum(values)
+    if not values:
+        return None
+    if function == AggregateFunction.MIN:
+        return min(values)
+    if function == AggregateFunction.MAX:
+        return max(values)
+    return sum(values) / len(values)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def _serialized_size(data: Any, limit: int) -> int:
+    """
+    JSON size of the data in bytes, counted only until it reaches limit.
+
+    Top-level elements are serialized one at a time, so sizing a large
+    input costs about limit bytes of serialization, not the whole input.
+    """
+    if isinstance(data, list):
+        elements = data
+    elif isinstance(data, dict):
+        elements = ({key: value} for key, value in data.items())
+    else:
+        return len(_dumps(data))
+    # The opening bracket, then each element with its comma or closing bracket
+    size = 1 if data else 2
+    for element in elements:
+        size += len(_dumps(element)) - (2 if isinstance(data, dict) else 0) + 1
+        if size >= limit:
+            break
+    return size
+
+
+def get_transform_pool() -> ProcessPoolExecutor:
+    """
+    Get or create the process pool for large transforms.
+
+    Worker processes are spawned rather than forked so they never inherit
+    the event loop, broker or Redis connections of the parent.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.TRANSFORM_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Transform process pool created")
+    return _pool
+
+
+def shutdown_transform_pool() -> None:
+    """Shut down the transform process pool, if it was started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class TransformConnector(BaseConnector):
+    """Connector that reshapes context data with a declarative pipeline."""
+
+    def __init__(self):
+        super().__init__(ConnectorType.TRANSFORM)
+
+    async def execute(
+        self,
+        step: TransformWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+    ) -> TransformOutput:
+        """
+        Apply the pipeline to the input data.
+
+        Inputs serializing to at least TRANSFORM_OFFLOAD_MIN_BYTES of JSON
+        run in the process pool so they neither block the event loop nor
+        hold the GIL; small inputs run inline, where the IPC round-trip
+        would cost more than the transform.
+
+        Args:
+            step (TransformWorkflowStep): The step configuration.
+            context (dict[str, Any]): The execution context.
+            timeout (float | None): Unused; the engine enforces it.
+
+        Returns:
+            TransformOutput: The transformed data.
+        """
+        config = step.config
+        data = resolve_path(context, config.input)
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
+
+        threshold = settings.TRANSFORM_OFFLOAD_MIN_BYTES
+        if _serialized_size(data, threshold) < threshold:
+            return TransformOutput(result=apply_operations(data, config.operations))
+
+        logger.info(f"Offloading transform {step.name} to process pool")
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            get_transform_pool(), apply_operations, data, config.operations
+        )
+        return TransformOutput(result=result, offloaded=True)
@@ -0,0 +1,101 @@
+# Transform Connector: step and output models
+from enum import StrEnum
+from typing import Any
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import model_validator
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+from app.connector.expression import compile_expression
+
+
+class TransformOp(StrEnum):
+    """Enumeration of transform operations."""
+
+    FILTER = "filter"
+    MAP = "map"
+    SORT = "sort"
+    LIMIT = "limit"
+    GROUP_BY = "group_by"
+    AGGREGATE = "aggregate"
+
+
+class AggregateFunction(StrEnum):
+    """Enumeration of aggregate functions."""
+
+    COUNT = "count"
+    SUM = "sum"
+    MIN = "min"
+    MAX = "max"
+    AVG = "avg"
+
+
+class TransformOperation(BaseModel):
+    """
+    One stage of a transform pipeline.
+
+    Expressions are evaluated per element. As in JMESPath, an element's
+    fields are in scope directly ("total > 100"); the element itself is
+    also available as "item" and its position as "index".
+
+    Attributes:
+        op (TransformOp): The operation.
+        expr (str | None): Element expression: the predicate of FILTER, the new
+            element of MAP (e.g. "{'id': id, 'total': total}"), the key of
+            SORT and GROUP_BY, the value of AGGREGATE.
+        reverse (bool): Sort descending.
+        count (int | None): Number of elements kept by LIMIT.
+        function (AggregateFunction | None): Aggregate function of AGGREGATE.
+    """
+
+    op: TransformOp
+    expr: str | None = None
+    reverse: bool = False
+    count: int | None = None
+    function: AggregateFunction | None = None
+
+    @model_validator(mode="after")
+    def validate_operation(self) -> "TransformOperation":
+        if self.op == TransformOp.LIMIT:
+            if self.count is None or self.count < 0:
+                raise ValueError("limit requires a non-negative count")
+        elif self.op == TransformOp.AGGREGATE:
+            if self.function is None:
+                raise ValueError("aggregate requires a function")
+            if self.expr is None and self.function != AggregateFunction.COUNT:
+                raise ValueError(f"aggregate {self.function} requires an expr")
+        elif self.expr is None:
+            raise ValueError(f"{self.op} requires an expr")
+        if self.expr is not None:
+            compile_expression(self.expr)
+        return self
+
+
+class TransformConfig(BaseModel):
+    """
+    Configuration for Transform connector.
+
+    Attributes:
+        input (str): Context path of the data to transform.
+        operations (list[TransformOperation]): Pipeline stages, applied in order.
+    """
+
+    input: str = "payload"
+    operations: list[TransformOperation]
+
+
+class TransformWorkflowStep(BaseWorkflowStep):
+    """Definition of a Transform step in a workflow."""
+
+    type: Literal[ConnectorType.TRANSFORM] = ConnectorType.TRANSFORM
+    config: TransformConfig
+
+
+class TransformOutput(BaseModel):
+    """Output model for Transform connector."""
+
+    type: Literal[ConnectorType.TRANSFORM] = ConnectorType.TRANSFORM
+    result: Any
+    offloaded: bool = False
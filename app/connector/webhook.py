@@ -1,53 +1,47 @@
+import asyncio
+import json
 import logging
+import time
 from typing import Any
-from typing import Literal
 
 import httpx
-from pydantic import BaseModel
 
 from .enum import ConnectorType
+from app.cache.rate_limit import RateLimiter
+from app.cache.response_cache import cache_control_ttl
+from app.cache.response_cache import request_key
+from app.cache.response_cache import ResponseCache
 from app.connector.base import BaseConnector
+from app.connector.hedging import HedgeTracker
+from app.connector.template import render
+from app.connector.template import resolve_path
+from app.connector.webhook_models import HedgePolicy
+from app.connector.webhook_models import RateLimit
+from app.connector.webhook_models import ResponseMode
+from app.connector.webhook_models import WebhookConfig
+from app.connector.webhook_models import WebhookResponse
+from app.connector.webhook_models import WebhookWorkflowStep
+from app.core.config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class WebhookConfig(BaseModel):
-    """Configuration for Webhook connector."""
-
-    url: str
-    method: str
-    headers: dict[str, str] = {}
-    body: dict[str, Any] = {}
-
-
-class WebhookWorkflowStep(BaseModel):
-    """Definition of a Webhook step in a workflow."""
-
-    type: Literal[ConnectorType.WEBHOOK] = ConnectorType.WEBHOOK
-    name: str
-    config: WebhookConfig
-
-
-class WebhookResponse(BaseModel):
-    """Output model for Webhook connector."""
-
-    type: Literal[ConnectorType.WEBHOOK] = ConnectorType.WEBHOOK
-    status_code: int
-    response_data: Any
-    url: str
-    method: str
-
-
 class WebhookConnector(BaseConnector):
     """Connector that makes HTTP requests."""
 
     def __init__(self):
         super().__init__(ConnectorType.WEBHOOK)
+        self._rate_limiter = RateLimiter()
+        self._hedging = HedgeTracker()
+        self._cache = ResponseCache(settings.WEBHOOK_CACHE_SIZE)
 
     async def execute(
-        self, step: WebhookWorkflowStep, context: dict[str, Any]
+        self,
+        step: WebhookWorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
     ) -> WebhookResponse:
         """
         Make HTTP request to webhook URL.
@@ -55,14 +49,18 @@ class WebhookConnector(BaseConnector):
         Args:
             step (WebhookWorkflowStep): The step configuration.
             context (dict[str, Any]): The execution context.
+            timeout (float | None): Seconds left for the step; bounds connect, read
+                and write. Defaults to settings.WEBHOOK_TIMEOUT_SECONDS.
 
         Returns:
             WebhookResponse: The response from the webhook.
 
         Raises:
-            ValueError: If an unsupported HTTP method is used.
+            ValueError: If an unsupported HTTP method is used or the response
+                exceeds the maximum size.
+            TimeoutError: If the request does not complete within the timeout.
         """
-        url = step.config.url
+        url = render(step.config.url, context)
         method = step.config.method.upper()
         headers = step.config.headers
         body = step.config.body
@@ -71,36 +69,258 @@ class WebhookConnector(BaseConnector):
         if isinstance(body, dict):
             body = self._replace_placeholders(body, context)
 
+        if step.config.cache is None:
+            response, _ = await self._call(step, method, url, headers, body, timeout)
+            return response
+
+        async def fetch() -> tuple[dict[str, Any], float | None]:
+            response, cache_control = await self._call(
+                step, method, url, headers, body, timeout
+            )
+            ttl = cache_control_ttl(cache_control)
+            if ttl != 0 and step.config.cache.ttl is not None:
+                ttl = step.config.cache.ttl
+            if not 200 <= response.status_code < 300:
+                ttl = None
+            return response.model_dump(mode="json"), ttl
+
+        key = request_key(method, url, headers, body)
+        data, cached = await self._cache.get_or_fetch(key, fetch)
+        return WebhookResponse.model_validate({**data, "cached": cached})
+
+    async def _call(
+        self,
+        step: WebhookWorkflowStep,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: Any,
+        timeout: float | None,
+    ) -> tuple[WebhookResponse, str | None]:
+        """
+        Make the request, subject to the step's rate limit and hedge policy.
+
+        Returns:
+            tuple[WebhookResponse, str | None]: The response and its
+            Cache-Control header.
+        """
+        await self._throttle(url, step.config.rate_limit)
         logger.info(f"Making {method} request to {url}")
 
-        async with httpx.AsyncClient() as client:
-            if method == "GET":
-                response = await client.get(url, headers=headers)
-            elif method == "POST":
-                response = await client.post(url, json=body, headers=headers)
-            elif method == "PUT":
-                response = await client.put(url, json=body, headers=headers)
-            elif method == "DELETE":
-                response = await client.delete(url, headers=headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-        response_data = (
-            response.json()
-            if response.headers.get("content-type", "").startswith("application/json")
-            else response.text
-        )
+        timeout = timeout or settings.WEBHOOK_TIMEOUT_SECONDS
+        hedged = hedge_won = False
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                if step.config.hedge is None:
+                    response = await self._send(client, method, url, headers, body)
+                else:
+                    response, hedged, hedge_won = await self._send_hedged(
+                        client,
+                        method,
+                        url,
+                        headers,
+                        body,
+                        step.config.hedge,
+                        step.config.rate_limit,
+                    )
+                response_data = await self._read(response, step.config)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"{method} {url} timed out after {timeout}s") from e
+
         return WebhookResponse(
             status_code=response.status_code,
             response_data=response_data,
             url=url,
             method=method,
-        )
+            hedged=hedged,
+            hedge_won=hedge_won,
+        ), response.headers.get("cache-control")
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: Any,
+    ) -> httpx.Response:
+        """Send one request, returning once the headers arrive (body unread)."""
+        if method in ("GET", "DELETE"):
+            request = client.build_request(method, url, headers=headers)
+        elif method in ("POST", "PUT"):
+            request = client.build_request(method, url, json=body, headers=headers)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        return await client.send(request, stream=True)
+
+    async def _read(self, response: httpx.Response, config: WebhookConfig) -> Any:
+        """
+        Stream the response body within the size limit and parse it.
+
+        Args:
+            response (httpx.Response): A streamed response.
+            config (WebhookConfig): The step configuration.
+
+        Returns:
+            Any: The parsed JSON (or its selected fields), the text, or None
+            when the body is discarded.
+
+        Raises:
+            ValueError: If the body exceeds the maximum size.
+        """
+        try:
+            if config.response_mode == ResponseMode.DISCARD:
+                return None
+
+            limit = config.max_response_bytes or settings.WEBHOOK_MAX_RESPONSE_BYTES
+            length = response.headers.get("content-length", "")
+            if length.isdigit() and int(length) > limit:
+                raise ValueError(
+                    f"Response from {response.url} is {length} bytes, "
+                    f"over the {limit} byte limit"
+                )
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > limit:
+                    raise ValueError(
+                        f"Response from {response.url} exceeds the {limit} byte limit"
+                    )
+                chunks.append(chunk)
+        finally:
+            await response.aclose()
+
+        content = b"".join(chunks)
+        if not response.headers.get("content-type", "").startswith("application/json"):
+            return content.decode(response.encoding or "utf-8", errors="replace")
+        data = json.loads(content)
+        if config.select is None:
+            return data
+        return {name: resolve_path(data, path) for name, path in config.select.items()}
+
+    async def _send_hedged(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: Any,
+        policy: HedgePolicy,
+        step_limit: RateLimit | None = None,
+    ) -> tuple[httpx.Response, bool, bool]:
+        """
+        Send a request, hedging it if it is slow and the host's budget allows.
+
+        The hedge waits for its own rate limit token (the first request has
+        already had one). The latency of the losing request, cancelled before
+        it answered, is recorded as the time it had been running: a lower
+        bound, but leaving it out would hide exactly the slow requests.
+
+        Args:
+            client (httpx.AsyncClient): The HTTP client.
+            method (str): The HTTP method.
+            url (str): The request URL.
+            headers (dict[str, str]): The request headers.
+            body (Any): The request body.
+            policy (HedgePolicy): The hedging policy.
+            step_limit (RateLimit | None): The step's rate limit.
+
+        Returns:
+            tuple[httpx.Response, bool, bool]: The winning response, whether a
+            hedge was sent and whether the hedge won.
+        """
+        host = httpx.URL(url).host
+        self._hedging.record_request(host)
+
+        async def attempt(throttle: bool = False) -> httpx.Response:
+            if throttle:
+                await self._throttle(url, step_limit)
+            started = time.monotonic()
+            try:
+                response = await self._send(client, method, url, headers, body)
+            except asyncio.CancelledError:
+                self._hedging.record_latency(host, time.monotonic() - started)
+                raise
+            self._hedging.record_latency(host, time.monotonic() - started)
+            return response
+
+        first = asyncio.create_task(attempt())
+        pending = {first}
+        try:
+            delay = policy.delay or self._hedging.hedge_delay(host, policy.percentile)
+            if delay is not None:
+                await asyncio.wait(pending, timeout=delay)
+            if first.done() or delay is None or not self._hedging.try_hedge(host):
+                return await first, False, False
+
+            logger.info(f"Hedging {method} {url} after {delay:.3f}s")
+            hedge = asyncio.create_task(attempt(throttle=True))
+            pending.add(hedge)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._hedging.record_outcome(host, hedge_won=task is hedge)
+                        return task.result(), True, task is hedge
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+    async def _throttle(self, url: str, step_limit: RateLimit | None) -> None:
+        """
+        Wait for a token of the bucket that applies to the URL, if any.
+
+        The step's own limit applies per host, in a bucket shared only by
+        steps with the same limit; otherwise the longest matching URL prefix
+        or the host in settings.WEBHOOK_RATE_LIMITS. A reservation given up
+        while waiting (step cancelled or timed out) is refunded.
+
+        Args:
+            url (str): The rendered request URL.
+            step_limit (RateLimit | None): The step's rate limit.
+        """
+        host = httpx.URL(url).host
+        if step_limit is not None:
+            bucket, limit = (
+                f"step:{host}:{step_limit.rate:g}:{step_limit.capacity}",
+                step_limit,
+            )
+        else:
+            matches = [
+                name
+                for name in settings.WEBHOOK_RATE_LIMITS
+                if name == host
+                or (name.startswith(("http://", "https://")) and url.startswith(name))
+            ]
+            if not matches:
+                return
+            bucket = max(matches, key=len)
+            limit = RateLimit(**settings.WEBHOOK_RATE_LIMITS[bucket])
+
+        wait = await self._rate_limiter.reserve(bucket, limit.rate, limit.capacity)
+        if wait > 0:
+            logger.info(f"Rate limited on {bucket}; waiting {wait:.3f}s")
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                await asyncio.shield(
+                    self._rate_limiter.refund(bucket, limit.rate, limit.capacity)
+                )
+                raise
 
     def _replace_placeholders(self, data: Any, context: dict[str, Any]) -> Any:
         """
         Replace placeholders in data with context values.
-        Supports dictionary, list, and string replacement (e.g., "${key}").
+        Supports dictionary, list, and string replacement (e.g., "${key}" or
+        dotted paths such as "${payload.user.id}").
 
         Args:
             data (Any): The data containing placeholders.
@@ -109,12 +329,4 @@ class WebhookConnector(BaseConnector):
         Returns:
             Any: The data with placeholders replaced.
         """
-        if isinstance(data, dict):
-            return {k: self._replace_placeholders(v, context) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self._replace_placeholders(item, context) for item in data]
-        elif isinstance(data, str) and data.startswith("${") and data.endswith("}"):
-            # Simple placeholder replacement: ${key} -> context[key]
-            key = data[2:-1]
-            return context.get(key, data)
-        return data
+        return render(data, context)
@@ -0,0 +1,130 @@
+# Webhook Connector: step and output models
+from enum import StrEnum
+from typing import Any
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import model_validator
+
+from .enum import ConnectorType
+from app.connector.base import BaseWorkflowStep
+
+
+class RateLimit(BaseModel):
+    """
+    Token bucket limiting outbound calls, shared by all workers.
+
+    Attributes:
+        rate (float): Requests per second.
+        burst (int | None): Requests allowed at once after idling. Defaults to
+            the rate (at least 1).
+    """
+
+    rate: float = Field(gt=0)
+    burst: int | None = Field(default=None, ge=1)
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or max(int(self.rate), 1)
+
+
+class HedgePolicy(BaseModel):
+    """
+    Hedging of slow requests to an idempotent endpoint.
+
+    Attributes:
+        percentile (float): Hedge once the request is slower than this
+            percentile of the host's recent latencies.
+        delay (float | None): Fixed hedge delay in seconds, instead of the
+            observed percentile.
+    """
+
+    percentile: float = Field(default=0.95, gt=0, lt=1)
+    delay: float | None = Field(default=None, gt=0)
+
+
+class CachePolicy(BaseModel):
+    """
+    Memoization of successful responses.
+
+    Attributes:
+        ttl (float | None): Seconds to reuse a response. When unset, the
+            response's Cache-Control max-age is used and responses without
+            one are not cached. Cache-Control no-store/no-cache always wins.
+    """
+
+    ttl: float | None = Field(default=None, gt=0)
+
+
+class ResponseMode(StrEnum):
+    """How the response body is handled."""
+
+    PARSE = "parse"
+    DISCARD = "discard"
+
+
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+
+
+class WebhookConfig(BaseModel):
+    """
+    Configuration for Webhook connector.
+
+    Attributes:
+        rate_limit (RateLimit | None): Limit for this step's URL host, overriding
+            settings.WEBHOOK_RATE_LIMITS. Calls over the limit wait for a token.
+        hedge (HedgePolicy | None): Send a second request when the first is
+            slow and use whichever answers first. Idempotent methods only.
+        cache (CachePolicy | None): Reuse responses to identical requests
+            (same method, URL, headers and body). GET only.
+        response_mode (ResponseMode): "parse" keeps the body as response_data;
+            "discard" closes the connection without reading it.
+        max_response_bytes (int | None): Fail the step when the body is larger.
+            Defaults to settings.WEBHOOK_MAX_RESPONSE_BYTES.
+        select (dict[str, str] | None): Keep only these fields of a JSON body,
+            as output name -> dotted path (e.g. {"id": "data.customer.id"}).
+    """
+
+    url: str
+    method: str
+    headers: dict[str, str] = {}
+    body: dict[str, Any] = {}
+    rate_limit: RateLimit | None = None
+    hedge: HedgePolicy | None = None
+    cache: CachePolicy | None = None
+    response_mode: ResponseMode = ResponseMode.PARSE
+    max_response_bytes: int | None = Field(default=None, gt=0)
+    select: dict[str, str] | None = None
+
+    @model_validator(mode="after")
+    def validate_policies(self) -> "WebhookConfig":
+        if self.hedge is not None and self.method.upper() not in IDEMPOTENT_METHODS:
+            raise ValueError(
+                f"Hedging requires an idempotent method, not {self.method}"
+            )
+        if self.cache is not None and self.method.upper() != "GET":
+            raise ValueError(f"Response caching requires GET, not {self.method}")
+        if self.select is not None and self.response_mode == ResponseMode.DISCARD:
+            raise ValueError("select does not apply when the response is discarded")
+        return self
+
+
+class WebhookWorkflowStep(BaseWorkflowStep):
+    """Definition of a Webhook step in a workflow."""
+
+    type: Literal[ConnectorType.WEBHOOK] = ConnectorType.WEBHOOK
+    config: WebhookConfig
+
+
+class WebhookResponse(BaseModel):
+    """Output model for Webhook connector."""
+
+    type: Literal[ConnectorType.WEBHOOK] = ConnectorType.WEBHOOK
+    status_code: int
+    response_data: Any
+    url: str
+    method: str
+    hedged: bool = False
+    hedge_won: bool = False
+    cached: bool = False
@@ -1,4 +1,11 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+import socket
+
+from pydantic import model_validator
+from pydantic_settings import BaseSettings
+from pydantic_settings import SettingsConfigDict
+
+from app.messaging.enum import BrokerType
+from app.storage.enum import StorageType
 
 
 class Settings(BaseSettings):
@@ -13,20 +20,192 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
 
+    # Storage backend of the API, workers and scheduler ("postgres", "sqlite",
+    # "file_system" or "in_memory"). Run partitions, the run archive and the
+    # health table are only maintained with "postgres".
+    STORAGE_TYPE: StorageType = StorageType.POSTGRES
+
+    # Message broker: "kafka", or "in_memory" to run API and worker in one process
+    MESSAGE_BROKER: BrokerType = BrokerType.KAFKA
+    RUN_WORKER_IN_PROCESS: bool = False
+    IN_MEMORY_BROKER_LOG_DIR: str | None = None
+    IN_MEMORY_BROKER_MAX_QUEUE_SIZE: int = 100_000
+    IN_MEMORY_BROKER_COMMIT_INTERVAL: int = 100
+
     # Kafka
     KAFKA_BOOTSTRAP_SERVERS: str = "kafka:9092"
     KAFKA_CONSUMER_GROUP: str = "workflow-workers"
     KAFKA_TOPIC_WORKFLOW_TRIGGER: str = "workflow.trigger"
     KAFKA_TOPIC_WORKFLOW_COMPLETED: str = "workflow.completed"
+    KAFKA_TOPIC_SCHEDULE_CHANGED: str = "workflow.schedules"
+
+    # Worker scheduling: triggers are consumed from one lane per priority and
+    # dispatched with weighted fair scheduling. Per-lane limits below the total
+    # keep slots free for the high lane while a backfill saturates the others.
+    WORKER_MAX_IN_FLIGHT: int = 64
+    # Stable name of this worker (its container hostname by default), used for
+    # the consumer group reading the completions of its subworkflows
+    WORKER_ID: str = socket.gethostname()
+    PRIORITY_LANE_WEIGHTS: dict[str, int] = {"high": 6, "normal": 3, "low": 1}
+    PRIORITY_LANE_MAX_IN_FLIGHT: dict[str, int] = {"high": 64, "normal": 40, "low": 16}
 
     # Redis
     REDIS_HOST: str = "redis"
     REDIS_PORT: str = "6379"
+    REDIS_MAX_CONNECTIONS: int = 64
+    # Keys and channels written by redis workflow steps are forced under this
+    # prefix, so a step can never touch the service's own keys
+    REDIS_STEP_KEY_PREFIX: str = "steps:"
+
+    # Per-workflow concurrency (WorkflowDefinition.max_concurrency)
+    WORKFLOW_SEMAPHORE_LEASE_SECONDS: int = 60
+    WORKFLOW_CONCURRENCY_DEFER_SECONDS: float = 0.5
+    WORKFLOW_CONCURRENCY_DEFER_MAX_SECONDS: float = 30
+
+    # Timeouts: steps without their own timeout get the default; webhook
+    # clients use WEBHOOK_TIMEOUT_SECONDS when called outside the engine.
+    DEFAULT_STEP_TIMEOUT_SECONDS: float | None = 300
+    WEBHOOK_TIMEOUT_SECONDS: float = 30
+
+    # Largest webhook response body read into a step result (steps may lower
+    # or raise it with max_response_bytes)
+    WEBHOOK_MAX_RESPONSE_BYTES: int = 1024 * 1024
+
+    # Outbound webhook rate limits, keyed by host ("api.example.com") or URL
+    # prefix ("https://api.example.com/v1/"), e.g. {"api.example.com":
+    # {"rate": 50, "burst": 100}} for 50 requests/s with bursts of 100.
+    WEBHOOK_RATE_LIMITS: dict[str, dict[str, float]] = {}
+
+    # Webhook hedging: extra requests allowed per request (budget), and the
+    # latency samples per host used to estimate the hedge delay
+    WEBHOOK_HEDGE_BUDGET_RATIO: float = 0.05
+    WEBHOOK_HEDGE_MIN_SAMPLES: int = 20
+    WEBHOOK_HEDGE_WINDOW: int = 200
+
+    # Webhook response cache: entries kept in each worker's in-process LRU
+    # (in front of the shared Redis copy)
+    WEBHOOK_CACHE_SIZE: int = 1024
+
+    # Run table partitions: workflow_runs and workflow_step_results are split
+    # into RUN_PARTITION_DAYS-day ranges, created RUN_PARTITIONS_AHEAD periods
+    # ahead. Partitions older than RUN_RETENTION_DAYS (None = keep forever)
+    # are dropped, or detached with RUN_RETENTION_MODE="detach".
+    RUN_PARTITION_DAYS: int = 7
+    RUN_PARTITIONS_AHEAD: int = 4
+    RUN_RETENTION_DAYS: int | None = 90
+    RUN_RETENTION_MODE: str = "drop"
+    RUN_PARTITION_MAINTENANCE_SECONDS: int = 3600
+
+    # Run archive: run partitions whose period ended more than
+    # ARCHIVE_AFTER_DAYS ago (None = never) move, whatever their runs'
+    # status, to compressed segment files under ARCHIVE_PATH, which must be
+    # shared by the scheduler and the API. Must be below RUN_RETENTION_DAYS,
+    # which then never drops a partition that was not archived.
+    ARCHIVE_PATH: str = "data/archive"
+    ARCHIVE_AFTER_DAYS: int | None = 30
+    ARCHIVE_BATCH_SIZE: int = 10_000
+    ARCHIVE_BLOCK_RUNS: int = 128
+    # Shortest interval between directory listings for segments written by
+    # another process, triggered by lookups of runs not in the archive
+    ARCHIVE_REFRESH_SECONDS: float = 5
+
+    # File storage (StorageType.FILE_SYSTEM): append-only segment files per
+    # item type, rolled over at FILE_STORAGE_SEGMENT_BYTES and compacted once
+    # overwritten or deleted records exceed FILE_STORAGE_COMPACT_DEAD_RATIO of
+    # the log. FILE_STORAGE_DURABILITY is "none" (OS-buffered), "batched"
+    # (synced every FILE_STORAGE_GROUP_COMMIT_MS) or "immediate" (synced before
+    # returning, sharing fsyncs between concurrent writes).
+    FILE_STORAGE_PATH: str = "data"
+    FILE_STORAGE_SEGMENT_BYTES: int = 64 * 1024 * 1024
+    FILE_STORAGE_DURABILITY: str = "batched"
+    FILE_STORAGE_GROUP_COMMIT_MS: int = 50
+    FILE_STORAGE_COMPACT_DEAD_RATIO: float = 0.5
+
+    # SQLite storage (StorageType.SQLITE): one database file in WAL mode; the
+    # writer thread commits up to SQLITE_WRITE_BATCH queued writes per
+    # transaction. SQLITE_SYNCHRONOUS is the PRAGMA synchronous level
+    # (NORMAL syncs at WAL checkpoints, FULL on every commit).
+    SQLITE_PATH: str = "data/workflow.db"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_WRITE_BATCH: int = 256
+
+    # In-memory storage (StorageType.IN_MEMORY) bounds: least recently used
+    # items are evicted past MAX_ENTRIES or MAX_BYTES (JSON size), items expire
+    # TTL_SECONDS after their last write (None = unbounded). With a snapshot
+    # path, items are saved there on exit and reloaded on startup.
+    IN_MEMORY_STORAGE_MAX_ENTRIES: int | None = None
+    IN_MEMORY_STORAGE_MAX_BYTES: int | None = None
+    IN_MEMORY_STORAGE_TTL_SECONDS: float | None = None
+    IN_MEMORY_STORAGE_SNAPSHOT_PATH: str | None = None
+
+    # Storage cache (CachedStorage): Redis read-through/write-through cache in
+    # front of the STORAGE_CACHE_BACKENDS storage types, with a TTL per kind
+    # ("workflow", "run", "schedule"). With STORAGE_CACHE_WRITE_BEHIND, updates
+    # of active runs are queued and written every STORAGE_CACHE_WRITE_BEHIND_MS
+    # (queued transitions are lost if the process dies).
+    STORAGE_CACHE_BACKENDS: list[str] = ["postgres"]
+    STORAGE_CACHE_TTL_SECONDS: dict[str, int] = {
+        "workflow": 60,
+        "run": 10,
+        "schedule": 60,
+    }
+    STORAGE_CACHE_WRITE_BEHIND: bool = False
+    STORAGE_CACHE_WRITE_BEHIND_MS: int = 100
+
+    # Scheduler service (cron triggers)
+    SCHEDULER_LEADER_TTL_SECONDS: int = 10
+    SCHEDULER_MAX_BATCH: int = 1000
+    SCHEDULER_RESYNC_SECONDS: int = 600
+    SCHEDULER_MAX_CATCHUP_SECONDS: int = 3600
+
+    # Workflow engine
+    PLAN_CACHE_SIZE: int = 1024
+
+    # Blob store for large step outputs: outputs serializing to at least
+    # BLOB_OFFLOAD_MIN_BYTES are kept out of the run row. The path must be
+    # shared by the API, the workers and the scheduler, which deletes blobs
+    # unused for BLOB_RETENTION_DAYS (None = keep forever), which must not be
+    # below RUN_RETENTION_DAYS. Archived runs older than that lose their
+    # offloaded outputs.
+    BLOB_STORE: str = "file_system"
+    BLOB_STORE_PATH: str = "data/blobs"
+    BLOB_OFFLOAD_MIN_BYTES: int = 64 * 1024
+    BLOB_RETENTION_DAYS: int | None = None
+    TRANSFORM_OFFLOAD_MIN_BYTES: int = 1024 * 1024
+    TRANSFORM_POOL_WORKERS: int | None = None  # None = one per CPU
+
+    # Run cancellation
+    CANCEL_FLAG_RETENTION_SECONDS: int = 86400
+    CANCEL_CHECK_CACHE_SECONDS: float = 0.5
+    CANCEL_POLL_INTERVAL_SECONDS: float = 0.5
 
     # Pagination
     DEFAULT_PAGE_LIMIT: int = 50
 
-    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
+    model_config = SettingsConfigDict(
+        env_file=".env", case_sensitive=True, extra="ignore"
+    )
+
+    @model_validator(mode="after")
+    def _check_archive_before_retention(self) -> "Settings":
+        if (
+            self.ARCHIVE_AFTER_DAYS is not None
+            and self.RUN_RETENTION_DAYS is not None
+            and self.ARCHIVE_AFTER_DAYS >= self.RUN_RETENTION_DAYS
+        ):
+            raise ValueError("ARCHIVE_AFTER_DAYS must be below RUN_RETENTION_DAYS")
+        return self
+
+    @model_validator(mode="after")
+    def _check_blobs_outlive_runs(self) -> "Settings":
+        if (
+            self.BLOB_RETENTION_DAYS is not None
+            and self.RUN_RETENTION_DAYS is not None
+            and self.BLOB_RETENTION_DAYS < self.RUN_RETENTION_DAYS
+        ):
+            raise ValueError("BLOB_RETENTION_DAYS must not be below RUN_RETENTION_DAYS")
+        return self
 
 
 settings = Settings()
@@ -1,4 +1,11 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy import DDL
+from sqlalchemy import event
+from sqlalchemy import func
 from sqlalchemy import Index
+from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -9,6 +16,14 @@ from app.db.session import Base
 class WorkflowRunModel(Base):
     """
     Database model for WorkflowRun.
+
+    Step results written by this service live in workflow_step_results
+    (WorkflowStepResultModel). The table is range-partitioned on created_at
+    (see app.db.partitions), which is therefore part of the primary key.
+    Postgres cannot enforce a unique index on a partitioned table without
+    the partition key, so (uuid, created_at) no longer guarantees that a
+    uuid is unique: uniqueness rests on the storages generating random
+    uuid4 values, and lookups by uuid alone scan every partition's index.
     """
 
     __tablename__ = "workflow_runs"
@@ -21,8 +36,28 @@ class WorkflowRunModel(Base):
     started_at: Mapped[str] = mapped_column(index=True)
     completed_at: Mapped[str | None]
     error: Mapped[str | None]
-    step_results: Mapped[dict] = mapped_column(JSONB)
+    # Written by the Rust service only. This service stores step results in
+    # workflow_step_results and reads this column as a fallback for runs
+    # written by Rust or before that table existed.
+    step_results: Mapped[dict] = mapped_column(
+        JSONB, server_default=text("'{}'::jsonb")
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
+    )
 
     __table_args__ = (
         Index("idx_workflow_runs_status_started", "status", "started_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+
+
+# Rows land in the DEFAULT partition until maintenance creates their period
+event.listen(
+    WorkflowRunModel.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS workflow_runs_default "
+        "PARTITION OF workflow_runs DEFAULT"
+    ),
+)
@@ -0,0 +1,21 @@
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from app.db.session import Base
+
+
+class WorkflowScheduleModel(Base):
+    """
+    Database model for WorkflowSchedule.
+    """
+
+    __tablename__ = "workflow_schedules"
+
+    uuid: Mapped[str] = mapped_column(primary_key=True, index=True)
+    id: Mapped[str | None]
+    workflow_id: Mapped[str] = mapped_column(index=True)
+    cron: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSONB)
+    priority: Mapped[str]
+    enabled: Mapped[bool] = mapped_column(default=True)
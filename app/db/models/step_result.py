@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger
+from sqlalchemy import DateTime
+from sqlalchemy import DDL
+from sqlalchemy import event
+from sqlalchemy import Index
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from app.db.session import Base
+
+
+class WorkflowStepResultModel(Base):
+    """
+    Database model for one attempt of a step in a workflow run.
+
+    Rows are only ever inserted; a run's step results are its latest row
+    per step name. Range-partitioned on created_at like workflow_runs, with
+    created_at set to the run's created_at (not the insert time) so a run
+    and its step results always share a period. For the same reason the
+    unique (run_uuid, step_name, attempt) constraint includes created_at,
+    which changes nothing since it is fixed per run.
+    """
+
+    __tablename__ = "workflow_step_results"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    run_uuid: Mapped[str]
+    step_name: Mapped[str]
+    attempt: Mapped[int]
+    status: Mapped[str]
+    started_at: Mapped[str]
+    completed_at: Mapped[str | None]
+    output: Mapped[dict | None] = mapped_column(JSONB)
+    error: Mapped[str | None]
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+
+    __table_args__ = (
+        Index("idx_step_results_run", "run_uuid"),
+        Index(
+            "idx_step_results_name_status_started", "step_name", "status", "started_at"
+        ),
+        UniqueConstraint(
+            "run_uuid",
+            "step_name",
+            "attempt",
+            "created_at",
+            name="uq_step_results_attempt",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# Rows land in the DEFAULT partition until maintenance creates their period
+event.listen(
+    WorkflowStepResultModel.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS workflow_step_results_default "
+        "PARTITION OF workflow_step_results DEFAULT"
+    ),
+)
@@ -17,3 +17,5 @@ class WorkflowDefinitionModel(Base):
     name: Mapped[str]
     description: Mapped[str | None]
     steps: Mapped[list[dict]] = mapped_column(JSONB)
+    max_concurrency: Mapped[int | None]
+    deadline: Mapped[float | None]
@@ -0,0 +1,235 @@
+"""
+Time-range partitions of the run tables.
+
+workflow_runs and workflow_step_results are partitioned by RANGE on
+created_at into fixed periods of RUN_PARTITION_DAYS days, aligned to the
+Unix epoch and named <table>_pYYYYMMDD after their first day. Maintenance
+creates the partitions for the current and the next RUN_PARTITIONS_AHEAD
+periods, and removes partitions that ended more than RUN_RETENTION_DAYS
+ago with one DROP (or DETACH, keeping the table for archival) instead of
+deleting their rows.
+
+Each table also has a DEFAULT partition (<table>_default), created with
+the table, so inserts never fail for lack of a partition: a fresh
+database accepts runs before maintenance first runs, and a stalled
+maintenance job degrades pruning instead of availability. Creating a
+period moves any rows the default partition holds for it into the new
+partition.
+
+Partition DDL runs only in the maintenance job (and with the tables'
+creation), serialized across processes by an advisory lock, so replicas
+never race on the catalog.
+"""
+import logging
+import re
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from sqlalchemy import Connection
+from sqlalchemy import Engine
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("workflow_runs", "workflow_step_results")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_PARTITION_NAME = re.compile(r"_p(\d{8})$")
+
+# pg_advisory_xact_lock key serializing partition DDL
+PARTITION_LOCK_KEY = 0x776672756E73  # "wfruns"
+
+
+def partition_start(at: datetime) -> datetime:
+    """
+    Start of the partition period containing a time.
+
+    Args:
+        at (datetime): An aware datetime.
+
+    Returns:
+        datetime: The period start (UTC midnight).
+    """
+    days = (at - _EPOCH).days
+    return _EPOCH + timedelta(days=days - days % settings.RUN_PARTITION_DAYS)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    """Name of the partition of a table starting at a period start."""
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def partition_period(name: str) -> datetime | None:
+    """Period start of a partition name, or None if it is not a period partition."""
+    match = _PARTITION_NAME.search(name)
+    if match is None:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d").replace(tzinfo=timezone.utc)
+
+
+def default_partition(table: str) -> str:
+    """Name of the DEFAULT partition of a table."""
+    return f"{table}_default"
+
+
+def attached_partitions(conn: Connection, table: str) -> list[str]:
+    """
+    Names of the partitions attached to a table.
+
+    Args:
+        conn (Connection): An open connection.
+        table (str): The partitioned table.
+
+    Returns:
+        list[str]: The partition names.
+    """
+    return list(
+        conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table},
+        ).scalars()
+    )
+
+
+def lock_partitions(conn: Connection) -> None:
+    """Serialize partition DDL with other processes until the transaction ends."""
+    conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY}
+    )
+
+
+def _create_partition(
+    conn: Connection, table: str, name: str, start: datetime, end: datetime
+) -> None:
+    """
+    Create a period's partition, moving its rows out of the DEFAULT partition.
+
+    A range partition cannot be added while the default partition holds
+    rows in its range, so the partition is built as a standalone table,
+    filled from the default partition and then attached.
+    """
+    bounds = {"start": start, "end": end}
+    conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default_partition(table)} "
+            f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+
+
+def create_partitions(engine: Engine, now: datetime | None = None) -> list[str]:
+    """
+    Create missing partitions for the current and upcoming periods.
+
+    Also creates the DEFAULT partitions of tables that predate them.
+
+    Args:
+        engine (Engine): The database engine.
+        now (datetime | None): The current time (defaults to now, UTC).
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    period = timedelta(days=settings.RUN_PARTITION_DAYS)
+    first = partition_start(now or datetime.now(timezone.utc))
+    names = []
+    with engine.begin() as conn:
+        lock_partitions(conn)
+        for table in PARTITIONED_TABLES:
+            existing = set(attached_partitions(conn, table))
+            if default_partition(table) not in existing:
+                conn.execute(
+                    text(
+                        f"CREATE TABLE {default_partition(table)} "
+                        f"PARTITION OF {table} DEFAULT"
+                    )
+                )
+                names.append(default_partition(table))
+            start = first
+            for _ in range(settings.RUN_PARTITIONS_AHEAD + 1):
+                end = start + period
+                name = partition_name(table, start)
+                if name not in existing:
+                    _create_partition(conn, table, name, start, end)
+                    names.append(name)
+                start = end
+    return names
+
+
+def expire_partitions(engine: Engine, now: datetime | None = None) -> list[str]:
+    """
+    Drop or detach partitions past the retention period.
+
+    A partition expires once its whole range is older than
+    RUN_RETENTION_DAYS. With RUN_RETENTION_MODE "detach" the partition
+    becomes a standalone table, left for manual removal.
+
+    With archival enabled (ARCHIVE_AFTER_DAYS), partitions leave the live
+    tables through the archive job (app.archive.job) instead, so nothing
+    is expired here: a partition still attached past retention holds runs
+    that were never archived, and is kept (and logged) until they are.
+
+    Args:
+        engine (Engine): The database engine.
+        now (datetime | None): The current time (defaults to now, UTC).
+
+    Returns:
+        list[str]: Names of the partitions removed.
+    """
+    if settings.RUN_RETENTION_DAYS is None:
+        return []
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(
+        days=settings.RUN_RETENTION_DAYS
+    )
+    period = timedelta(days=settings.RUN_PARTITION_DAYS)
+    removed = []
+    kept = []
+    with engine.begin() as conn:
+        lock_partitions(conn)
+        for table in PARTITIONED_TABLES:
+            for name in attached_partitions(conn, table):
+                start = partition_period(name)
+                if start is None or start + period > cutoff:
+                    continue
+                if settings.ARCHIVE_AFTER_DAYS is not None:
+                    kept.append(name)
+                elif settings.RUN_RETENTION_MODE == "detach":
+                    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                    removed.append(name)
+                else:
+                    conn.execute(text(f"DROP TABLE {name}"))
+                    removed.append(name)
+    if removed:
+        logger.info(
+            f"Expired run partitions ({settings.RUN_RETENTION_MODE}): "
+            f"{', '.join(removed)}"
+        )
+    if kept:
+        logger.warning(
+            f"Keeping run partitions past retention until archived: {', '.join(kept)}"
+        )
+    return removed
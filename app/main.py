@@ -4,17 +4,25 @@ from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 
-from app.api.deps import get_db, set_kafka_producer
+from app.api.deps import set_kafka_producer
 from app.api.v1.router import api_router
 from app.core.config import settings
-from app.db.session import SessionLocal, engine, Base
-from app.messaging.kafka import KafkaProducer
+from app.db.session import Base
+from app.db.session import engine
+from app.db.session import SessionLocal
+from app.messaging.factory import BrokerFactory
+from app.messaging.in_memory import close_in_memory_broker
 from app.repositories.health import save_health_status
+from app.storage.enum import StorageType
+from app.worker.main import WorkflowWorker
 
 load_dotenv()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables. Run partitions are created and expired by the scheduler's
+# maintenance job; until then runs land in the default partitions. Other
+# storage backends create their own tables or files.
+if settings.STORAGE_TYPE == StorageType.POSTGRES:
+    Base.metadata.create_all(bind=engine)
 
 
 async def health_status_task():
@@ -38,26 +46,40 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for the FastAPI application.
 
-    Handles startup and shutdown events, such as initializing background tasks
-    and the shared Kafka producer.
+    Handles startup and shutdown events, such as initializing background tasks,
+    the shared broker producer and, for single-node deployments, an in-process
+    workflow worker.
 
     Args:
         app (FastAPI): The FastAPI application instance.
     """
     print("Starting up...")
 
-    # Initialize Kafka producer at startup (prevents race condition under load)
-    producer = KafkaProducer()
+    # Initialize broker producer at startup (prevents race condition under load)
+    producer = BrokerFactory.create_producer()
     await producer.start()
     set_kafka_producer(producer)
-    print("Kafka producer initialized at startup")
+    print(f"{settings.MESSAGE_BROKER.value} producer initialized at startup")
 
-    task = asyncio.create_task(health_status_task())
+    worker_task = None
+    if settings.RUN_WORKER_IN_PROCESS:
+        worker_task = asyncio.create_task(WorkflowWorker(producer=producer).start())
+        print("In-process workflow worker started")
+
+    if settings.STORAGE_TYPE == StorageType.POSTGRES:
+        asyncio.create_task(health_status_task())
     yield
 
-    # Shutdown: stop Kafka producer
+    # Shutdown: stop in-process worker, then the broker producer
+    if worker_task is not None:
+        worker_task.cancel()
+        try:
+            await worker_task
+        except asyncio.CancelledError:
+            pass
     await producer.stop()
-    print("Kafka producer stopped")
+    close_in_memory_broker()
+    print("Broker producer stopped")
 
 
 app = FastAPI(
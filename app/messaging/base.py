@@ -0,0 +1,111 @@
+"""
+Broker-agnostic producer and consumer interfaces.
+"""
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+
+def _ignore_ack() -> None:
+    pass
+
+
+class BaseProducer(ABC):
+    """Base class for all message producers."""
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Start the producer connection."""
+        ...
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop the producer connection."""
+        ...
+
+    @abstractmethod
+    async def send(
+        self, topic: str, value: dict[str, Any], key: str | None = None
+    ) -> None:
+        """
+        Send a message to a topic.
+
+        Args:
+            topic: The topic name.
+            value: The message payload.
+            key: Optional message key for partitioning.
+        """
+        ...
+
+    async def send_many(
+        self, topic: str, messages: list[tuple[str | None, dict[str, Any]]]
+    ) -> None:
+        """
+        Send many messages to a topic.
+
+        Backends that batch on the wire override this to avoid one
+        round-trip per message.
+
+        Args:
+            topic: The topic name.
+            messages: (key, value) pairs to send, in order.
+        """
+        for key, value in messages:
+            await self.send(topic, value, key=key)
+
+    async def __aenter__(self) -> "BaseProducer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+
+class BaseConsumer(ABC):
+    """Base class for all message consumers."""
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Start the consumer connection."""
+        ...
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop the consumer connection."""
+        ...
+
+    @abstractmethod
+    async def consume(
+        self, handler: Callable[[dict[str, Any]], Awaitable[None]]
+    ) -> None:
+        """
+        Start consuming messages and pass them to the handler.
+
+        Args:
+            handler: Async function to process each message.
+        """
+        ...
+
+    async def consume_with_ack(
+        self, handler: Callable[[dict[str, Any], Callable[[], None]], Awaitable[None]]
+    ) -> None:
+        """
+        Start consuming messages, passing each with a callback acknowledging it.
+
+        Handlers that finish processing after they return (e.g. by queueing
+        the message) call the ack once done. Backends that commit offsets on
+        their own (Kafka's auto-commit) ignore acknowledgements.
+
+        Args:
+            handler: Async function taking each message and its ack callback.
+        """
+        await self.consume(lambda value: handler(value, _ignore_ack))
+
+    async def __aenter__(self) -> "BaseConsumer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
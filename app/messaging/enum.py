@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class BrokerType(str, Enum):
+    """
+    Enum for different message broker backends.
+    """
+
+    KAFKA = "kafka"
+    IN_MEMORY = "in_memory"
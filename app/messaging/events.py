@@ -1,19 +1,76 @@
 """
 Kafka event schemas for workflow automation.
 """
+from datetime import datetime
 from typing import Any
+
 from pydantic import BaseModel
+from pydantic import field_validator
+
+from app.core.config import settings
+from app.schemas.common import Priority
+
+
+def trigger_topic(priority: Priority) -> str:
+    """
+    Map a trigger priority to its lane topic.
+
+    NORMAL keeps the original trigger topic so existing producers and
+    consumers are unaffected; the other lanes get a suffixed topic.
+
+    Args:
+        priority: The trigger priority.
+
+    Returns:
+        str: The topic name for the lane.
+    """
+    if priority == Priority.NORMAL:
+        return settings.KAFKA_TOPIC_WORKFLOW_TRIGGER
+    return f"{settings.KAFKA_TOPIC_WORKFLOW_TRIGGER}.{priority.value}"
+
+
+def is_internal_topic(topic: str) -> bool:
+    """
+    Whether a topic carries the service's own events (or Kafka's).
+
+    Args:
+        topic: The topic name.
+
+    Returns:
+        bool: True for trigger lanes, completion and schedule-change topics,
+        and Kafka internal ("__"-prefixed) topics.
+    """
+    internal = {
+        settings.KAFKA_TOPIC_WORKFLOW_COMPLETED,
+        settings.KAFKA_TOPIC_SCHEDULE_CHANGED,
+        *(trigger_topic(priority) for priority in Priority),
+    }
+    return topic in internal or topic.startswith("__")
 
 
 class WorkflowTriggerEvent(BaseModel):
     """
     Event published when a workflow is triggered.
     Consumed by workers to execute the workflow.
+
+    triggered_at is in UTC epoch seconds. An ISO timestamp (the run's
+    started_at) is converted when the event is built, so a naive one is
+    read in the producer's local time.
     """
 
     run_id: str
     workflow_id: str
     payload: dict[str, Any]
+    priority: Priority = Priority.NORMAL
+    max_concurrency: int | None = None
+    triggered_at: float | None = None
+
+    @field_validator("triggered_at", mode="before")
+    @classmethod
+    def parse_triggered_at(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return datetime.fromisoformat(value).timestamp()
+        return value
 
 
 class WorkflowCompletedEvent(BaseModel):
@@ -24,5 +81,15 @@ class WorkflowCompletedEvent(BaseModel):
 
     run_id: str
     workflow_id: str
-    status: str  # SUCCESS, FAILED
+    status: str  # SUCCESS, FAILED, CANCELLED, TIMED_OUT
     error: str | None = None
+
+
+class ScheduleChangedEvent(BaseModel):
+    """
+    Event published when a workflow schedule is created, updated or deleted.
+    Consumed by scheduler instances to update their timer heaps incrementally.
+    """
+
+    schedule_id: str
+    deleted: bool = False
@@ -0,0 +1,68 @@
+from app.core.config import settings
+from app.messaging.base import BaseConsumer
+from app.messaging.base import BaseProducer
+from app.messaging.enum import BrokerType
+from app.messaging.in_memory import InMemoryConsumer
+from app.messaging.in_memory import InMemoryProducer
+from app.messaging.kafka import KafkaConsumer
+from app.messaging.kafka import KafkaProducer
+
+
+class BrokerFactory:
+    """
+    Factory class for creating producers and consumers of the configured broker.
+    """
+
+    @staticmethod
+    def create_producer(broker_type: BrokerType | None = None) -> BaseProducer:
+        """
+        Create a producer for the given broker type.
+
+        Args:
+            broker_type (BrokerType | None): The broker backend. Defaults to settings.
+
+        Returns:
+            BaseProducer: A new, not yet started producer.
+
+        Raises:
+            ValueError: If the broker type is unknown.
+        """
+        broker_type = broker_type or settings.MESSAGE_BROKER
+        if broker_type == BrokerType.KAFKA:
+            return KafkaProducer()
+        elif broker_type == BrokerType.IN_MEMORY:
+            return InMemoryProducer()
+        else:
+            raise ValueError(f"Unknown broker type: {broker_type}")
+
+    @staticmethod
+    def create_consumer(
+        topic: str,
+        group_id: str | None = None,
+        broker_type: BrokerType | None = None,
+        auto_offset_reset: str = "earliest",
+    ) -> BaseConsumer:
+        """
+        Create a consumer for the given broker type.
+
+        Args:
+            topic (str): The topic to subscribe to.
+            group_id (str | None): Consumer group ID (ignored by the in-memory broker).
+            broker_type (BrokerType | None): The broker backend. Defaults to settings.
+            auto_offset_reset (str): Where a new Kafka consumer group starts reading.
+
+        Returns:
+            BaseConsumer: A new, not yet started consumer.
+
+        Raises:
+            ValueError: If the broker type is unknown.
+        """
+        broker_type = broker_type or settings.MESSAGE_BROKER
+        if broker_type == BrokerType.KAFKA:
+            return KafkaConsumer(
+                topic=topic, group_id=group_id, auto_offset_reset=auto_offset_reset
+            )
+        elif broker_type == BrokerType.IN_MEMORY:
+            return InMemoryConsumer(topic=topic)
+        else:
+            raise ValueError(f"Unknown broker type: {broker_type}")
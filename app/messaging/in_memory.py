@@ -0,0 +1,378 @@
+"""
+In-process broker backed by asyncio queues.
+
+Lets the API and worker run in a single process without Kafka/Zookeeper,
+e.g. for single-node deployments or for benchmarking the engine with
+broker overhead removed. Optionally each topic is backed by a local
+append-only log so unconsumed messages survive a restart.
+
+Messages carry their offset in the topic log. A consumer acknowledges a
+message when its handler returns or, with consume_with_ack, when the
+handler calls the ack callback it was given (the worker does so once the
+triggered run has finished). Acknowledgements may arrive out of order;
+the committed offset is the end of the longest fully acknowledged
+prefix, so after a crash every message whose processing had not
+finished is replayed (at-least-once delivery).
+
+A topic's committed offset is kept in "<topic>.offset" as an absolute
+message count. Once the acknowledged prefix of the log is at least as
+long as its unacknowledged tail, the log is rewritten without it; the
+rewritten log starts with a {"base": offset} line giving the offset of
+its first message, so the log and the offset file never need to change
+together.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import TextIO
+
+from app.core.config import settings
+from app.messaging.base import BaseConsumer
+from app.messaging.base import BaseProducer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBroker:
+    """
+    Process-wide registry of topic queues.
+
+    All consumers of a topic share one queue, which gives the same
+    semantics as a single Kafka consumer group: each message is handled
+    by exactly one consumer. Topics nobody subscribes to (e.g. the
+    completion topic in a single-node setup) keep only the most recent
+    ``max_queue_size`` messages.
+    """
+
+    def __init__(self, log_dir: str | None = None, max_queue_size: int | None = None):
+        """
+        Initialize the broker.
+
+        Args:
+            log_dir: Directory for the per-topic append-only logs. None keeps
+                messages in memory only.
+            max_queue_size: Maximum number of buffered messages per topic.
+                Defaults to settings.
+        """
+        self._log_dir = Path(log_dir) if log_dir else None
+        self._max_queue_size = (
+            max_queue_size or settings.IN_MEMORY_BROKER_MAX_QUEUE_SIZE
+        )
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._subscribed: set[str] = set()
+        self._log_files: dict[str, TextIO] = {}
+        self._committed: dict[str, int] = {}
+        # End of the fully acknowledged prefix, and offsets acknowledged past it
+        self._acked_upto: dict[str, int] = {}
+        self._acked: dict[str, set[int]] = {}
+        # Offsets of the first and past-the-last message of each topic log
+        self._log_base: dict[str, int] = {}
+        self._log_end: dict[str, int] = {}
+        # Tasks re-enqueuing replayed messages that did not fit in the queue
+        self._feeders: dict[str, asyncio.Task] = {}
+        if self._log_dir is not None:
+            self._log_dir.mkdir(parents=True, exist_ok=True)
+
+    def _queue(self, topic: str) -> asyncio.Queue:
+        """Get or create the queue for a topic, replaying its log on first use."""
+        queue = self._queues.get(topic)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self._max_queue_size)
+            self._queues[topic] = queue
+            self._replay(topic, queue)
+        return queue
+
+    def _replay(self, topic: str, queue: asyncio.Queue) -> None:
+        """
+        Re-enqueue messages that were logged but never acknowledged.
+
+        Messages beyond the queue's capacity are put by a background task as
+        the queue drains, rather than dropped.
+        """
+        if self._log_dir is None:
+            return
+        offset_path = self._log_dir / f"{topic}.offset"
+        committed = int(offset_path.read_text()) if offset_path.exists() else 0
+        self._committed[topic] = self._acked_upto[topic] = committed
+        self._log_base[topic] = self._log_end[topic] = committed
+        log_path = self._log_dir / f"{topic}.log"
+        if not log_path.exists():
+            return
+        backlog: deque[tuple[str | None, dict[str, Any], int]] = deque()
+        offset = 0
+        with open(log_path, "r") as file:
+            for index, line in enumerate(file):
+                record = json.loads(line)
+                if index == 0 and "base" in record:
+                    offset = self._log_base[topic] = record["base"]
+                    continue
+                if offset >= committed:
+                    backlog.append((record["key"], record["value"], offset))
+                offset += 1
+        self._log_end[topic] = max(offset, committed)
+        if not backlog:
+            return
+        logger.info(f"Replaying {len(backlog)} unacknowledged messages on {topic}")
+        while backlog and not queue.full():
+            queue.put_nowait(backlog.popleft())
+        if backlog:
+            self._feeders[topic] = asyncio.get_running_loop().create_task(
+                self._feed(queue, backlog)
+            )
+
+    @staticmethod
+    async def _feed(queue: asyncio.Queue, backlog: deque) -> None:
+        while backlog:
+            await queue.put(backlog.popleft())
+
+    def _log(self, topic: str, key: str | None, value: dict[str, Any]) -> int:
+        """Append a message to the topic log and return its offset."""
+        file = self._log_files.get(topic)
+        if file is None:
+            file = open(self._log_dir / f"{topic}.log", "a")
+            self._log_files[topic] = file
+        file.write(json.dumps({"key": key, "value": value}) + "\n")
+        file.flush()
+        offset = self._log_end.get(topic, 0)
+        self._log_end[topic] = offset + 1
+        return offset
+
+    async def publish(
+        self, topic: str, value: dict[str, Any], key: str | None = None
+    ) -> None:
+        """
+        Publish a message to a topic.
+
+        Blocks when a subscribed topic's queue is full (backpressure);
+        drops the oldest message when nobody is subscribed.
+        """
+        queue = self._queue(topic)
+        offset = self._log(topic, key, value) if self._log_dir is not None else None
+        if topic not in self._subscribed and queue.full():
+            self.ack(topic, queue.get_nowait()[2])
+        await queue.put((key, value, offset))
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        """Register a consumer for a topic and return its queue."""
+        self._subscribed.add(topic)
+        return self._queue(topic)
+
+    def ack(self, topic: str, offset: int | None) -> None:
+        """
+        Acknowledge a message on a topic, committing offsets periodically.
+
+        Acknowledging a message twice has no effect.
+
+        Args:
+            topic: The topic name.
+            offset: The message's offset (None for messages not logged).
+        """
+        if self._log_dir is None or offset is None:
+            return
+        upto = self._acked_upto.get(topic, 0)
+        if offset < upto:
+            return
+        acked = self._acked.setdefault(topic, set())
+        acked.add(offset)
+        while upto in acked:
+            acked.remove(upto)
+            upto += 1
+        self._acked_upto[topic] = upto
+        if (
+            upto - self._committed.get(topic, 0)
+            >= settings.IN_MEMORY_BROKER_COMMIT_INTERVAL
+        ):
+            self.commit(topic)
+
+    def commit(self, topic: str) -> None:
+        """Persist the end of the acknowledged prefix of a topic as its offset."""
+        upto = self._acked_upto.get(topic, 0)
+        if self._log_dir is None or upto <= self._committed.get(topic, 0):
+            return
+        self._committed[topic] = upto
+        (self._log_dir / f"{topic}.offset").write_text(str(upto))
+        self._compact(topic)
+
+    def _compact(self, topic: str) -> None:
+        """Drop the acknowledged prefix from a topic log once it is the larger part."""
+        base, committed = self._log_base.get(topic, 0), self._committed[topic]
+        live = self._log_end.get(topic, committed) - committed
+        if committed - base < max(settings.IN_MEMORY_BROKER_COMMIT_INTERVAL, live):
+            return
+        log_path = self._log_dir / f"{topic}.log"
+        if not log_path.exists():
+            return
+        file = self._log_files.pop(topic, None)
+        if file is not None:
+            file.close()
+        compacted = log_path.with_name(f"{topic}.log.tmp")
+        with open(log_path, "r") as source, open(compacted, "w") as target:
+            target.write(json.dumps({"base": committed}) + "\n")
+            offset = base
+            for index, line in enumerate(source):
+                if index == 0 and line.startswith('{"base"'):
+                    continue
+                if offset >= committed:
+                    target.write(line)
+                offset += 1
+        os.replace(compacted, log_path)
+        self._log_base[topic] = committed
+
+    def close(self) -> None:
+        """Stop replaying, commit all offsets and close the topic logs."""
+        for feeder in self._feeders.values():
+            feeder.cancel()
+        self._feeders.clear()
+        for topic in list(self._acked_upto):
+            self.commit(topic)
+        for file in self._log_files.values():
+            file.close()
+        self._log_files.clear()
+
+
+_broker: InMemoryBroker | None = None
+
+
+def get_in_memory_broker() -> InMemoryBroker:
+    """
+    Get or create the singleton in-process broker.
+
+    Returns:
+        InMemoryBroker: The broker shared by all in-memory producers and consumers.
+    """
+    global _broker
+    if _broker is None:
+        _broker = InMemoryBroker(log_dir=settings.IN_MEMORY_BROKER_LOG_DIR)
+        logger.info("In-memory broker created")
+    return _broker
+
+
+def close_in_memory_broker() -> None:
+    """Commit the offsets and close the logs of the singleton broker, if created."""
+    if _broker is not None:
+        _broker.close()
+
+
+class InMemoryProducer(BaseProducer):
+    """
+    Producer that publishes to the in-process broker.
+    """
+
+    def __init__(self, broker: InMemoryBroker | None = None):
+        """
+        Initialize the producer.
+
+        Args:
+            broker: The broker to publish to. Defaults to the process singleton.
+        """
+        self._broker = broker or get_in_memory_broker()
+
+    async def start(self) -> None:
+        """No connection to open for the in-process broker."""
+
+    async def stop(self) -> None:
+        """No connection to close for the in-process broker."""
+
+    async def send(
+        self, topic: str, value: dict[str, Any], key: str | None = None
+    ) -> None:
+        """
+        Send a message to a topic.
+
+        Args:
+            topic: The topic name.
+            value: The message payload.
+            key: Optional message key (kept for interface parity).
+        """
+        await self._broker.publish(topic, value, key)
+
+
+class InMemoryConsumer(BaseConsumer):
+    """
+    Consumer that reads from the in-process broker.
+    """
+
+    def __init__(self, topic: str, broker: InMemoryBroker | None = None):
+        """
+        Initialize the consumer.
+
+        Args:
+            topic: The topic to subscribe to.
+            broker: The broker to read from. Defaults to the process singleton.
+        """
+        self._topic = topic
+        self._broker = broker or get_in_memory_broker()
+        self._queue: asyncio.Queue | None = None
+        self._running = False
+
+    async def start(self) -> None:
+        """Subscribe to the topic."""
+        if self._queue is None:
+            self._queue = self._broker.subscribe(self._topic)
+            self._running = True
+            logger.info(f"In-memory consumer started: topic={self._topic}")
+
+    async def stop(self) -> None:
+        """Stop consuming and commit acknowledged offsets."""
+        self._running = False
+        if self._queue is not None:
+            self._broker.commit(self._topic)
+            self._queue = None
+            logger.info("In-memory consumer stopped")
+
+    async def consume(
+        self, handler: Callable[[dict[str, Any]], Awaitable[None]]
+    ) -> None:
+        """
+        Start consuming messages and pass them to the handler.
+
+        Each message is acknowledged when the handler returns.
+
+        Args:
+            handler: Async function to process each message.
+        """
+        await self._consume(handler, manual_ack=False)
+
+    async def consume_with_ack(
+        self, handler: Callable[[dict[str, Any], Callable[[], None]], Awaitable[None]]
+    ) -> None:
+        """
+        Start consuming messages, acknowledging each when the handler calls its ack.
+
+        A message whose handler fails is acknowledged so it is not retried.
+
+        Args:
+            handler: Async function taking each message and its ack callback.
+        """
+        await self._consume(handler, manual_ack=True)
+
+    async def _consume(
+        self, handler: Callable[..., Awaitable[None]], manual_ack: bool
+    ) -> None:
+        if self._queue is None:
+            await self.start()
+
+        queue = self._queue
+        while self._running:
+            _, value, offset = await queue.get()
+            ack = functools.partial(self._broker.ack, self._topic, offset)
+            try:
+                if manual_ack:
+                    await handler(value, ack)
+                else:
+                    await handler(value)
+                    ack()
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                # Continue processing other messages
+                ack()
+            finally:
+                queue.task_done()
@@ -4,18 +4,23 @@ Kafka producer and consumer implementations.
 import asyncio
 import json
 import logging
-from typing import Any, Callable, Awaitable
+from typing import Any
+from typing import Awaitable
+from typing import Callable
 
-from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaProducer
 from aiokafka.errors import KafkaError
 
 from app.core.config import settings
+from app.messaging.base import BaseConsumer
+from app.messaging.base import BaseProducer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class KafkaProducer:
+class KafkaProducer(BaseProducer):
     """
     Async Kafka producer for publishing events.
 
@@ -56,7 +61,9 @@ class KafkaProducer:
                 self._producer = None
                 logger.info("Kafka producer stopped")
 
-    async def send(self, topic: str, value: dict[str, Any], key: str | None = None) -> None:
+    async def send(
+        self, topic: str, value: dict[str, Any], key: str | None = None
+    ) -> None:
         """
         Send a message to a Kafka topic.
 
@@ -76,6 +83,35 @@ class KafkaProducer:
             logger.error(f"Failed to send message to {topic}: {e}")
             raise
 
+    async def send_many(
+        self, topic: str, messages: list[tuple[str | None, dict[str, Any]]]
+    ) -> None:
+        """
+        Send many messages to a Kafka topic, letting the client batch them.
+
+        All messages are enqueued before waiting, so they share produce
+        requests (up to max_batch_size) instead of one round-trip each.
+
+        Args:
+            topic: The Kafka topic name.
+            messages: (key, value) pairs to send, in order.
+        """
+        if self._producer is None:
+            await self.start()
+
+        try:
+            futures = [
+                await self._producer.send(
+                    topic, value=value, key=key.encode("utf-8") if key else None
+                )
+                for key, value in messages
+            ]
+            await asyncio.gather(*futures)
+            logger.info(f"{len(messages)} messages sent to {topic}")
+        except KafkaError as e:
+            logger.error(f"Failed to send batch to {topic}: {e}")
+            raise
+
     async def __aenter__(self) -> "KafkaProducer":
         await self.start()
         return self
@@ -84,7 +120,7 @@ class KafkaProducer:
         await self.stop()
 
 
-class KafkaConsumer:
+class KafkaConsumer(BaseConsumer):
     """
     Async Kafka consumer for processing events.
     """
@@ -94,6 +130,7 @@ class KafkaConsumer:
         topic: str,
         group_id: str | None = None,
         bootstrap_servers: str | None = None,
+        auto_offset_reset: str = "earliest",
     ):
         """
         Initialize the Kafka consumer.
@@ -102,10 +139,13 @@ class KafkaConsumer:
             topic: The Kafka topic to subscribe to.
             group_id: Consumer group ID. Defaults to settings.
             bootstrap_servers: Kafka broker addresses. Defaults to settings.
+            auto_offset_reset: Where a new consumer group starts ("earliest"
+                or "latest").
         """
         self._topic = topic
         self._group_id = group_id or settings.KAFKA_CONSUMER_GROUP
         self._bootstrap_servers = bootstrap_servers or settings.KAFKA_BOOTSTRAP_SERVERS
+        self._auto_offset_reset = auto_offset_reset
         self._consumer: AIOKafkaConsumer | None = None
         self._running = False
 
@@ -117,7 +157,7 @@ class KafkaConsumer:
                 bootstrap_servers=self._bootstrap_servers,
                 group_id=self._group_id,
                 value_deserializer=lambda v: json.loads(v.decode("utf-8")),
-                auto_offset_reset="earliest",
+                auto_offset_reset=self._auto_offset_reset,
             )
             await self._consumer.start()
             self._running = True
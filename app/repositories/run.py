@@ -1,5 +1,6 @@
 from app.schemas.run import WorkflowRun
 from app.storage.base import BaseStorage
+from app.storage.durability import Durability
 
 
 class WorkflowRunRepository:
@@ -41,6 +42,32 @@ class WorkflowRunRepository:
         """
         return self.storage.create(workflow_run)
 
+    def create_workflow_runs(self, workflow_runs: list[WorkflowRun]) -> list[str]:
+        """
+        Create many workflow runs in one batch.
+
+        Args:
+            workflow_runs (list[WorkflowRun]): The workflow runs to create.
+
+        Returns:
+            list[str]: The UUIDs of the created workflow runs.
+        """
+        return self.storage.create_many(workflow_runs)
+
+    def create_missing_workflow_runs(
+        self, workflow_runs: list[WorkflowRun]
+    ) -> list[str]:
+        """
+        Create the workflow runs not stored yet, under their preset UUIDs.
+
+        Args:
+            workflow_runs (list[WorkflowRun]): The workflow runs, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the workflow runs created by this call.
+        """
+        return self.storage.create_missing(workflow_runs)
+
     def delete_workflow_run(self, uuid: str) -> bool:
         """
         Delete a workflow run by its UUID.
@@ -53,17 +80,21 @@ class WorkflowRunRepository:
         """
         return self.storage.delete(uuid)
 
-    def update_workflow_run(self, workflow_run: WorkflowRun) -> bool:
+    def update_workflow_run(
+        self, workflow_run: WorkflowRun, durability: Durability | None = None
+    ) -> bool:
         """
         Update an existing workflow run.
 
         Args:
             workflow_run (WorkflowRun): The updated workflow run.
+            durability (Durability | None): Durability of the write (storage
+                default if None).
 
         Returns:
             bool: True if updated, False if not found.
         """
-        return self.storage.update(workflow_run)
+        return self.storage.update(workflow_run, durability)
 
     def list_workflow_runs(self) -> list[WorkflowRun]:
         """
@@ -0,0 +1,74 @@
+from app.schemas.schedule import WorkflowSchedule
+from app.storage.base import BaseStorage
+
+
+class WorkflowScheduleRepository:
+    """
+    Repository for managing WorkflowSchedule entities.
+    """
+
+    def __init__(self, storage: BaseStorage[WorkflowSchedule]):
+        """
+        Initialize the repository.
+
+        Args:
+            storage (BaseStorage[WorkflowSchedule]): The storage backend.
+        """
+        self.storage = storage
+
+    def get_schedule(self, uuid: str) -> WorkflowSchedule:
+        """
+        Retrieve a schedule by its UUID.
+
+        Args:
+            uuid (str): The UUID of the schedule.
+
+        Returns:
+            WorkflowSchedule: The schedule, or None if not found.
+        """
+        return self.storage.get(uuid)
+
+    def create_schedule(self, schedule: WorkflowSchedule) -> str:
+        """
+        Create a new schedule.
+
+        Args:
+            schedule (WorkflowSchedule): The schedule to create.
+
+        Returns:
+            str: The UUID of the created schedule.
+        """
+        return self.storage.create(schedule)
+
+    def delete_schedule(self, uuid: str) -> bool:
+        """
+        Delete a schedule by its UUID.
+
+        Args:
+            uuid (str): The UUID of the schedule to delete.
+
+        Returns:
+            bool: True if deleted, False if not found.
+        """
+        return self.storage.delete(uuid)
+
+    def update_schedule(self, schedule: WorkflowSchedule) -> bool:
+        """
+        Update an existing schedule.
+
+        Args:
+            schedule (WorkflowSchedule): The updated schedule.
+
+        Returns:
+            bool: True if updated, False if not found.
+        """
+        return self.storage.update(schedule)
+
+    def list_schedules(self) -> list[WorkflowSchedule]:
+        """
+        List all schedules.
+
+        Returns:
+            list[WorkflowSchedule]: A list of all schedules.
+        """
+        return self.storage.list_all()
@@ -0,0 +1,155 @@
+"""
+Minimal five-field cron expression parser (minute hour day month weekday).
+
+Supports '*', single values, ranges 'a-b', steps '*/n' and 'a-b/n', lists
+'a,b,c' and the macros @yearly, @monthly, @weekly, @daily and @hourly.
+Weekday 0 and 7 are both Sunday. As in Vixie cron, when both day-of-month
+and day-of-week are restricted a day matches if either does. All times
+are UTC.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (minimum, maximum) per field
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Upper bound on the search for the next fire time (covers leap days)
+MAX_SEARCH_YEARS = 5
+
+
+def _parse_field(spec: str, minimum: int, maximum: int) -> frozenset[int]:
+    """Expand one cron field into the set of values it matches."""
+    values: set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_spec = part.split("/", 1)
+            step = int(step_spec)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {step_spec}")
+        if part == "*":
+            start, end = minimum, maximum
+        elif "-" in part:
+            start_spec, end_spec = part.split("-", 1)
+            start, end = int(start_spec), int(end_spec)
+        else:
+            start = int(part)
+            end = maximum if step > 1 else start
+        if start < minimum or end > maximum or start > end:
+            raise ValueError(f"Cron field '{spec}' out of range {minimum}-{maximum}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronExpression:
+    """
+    A parsed cron expression.
+
+    Attributes:
+        expression (str): The original expression.
+        minutes, hours, days, months, weekdays (frozenset[int]): Matching values.
+        day_restricted (bool): Whether the day-of-month field is not '*'.
+        weekday_restricted (bool): Whether the day-of-week field is not '*'.
+    """
+
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    day_restricted: bool
+    weekday_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronExpression":
+        """
+        Parse a cron expression.
+
+        Args:
+            expression: Five space-separated fields or a macro.
+
+        Returns:
+            CronExpression: The parsed expression.
+
+        Raises:
+            ValueError: If the expression is malformed.
+        """
+        fields = MACROS.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+        try:
+            minutes, hours, days, months, weekdays = (
+                _parse_field(spec, minimum, maximum)
+                for spec, (minimum, maximum) in zip(fields, FIELD_RANGES)
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression '{expression}': {e}") from e
+        return cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            # cron Sunday is 0 or 7; Python's weekday() has Monday=0
+            weekdays=frozenset((value - 1) % 7 for value in weekdays),
+            day_restricted=fields[2] != "*",
+            weekday_restricted=fields[4] != "*",
+        )
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = moment.weekday() in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        Compute the first fire time strictly after a moment.
+
+        Skips whole months, days and hours that cannot match, so the
+        search takes at most a few hundred iterations.
+
+        Args:
+            moment: The reference time (UTC).
+
+        Returns:
+            datetime: The next fire time.
+
+        Raises:
+            ValueError: If the expression never fires (e.g. '0 0 31 2 *').
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * MAX_SEARCH_YEARS)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never fires")
@@ -0,0 +1,611 @@
+"""
+Scheduler service for cron-triggered workflow runs.
+
+This module runs as a standalone service that:
+1. Elects a single leader among scheduler instances through a Redis lease
+2. Keeps every enabled schedule in a min-heap keyed by its next fire time
+3. Sleeps until the earliest fire time, then creates all due runs in one
+   bulk insert and publishes their trigger events in one batch per lane
+
+Schedule changes made through the API arrive on the schedule-changed topic
+and update the heap incrementally; a periodic full reload guards against
+missed change events. The leader records the last processed fire time in
+Redis so a newly elected leader catches up on fires missed during failover.
+
+Run table maintenance (partitions, app.db.partitions, and archival,
+app.archive) and the sweep of unused blobs (BLOB_RETENTION_DAYS) run
+in a separate task under its own Redis lease, so a long
+archival pass never holds up firing or outlives the firing leader's
+lease. Any instance may take the maintenance lease; it is renewed while
+the work runs, the work stops between batches once it is lost, and on
+completion it is kept for RUN_PARTITION_MAINTENANCE_SECONDS so the
+maintenance is not repeated sooner by another instance.
+"""
+import asyncio
+import heapq
+import logging
+import signal
+import sys
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import Callable
+
+from app.archive.job import archive_runs
+from app.archive.store import get_run_archive
+from app.blob.factory import get_blob_store
+from app.cache.redis_cache import get_async_redis_client
+from app.core.config import settings
+from app.db.partitions import create_partitions
+from app.db.partitions import expire_partitions
+from app.db.session import engine
+from app.messaging.base import BaseProducer
+from app.messaging.events import ScheduleChangedEvent
+from app.messaging.events import trigger_topic
+from app.messaging.events import WorkflowTriggerEvent
+from app.messaging.factory import BrokerFactory
+from app.scheduler.cron import CronExpression
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.schedule import WorkflowSchedule
+from app.services.workflow import WorkflowService
+from app.storage.enum import StorageType
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "scheduler:leader"
+WATERMARK_KEY = "scheduler:watermark"
+MAINTENANCE_KEY = "scheduler:maintenance"
+
+_RENEW_LEADER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def scheduled_run_id(schedule_id: str, fire_at: datetime) -> str:
+    """
+    Deterministic UUID of the run of a schedule at a fire time.
+
+    Args:
+        schedule_id (str): The schedule UUID.
+        fire_at (datetime): The fire time (UTC).
+
+    Returns:
+        str: The run UUID (hex).
+    """
+    return uuid.uuid5(
+        uuid.NAMESPACE_URL, f"schedule:{schedule_id}@{fire_at.isoformat()}"
+    ).hex
+
+
+@dataclass
+class ScheduleEntry:
+    """
+    A schedule tracked by the scheduler.
+
+    Attributes:
+        schedule (WorkflowSchedule): The schedule definition.
+        cron (CronExpression): The parsed cron expression.
+        next_fire (datetime): The next fire time (UTC). Heap items whose
+            timestamp differs from this are stale and skipped.
+    """
+
+    schedule: WorkflowSchedule
+    cron: CronExpression
+    next_fire: datetime
+
+
+class SchedulerService:
+    """
+    Leader-elected scheduler that fires due cron schedules in batches.
+    """
+
+    def __init__(self, producer: BaseProducer | None = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            producer: An already started producer to share. Defaults to a new
+                producer owned by the scheduler.
+        """
+        self._instance_id = uuid.uuid4().hex
+        self._owns_producer = producer is None
+        self._producer: BaseProducer = producer or BrokerFactory.create_producer()
+        # Every instance needs every change event, so each gets its own group
+        self._consumer = BrokerFactory.create_consumer(
+            topic=settings.KAFKA_TOPIC_SCHEDULE_CHANGED,
+            group_id=f"{settings.KAFKA_CONSUMER_GROUP}-scheduler-{self._instance_id}",
+            auto_offset_reset="latest",
+        )
+        self._workflow_service = WorkflowService(settings.STORAGE_TYPE)
+        self._entries: dict[str, ScheduleEntry] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._is_leader = False
+        self._loaded_at: float | None = None
+        self._wakeup = asyncio.Event()
+
+    async def start(self) -> None:
+        """Start the scheduler loop and the schedule-change consumer."""
+        logger.info(f"Starting scheduler {self._instance_id}...")
+        if self._owns_producer:
+            await self._producer.start()
+        await self._consumer.start()
+        try:
+            await asyncio.gather(
+                self._run(),
+                self._maintenance_loop(),
+                self._consumer.consume(self._handle_change),
+            )
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """Stop the scheduler and release leadership."""
+        logger.info("Stopping scheduler...")
+        await self._consumer.stop()
+        if self._owns_producer:
+            await self._producer.stop()
+        if self._is_leader:
+            try:
+                client = get_async_redis_client()
+                if await client.get(LEADER_KEY) == self._instance_id:
+                    await client.delete(LEADER_KEY)
+            except Exception as e:
+                logger.warning(f"Redis error releasing scheduler leadership: {e}")
+            self._is_leader = False
+        logger.info("Scheduler stopped")
+
+    async def _elect(self) -> bool:
+        """
+        Acquire or renew the leader lease.
+
+        Redis errors count as lost leadership, so an outage pauses firing
+        instead of risking two leaders firing the same schedule.
+
+        Returns:
+            bool: Whether this instance is the leader.
+        """
+        ttl_ms = settings.SCHEDULER_LEADER_TTL_SECONDS * 1000
+        try:
+            client = get_async_redis_client()
+            if self._is_leader:
+                leader = bool(
+                    await client.eval(
+                        _RENEW_LEADER_SCRIPT, 1, LEADER_KEY, self._instance_id, ttl_ms
+                    )
+                )
+            else:
+                leader = bool(
+                    await client.set(LEADER_KEY, self._instance_id, nx=True, px=ttl_ms)
+                )
+        except Exception as e:
+            logger.warning(f"Redis scheduler election error: {e}")
+            leader = False
+
+        if leader and not self._is_leader:
+            logger.info(f"Scheduler {self._instance_id} became leader")
+            self._loaded_at = None
+        elif self._is_leader and not leader:
+            logger.warning(f"Scheduler {self._instance_id} lost leadership")
+            self._entries.clear()
+            self._heap.clear()
+        self._is_leader = leader
+        return leader
+
+    async def _read_watermark(self) -> datetime | None:
+        """Read the last fire time processed by any leader."""
+        try:
+            value = await get_async_redis_client().get(WATERMARK_KEY)
+        except Exception as e:
+            logger.warning(f"Redis error reading scheduler watermark: {e}")
+            return None
+        return datetime.fromtimestamp(float(value), tz=timezone.utc) if value else None
+
+    async def _write_watermark(self, fired_until: datetime) -> None:
+        """Record the last processed fire time."""
+        try:
+            await get_async_redis_client().set(WATERMARK_KEY, fired_until.timestamp())
+        except Exception as e:
+            logger.warning(f"Redis error writing scheduler watermark: {e}")
+
+    def _push(self, entry: ScheduleEntry) -> None:
+        heapq.heappush(self._heap, (entry.next_fire.timestamp(), entry.schedule.uuid))
+
+    def upsert(self, schedule: WorkflowSchedule, after: datetime) -> None:
+        """
+        Add or replace a schedule in the heap.
+
+        Args:
+            schedule: The schedule.
+            after: Fire times at or before this moment are not scheduled.
+        """
+        self.remove(schedule.uuid)
+        if not schedule.enabled:
+            return
+        try:
+            cron = CronExpression.parse(schedule.cron)
+            next_fire = cron.next_after(after)
+        except ValueError as e:
+            logger.error(f"Skipping schedule {schedule.uuid}: {e}")
+            return
+        entry = ScheduleEntry(schedule=schedule, cron=cron, next_fire=next_fire)
+        self._entries[schedule.uuid] = entry
+        self._push(entry)
+
+    def remove(self, schedule_id: str) -> None:
+        """
+        Stop tracking a schedule. Its heap item is discarded lazily.
+
+        Args:
+            schedule_id: The UUID of the schedule.
+        """
+        self._entries.pop(schedule_id, None)
+
+    def load(self, schedules: list[WorkflowSchedule], after: datetime) -> None:
+        """
+        Replace all tracked schedules.
+
+        Args:
+            schedules: Every schedule.
+            after: Fire times at or before this moment are not scheduled.
+        """
+        self._entries.clear()
+        self._heap.clear()
+        for schedule in schedules:
+            self.upsert(schedule, after)
+
+    def next_fire_time(self) -> datetime | None:
+        """
+        Return the earliest pending fire time.
+
+        Returns:
+            datetime | None: The next fire time, or None if nothing is scheduled.
+        """
+        while self._heap:
+            fire_ts, schedule_id = self._heap[0]
+            entry = self._entries.get(schedule_id)
+            if entry is not None and entry.next_fire.timestamp() == fire_ts:
+                return entry.next_fire
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(
+        self, now: datetime, limit: int
+    ) -> list[tuple[WorkflowSchedule, datetime]]:
+        """
+        Take the schedules due at or before a moment and advance them.
+
+        A schedule that missed several fire times yields one item per
+        missed time, oldest first.
+
+        Args:
+            now: The current time (UTC).
+            limit: Maximum number of fires to return.
+
+        Returns:
+            list[tuple[WorkflowSchedule, datetime]]: (schedule, fire time) pairs.
+        """
+        due = []
+        now_ts = now.timestamp()
+        while self._heap and len(due) < limit:
+            fire_ts, schedule_id = self._heap[0]
+            if fire_ts > now_ts:
+                break
+            heapq.heappop(self._heap)
+            entry = self._entries.get(schedule_id)
+            if entry is None or entry.next_fire.timestamp() != fire_ts:
+                continue
+            due.append((entry.schedule, entry.next_fire))
+            try:
+                entry.next_fire = entry.cron.next_after(entry.next_fire)
+            except ValueError:
+                del self._entries[schedule_id]
+                continue
+            self._push(entry)
+        return due
+
+    async def fire(self, due: list[tuple[WorkflowSchedule, datetime]]) -> int:
+        """
+        Create runs for due schedules and publish their trigger events.
+
+        Each run's UUID derives from its schedule and fire time, and runs
+        are inserted in one idempotent batch, so fires replayed by a new
+        leader (or after a failed tick) never create a run twice. Events
+        are published in one batch per priority lane for the runs created,
+        and again for replayed runs that are still pending, whose trigger
+        may not have been published.
+
+        Args:
+            due: (schedule, fire time) pairs from pop_due.
+
+        Returns:
+            int: The number of runs created.
+        """
+        workflows: dict[str, Any] = {}
+        for workflow_id in {schedule.workflow_id for schedule, _ in due}:
+            workflows[workflow_id] = await asyncio.to_thread(
+                self._workflow_service.load_workflow, workflow_id
+            )
+        pending: list[tuple[WorkflowRun, WorkflowSchedule, Any]] = []
+        for schedule, fire_at in due:
+            workflow = workflows[schedule.workflow_id]
+            if workflow is None:
+                logger.warning(
+                    f"Schedule {schedule.uuid} targets missing workflow "
+                    f"{schedule.workflow_id}"
+                )
+                continue
+            run = WorkflowRun(
+                uuid=scheduled_run_id(schedule.uuid, fire_at),
+                workflow_id=schedule.workflow_id,
+                status=WorkflowStatus.PENDING,
+                payload=schedule.payload,
+                started_at=datetime.now().isoformat(),
+            )
+            pending.append((run, schedule, workflow))
+
+        if not pending:
+            return 0
+        created = set(
+            await asyncio.to_thread(
+                self._workflow_service.create_missing_workflow_runs,
+                [run for run, _, _ in pending],
+            )
+        )
+        replayed = [run for run, _, _ in pending if run.uuid not in created]
+        if replayed:
+            stored = await asyncio.to_thread(
+                lambda: [
+                    self._workflow_service.load_workflow_run(run.uuid)
+                    for run in replayed
+                ]
+            )
+            still_pending = {
+                run.uuid: run
+                for run in stored
+                if run is not None and run.status == WorkflowStatus.PENDING
+            }
+            pending = [
+                (still_pending.get(run.uuid, run), schedule, workflow)
+                for run, schedule, workflow in pending
+                if run.uuid in created or run.uuid in still_pending
+            ]
+
+        events: dict[str, list[tuple[str | None, dict[str, Any]]]] = {}
+        for run, schedule, workflow in pending:
+            event = WorkflowTriggerEvent(
+                run_id=run.uuid,
+                workflow_id=schedule.workflow_id,
+                payload=schedule.payload,
+                priority=schedule.priority,
+                max_concurrency=workflow.max_concurrency,
+                triggered_at=run.started_at,
+            )
+            events.setdefault(trigger_topic(schedule.priority), []).append(
+                (run.uuid, event.model_dump())
+            )
+        for topic, messages in events.items():
+            await self._producer.send_many(topic, messages)
+        logger.info(
+            f"Fired {len(created)} scheduled runs ({len(replayed)} already created)"
+        )
+        return len(created)
+
+    async def _reload(self, now: datetime) -> None:
+        """Reload every schedule from storage, catching up missed fires."""
+        after = now
+        watermark = await self._read_watermark()
+        if watermark is not None:
+            earliest = now - timedelta(seconds=settings.SCHEDULER_MAX_CATCHUP_SECONDS)
+            after = min(max(watermark, earliest), now)
+        schedules = await asyncio.to_thread(self._workflow_service.list_schedules)
+        self.load(schedules, after)
+        self._loaded_at = now.timestamp()
+        logger.info(f"Loaded {len(self._entries)} enabled schedules")
+
+    async def _run(self) -> None:
+        """Elect, (re)load and fire due schedules until cancelled."""
+        renew_every = settings.SCHEDULER_LEADER_TTL_SECONDS / 3
+        while True:
+            now = datetime.now(timezone.utc)
+            if not await self._elect():
+                await asyncio.sleep(renew_every)
+                continue
+
+            try:
+                if (
+                    self._loaded_at is None
+                    or now.timestamp() - self._loaded_at
+                    >= settings.SCHEDULER_RESYNC_SECONDS
+                ):
+                    await self._reload(now)
+
+                due = self.pop_due(now, settings.SCHEDULER_MAX_BATCH)
+                if due:
+                    await self.fire(due)
+                    if len(due) == settings.SCHEDULER_MAX_BATCH:
+                        # More fires may be due; keep draining before sleeping
+                        continue
+                    await self._write_watermark(now)
+            except Exception as e:
+                # Reload from the watermark so the failed fires are retried
+                logger.error(f"Scheduler tick error: {e}")
+                self._loaded_at = None
+
+            next_fire = self.next_fire_time()
+            timeout = renew_every
+            if next_fire is not None:
+                timeout = min(timeout, max((next_fire - now).total_seconds(), 0))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _maintenance_loop(self) -> None:
+        """Maintain the run tables whenever this instance gets the maintenance lease."""
+        ttl_ms = settings.SCHEDULER_LEADER_TTL_SECONDS * 1000
+        while True:
+            try:
+                acquired = await get_async_redis_client().set(
+                    MAINTENANCE_KEY, self._instance_id, nx=True, px=ttl_ms
+                )
+            except Exception as e:
+                logger.warning(f"Redis error acquiring the maintenance lease: {e}")
+                acquired = False
+            if acquired:
+                await self._maintain(datetime.now(timezone.utc))
+            await asyncio.sleep(settings.SCHEDULER_LEADER_TTL_SECONDS / 3)
+
+    async def _renew_maintenance(self, ttl_ms: int) -> bool:
+        try:
+            return bool(
+                await get_async_redis_client().eval(
+                    _RENEW_LEADER_SCRIPT, 1, MAINTENANCE_KEY, self._instance_id, ttl_ms
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Redis error renewing the maintenance lease: {e}")
+            return False
+
+    async def _keep_maintenance_lease(self, lost: threading.Event) -> None:
+        """Renew the maintenance lease until cancelled, flagging its loss."""
+        renew_every = settings.SCHEDULER_LEADER_TTL_SECONDS / 3
+        while True:
+            await asyncio.sleep(renew_every)
+            if not await self._renew_maintenance(
+                settings.SCHEDULER_LEADER_TTL_SECONDS * 1000
+            ):
+                logger.warning(
+                    f"Scheduler {self._instance_id} lost the maintenance lease"
+                )
+                lost.set()
+                return
+
+    async def _maintain(self, now: datetime) -> None:
+        """
+        Maintain the run tables while renewing the maintenance lease, then
+        hold the lease until the next maintenance is due.
+        """
+        lost = threading.Event()
+        renewer = asyncio.create_task(self._keep_maintenance_lease(lost))
+        try:
+            await self._maintain_run_tables(now, lambda: not lost.is_set())
+            await self._sweep_blobs(now)
+        finally:
+            renewer.cancel()
+        if not lost.is_set():
+            await self._renew_maintenance(
+                settings.RUN_PARTITION_MAINTENANCE_SECONDS * 1000
+            )
+
+    async def _maintain_run_tables(
+        self, now: datetime, keep_going: Callable[[], bool]
+    ) -> None:
+        """
+        Create upcoming run partitions, archive cold ones and expire old ones.
+
+        Expiry is skipped when archival fails or keep_going turns False, so
+        no partition is dropped before its runs are archived. Partitions and
+        the archive only exist with Postgres storage.
+        """
+        if settings.STORAGE_TYPE != StorageType.POSTGRES:
+            return
+        try:
+            await asyncio.to_thread(create_partitions, engine, now)
+        except Exception as e:
+            logger.error(f"Run partition creation error: {e}")
+        try:
+            await asyncio.to_thread(
+                archive_runs, engine, get_run_archive(), now, keep_going
+            )
+        except Exception as e:
+            logger.error(f"Run archival error, skipping partition expiry: {e}")
+            return
+        if not keep_going():
+            return
+        try:
+            await asyncio.to_thread(expire_partitions, engine, now)
+        except Exception as e:
+            logger.error(f"Run partition expiry error: {e}")
+
+    @staticmethod
+    async def _sweep_blobs(now: datetime) -> None:
+        """Delete blobs no run has stored for BLOB_RETENTION_DAYS."""
+        if settings.BLOB_RETENTION_DAYS is None:
+            return
+        try:
+            await asyncio.to_thread(
+                get_blob_store().delete_unused_since,
+                now - timedelta(days=settings.BLOB_RETENTION_DAYS),
+            )
+        except Exception as e:
+            logger.error(f"Blob sweep error: {e}")
+
+    async def _handle_change(self, message: dict[str, Any]) -> None:
+        """
+        Apply a schedule change event to the heap.
+
+        Args:
+            message: The raw ScheduleChangedEvent payload.
+        """
+        event = ScheduleChangedEvent.model_validate(message)
+        if not self._is_leader or self._loaded_at is None:
+            # Followers hold no heap; a new leader does a full load anyway
+            return
+        schedule = None
+        if not event.deleted:
+            schedule = await asyncio.to_thread(
+                self._workflow_service.load_schedule, event.schedule_id
+            )
+        if schedule is None:
+            self.remove(event.schedule_id)
+        else:
+            self.upsert(schedule, datetime.now(timezone.utc))
+        self._wakeup.set()
+
+
+async def main() -> None:
+    """Main entry point for the scheduler service."""
+    scheduler = SchedulerService()
+
+    # Handle graceful shutdown
+    loop = asyncio.get_event_loop()
+    shutdown_event = asyncio.Event()
+
+    def signal_handler():
+        logger.info("Shutdown signal received")
+        shutdown_event.set()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, signal_handler)
+
+    try:
+        scheduler_task = asyncio.create_task(scheduler.start())
+
+        await shutdown_event.wait()
+
+        scheduler_task.cancel()
+        try:
+            await scheduler_task
+        except asyncio.CancelledError:
+            pass
+
+    except Exception as e:
+        logger.error(f"Scheduler error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,6 +9,8 @@ class WorkflowStatus(str, Enum):
     SUCCESS = "success"
     FAILED = "failed"
     PAUSED = "paused"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
 
 
 class StepStatus(str, Enum):
@@ -19,3 +21,13 @@ class StepStatus(str, Enum):
     SUCCESS = "success"
     FAILED = "failed"
     SKIPPED = "skipped"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+class Priority(str, Enum):
+    """Enumeration of trigger priorities, each mapped to its own queue lane."""
+
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
@@ -1,5 +1,7 @@
 from typing import Any
-from pydantic import BaseModel, Field
+
+from pydantic import BaseModel
+from pydantic import Field
 
 from app.schemas.common import WorkflowStatus
 from app.schemas.workflow import StepResult
@@ -30,3 +32,14 @@ class WorkflowRun(BaseModel):
     completed_at: str | None = None
     error: str | None = None
     step_results: dict[str, StepResult] = Field(default_factory=dict)
+
+
+class CancelRunsRequest(BaseModel):
+    """
+    Request model for cancelling every run of a workflow.
+
+    Attributes:
+        workflow_id (str): The workflow whose pending and running runs are cancelled.
+    """
+
+    workflow_id: str
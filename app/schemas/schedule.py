@@ -0,0 +1,37 @@
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import field_validator
+
+from app.scheduler.cron import CronExpression
+from app.schemas.common import Priority
+
+
+class WorkflowSchedule(BaseModel):
+    """
+    A cron schedule that triggers a workflow.
+
+    Attributes:
+        uuid (str | None): Unique schedule ID.
+        id (str | None): Optional external ID.
+        workflow_id (str): ID of the workflow definition to trigger.
+        cron (str): Five-field cron expression or macro, evaluated in UTC.
+        payload (dict[str, Any]): Input payload of every triggered run.
+        priority (Priority): Queue lane of the triggered runs.
+        enabled (bool): Disabled schedules are kept but never fire.
+    """
+
+    uuid: str | None = None
+    id: str | None = None
+    workflow_id: str
+    cron: str
+    payload: dict[str, Any] = Field(default_factory=dict)
+    priority: Priority = Priority.NORMAL
+    enabled: bool = True
+
+    @field_validator("cron")
+    @classmethod
+    def validate_cron(cls, value: str) -> str:
+        CronExpression.parse(value)
+        return value
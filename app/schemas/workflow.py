@@ -1,8 +1,17 @@
-from typing import Annotated, Any, Union
-from pydantic import BaseModel, Field
-
-from app.connector.delay import DelayOutput, DelayWorkflowStep
-from app.connector.webhook import WebhookResponse, WebhookWorkflowStep
+from typing import Annotated
+from typing import Any
+from typing import Union
+
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import model_validator
+
+from app.blob.base import BlobRef
+from app.connector.enum import ConnectorType
+from app.connector.map_models import MapConfig
+from app.connector.map_models import MapWorkflowStep
+from app.connector.registry import registry
+from app.schemas.common import Priority
 from app.schemas.common import StepStatus
 
 
@@ -13,18 +22,29 @@ class TriggerRequest(BaseModel):
     Attributes:
         workflow_id (str): The unique identifier of the workflow to trigger.
         payload (dict[str, Any]): Input data for the workflow execution.
+        priority (Priority): Queue lane for the run. Use LOW for bulk backfills
+            so they do not delay interactive runs.
     """
 
     workflow_id: str
     payload: dict[str, Any] = Field(default_factory=dict)
+    priority: Priority = Priority.NORMAL
 
 
+# Step and output unions cover every registered connector type (built-in
+# and plugins), discriminated by "type"
 WorkflowStep = Annotated[
-    Union[WebhookWorkflowStep, DelayWorkflowStep], Field(discriminator="type")
+    Union[tuple(registry.step_models())],
+    Field(discriminator="type"),
 ]
 
+# Map steps nest a WorkflowStep, so resolve the forward reference now
+MapConfig.model_rebuild(_types_namespace={"WorkflowStep": WorkflowStep})
+MapWorkflowStep.model_rebuild()
+
 WorkflowStepResponse = Annotated[
-    Union[DelayOutput, WebhookResponse], Field(discriminator="type")
+    Union[tuple(registry.output_models()) + (BlobRef,)],
+    Field(discriminator="type"),
 ]
 
 
@@ -38,6 +58,10 @@ class WorkflowDefinition(BaseModel):
         name (str): Display name of the workflow.
         description (str | None): Optional description.
         steps (list[WorkflowStep]): List of steps to execute.
+        max_concurrency (int | None): Maximum runs of this workflow executing at
+            once across all workers. Runs over the limit are deferred, not refused.
+        deadline (float | None): Maximum duration of a run in seconds. Each step's
+            timeout is capped by the time left; exceeding it times the run out.
     """
 
     uuid: str | None = None
@@ -45,6 +69,23 @@ class WorkflowDefinition(BaseModel):
     name: str
     description: str | None = None
     steps: list[WorkflowStep]
+    max_concurrency: int | None = Field(default=None, ge=1)
+    deadline: float | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def validate_branches(self) -> "WorkflowDefinition":
+        """Check every switch step only targets steps that come after it."""
+        positions = {step.name: index for index, step in enumerate(self.steps)}
+        for index, step in enumerate(self.steps):
+            if step.type != ConnectorType.SWITCH:
+                continue
+            for target in step.config.targets:
+                if positions.get(target, -1) <= index:
+                    raise ValueError(
+                        f"Switch step '{step.name}' targets '{target}', "
+                        "which is not a later step"
+                    )
+        return self
 
 
 class StepResult(BaseModel):
@@ -56,7 +97,8 @@ class StepResult(BaseModel):
         status (StepStatus): Execution status.
         started_at (str): ISO timestamp of start time.
         completed_at (str | None): ISO timestamp of completion time.
-        output (WorkflowStepResponse | None): output data from the step.
+        output (WorkflowStepResponse | None): output data from the step, or a
+            BlobRef when it was moved to the blob store for its size.
         error (str | None): Error message if failed.
     """
 
@@ -0,0 +1,124 @@
+"""
+Compiled workflow execution plans.
+
+Compiling a workflow definition resolves the connector of every step
+once, so executing a run (or an inline sub-workflow) is a loop over
+prepared steps with no definition lookup or factory dispatch. Plans are
+cached per workflow UUID; definitions are immutable once created.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.connector.base import BaseConnector
+from app.connector.factory import ConnectorFactory
+from app.schemas.workflow import WorkflowDefinition
+from app.schemas.workflow import WorkflowStep
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """
+    A step bound to the connector that executes it.
+
+    Attributes:
+        step (WorkflowStep): The step definition.
+        connector (BaseConnector): The connector for the step's type.
+    """
+
+    step: WorkflowStep
+    connector: BaseConnector
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    A workflow definition ready for execution.
+
+    Attributes:
+        workflow (WorkflowDefinition): The source definition.
+        steps (tuple[CompiledStep, ...]): The steps in execution order.
+    """
+
+    workflow: WorkflowDefinition
+    steps: tuple[CompiledStep, ...]
+
+    @property
+    def workflow_id(self) -> str:
+        """UUID of the compiled workflow."""
+        return self.workflow.uuid
+
+    @classmethod
+    def compile(cls, workflow: WorkflowDefinition) -> "ExecutionPlan":
+        """
+        Compile a workflow definition.
+
+        Args:
+            workflow (WorkflowDefinition): The definition to compile.
+
+        Returns:
+            ExecutionPlan: The compiled plan.
+
+        Raises:
+            ValueError: If a step uses an unknown connector type.
+        """
+        return cls(
+            workflow=workflow,
+            steps=tuple(
+                CompiledStep(
+                    step=step, connector=ConnectorFactory.get_instance(step.type)
+                )
+                for step in workflow.steps
+            ),
+        )
+
+
+class PlanCache:
+    """
+    Bounded LRU cache of compiled plans keyed by workflow UUID.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of plans kept.
+        """
+        self._max_size = max_size
+        self._plans: OrderedDict[str, ExecutionPlan] = OrderedDict()
+
+    def get(self, workflow_id: str) -> ExecutionPlan | None:
+        """
+        Get a cached plan.
+
+        Args:
+            workflow_id (str): The workflow UUID.
+
+        Returns:
+            ExecutionPlan | None: The plan, or None if not cached.
+        """
+        plan = self._plans.get(workflow_id)
+        if plan is not None:
+            self._plans.move_to_end(workflow_id)
+        return plan
+
+    def put(self, plan: ExecutionPlan) -> None:
+        """
+        Cache a plan, evicting the least recently used one when full.
+
+        Args:
+            plan (ExecutionPlan): The plan to cache.
+        """
+        self._plans[plan.workflow_id] = plan
+        self._plans.move_to_end(plan.workflow_id)
+        while len(self._plans) > self._max_size:
+            self._plans.popitem(last=False)
+
+    def invalidate(self, workflow_id: str) -> None:
+        """
+        Drop a cached plan.
+
+        Args:
+            workflow_id (str): The workflow UUID.
+        """
+        self._plans.pop(workflow_id, None)
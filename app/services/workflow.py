@@ -1,13 +1,34 @@
+import asyncio
 import logging
 from datetime import datetime
 from typing import Any
 
+from pydantic import TypeAdapter
+
+from app.blob.base import BlobRef
+from app.blob.factory import get_blob_store
+from app.blob.offload import offload_output
+from app.blob.offload import resolve_output
+from app.connector.base import BaseConnector
 from app.connector.factory import ConnectorFactory
-from app.schemas.workflow import StepResult, WorkflowDefinition, WorkflowStep
-from app.schemas.run import WorkflowRun
-from app.schemas.common import StepStatus, WorkflowStatus
-from app.repositories.workflow import WorkflowRepository
+from app.connector.subworkflow import current_scope
+from app.connector.subworkflow import ExecutionScope
+from app.connector.switch_models import SwitchOutput
+from app.core.config import settings
 from app.repositories.run import WorkflowRunRepository
+from app.repositories.schedule import WorkflowScheduleRepository
+from app.repositories.workflow import WorkflowRepository
+from app.schemas.common import StepStatus
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.schedule import WorkflowSchedule
+from app.schemas.workflow import StepResult
+from app.schemas.workflow import WorkflowDefinition
+from app.schemas.workflow import WorkflowStep
+from app.schemas.workflow import WorkflowStepResponse
+from app.services.plan import ExecutionPlan
+from app.services.plan import PlanCache
+from app.storage.durability import Durability
 from app.storage.enum import StorageType
 from app.storage.factory import StorageFactory
 
@@ -15,6 +36,8 @@ from app.storage.factory import StorageFactory
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_step_output_adapter = TypeAdapter(WorkflowStepResponse)
+
 
 class WorkflowService:
     def __init__(self, storage: StorageType):
@@ -27,14 +50,20 @@ class WorkflowService:
         Raises:
             ValueError: If the storage type is unknown.
         """
-        storage_cls = StorageFactory.create_storage(storage)
-
-        # Initialize storage and engine
-        workflow_storage = storage_cls[WorkflowDefinition](t_type=WorkflowDefinition)
-        workflow_run_storage = storage_cls[WorkflowRun](t_type=WorkflowRun)
+        # Initialize storage (cached for the backends in STORAGE_CACHE_BACKENDS)
+        # and engine
+        workflow_storage = StorageFactory.create(storage, WorkflowDefinition)
+        workflow_run_storage = StorageFactory.create(storage, WorkflowRun)
+        schedule_storage = StorageFactory.create(storage, WorkflowSchedule)
 
         self.workflow_repository = WorkflowRepository(workflow_storage)
         self.workflow_run_repository = WorkflowRunRepository(workflow_run_storage)
+        self.schedule_repository = WorkflowScheduleRepository(schedule_storage)
+
+        self._plans = PlanCache(settings.PLAN_CACHE_SIZE)
+        self.blob_store = get_blob_store()
+        # Set by the worker to run ASYNC sub-workflows through the broker
+        self.dispatcher = None
 
     def create_workflow(self, workflow: WorkflowDefinition) -> str:
         """
@@ -60,6 +89,25 @@ class WorkflowService:
         """
         return self.workflow_repository.get_workflow(uuid)
 
+    def get_plan(self, workflow_id: str) -> ExecutionPlan | None:
+        """
+        Get the compiled execution plan of a workflow, compiling it on first use.
+
+        Args:
+            workflow_id (str): The UUID of the workflow.
+
+        Returns:
+            ExecutionPlan | None: The plan, or None if the workflow does not exist.
+        """
+        plan = self._plans.get(workflow_id)
+        if plan is None:
+            workflow = self.load_workflow(workflow_id)
+            if workflow is None:
+                return None
+            plan = ExecutionPlan.compile(workflow)
+            self._plans.put(plan)
+        return plan
+
     def create_workflow_run(self, workflow_run: WorkflowRun) -> str:
         """
         Create a new workflow run.
@@ -72,6 +120,33 @@ class WorkflowService:
         """
         return self.workflow_run_repository.create_workflow_run(workflow_run)
 
+    def create_workflow_runs(self, workflow_runs: list[WorkflowRun]) -> list[str]:
+        """
+        Create many workflow runs in one batch (e.g. all runs due in a scheduler tick).
+
+        Args:
+            workflow_runs (list[WorkflowRun]): The workflow runs to save.
+
+        Returns:
+            list[str]: The UUIDs of the created workflow runs.
+        """
+        return self.workflow_run_repository.create_workflow_runs(workflow_runs)
+
+    def create_missing_workflow_runs(
+        self, workflow_runs: list[WorkflowRun]
+    ) -> list[str]:
+        """
+        Create the workflow runs not stored yet, under their preset UUIDs
+        (e.g. scheduled runs, whose UUIDs derive from their schedule and fire time).
+
+        Args:
+            workflow_runs (list[WorkflowRun]): The workflow runs, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the workflow runs created by this call.
+        """
+        return self.workflow_run_repository.create_missing_workflow_runs(workflow_runs)
+
     def load_workflow_run(self, uuid: str) -> WorkflowRun:
         """
         Load a workflow run by its UUID.
@@ -84,6 +159,81 @@ class WorkflowService:
         """
         return self.workflow_run_repository.get_workflow_run(uuid)
 
+    def resolve_outputs(self, run: WorkflowRun) -> None:
+        """
+        Replace blob references in a run's step results with the outputs.
+
+        Args:
+            run (WorkflowRun): The run to update in place.
+
+        Raises:
+            LookupError: If a referenced blob is missing.
+        """
+        for result in run.step_results.values():
+            if isinstance(result.output, BlobRef):
+                result.output = _step_output_adapter.validate_python(
+                    resolve_output(result.output, self.blob_store)
+                )
+
+    def offload_outputs(self, step_results: dict[str, StepResult]) -> None:
+        """
+        Move outputs over settings.BLOB_OFFLOAD_MIN_BYTES to the blob store.
+
+        Serializes and writes large outputs, so async callers run it in a
+        thread (asyncio.to_thread).
+
+        Args:
+            step_results (dict[str, StepResult]): Results updated in place.
+        """
+        for result in step_results.values():
+            if result.output is not None:
+                result.output = offload_output(result.output, self.blob_store)
+
+    def create_schedule(self, schedule: WorkflowSchedule) -> str:
+        """
+        Create a new workflow schedule.
+
+        Args:
+            schedule (WorkflowSchedule): The schedule to create.
+
+        Returns:
+            str: The UUID of the created schedule.
+        """
+        return self.schedule_repository.create_schedule(schedule)
+
+    def load_schedule(self, uuid: str) -> WorkflowSchedule:
+        """
+        Load a workflow schedule by its UUID.
+
+        Args:
+            uuid (str): The UUID of the schedule.
+
+        Returns:
+            WorkflowSchedule: The schedule, or None if not found.
+        """
+        return self.schedule_repository.get_schedule(uuid)
+
+    def delete_schedule(self, uuid: str) -> bool:
+        """
+        Delete a workflow schedule.
+
+        Args:
+            uuid (str): The UUID of the schedule.
+
+        Returns:
+            bool: True if deleted, False if not found.
+        """
+        return self.schedule_repository.delete_schedule(uuid)
+
+    def list_schedules(self) -> list[WorkflowSchedule]:
+        """
+        List all workflow schedules.
+
+        Returns:
+            list[WorkflowSchedule]: A list of all schedules.
+        """
+        return self.schedule_repository.list_schedules()
+
     def list_runs(self) -> list[WorkflowRun]:
         """
         List all workflow runs.
@@ -118,11 +268,21 @@ class WorkflowService:
             run_id (str): The UUID of the workflow run to execute.
 
         This method:
-            1. Loads the run and workflow definition.
+            1. Loads the run and the workflow's compiled plan (cached).
             2. Updates status to RUNNING.
-            3. Iterates through steps sequentially, passing context.
+            3. Iterates through steps sequentially, passing context (run_plan).
             4. Handling step retries (if implemented) or failure.
-            5. Updates final status to SUCCESS or FAILED.
+            5. Updates final status to SUCCESS, FAILED or TIMED_OUT.
+
+        Each step runs under a timeout: its own, else the default, capped by
+        the time left before the workflow deadline. Large outputs are moved
+        to the blob store before the results are saved (offload_outputs).
+        Finished statuses are written with Durability.IMMEDIATE, so a run
+        reported finished survives a crash whatever the storage default.
+
+        If the task running this coroutine is cancelled (run cancellation),
+        the in-flight step and the run are recorded as CANCELLED and the
+        CancelledError is re-raised.
         """
         # This method would contain the logic to execute the workflow.
         # For now, we will just return a placeholder message.
@@ -131,12 +291,22 @@ class WorkflowService:
             logger.error(f"Workflow run {run_id} not found")
             return
 
-        workflow = self.load_workflow(run.workflow_id)
-        if not workflow:
+        if run.status == WorkflowStatus.CANCELLED:
+            logger.info(f"Workflow run {run_id} was cancelled before execution")
+            return
+        if run.status not in (WorkflowStatus.PENDING, WorkflowStatus.RUNNING):
+            # e.g. its trigger was redelivered after a crash
+            logger.info(
+                f"Workflow run {run_id} already finished with status {run.status}"
+            )
+            return
+
+        plan = self.get_plan(run.workflow_id)
+        if not plan:
             logger.error(f"Workflow {run.workflow_id} not found")
             run.status = WorkflowStatus.FAILED
             run.error = f"Workflow {run.workflow_id} not found"
-            self.workflow_run_repository.update_workflow_run(run)
+            self.workflow_run_repository.update_workflow_run(run, Durability.IMMEDIATE)
             return
 
         logger.info(f"Executing workflow run {run_id}")
@@ -144,42 +314,168 @@ class WorkflowService:
         self.workflow_run_repository.update_workflow_run(run)
 
         context = {"payload": run.payload}
+        loop = asyncio.get_running_loop()
+        deadline_at = (
+            loop.time() + plan.workflow.deadline if plan.workflow.deadline else None
+        )
         try:
-            for step in workflow.steps:
-                step_result = await self._execute_step(step, context)
-                run.step_results[step.name] = step_result
-
-                if step_result.status == StepStatus.FAILED:
-                    run.status = WorkflowStatus.FAILED
-                    run.error = step_result.error
-                    run.completed_at = datetime.now().isoformat()
-                    self.workflow_run_repository.update_workflow_run(run)
-                    return
-
-                # Add step output to context for next steps
-                if step_result.output:
-                    context[step.name] = step_result.output
+            failed = await self.run_plan(plan, context, run.step_results, deadline_at)
+            await asyncio.to_thread(self.offload_outputs, run.step_results)
+            if failed is not None:
+                run.status = (
+                    WorkflowStatus.FAILED
+                    if failed.status == StepStatus.FAILED
+                    else WorkflowStatus.TIMED_OUT
+                )
+                run.error = failed.error
+                run.completed_at = datetime.now().isoformat()
+                self.workflow_run_repository.update_workflow_run(
+                    run, Durability.IMMEDIATE
+                )
+                return
 
             # All steps completed successfully
             run.status = WorkflowStatus.SUCCESS
             run.completed_at = datetime.now().isoformat()
-            self.workflow_run_repository.update_workflow_run(run)
+            self.workflow_run_repository.update_workflow_run(run, Durability.IMMEDIATE)
             logger.info(f"Workflow run {run_id} completed successfully")
 
+        except asyncio.CancelledError:
+            logger.info(f"Workflow run {run_id} cancelled")
+            await asyncio.to_thread(self.offload_outputs, run.step_results)
+            self.mark_run_cancelled(run)
+            raise
+
         except Exception as e:
             logger.error(f"Workflow run {run_id} failed: {str(e)}")
+            await asyncio.to_thread(self.offload_outputs, run.step_results)
             run.status = WorkflowStatus.FAILED
             run.error = str(e)
             run.completed_at = datetime.now().isoformat()
-            self.workflow_run_repository.update_workflow_run(run)
+            self.workflow_run_repository.update_workflow_run(run, Durability.IMMEDIATE)
+
+    async def run_plan(
+        self,
+        plan: ExecutionPlan,
+        context: dict[str, Any],
+        step_results: dict[str, StepResult],
+        deadline_at: float | None = None,
+    ) -> StepResult | None:
+        """
+        Execute the steps of a compiled plan sequentially.
+
+        Used for runs and for inline sub-workflows, which pass their own
+        context and result map and get no run record. Steps left out by a
+        switch step's chosen branch are recorded as SKIPPED without running.
+
+        Args:
+            plan (ExecutionPlan): The plan to execute.
+            context (dict[str, Any]): The execution context; step outputs are
+                added to it.
+            step_results (dict[str, StepResult]): Receives the result of each step.
+            deadline_at (float | None): Plan deadline on the event loop clock.
+
+        Returns:
+            StepResult | None: The result of the step that failed or timed out,
+            or None if every step succeeded.
+        """
+        parent = current_scope.get()
+        call_stack = (parent.call_stack if parent else ()) + (plan.workflow_id,)
+        token = current_scope.set(ExecutionScope(engine=self, call_stack=call_stack))
+        compiled = None
+        skipped: set[str] = set()
+        try:
+            for compiled in plan.steps:
+                step = compiled.step
+                if step.name in skipped:
+                    now = datetime.now().isoformat()
+                    step_results[step.name] = StepResult(
+                        step_name=step.name,
+                        status=StepStatus.SKIPPED,
+                        started_at=now,
+                        completed_at=now,
+                    )
+                    continue
+
+                timeout = self._step_timeout(step, deadline_at)
+                step_result = await self._execute_step(
+                    step, context, timeout, connector=compiled.connector
+                )
+                step_results[step.name] = step_result
+
+                if step_result.status in (StepStatus.FAILED, StepStatus.TIMED_OUT):
+                    return step_result
+
+                if isinstance(step_result.output, SwitchOutput):
+                    skipped.difference_update(step_result.output.selected)
+                    skipped.update(step_result.output.skipped)
+
+                # Add step output to context for next steps
+                if step_result.output:
+                    context[step.name] = step_result.output
+            return None
+
+        except asyncio.CancelledError:
+            if compiled is not None and compiled.step.name not in step_results:
+                now = datetime.now().isoformat()
+                step_results[compiled.step.name] = StepResult(
+                    step_name=compiled.step.name,
+                    status=StepStatus.CANCELLED,
+                    started_at=now,
+                    completed_at=now,
+                )
+            raise
+
+        finally:
+            current_scope.reset(token)
+
+    def mark_run_cancelled(self, run: WorkflowRun) -> None:
+        """
+        Record a run as cancelled.
 
-    async def _execute_step(self, step: WorkflowStep, context: dict[str, Any]):
+        Args:
+            run (WorkflowRun): The run to update.
+        """
+        run.status = WorkflowStatus.CANCELLED
+        run.error = "Run cancelled"
+        run.completed_at = datetime.now().isoformat()
+        self.workflow_run_repository.update_workflow_run(run, Durability.IMMEDIATE)
+
+    @staticmethod
+    def _step_timeout(step: WorkflowStep, deadline_at: float | None) -> float | None:
+        """
+        Compute the timeout of a step.
+
+        Args:
+            step (WorkflowStep): The step definition.
+            deadline_at (float | None): Run deadline on the event loop clock.
+
+        Returns:
+            float | None: Seconds the step may take, or None for no limit.
+        """
+        timeout = step.timeout or settings.DEFAULT_STEP_TIMEOUT_SECONDS
+        if deadline_at is not None:
+            remaining = max(deadline_at - asyncio.get_running_loop().time(), 0)
+            timeout = min(timeout, remaining) if timeout else remaining
+        return timeout
+
+    async def _execute_step(
+        self,
+        step: WorkflowStep,
+        context: dict[str, Any],
+        timeout: float | None = None,
+        connector: BaseConnector | None = None,
+    ):
         """
         Execute a single workflow step.
 
         Args:
             step (WorkflowStep): The step definition.
             context (dict[str, Any]): The execution context containing payload and previous step outputs.
+            timeout (float | None): Maximum step duration in seconds; passed down
+                to the connector. On expiry the step is TIMED_OUT.
+            connector (BaseConnector | None): The step's connector, when already
+                resolved by a compiled plan.
 
         Returns:
             StepResult: The result of the step execution.
@@ -192,11 +488,17 @@ class WorkflowService:
         )
         try:
             # Simulate step execution
-            connector = ConnectorFactory.get_instance(step.type)
+            connector = connector or ConnectorFactory.get_instance(step.type)
             logger.info(f"Executing step: {step.name} ({step.type})")
-            result.output = await connector.execute(step, context)
+            async with asyncio.timeout(timeout):
+                result.output = await connector.execute(step, context, timeout=timeout)
             result.status = StepStatus.SUCCESS
             result.completed_at = datetime.now().isoformat()
+        except TimeoutError as e:
+            logger.error(f"Step {step.name} timed out after {timeout}s")
+            result.status = StepStatus.TIMED_OUT
+            result.error = str(e) or f"Step {step.name} timed out after {timeout}s"
+            result.completed_at = datetime.now().isoformat()
         except Exception as e:
             logger.error(f"Step {step.name} failed: {str(e)}")
             result.status = StepStatus.FAILED
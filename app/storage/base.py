@@ -1,13 +1,12 @@
 import uuid
 from abc import ABC
 from abc import abstractmethod
-from typing import Any
+from typing import Generic
 from typing import TypeVar
 
-T = TypeVar("T")
-
+from app.storage.durability import Durability
 
-from typing import Generic
+T = TypeVar("T")
 
 
 class BaseStorage(ABC, Generic[T]):
@@ -46,6 +45,37 @@ class BaseStorage(ABC, Generic[T]):
         """
         ...
 
+    def create_many(self, items: list[T]) -> list[str]:
+        """
+        Create many items and return their UUIDs.
+
+        Backends that can batch writes (e.g. one DB transaction) override this.
+
+        Args:
+            items (list[T]): The items to create.
+
+        Returns:
+            list[str]: The UUIDs of the created items, in order.
+        """
+        return [self.create(item) for item in items]
+
+    def create_missing(self, items: list[T]) -> list[str]:
+        """
+        Create items under the UUIDs they already carry, skipping any that exist.
+
+        Replaying a batch (e.g. scheduler fires retried after a failover)
+        therefore creates each item at most once.
+
+        Args:
+            items (list[T]): The items to create, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the items created by this call, in order.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support create_missing"
+        )
+
     @abstractmethod
     def delete(self, uuid: str) -> bool:
         """
@@ -60,12 +90,15 @@ class BaseStorage(ABC, Generic[T]):
         ...
 
     @abstractmethod
-    def update(self, item: T) -> bool:
+    def update(self, item: T, durability: Durability | None = None) -> bool:
         """
         Update an existing item.
 
         Args:
             item (T): The item to update.
+            durability (Durability | None): When the write must reach the disk,
+                for backends
+                with durability levels (FileStorage); others ignore it.
 
         Returns:
             bool: True if updated, False if not found.
@@ -82,7 +115,9 @@ class BaseStorage(ABC, Generic[T]):
         """
         ...
 
-    def list_paginated(self, limit: int = 50, cursor: str | None = None) -> tuple[list[T], str | None]:
+    def list_paginated(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[T], str | None]:
         """
         List items with cursor-based pagination.
 
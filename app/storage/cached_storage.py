@@ -0,0 +1,305 @@
+"""
+Redis caching around any storage backend.
+
+CachedStorage wraps a BaseStorage and keeps items in Redis under
+"storage:<kind>:<uuid>" with a TTL per kind (STORAGE_CACHE_TTL_SECONDS):
+
+- reads are read-through: a miss loads from the backend and fills the cache;
+- create, update and delete write through to the backend, then refresh or
+  drop the cached copy, so every API and worker process reading through
+  a CachedStorage sees its own writes;
+- bulk creates are not cached (they are filled on first read), and bulk
+  deletes drop the cached copies in one call.
+
+With write_behind (STORAGE_CACHE_WRITE_BEHIND), updates of runs that are
+not finished are cached and queued instead of written: a background
+thread writes the latest queued state of each run every
+STORAGE_CACHE_WRITE_BEHIND_MS. Transitions to a finished status, and
+updates given a durability level, are written through immediately.
+Queued updates are reported as done without checking that the run
+exists; one that turns out to be missing when written is dropped with
+its cached copy. Queued transitions are lost if the process dies, so
+runs recovered after a crash may restart from an earlier step.
+
+Rows written by other services without going through a CachedStorage
+(e.g. the Rust worker) are only picked up when the cached copy expires,
+which is why runs default to a short TTL.
+
+Redis errors fall back to the backend.
+"""
+import atexit
+import logging
+import threading
+import time
+import weakref
+from typing import Any
+from typing import TypeVar
+
+from app.cache.redis_cache import cache_delete
+from app.cache.redis_cache import cache_delete_many
+from app.cache.redis_cache import cache_get
+from app.cache.redis_cache import cache_set
+from app.core.config import settings
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.schedule import WorkflowSchedule
+from app.schemas.workflow import WorkflowDefinition
+from app.storage.base import BaseStorage
+from app.storage.durability import Durability
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CACHE_KINDS: dict[type, str] = {
+    WorkflowDefinition: "workflow",
+    WorkflowRun: "run",
+    WorkflowSchedule: "schedule",
+}
+
+ACTIVE_STATUSES = (WorkflowStatus.PENDING, WorkflowStatus.RUNNING)
+
+# Storages with queued writes, flushed at exit
+_write_behind_storages: "weakref.WeakSet[CachedStorage]" = weakref.WeakSet()
+
+
+@atexit.register
+def flush_all() -> None:
+    """Write the queued updates of every write-behind storage."""
+    for storage in list(_write_behind_storages):
+        storage.flush()
+
+
+class CachedStorage(BaseStorage[T]):
+    """
+    Caching decorator for a storage backend (see the module docstring).
+    """
+
+    def __init__(self, storage: BaseStorage[T], write_behind: bool | None = None):
+        """
+        Wrap a storage.
+
+        Args:
+            storage (BaseStorage[T]): The backend.
+            write_behind (bool | None): Queue updates of active runs (run
+                storage only; defaults to STORAGE_CACHE_WRITE_BEHIND).
+        """
+        super().__init__(storage.t_type)
+        self.storage = storage
+        self.kind = CACHE_KINDS.get(storage.t_type, storage.t_type.__name__.lower())
+        self.ttl = settings.STORAGE_CACHE_TTL_SECONDS.get(self.kind, 60)
+        if write_behind is None:
+            write_behind = settings.STORAGE_CACHE_WRITE_BEHIND
+        self.write_behind = write_behind and storage.t_type == WorkflowRun
+        # Latest queued state of each run, as JSON-ready dicts
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Held while writing to the backend so a queued state never lands
+        # after a newer written-through one
+        self._flush_lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Backend-specific methods
+        if name == "storage":
+            raise AttributeError(name)
+        return getattr(self.storage, name)
+
+    def _key(self, uuid: str) -> str:
+        return f"storage:{self.kind}:{uuid}"
+
+    def _cache(self, item: T) -> dict[str, Any]:
+        data = item.model_dump(mode="json")
+        cache_set(self._key(item.uuid), data, ttl=self.ttl)
+        return data
+
+    def get(self, uuid: str) -> T | None:
+        """
+        Retrieve an item by its UUID, from the cache if possible.
+
+        Args:
+            uuid (str): The UUID of the item.
+
+        Returns:
+            T | None: The item if found, else None.
+        """
+        data = self._pending.get(uuid) if self.write_behind else None
+        if data is None:
+            data = cache_get(self._key(uuid))
+        if data is not None:
+            return self.t_type.model_validate(data)
+        item = self.storage.get(uuid)
+        if item is not None:
+            self._cache(item)
+        return item
+
+    def create(self, item: T) -> str:
+        """
+        Create a new item and cache it.
+
+        Args:
+            item (T): The item to create.
+
+        Returns:
+            str: The UUID of the created item.
+        """
+        uuid = self.storage.create(item)
+        if uuid:
+            self._cache(item)
+        return uuid
+
+    def create_many(self, items: list[T]) -> list[str]:
+        """
+        Create many items (cached on first read).
+
+        Args:
+            items (list[T]): The items to create.
+
+        Returns:
+            list[str]: The UUIDs of the created items, in order.
+        """
+        return self.storage.create_many(items)
+
+    def create_missing(self, items: list[T]) -> list[str]:
+        """
+        Create the items not stored yet, under their preset UUIDs.
+
+        Created items are cached on first read.
+
+        Args:
+            items (list[T]): The items to create, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the items created by this call, in order.
+        """
+        return self.storage.create_missing(items)
+
+    def delete(self, uuid: str) -> bool:
+        """
+        Delete an item and its cached copy.
+
+        Args:
+            uuid (str): The UUID of the item to delete.
+
+        Returns:
+            bool: True if deleted, False if not found.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._pending.pop(uuid, None)
+            deleted = self.storage.delete(uuid)
+        cache_delete(self._key(uuid))
+        return deleted
+
+    def delete_many(self, uuids: list[str]) -> int:
+        """
+        Delete items and their cached copies.
+
+        Args:
+            uuids (list[str]): The UUIDs of the items to delete.
+
+        Returns:
+            int: Number of items deleted.
+        """
+        with self._flush_lock:
+            with self._lock:
+                for uuid in uuids:
+                    self._pending.pop(uuid, None)
+            deleted = self.storage.delete_many(uuids)
+        cache_delete_many([self._key(uuid) for uuid in uuids])
+        return deleted
+
+    def update(self, item: T, durability: Durability | None = None) -> bool:
+        """
+        Update an item, writing it through (or queueing it, see write_behind).
+
+        Args:
+            item (T): The item to update.
+            durability (Durability | None): Durability of the backend write;
+                an update with a durability level is never queued.
+
+        Returns:
+            bool: True if updated, False if not found.
+        """
+        if self.write_behind and durability is None:
+            if item.status in ACTIVE_STATUSES:
+                self._queue(item)
+                return True
+            with self._flush_lock:
+                with self._lock:
+                    self._pending.pop(item.uuid, None)
+                updated = self.storage.update(item)
+        else:
+            with self._flush_lock:
+                with self._lock:
+                    self._pending.pop(item.uuid, None)
+                updated = self.storage.update(item, durability)
+        if updated:
+            self._cache(item)
+        else:
+            cache_delete(self._key(item.uuid))
+        return updated
+
+    def _queue(self, item: T) -> None:
+        data = self._cache(item)
+        with self._lock:
+            self._pending[item.uuid] = data
+            if self._flusher is None:
+                _write_behind_storages.add(self)
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="storage-write-behind", daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(settings.STORAGE_CACHE_WRITE_BEHIND_MS / 1000)
+            with self._lock:
+                if not self._pending:
+                    self._flusher = None
+                    return
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the queued run updates to the backend."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for uuid, data in pending.items():
+                try:
+                    if not self.storage.update(self.t_type.model_validate(data)):
+                        logger.warning(f"Dropped write-behind update of missing {uuid}")
+                        cache_delete(self._key(uuid))
+                except Exception as e:
+                    logger.error(
+                        f"Write-behind update of {self.kind} {uuid} failed: {e}"
+                    )
+
+    def list_all(self) -> list[T]:
+        """
+        List all items from the backend (after writing queued updates).
+
+        Returns:
+            list[T]: A list of all items.
+        """
+        if self._pending:
+            self.flush()
+        return self.storage.list_all()
+
+    def list_paginated(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[T], str | None]:
+        """
+        List items from the backend (after writing queued updates).
+
+        Args:
+            limit: Maximum number of items to return.
+            cursor: Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of items, next_cursor or None).
+        """
+        if self._pending:
+            self.flush()
+        return self.storage.list_paginated(limit=limit, cursor=cursor)
@@ -1,16 +1,41 @@
-from typing import Generic
+from datetime import datetime
+from datetime import timezone
 from typing import TypeVar
 
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
 from app.db.models.run import WorkflowRunModel
+from app.db.models.schedule import WorkflowScheduleModel
+from app.db.models.step_result import WorkflowStepResultModel
 from app.db.models.workflow import WorkflowDefinitionModel
 from app.db.session import SessionLocal
 from app.schemas.run import WorkflowRun
+from app.schemas.schedule import WorkflowSchedule
+from app.schemas.workflow import StepResult
 from app.schemas.workflow import WorkflowDefinition
 from app.storage.base import BaseStorage
+from app.storage.durability import Durability
 
 T = TypeVar("T")
 
+
 class DBStorage(BaseStorage[T]):
+    """
+    PostgreSQL storage.
+
+    Run step results are stored apart from the run row, in the append-only
+    workflow_step_results table: writes insert rows for new or changed
+    step results, and reads assemble each run's latest result per step
+    over any results still embedded in workflow_runs.step_results.
+    Step result rows carry their run's created_at, so they live in the
+    partition of the same period as the run and lookups by run prune to it.
+    Updates lock the run row before numbering new attempts, so concurrent
+    updates of a run cannot write the same attempt twice (which the
+    table's unique constraint would reject).
+    """
+
     def __init__(self, t_type: type[T]):
         """
         Initialize the DB storage.
@@ -19,13 +44,98 @@ class DBStorage(BaseStorage[T]):
             t_type (type[T]): The type of the item to store.
         """
         super().__init__(t_type)
+        self.has_step_results = t_type == WorkflowRun
         if t_type == WorkflowDefinition:
             self.model = WorkflowDefinitionModel
         elif t_type == WorkflowRun:
             self.model = WorkflowRunModel
+        elif t_type == WorkflowSchedule:
+            self.model = WorkflowScheduleModel
         else:
             raise ValueError(f"Unknown type: {t_type}")
 
+    def _row(self, item: T, new: bool = False) -> dict:
+        """
+        Column values of an item.
+
+        Step results are stored separately: new runs get an empty
+        step_results column and their creation time (copied onto their
+        step result rows), and updates leave both as they are.
+        """
+        if not self.has_step_results:
+            return item.model_dump()
+        row = item.model_dump(exclude={"step_results"})
+        if new:
+            row["step_results"] = {}
+            row["created_at"] = datetime.now(timezone.utc)
+        return row
+
+    def _to_items(self, db: Session, rows: list) -> list[T]:
+        """Convert rows to items, attaching step results in one query."""
+        items = [self.t_type.model_validate(row, from_attributes=True) for row in rows]
+        if not self.has_step_results or not items:
+            return items
+        results = (
+            db.query(WorkflowStepResultModel)
+            .filter(
+                WorkflowStepResultModel.run_uuid.in_([item.uuid for item in items]),
+                WorkflowStepResultModel.created_at.in_(
+                    list({row.created_at for row in rows})
+                ),
+            )
+            .order_by(WorkflowStepResultModel.id)
+            .all()
+        )
+        by_uuid = {item.uuid: item for item in items}
+        for result in results:
+            by_uuid[result.run_uuid].step_results[
+                result.step_name
+            ] = StepResult.model_validate(result, from_attributes=True)
+        return items
+
+    def _append_step_results(self, db: Session, item: T, created_at: datetime) -> None:
+        """
+        Insert rows for step results that differ from the latest stored ones.
+
+        Args:
+            db (Session): The session.
+            item (T): The run.
+            created_at (datetime): The run's creation time, copied onto the rows.
+        """
+        if not self.has_step_results or not item.step_results:
+            return
+        stored = (
+            db.query(
+                WorkflowStepResultModel.step_name,
+                WorkflowStepResultModel.attempt,
+                WorkflowStepResultModel.status,
+                WorkflowStepResultModel.started_at,
+                WorkflowStepResultModel.completed_at,
+            )
+            .filter(
+                WorkflowStepResultModel.run_uuid == item.uuid,
+                WorkflowStepResultModel.created_at == created_at,
+            )
+            .order_by(WorkflowStepResultModel.id)
+            .all()
+        )
+        latest = {row.step_name: row for row in stored}
+        for name, result in item.step_results.items():
+            previous = latest.get(name)
+            if previous is not None and (
+                (previous.status, previous.started_at, previous.completed_at)
+                == (result.status, result.started_at, result.completed_at)
+            ):
+                continue
+            db.add(
+                WorkflowStepResultModel(
+                    run_uuid=item.uuid,
+                    attempt=previous.attempt + 1 if previous is not None else 1,
+                    created_at=created_at,
+                    **result.model_dump(),
+                )
+            )
+
     def get(self, uuid: str) -> T | None:
         """
         Retrieve an item by its UUID.
@@ -41,7 +151,7 @@ class DBStorage(BaseStorage[T]):
             item = db.query(self.model).filter(self.model.uuid == uuid).first()
             if not item:
                 return None
-            return self.t_type.model_validate(item, from_attributes=True)
+            return self._to_items(db, [item])[0]
         finally:
             db.close()
 
@@ -58,8 +168,9 @@ class DBStorage(BaseStorage[T]):
         item.uuid = self.generate_uuid()
         try:
             db = SessionLocal()
-            db_item = self.model(**item.model_dump())
+            db_item = self.model(**self._row(item, new=True))
             db.add(db_item)
+            self._append_step_results(db, item, db_item.created_at)
             db.commit()
             db.refresh(db_item)
             return item.uuid
@@ -70,6 +181,75 @@ class DBStorage(BaseStorage[T]):
         finally:
             db.close()
 
+    def create_many(self, items: list[T]) -> list[str]:
+        """
+        Create many items in a single transaction.
+
+        Args:
+            items (list[T]): The items to create.
+
+        Returns:
+            list[str]: The UUIDs of the created items, in order.
+        """
+        if not items:
+            return []
+        for item in items:
+            item.uuid = self.generate_uuid()
+        try:
+            db = SessionLocal()
+            db_items = [self.model(**self._row(item, new=True)) for item in items]
+            db.add_all(db_items)
+            for item, db_item in zip(items, db_items):
+                self._append_step_results(db, item, db_item.created_at)
+            db.commit()
+            return [item.uuid for item in items]
+        except Exception as e:
+            print(f"Error creating items: {e}")
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+
+    def create_missing(self, items: list[T]) -> list[str]:
+        """
+        Create items under their preset UUIDs, skipping those already stored.
+
+        The existence check and the insert run in one transaction under an
+        advisory lock per table, so concurrent callers cannot both insert
+        an item.
+
+        Args:
+            items (list[T]): The items to create, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the items created by this call, in order.
+        """
+        if not items:
+            return []
+        try:
+            db = SessionLocal()
+            db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:table))"),
+                {"table": self.model.__tablename__},
+            )
+            uuids = [item.uuid for item in items]
+            existing = set(
+                db.scalars(select(self.model.uuid).where(self.model.uuid.in_(uuids)))
+            )
+            created = [item for item in items if item.uuid not in existing]
+            db_items = [self.model(**self._row(item, new=True)) for item in created]
+            db.add_all(db_items)
+            for item, db_item in zip(created, db_items):
+                self._append_step_results(db, item, db_item.created_at)
+            db.commit()
+            return [item.uuid for item in created]
+        except Exception as e:
+            print(f"Error creating items: {e}")
+            db.rollback()
+            raise e
+        finally:
+            db.close()
+
     def delete(self, uuid: str) -> bool:
         """
         Delete an item by its UUID.
@@ -86,6 +266,11 @@ class DBStorage(BaseStorage[T]):
             if not item:
                 return False
             db.delete(item)
+            if self.has_step_results:
+                db.query(WorkflowStepResultModel).filter(
+                    WorkflowStepResultModel.run_uuid == uuid,
+                    WorkflowStepResultModel.created_at == item.created_at,
+                ).delete()
             db.commit()
             return True
         except Exception as e:
@@ -95,23 +280,29 @@ class DBStorage(BaseStorage[T]):
         finally:
             db.close()
 
-    def update(self, item: T) -> bool:
+    def update(self, item: T, durability: Durability | None = None) -> bool:
         """
         Update an existing item.
 
         Args:
             item (T): The item to update.
+            durability (Durability | None): Unused: every write is committed
+                before it returns.
 
         Returns:
             bool: True if updated, False if not found.
         """
         try:
             db = SessionLocal()
-            db_item = db.query(self.model).filter(self.model.uuid == item.uuid).first()
+            query = db.query(self.model).filter(self.model.uuid == item.uuid)
+            if self.has_step_results:
+                query = query.with_for_update()
+            db_item = query.first()
             if not db_item:
                 return False
-            for key, value in item.model_dump().items():
+            for key, value in self._row(item).items():
                 setattr(db_item, key, value)
+            self._append_step_results(db, item, db_item.created_at)
             db.commit()
             return True
         except Exception as e:
@@ -131,11 +322,13 @@ class DBStorage(BaseStorage[T]):
         try:
             db = SessionLocal()
             items = db.query(self.model).all()
-            return [self.t_type.model_validate(item, from_attributes=True) for item in items]
+            return self._to_items(db, items)
         finally:
             db.close()
 
-    def list_paginated(self, limit: int = 50, cursor: str | None = None) -> tuple[list[T], str | None]:
+    def list_paginated(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[T], str | None]:
         """
         List items with cursor-based pagination, ordered by uuid.
 
@@ -157,9 +350,38 @@ class DBStorage(BaseStorage[T]):
             items = items[:limit]
             next_cursor = items[-1].uuid if has_more and items else None
 
-            return (
-                [self.t_type.model_validate(item, from_attributes=True) for item in items],
-                next_cursor,
+            return self._to_items(db, items), next_cursor
+        finally:
+            db.close()
+
+    def delete_many(self, uuids: list[str]) -> int:
+        """
+        Delete items (and run step results) in one transaction.
+
+        Args:
+            uuids (list[str]): The UUIDs of the items to delete.
+
+        Returns:
+            int: Number of items deleted.
+        """
+        if not uuids:
+            return 0
+        try:
+            db = SessionLocal()
+            deleted = (
+                db.query(self.model)
+                .filter(self.model.uuid.in_(uuids))
+                .delete(synchronize_session=False)
             )
+            if self.has_step_results:
+                db.query(WorkflowStepResultModel).filter(
+                    WorkflowStepResultModel.run_uuid.in_(uuids)
+                ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception as e:
+            print(f"Error deleting items: {e}")
+            db.rollback()
+            raise e
         finally:
             db.close()
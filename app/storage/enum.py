@@ -9,4 +9,5 @@ class StorageType(str, Enum):
     FILE_SYSTEM = "file_system"
     IN_MEMORY = "in_memory"
     POSTGRES = "postgres"
+    SQLITE = "sqlite"
     # Add more storage types as needed
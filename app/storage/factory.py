@@ -1,7 +1,11 @@
+from app.core.config import settings
+from app.storage.base import BaseStorage
+from app.storage.cached_storage import CachedStorage
 from app.storage.db_storage import DBStorage
 from app.storage.enum import StorageType
 from app.storage.file_storage import FileStorage
 from app.storage.in_memory import InMemoryStorage
+from app.storage.sqlite_storage import SQLiteStorage
 
 
 class StorageFactory:
@@ -17,5 +21,26 @@ class StorageFactory:
             return InMemoryStorage
         elif storage_type == StorageType.POSTGRES:
             return DBStorage
+        elif storage_type == StorageType.SQLITE:
+            return SQLiteStorage
         else:
             raise ValueError(f"Unknown storage type: {storage_type}")
+
+    @staticmethod
+    def create(storage_type: StorageType, t_type: type) -> BaseStorage:
+        """
+        Create a storage for an item type.
+
+        Backends listed in STORAGE_CACHE_BACKENDS are wrapped in a CachedStorage.
+
+        Args:
+            storage_type (StorageType): The backend.
+            t_type (type): The type of the item to store.
+
+        Returns:
+            BaseStorage: The storage.
+        """
+        storage = StorageFactory.create_storage(storage_type)[t_type](t_type=t_type)
+        if storage_type.value in settings.STORAGE_CACHE_BACKENDS:
+            return CachedStorage(storage)
+        return storage
@@ -1,27 +1,83 @@
+import atexit
 import json
-import os
+import logging
+import threading
 import uuid
 from pathlib import Path
-from typing import Generic
 from typing import TypeVar
 
+from app.core.config import settings
 from app.storage.base import BaseStorage
+from app.storage.durability import Durability
+from app.storage.log_store import LogStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# One log store per directory, shared by every FileStorage of the process
+_stores: dict[Path, LogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _open_store(path: Path) -> LogStore:
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = LogStore(path)
+            _import_legacy_files(store)
+        return store
+
+
+def _import_legacy_files(store: LogStore) -> None:
+    """Move items saved as one JSON file each (the previous layout) into the log."""
+    files = [file for file in store.path.glob("*.json") if file.is_file()]
+    if not files:
+        return
+    store.put_many(
+        [
+            (file.stem, json.dumps(json.loads(file.read_bytes())).encode())
+            for file in files
+        ]
+    )
+    store.save_index()
+    for file in files:
+        file.unlink()
+    logger.info(f"Imported {len(files)} items into {store.path}")
+
+
+@atexit.register
+def close_stores() -> None:
+    """Close all open log stores, saving their indexes."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
 
 class FileStorage(BaseStorage[T]):
-    def __init__(self, t_type: type[T]):
+    def __init__(self, t_type: type[T], durability: Durability | None = None):
         """
         Initialize the file storage.
 
+        Items are kept in a log-structured store (see app.storage.log_store)
+        under FILE_STORAGE_PATH/<type>s, shared by all instances for the type.
+
         Args:
             t_type (type[T]): The type of the item to store.
+            durability (Durability | None): Durability of this instance's
+                writes (defaults to FILE_STORAGE_DURABILITY).
         """
         super().__init__(t_type)
-        base_path = "data"
-        self.base_path = Path(base_path) / f"{t_type.__name__.lower()}s"
-        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.durability = durability
+        self.base_path = (
+            Path(settings.FILE_STORAGE_PATH) / f"{t_type.__name__.lower()}s"
+        )
+        self.store = _open_store(self.base_path)
+
+    def _load(self, data: bytes) -> T:
+        return self.t_type.model_validate_json(data)
 
     def get(self, uuid: str) -> T | None:
         """
@@ -34,14 +90,8 @@ class FileStorage(BaseStorage[T]):
             T | None: The item if found, else None.
         """
         try:
-            file_path = self.base_path / f"{uuid}.json"
-            if not file_path.exists():
-                return None
-            with open(file_path, "r") as file:
-                data = json.load(file)
-            return self.t_type(**data)
-        except FileNotFoundError:
-            return None
+            data = self.store.get(uuid)
+            return None if data is None else self._load(data)
         except Exception as e:
             print(f"Error retrieving item {uuid}: {e}")
             return None
@@ -58,15 +108,55 @@ class FileStorage(BaseStorage[T]):
         """
         item.uuid = uuid.uuid4().hex
         try:
-            file_path = self.base_path / f"{item.uuid}.json"
-            print(f"Saving workflow to {file_path=}")
-            with open(file_path, "w") as file:
-                json.dump(item.model_dump(), file, indent=2)
+            self.store.put(item.uuid, item.model_dump_json().encode(), self.durability)
             return item.uuid
         except Exception as e:
             print(f"Error creating item: {e}")
             return ""
 
+    def create_many(self, items: list[T]) -> list[str]:
+        """
+        Create several items with one append.
+
+        Args:
+            items (list[T]): The items to create.
+
+        Returns:
+            list[str]: The UUIDs of the created items, in order.
+        """
+        for item in items:
+            item.uuid = self.generate_uuid()
+        try:
+            self.store.put_many(
+                [(item.uuid, item.model_dump_json().encode()) for item in items],
+                self.durability,
+            )
+            return [item.uuid for item in items]
+        except Exception as e:
+            print(f"Error creating items: {e}")
+            raise e
+
+    def create_missing(self, items: list[T]) -> list[str]:
+        """
+        Create items under their preset UUIDs, skipping those already stored.
+
+        The check and the append run under the log store's lock.
+
+        Args:
+            items (list[T]): The items to create, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the items created by this call, in order.
+        """
+        try:
+            return self.store.put_missing(
+                [(item.uuid, item.model_dump_json().encode()) for item in items],
+                self.durability,
+            )
+        except Exception as e:
+            print(f"Error creating items: {e}")
+            raise e
+
     def delete(self, uuid: str) -> bool:
         """
         Delete an item by its UUID.
@@ -78,31 +168,31 @@ class FileStorage(BaseStorage[T]):
             bool: True if deleted, False if not found.
         """
         try:
-            file_path = self.base_path / f"{uuid}.json"
-            if not self.get(uuid):
-                return False
-            os.remove(file_path)
-            return True
+            return self.store.delete(uuid, self.durability)
         except Exception as e:
             print(f"Error deleting item {uuid}: {e}")
             return False
 
-    def update(self, item: T) -> bool:
+    def update(self, item: T, durability: Durability | None = None) -> bool:
         """
         Update an existing item.
 
         Args:
             item (T): The item to update.
+            durability (Durability | None): Durability of this write (defaults to
+                the instance's, then FILE_STORAGE_DURABILITY).
 
         Returns:
             bool: True if updated, False if not found.
         """
         try:
-            if not self.get(item.uuid):
+            if item.uuid not in self.store:
                 return False
-            file_path = self.base_path / f"{item.uuid}.json"
-            with open(file_path, "w") as file:
-                json.dump(item.model_dump(), file)
+            self.store.put(
+                item.uuid,
+                item.model_dump_json().encode(),
+                durability or self.durability,
+            )
             return True
         except Exception as e:
             print(f"Error updating item {item.uuid}: {e}")
@@ -113,18 +203,10 @@ class FileStorage(BaseStorage[T]):
         List all items in storage.
 
         Returns:
-            list[T]: A list of all items.
+            list[T]: A list of all items, oldest first.
         """
         try:
-            # Read all JSON files in the directory
-            items = []
-            for file in self.base_path.glob("*.json"):
-                if file.is_file():
-                    item = self.get(file.stem)
-                    if item:
-                        items.append(item)
-            return items
-
+            return [self._load(data) for data in self.store.values()]
         except Exception as e:
             print(f"Error listing items: {e}")
             return []
@@ -1,22 +1,145 @@
+import atexit
+import bisect
+import logging
+import threading
+import time
 import uuid
-from typing import Generic
+import weakref
+from collections import OrderedDict
+from pathlib import Path
 from typing import TypeVar
 
+from app.core.config import settings
 from app.storage.base import BaseStorage
+from app.storage.durability import atomic_write
+from app.storage.durability import Durability
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Storage saved to each snapshot file at exit: the latest one created for it
+_snapshot_storages: "weakref.WeakValueDictionary[Path, InMemoryStorage]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+@atexit.register
+def snapshot_all() -> None:
+    """Write the snapshot of every storage with a snapshot file."""
+    for storage in list(_snapshot_storages.values()):
+        storage.snapshot()
+
 
 class InMemoryStorage(BaseStorage[T]):
-    def __init__(self, t_type: type[T]):
+    """
+    In-memory storage, optionally bounded.
+
+    Items are listed and paginated in insertion order: each item gets a
+    sequence number, kept in a sorted list, so a page is one bisect and a
+    slice. Removed items leave their number in the list until removed
+    ones make up half of it, when it is compacted. With a size limit
+    (entries or serialized bytes), the least recently used items are
+    evicted; with a TTL, items expire that long after their last write.
+    An optional snapshot file (JSON lines) is loaded on startup and
+    written on exit (by the storage created last for that file) or by
+    snapshot().
+
+    All access goes through a lock, so the storage can be shared with
+    threads the event loop hands work to (asyncio.to_thread).
+    """
+
+    def __init__(
+        self,
+        t_type: type[T],
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        snapshot_path: str | None = None,
+    ):
         """
         Initialize the in-memory storage.
 
+        Limits default to the IN_MEMORY_STORAGE_* settings (None = unbounded).
+
         Args:
             t_type (type[T]): The type of the item to store.
+            max_entries (int | None): Maximum number of items.
+            max_bytes (int | None): Maximum total size of the items, serialized as JSON.
+            ttl_seconds (float | None): Lifetime of an item after its last write.
+            snapshot_path (str | None): Directory of the snapshot file.
         """
         super().__init__(t_type)
-        self.storage: dict[str, T] = {}
+        self.max_entries = max_entries or settings.IN_MEMORY_STORAGE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.IN_MEMORY_STORAGE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds or settings.IN_MEMORY_STORAGE_TTL_SECONDS
+        # Items in recency order, least recently used first
+        self.storage: OrderedDict[str, T] = OrderedDict()
+        self._seqs: dict[str, int] = {}
+        self._uuids: dict[int, str] = {}
+        # Sequence numbers in order, including those of removed items
+        self._order: list[int] = []
+        self._removed = 0
+        self._next_seq = 0
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        # Expiry times in write order, oldest first
+        self._expires: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.RLock()
+
+        snapshot_path = snapshot_path or settings.IN_MEMORY_STORAGE_SNAPSHOT_PATH
+        self.snapshot_file = None
+        if snapshot_path:
+            self.snapshot_file = (
+                Path(snapshot_path) / f"{t_type.__name__.lower()}s.jsonl"
+            )
+            self._load_snapshot()
+            _snapshot_storages[self.snapshot_file] = self
+
+    def _put(self, item: T, new: bool) -> None:
+        self.storage[item.uuid] = item
+        self.storage.move_to_end(item.uuid)
+        if new:
+            self._seqs[item.uuid] = self._next_seq
+            self._uuids[self._next_seq] = item.uuid
+            self._order.append(self._next_seq)
+            self._next_seq += 1
+        if self.max_bytes:
+            size = len(item.model_dump_json())
+            self._bytes += size - self._sizes.get(item.uuid, 0)
+            self._sizes[item.uuid] = size
+        if self.ttl_seconds:
+            self._expires[item.uuid] = time.monotonic() + self.ttl_seconds
+            self._expires.move_to_end(item.uuid)
+        self._evict()
+
+    def _remove(self, uuid: str) -> None:
+        del self.storage[uuid]
+        del self._uuids[self._seqs.pop(uuid)]
+        self._removed += 1
+        if self._removed * 2 >= len(self._order):
+            self._order = [seq for seq in self._order if seq in self._uuids]
+            self._removed = 0
+        self._bytes -= self._sizes.pop(uuid, 0)
+        self._expires.pop(uuid, None)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._expires:
+            uuid, expires_at = next(iter(self._expires.items()))
+            if expires_at > now:
+                break
+            self._remove(uuid)
+
+    def _evict(self) -> None:
+        self._expire()
+        # The most recent item is kept even if it alone exceeds max_bytes
+        while len(self.storage) > 1 and (
+            (self.max_entries and len(self.storage) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self.storage)))
 
     def get(self, uuid: str) -> T | None:
         """
@@ -28,8 +151,12 @@ class InMemoryStorage(BaseStorage[T]):
         Returns:
             T | None: The item if found, else None.
         """
-        item = self.storage.get(uuid)
-        return item
+        with self._lock:
+            self._expire()
+            item = self.storage.get(uuid)
+            if item is not None:
+                self.storage.move_to_end(uuid)
+            return item
 
     def create(self, item: T) -> str:
         """
@@ -43,9 +170,29 @@ class InMemoryStorage(BaseStorage[T]):
         """
         # create a uuid
         item.uuid = uuid.uuid4().hex
-        self.storage[item.uuid] = item
+        with self._lock:
+            self._put(item, new=True)
         return item.uuid
 
+    def create_missing(self, items: list[T]) -> list[str]:
+        """
+        Create items under their preset UUIDs, skipping those already stored.
+
+        Args:
+            items (list[T]): The items to create, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the items created by this call, in order.
+        """
+        created = []
+        with self._lock:
+            self._expire()
+            for item in items:
+                if item.uuid not in self.storage:
+                    self._put(item, new=True)
+                    created.append(item.uuid)
+        return created
+
     def delete(self, uuid: str) -> bool:
         """
         Delete an item by its UUID.
@@ -56,31 +203,97 @@ class InMemoryStorage(BaseStorage[T]):
         Returns:
             bool: True if deleted, False if not found.
         """
-        if uuid in self.storage:
-            del self.storage[uuid]
-            return True
-        return False
+        with self._lock:
+            self._expire()
+            if uuid in self.storage:
+                self._remove(uuid)
+                return True
+            return False
 
-    def update(self, item: T) -> bool:
+    def update(self, item: T, durability: Durability | None = None) -> bool:
         """
         Update an existing item.
 
         Args:
             item (T): The item to update.
+            durability (Durability | None): Unused: items are kept in memory.
 
         Returns:
             bool: True if updated, False if not found.
         """
-        if item.uuid in self.storage:
-            self.storage[item.uuid] = item
-            return True
-        return False
+        with self._lock:
+            self._expire()
+            if item.uuid in self.storage:
+                self._put(item, new=False)
+                return True
+            return False
 
     def list_all(self) -> list[T]:
         """
         List all items in storage.
 
         Returns:
-            list[T]: A list of all items.
+            list[T]: A list of all items, in insertion order.
+        """
+        with self._lock:
+            self._expire()
+            return [
+                self.storage[self._uuids[seq]]
+                for seq in self._order
+                if seq in self._uuids
+            ]
+
+    def list_paginated(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[T], str | None]:
+        """
+        List items with cursor-based pagination, in insertion order.
+
+        Args:
+            limit: Maximum number of items to return.
+            cursor: Cursor returned with the previous page.
+
+        Returns:
+            tuple: (list of items, next_cursor or None if no more items).
+
+        Raises:
+            ValueError: If the cursor was not returned by this storage.
         """
-        return list(self.storage.values())
+        if cursor and not cursor.isdigit():
+            raise ValueError(f"Invalid cursor: {cursor}")
+        with self._lock:
+            self._expire()
+            seqs = []
+            for index in range(
+                bisect.bisect_right(self._order, int(cursor)) if cursor else 0,
+                len(self._order),
+            ):
+                if len(seqs) > limit:
+                    break
+                if self._order[index] in self._uuids:
+                    seqs.append(self._order[index])
+            next_cursor = (
+                str(seqs[limit - 1]) if len(seqs) > limit and limit > 0 else None
+            )
+            return [self.storage[self._uuids[seq]] for seq in seqs[:limit]], next_cursor
+
+    def _load_snapshot(self) -> None:
+        try:
+            lines = self.snapshot_file.read_bytes().splitlines()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            for line in lines:
+                self._put(self.t_type.model_validate_json(line), new=True)
+        logger.info(f"Loaded {len(self.storage)} items from {self.snapshot_file}")
+
+    def snapshot(self) -> None:
+        """Write all items to the snapshot file, replacing it atomically."""
+        if self.snapshot_file is None:
+            return
+        items = self.list_all()
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(
+            self.snapshot_file,
+            b"".join(item.model_dump_json().encode() + b"\n" for item in items),
+        )
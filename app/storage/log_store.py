@@ -0,0 +1,461 @@
+"""
+Log-structured key-value store backing FileStorage.
+
+Writes append records to the active segment file (segment-NNNNNN.log);
+an in-memory hash index maps each key to the location of its latest
+value, so reads are one positioned read. Segments roll over at
+FILE_STORAGE_SEGMENT_BYTES.
+
+Record layout (little-endian):
+
+    crc32 (I) | key length (H) | value length (I) | op (B) | key | value
+
+where op is PUT or DELETE and the CRC covers everything after itself. A
+torn record at the end of the log (crash mid-append) fails the check and
+is truncated on open.
+
+The index is saved to a compact binary file (index.bin) together with
+the log position it covers. Opening loads it and replays only the log
+written after that position. Appends go through a GroupCommitWriter:
+each write has a Durability level (FILE_STORAGE_DURABILITY by default),
+and a background thread syncs BATCHED writes every
+FILE_STORAGE_GROUP_COMMIT_MS and compacts sealed segments once more than
+FILE_STORAGE_COMPACT_DEAD_RATIO of the log is overwritten or deleted
+data.
+
+Compaction copies the live records of all sealed segments into
+segment-<last sealed>.merged, then deletes the sealed segments and
+renames the merged file into place. An interrupted compaction is
+completed on the next open.
+
+A store is opened by one process at a time: opening takes an exclusive
+lock on its LOCK file, held until close() (or the process exits), and
+fails while another process holds it.
+"""
+import fcntl
+import logging
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterator
+from typing import NamedTuple
+
+from app.core.config import settings
+from app.storage.durability import atomic_write
+from app.storage.durability import Durability
+from app.storage.durability import fsync_dir
+from app.storage.durability import GroupCommitWriter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<IHIB")
+_INDEX_HEADER = struct.Struct("<IQQ")
+_INDEX_ENTRY = struct.Struct("<HIQI")
+
+PUT = 1
+DELETE = 2
+
+INDEX_FILE = "index.bin"
+LOCK_FILE = "LOCK"
+
+
+class Location(NamedTuple):
+    """Location of a value in the log."""
+
+    segment: int
+    offset: int
+    length: int
+
+
+def _segment_name(segment: int, suffix: str = ".log") -> str:
+    return f"segment-{segment:06d}{suffix}"
+
+
+def _record_size(key: str, length: int) -> int:
+    """Size in the log of a record with this key and value length."""
+    return _HEADER.size + len(key.encode()) + length
+
+
+def _encode(op: int, key: str, value: bytes) -> bytes:
+    key_bytes = key.encode()
+    body = _HEADER.pack(0, len(key_bytes), len(value), op)[4:] + key_bytes + value
+    return struct.pack("<I", zlib.crc32(body)) + body
+
+
+class LogStore:
+    """
+    Append-only segmented key-value store with an in-memory index.
+    """
+
+    def __init__(self, path: str | Path, durability: Durability | None = None):
+        """
+        Open (or create) a store, recovering its index.
+
+        Args:
+            path (str | Path): Directory of the store.
+            durability (Durability | None): Default durability of writes
+                (defaults to FILE_STORAGE_DURABILITY).
+
+        Raises:
+            RuntimeError: If the store is open in another process.
+        """
+        self.path = Path(path)
+        self.durability = durability or Durability(settings.FILE_STORAGE_DURABILITY)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.path / LOCK_FILE, os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            raise RuntimeError(
+                f"Log store {self.path} is already open in another process"
+            )
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._index: dict[str, Location] = {}
+        self._readers: dict[int, int] = {}
+        # Sizes of the log and of its live records (header, key and value)
+        self._total_bytes = 0
+        self._live_bytes = 0
+        self._closed = False
+
+        self._finish_compaction()
+        segments = self._segment_ids()
+        covered = self._load_index()
+        for segment in segments:
+            if covered is None or segment >= covered[0]:
+                start = (
+                    covered[1] if covered is not None and segment == covered[0] else 0
+                )
+                self._replay(segment, start)
+            self._total_bytes += (self.path / _segment_name(segment)).stat().st_size
+
+        self._active = segments[-1] if segments else 1
+        self._writer = GroupCommitWriter(self._open_segment(self._active))
+        self._active_size = os.fstat(self._writer.fd).st_size
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._background, name=f"log-store-{self.path.name}", daemon=True
+        )
+        self._thread.start()
+
+    # Recovery
+
+    def _segment_ids(self) -> list[int]:
+        return sorted(
+            int(p.stem.split("-")[1]) for p in self.path.glob("segment-*.log")
+        )
+
+    def _open_segment(self, segment: int) -> int:
+        fd = os.open(
+            self.path / _segment_name(segment), os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        )
+        fsync_dir(self.path)
+        return fd
+
+    def _finish_compaction(self) -> None:
+        """Complete a compaction interrupted after its merged file was synced."""
+        for merged in self.path.glob("segment-*.merged"):
+            last = int(merged.stem.split("-")[1])
+            for segment in self._segment_ids():
+                if segment <= last:
+                    (self.path / _segment_name(segment)).unlink()
+            os.replace(merged, self.path / _segment_name(last))
+            (self.path / INDEX_FILE).unlink(missing_ok=True)
+            logger.info(
+                f"Completed interrupted compaction of {self.path} up to segment {last}"
+            )
+        for tmp in self.path.glob("*.tmp"):
+            tmp.unlink()
+
+    def _load_index(self) -> tuple[int, int] | None:
+        """Load the saved index; returns the log position it covers."""
+        try:
+            data = (self.path / INDEX_FILE).read_bytes()
+        except FileNotFoundError:
+            return None
+        count, segment, offset = _INDEX_HEADER.unpack_from(data)
+        position = _INDEX_HEADER.size
+        for _ in range(count):
+            key_length, entry_segment, entry_offset, length = _INDEX_ENTRY.unpack_from(
+                data, position
+            )
+            position += _INDEX_ENTRY.size
+            key = data[position : position + key_length].decode()
+            position += key_length
+            self._index[key] = Location(entry_segment, entry_offset, length)
+            self._live_bytes += _HEADER.size + key_length + length
+        return segment, offset
+
+    def _replay(self, segment: int, start: int) -> None:
+        """Apply the records of a segment from an offset, truncating a torn tail."""
+        path = self.path / _segment_name(segment)
+        with open(path, "rb") as file:
+            file.seek(start)
+            data = file.read()
+        position = 0
+        while position + _HEADER.size <= len(data):
+            crc, key_length, value_length, op = _HEADER.unpack_from(data, position)
+            end = position + _HEADER.size + key_length + value_length
+            if end > len(data) or zlib.crc32(data[position + 4 : end]) != crc:
+                break
+            key = data[
+                position + _HEADER.size : position + _HEADER.size + key_length
+            ].decode()
+            self._apply(key, op, segment, start + end - value_length, value_length)
+            position = end
+        if position < len(data):
+            logger.warning(f"Truncating torn log tail of {path} at {start + position}")
+            with open(path, "r+b") as file:
+                file.truncate(start + position)
+
+    def _apply(self, key: str, op: int, segment: int, offset: int, length: int) -> None:
+        # Overwriting in place keeps keys in first-write order
+        previous = self._index.get(key) if op == PUT else self._index.pop(key, None)
+        if previous is not None:
+            self._live_bytes -= _record_size(key, previous.length)
+        if op == PUT:
+            self._index[key] = Location(segment, offset, length)
+            self._live_bytes += _record_size(key, length)
+
+    # Reads and writes
+
+    def _read(self, location: Location) -> bytes:
+        fd = self._readers.get(location.segment)
+        if fd is None:
+            fd = self._readers[location.segment] = os.open(
+                self.path / _segment_name(location.segment), os.O_RDONLY
+            )
+        return os.pread(fd, location.length, location.offset)
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Read the value of a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            bytes | None: The value, or None if absent.
+        """
+        with self._lock:
+            location = self._index.get(key)
+            return None if location is None else self._read(location)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self) -> list[str]:
+        """Keys in first-write order."""
+        with self._lock:
+            return list(self._index)
+
+    def values(self) -> Iterator[bytes]:
+        """Iterate over values in first-write order."""
+        for key in self.keys():
+            value = self.get(key)
+            if value is not None:
+                yield value
+
+    def _write(
+        self, records: list[tuple[int, str, bytes]], durability: Durability
+    ) -> int:
+        """Append and index records in one write; returns its sequence number."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Log store {self.path} is closed")
+            if self._active_size >= settings.FILE_STORAGE_SEGMENT_BYTES:
+                self._roll()
+            chunks = []
+            offset = self._active_size
+            for op, key, value in records:
+                record = _encode(op, key, value)
+                chunks.append(record)
+                offset += len(record)
+                self._apply(key, op, self._active, offset - len(value), len(value))
+            data = b"".join(chunks)
+            seq = self._writer.write(data, durability)
+            self._active_size += len(data)
+            self._total_bytes += len(data)
+            return seq
+
+    def _append(
+        self, records: list[tuple[int, str, bytes]], durability: Durability | None
+    ) -> None:
+        """Append records and wait for the disk as the durability requires."""
+        durability = durability or self.durability
+        seq = self._write(records, durability)
+        if durability == Durability.IMMEDIATE:
+            self._writer.wait(seq)
+
+    def put(self, key: str, value: bytes, durability: Durability | None = None) -> None:
+        """Write the value of a key."""
+        self._append([(PUT, key, value)], durability)
+
+    def put_many(
+        self, items: list[tuple[str, bytes]], durability: Durability | None = None
+    ) -> None:
+        """Write many values in one append."""
+        if items:
+            self._append([(PUT, key, value) for key, value in items], durability)
+
+    def put_missing(
+        self, items: list[tuple[str, bytes]], durability: Durability | None = None
+    ) -> list[str]:
+        """
+        Write the values of keys not stored yet in one append.
+
+        Returns:
+            list[str]: The keys written, in order.
+        """
+        durability = durability or self.durability
+        with self._lock:
+            missing: dict[str, bytes] = {}
+            for key, value in items:
+                if key not in self._index and key not in missing:
+                    missing[key] = value
+            if not missing:
+                return []
+            seq = self._write(
+                [(PUT, key, value) for key, value in missing.items()], durability
+            )
+        if durability == Durability.IMMEDIATE:
+            self._writer.wait(seq)
+        return list(missing)
+
+    def delete(self, key: str, durability: Durability | None = None) -> bool:
+        """
+        Delete a key.
+
+        Returns:
+            bool: True if the key existed.
+        """
+        durability = durability or self.durability
+        with self._lock:
+            if key not in self._index:
+                return False
+            seq = self._write([(DELETE, key, b"")], durability)
+        if durability == Durability.IMMEDIATE:
+            self._writer.wait(seq)
+        return True
+
+    def _roll(self) -> None:
+        """Seal the active segment and start a new one."""
+        self._active += 1
+        self._writer.swap(self._open_segment(self._active))
+        self._active_size = 0
+
+    # Durability and maintenance
+
+    def sync(self) -> None:
+        """Flush every appended record to disk."""
+        if not self._closed:
+            self._writer.sync()
+
+    def save_index(self) -> None:
+        """Save the index and the log position it covers."""
+        with self._lock:
+            self.sync()
+            entries = [
+                _INDEX_ENTRY.pack(len(key_bytes), *location) + key_bytes
+                for key_bytes, location in (
+                    (key.encode(), location) for key, location in self._index.items()
+                )
+            ]
+            header = _INDEX_HEADER.pack(len(entries), self._active, self._active_size)
+        atomic_write(self.path / INDEX_FILE, header + b"".join(entries))
+
+    def needs_compaction(self) -> bool:
+        """Whether dead data exceeds the configured share of sealed segments."""
+        dead = self._total_bytes - self._live_bytes - self._active_size
+        return (
+            self._active > 1
+            and dead > settings.FILE_STORAGE_COMPACT_DEAD_RATIO * self._total_bytes
+        )
+
+    def compact(self) -> None:
+        """Rewrite the live records of sealed segments into one segment."""
+        with self._compact_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        with self._lock:
+            self._roll()
+            last = self._active - 1
+            sealed = {
+                key: location
+                for key, location in self._index.items()
+                if location.segment <= last
+            }
+
+        merged_path = self.path / _segment_name(last, ".merged")
+        tmp_path = self.path / _segment_name(last, ".merged.tmp")
+        moved: dict[str, tuple[Location, Location]] = {}
+        offset = 0
+        with open(tmp_path, "wb") as file:
+            for key, location in sealed.items():
+                with self._lock:
+                    value = self._read(location)
+                record = _encode(PUT, key, value)
+                file.write(record)
+                offset += len(record)
+                moved[key] = (location, Location(last, offset - len(value), len(value)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, merged_path)
+        fsync_dir(self.path)
+
+        with self._lock:
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+            # The saved index points into the segments being replaced
+            (self.path / INDEX_FILE).unlink(missing_ok=True)
+            removed = 0
+            for segment in self._segment_ids():
+                if segment <= last:
+                    path = self.path / _segment_name(segment)
+                    removed += path.stat().st_size
+                    path.unlink()
+            os.replace(merged_path, self.path / _segment_name(last))
+            fsync_dir(self.path)
+            for key, (old, new) in moved.items():
+                # Keys written or deleted during the copy keep their newer state
+                if self._index.get(key) == old:
+                    self._index[key] = new
+            self._total_bytes += offset - removed
+        self.save_index()
+        logger.info(f"Compacted {self.path}: {removed} -> {offset} bytes")
+
+    def _background(self) -> None:
+        interval = settings.FILE_STORAGE_GROUP_COMMIT_MS / 1000
+        while not self._stop.wait(interval):
+            try:
+                self._writer.flush()
+                if self.needs_compaction():
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Log store maintenance error for {self.path}: {e}")
+
+    def close(self) -> None:
+        """Stop background work, save the index and close files."""
+        if self._closed:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.save_index()
+        with self._lock:
+            self._closed = True
+            self._writer.close()
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+            # Closing the file releases the lock
+            os.close(self._lock_fd)
@@ -0,0 +1,434 @@
+"""
+Embedded SQLite storage for single-node deployments.
+
+Items are stored as JSON documents (the body column) in one table per
+type. Fields that DBStorage indexes are exposed as generated columns
+over the document and indexed the same way, and pagination is keyset
+on the uuid primary key.
+
+The database runs in WAL mode, so reads (one connection per thread) run
+concurrently with writes. All writes go through one writer thread,
+which drains up to SQLITE_WRITE_BATCH queued writes into a single
+transaction, each in its own savepoint: one commit is paid per batch
+rather than per write, and a failed write does not roll back the others.
+"""
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import TypeVar
+
+from app.core.config import settings
+from app.schemas.run import WorkflowRun
+from app.schemas.schedule import WorkflowSchedule
+from app.schemas.workflow import WorkflowDefinition
+from app.storage.base import BaseStorage
+from app.storage.durability import Durability
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Table, indexed document fields and indexes (name -> columns) per item type
+TABLES: dict[type, tuple[str, list[str], dict[str, tuple[str, ...]]]] = {
+    WorkflowDefinition: ("workflow_definitions", [], {}),
+    WorkflowRun: (
+        "workflow_runs",
+        ["workflow_id", "status", "started_at"],
+        {
+            "ix_workflow_runs_workflow_id": ("workflow_id",),
+            "ix_workflow_runs_status": ("status",),
+            "ix_workflow_runs_started_at": ("started_at",),
+            "idx_workflow_runs_status_started": ("status", "started_at"),
+            "idx_workflow_runs_created_at": ("created_at",),
+        },
+    ),
+    WorkflowSchedule: (
+        "workflow_schedules",
+        ["workflow_id"],
+        {"ix_workflow_schedules_workflow_id": ("workflow_id",)},
+    ),
+}
+
+
+class SQLiteDatabase:
+    """
+    A SQLite database file with per-thread readers and a batching writer thread.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the database and start the writer thread.
+
+        Args:
+            path (str): The database file.
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self.tables: set[str] = set()
+        self._queue: queue.Queue[
+            tuple[Callable[[sqlite3.Connection], Any], Future] | None
+        ] = queue.Queue()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: the writer thread issues BEGIN/COMMIT itself
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """The calling thread's read connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run a write on the writer thread and wait for its transaction to commit.
+
+        Args:
+            fn (Callable[[sqlite3.Connection], Any]): Executes the write's statements.
+
+        Returns:
+            Any: The value returned by fn.
+        """
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future.result()
+
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            stop = False
+            while len(batch) < settings.SQLITE_WRITE_BATCH:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(
+        self, batch: list[tuple[Callable[[sqlite3.Connection], Any], Future]]
+    ) -> None:
+        results: list[tuple[Future, Any, Exception | None]] = []
+        try:
+            self._writer.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                self._writer.execute("SAVEPOINT item")
+                try:
+                    results.append((future, fn(self._writer), None))
+                except Exception as e:
+                    self._writer.execute("ROLLBACK TO item")
+                    results.append((future, None, e))
+                self._writer.execute("RELEASE item")
+            self._writer.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"SQLite write batch of {len(batch)} failed: {e}")
+            if self._writer.in_transaction:
+                self._writer.execute("ROLLBACK")
+            results = [(future, None, e) for _, future in batch]
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Finish queued writes and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.close()
+
+
+_databases: dict[str, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path: str) -> SQLiteDatabase:
+    """
+    Get or open the process-wide database for a file.
+
+    Args:
+        path (str): The database file.
+
+    Returns:
+        SQLiteDatabase: The shared database.
+    """
+    with _databases_lock:
+        database = _databases.get(path)
+        if database is None:
+            database = _databases[path] = SQLiteDatabase(path)
+        return database
+
+
+@atexit.register
+def close_databases() -> None:
+    """Close all open databases."""
+    with _databases_lock:
+        for database in _databases.values():
+            database.close()
+        _databases.clear()
+
+
+class SQLiteStorage(BaseStorage[T]):
+    """
+    SQLite storage (see the module docstring).
+    """
+
+    def __init__(self, t_type: type[T]):
+        """
+        Initialize the SQLite storage, creating the type's table if needed.
+
+        Args:
+            t_type (type[T]): The type of the item to store.
+        """
+        super().__init__(t_type)
+        if t_type not in TABLES:
+            raise ValueError(f"Unknown type: {t_type}")
+        self.table, fields, indexes = TABLES[t_type]
+        self.database = get_database(settings.SQLITE_PATH)
+        if self.table not in self.database.tables:
+            self._create_table(fields, indexes)
+            self.database.tables.add(self.table)
+
+    def _create_table(
+        self, fields: list[str], indexes: dict[str, tuple[str, ...]]
+    ) -> None:
+        columns = "".join(
+            f", {field} TEXT GENERATED ALWAYS AS "
+            f"(json_extract(body, '$.{field}')) VIRTUAL"
+            for field in fields
+        )
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {self.table} (uuid TEXT PRIMARY KEY, "
+            "body TEXT NOT NULL CHECK (json_valid(body)), "
+            f"created_at TEXT NOT NULL{columns})"
+        ] + [
+            f"CREATE INDEX IF NOT EXISTS {name} "
+            f"ON {self.table} ({', '.join(index_columns)})"
+            for name, index_columns in indexes.items()
+        ]
+        self.database.write(
+            lambda conn: [conn.execute(statement) for statement in statements]
+        )
+
+    def _load(self, rows: list[tuple[str]]) -> list[T]:
+        return [self.t_type.model_validate_json(row[0]) for row in rows]
+
+    def get(self, uuid: str) -> T | None:
+        """
+        Retrieve an item by its UUID.
+
+        Args:
+            uuid (str): The UUID of the item.
+
+        Returns:
+            T | None: The item if found, else None.
+        """
+        rows = (
+            self.database.reader()
+            .execute(f"SELECT body FROM {self.table} WHERE uuid = ?", (uuid,))
+            .fetchall()
+        )
+        return self._load(rows)[0] if rows else None
+
+    def create(self, item: T) -> str:
+        """
+        Create a new item and return its UUID.
+
+        Args:
+            item (T): The item to create.
+
+        Returns:
+            str: The UUID of the created item.
+        """
+        return self.create_many([item])[0]
+
+    def create_many(self, items: list[T]) -> list[str]:
+        """
+        Create many items in a single transaction.
+
+        Args:
+            items (list[T]): The items to create.
+
+        Returns:
+            list[str]: The UUIDs of the created items, in order.
+        """
+        if not items:
+            return []
+        for item in items:
+            item.uuid = self.generate_uuid()
+        created_at = datetime.now(timezone.utc).isoformat()
+        rows = [(item.uuid, item.model_dump_json(), created_at) for item in items]
+        try:
+            self.database.write(
+                lambda conn: conn.executemany(
+                    f"INSERT INTO {self.table} (uuid, body, created_at) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+            )
+            return [item.uuid for item in items]
+        except Exception as e:
+            print(f"Error creating items: {e}")
+            raise e
+
+    def create_missing(self, items: list[T]) -> list[str]:
+        """
+        Create items under their preset UUIDs, skipping those already stored.
+
+        Each row is inserted with INSERT OR IGNORE in one write transaction,
+        so concurrent callers cannot both create an item.
+
+        Args:
+            items (list[T]): The items to create, with their UUIDs set.
+
+        Returns:
+            list[str]: The UUIDs of the items created by this call, in order.
+        """
+        if not items:
+            return []
+        created_at = datetime.now(timezone.utc).isoformat()
+        rows = [(item.uuid, item.model_dump_json(), created_at) for item in items]
+        statement = (
+            f"INSERT OR IGNORE INTO {self.table} (uuid, body, created_at) "
+            "VALUES (?, ?, ?)"
+        )
+        try:
+            return self.database.write(
+                lambda conn: [
+                    row[0] for row in rows if conn.execute(statement, row).rowcount
+                ]
+            )
+        except Exception as e:
+            print(f"Error creating items: {e}")
+            raise e
+
+    def delete(self, uuid: str) -> bool:
+        """
+        Delete an item by its UUID.
+
+        Args:
+            uuid (str): The UUID of the item to delete.
+
+        Returns:
+            bool: True if deleted, False if not found.
+        """
+        try:
+            return self.delete_many([uuid]) == 1
+        except Exception as e:
+            print(f"Error deleting item {uuid}: {e}")
+            return False
+
+    def update(self, item: T, durability: Durability | None = None) -> bool:
+        """
+        Update an existing item.
+
+        Args:
+            item (T): The item to update.
+            durability (Durability | None): Unused: every write is committed
+                before it returns.
+
+        Returns:
+            bool: True if updated, False if not found.
+        """
+        body = item.model_dump_json()
+        try:
+            return self.database.write(
+                lambda conn: conn.execute(
+                    f"UPDATE {self.table} SET body = ? WHERE uuid = ?",
+                    (body, item.uuid),
+                ).rowcount
+                == 1
+            )
+        except Exception as e:
+            print(f"Error updating item {item.uuid}: {e}")
+            return False
+
+    def list_all(self) -> list[T]:
+        """
+        List all items in storage.
+
+        Returns:
+            list[T]: A list of all items.
+        """
+        return self._load(
+            self.database.reader().execute(f"SELECT body FROM {self.table}").fetchall()
+        )
+
+    def list_paginated(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[T], str | None]:
+        """
+        List items with cursor-based pagination, ordered by uuid.
+
+        Args:
+            limit: Maximum number of items to return.
+            cursor: UUID cursor — return items with uuid > cursor.
+
+        Returns:
+            tuple: (list of items, next_cursor or None if no more items).
+        """
+        rows = (
+            self.database.reader()
+            .execute(
+                f"SELECT body, uuid FROM {self.table} "
+                "WHERE uuid > ? ORDER BY uuid LIMIT ?",
+                (cursor or "", limit + 1),
+            )
+            .fetchall()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = rows[-1][1] if has_more and rows else None
+        return self._load(rows), next_cursor
+
+    def delete_many(self, uuids: list[str]) -> int:
+        """
+        Delete items in one transaction.
+
+        Args:
+            uuids (list[str]): The UUIDs of the items to delete.
+
+        Returns:
+            int: Number of items deleted.
+        """
+        if not uuids:
+            return 0
+        placeholders = ", ".join("?" for _ in uuids)
+        return self.database.write(
+            lambda conn: conn.execute(
+                f"DELETE FROM {self.table} WHERE uuid IN ({placeholders})", uuids
+            ).rowcount
+        )
@@ -0,0 +1,154 @@
+"""
+Dispatch of asynchronous sub-workflow runs.
+
+A sub-workflow step in ASYNC mode creates a child run, publishes its
+trigger event like the trigger endpoint does, and (optionally) waits for
+the child's completion event. Each worker reads the completion topic with
+its own consumer group, named after WORKER_ID so a restarted worker reuses
+it, and resolves the futures of the runs it awaits. The completion
+consumer is only started by the first dispatch that waits, so workers
+that never run async subworkflows do not read the completion topic.
+
+A parent waiting on a child holds its worker slot, so deep chains of
+waiting async sub-workflows can exhaust WORKER_MAX_IN_FLIGHT; prefer
+INLINE mode unless the child must be its own run.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from app.core.config import settings
+from app.messaging.base import BaseConsumer
+from app.messaging.base import BaseProducer
+from app.messaging.events import trigger_topic
+from app.messaging.events import WorkflowCompletedEvent
+from app.messaging.events import WorkflowTriggerEvent
+from app.messaging.factory import BrokerFactory
+from app.schemas.common import Priority
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import WorkflowDefinition
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SubworkflowDispatcher:
+    """
+    Creates child runs and awaits their completion events.
+    """
+
+    def __init__(self, producer: BaseProducer, workflow_service: Any):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            producer: The worker's started producer.
+            workflow_service: The WorkflowService used to create child runs.
+        """
+        self._producer = producer
+        self._workflow_service = workflow_service
+        self._consumer: BaseConsumer | None = None
+        self._consume_task: asyncio.Task | None = None
+        self._start_lock = asyncio.Lock()
+        self._waiting: dict[str, asyncio.Future] = {}
+
+    async def _ensure_consuming(self) -> None:
+        """Start the completion consumer on first use."""
+        async with self._start_lock:
+            if self._consumer is not None:
+                return
+            # Every worker needs the completions of its own children
+            consumer = BrokerFactory.create_consumer(
+                topic=settings.KAFKA_TOPIC_WORKFLOW_COMPLETED,
+                group_id=f"{settings.KAFKA_CONSUMER_GROUP}-dispatch-{settings.WORKER_ID}",
+                auto_offset_reset="latest",
+            )
+            await consumer.start()
+            self._consumer = consumer
+            self._consume_task = asyncio.create_task(
+                consumer.consume(self._handle_completed)
+            )
+            logger.info("Subworkflow completion consumer started")
+
+    async def stop(self) -> None:
+        """Stop the completion consumer, if started, and fail pending waits."""
+        if self._consume_task is not None:
+            self._consume_task.cancel()
+            self._consume_task = None
+        if self._consumer is not None:
+            await self._consumer.stop()
+            self._consumer = None
+        for future in self._waiting.values():
+            future.cancel()
+        self._waiting.clear()
+
+    async def dispatch(
+        self, workflow: WorkflowDefinition, payload: dict[str, Any], wait: bool = True
+    ) -> str:
+        """
+        Create a child run and publish its trigger event.
+
+        Args:
+            workflow: The child workflow definition.
+            payload: The child payload.
+            wait: Register for the completion event (call wait() afterwards).
+
+        Returns:
+            str: The child run ID.
+        """
+        run = WorkflowRun(
+            workflow_id=workflow.uuid,
+            status=WorkflowStatus.PENDING,
+            payload=payload,
+            started_at=datetime.now().isoformat(),
+        )
+        if wait:
+            await self._ensure_consuming()
+        self._workflow_service.create_workflow_run(run)
+        if wait:
+            # Registered before publishing so a fast completion is not missed
+            self._waiting[run.uuid] = asyncio.get_running_loop().create_future()
+
+        event = WorkflowTriggerEvent(
+            run_id=run.uuid,
+            workflow_id=workflow.uuid,
+            payload=payload,
+            max_concurrency=workflow.max_concurrency,
+            triggered_at=run.started_at,
+        )
+        try:
+            await self._producer.send(
+                topic=trigger_topic(Priority.NORMAL),
+                value=event.model_dump(),
+                key=run.uuid,
+            )
+        except Exception:
+            self._waiting.pop(run.uuid, None)
+            raise
+        logger.info(
+            f"Dispatched subworkflow run {run.uuid} of workflow {workflow.uuid}"
+        )
+        return run.uuid
+
+    async def wait(self, run_id: str) -> WorkflowCompletedEvent:
+        """
+        Wait for the completion event of a dispatched run.
+
+        Args:
+            run_id: The child run ID returned by dispatch(wait=True).
+
+        Returns:
+            WorkflowCompletedEvent: The child's completion event.
+        """
+        try:
+            return await self._waiting[run_id]
+        finally:
+            self._waiting.pop(run_id, None)
+
+    async def _handle_completed(self, message: dict[str, Any]) -> None:
+        """Resolve the wait of a completed child run, if any."""
+        future = self._waiting.get(message.get("run_id"))
+        if future is not None and not future.done():
+            future.set_result(WorkflowCompletedEvent(**message))
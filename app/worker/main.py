@@ -2,21 +2,37 @@
 Kafka worker service for async workflow execution.
 
 This module runs as a standalone service that:
-1. Consumes workflow trigger events from Kafka
+1. Consumes workflow trigger events from the message broker
 2. Executes workflows asynchronously
-3. Publishes completion events back to Kafka
+3. Publishes completion events back to the message broker
+
+With MESSAGE_BROKER=in_memory and RUN_WORKER_IN_PROCESS=true the worker
+runs inside the API process instead (see app.main).
 """
 import asyncio
 import logging
+import random
 import signal
 import sys
+from typing import Callable
 
+from app.cache.cancellation import CancellationChecker
+from app.cache.semaphore import DistributedSemaphore
+from app.connector.factory import ConnectorFactory
+from app.connector.transform import shutdown_transform_pool
 from app.core.config import settings
-from app.messaging.kafka import KafkaProducer, KafkaConsumer
-from app.messaging.events import WorkflowTriggerEvent, WorkflowCompletedEvent
-from app.services.workflow import WorkflowService
-from app.storage.enum import StorageType
+from app.messaging.base import BaseConsumer
+from app.messaging.base import BaseProducer
+from app.messaging.events import trigger_topic
+from app.messaging.events import WorkflowCompletedEvent
+from app.messaging.events import WorkflowTriggerEvent
+from app.messaging.factory import BrokerFactory
+from app.messaging.in_memory import close_in_memory_broker
+from app.schemas.common import Priority
 from app.schemas.common import WorkflowStatus
+from app.services.workflow import WorkflowService
+from app.worker.dispatcher import SubworkflowDispatcher
+from app.worker.scheduler import LaneScheduler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,14 +46,39 @@ class WorkflowWorker:
     Worker that consumes workflow events and executes workflows.
     """
 
-    def __init__(self):
-        """Initialize the worker with Kafka consumer/producer and workflow service."""
-        self._consumer = KafkaConsumer(
-            topic=settings.KAFKA_TOPIC_WORKFLOW_TRIGGER,
-            group_id=settings.KAFKA_CONSUMER_GROUP,
+    def __init__(self, producer: BaseProducer | None = None):
+        """
+        Initialize the worker with broker consumer/producer and workflow service.
+
+        Args:
+            producer: An already started producer to share (e.g. the API's when
+                running in-process). Defaults to a new producer owned by the worker.
+        """
+        self._scheduler = LaneScheduler(
+            handler=self._handle_message,
+            weights=settings.PRIORITY_LANE_WEIGHTS,
+            lane_limits=settings.PRIORITY_LANE_MAX_IN_FLIGHT,
+            max_in_flight=settings.WORKER_MAX_IN_FLIGHT,
         )
-        self._producer = KafkaProducer()
-        self._workflow_service = WorkflowService(StorageType.POSTGRES)
+        self._consumers: dict[str, BaseConsumer] = {
+            lane: BrokerFactory.create_consumer(
+                topic=trigger_topic(Priority(lane)),
+                group_id=settings.KAFKA_CONSUMER_GROUP,
+            )
+            for lane in self._scheduler.lanes
+        }
+        self._owns_producer = producer is None
+        self._producer: BaseProducer = producer or BrokerFactory.create_producer()
+        self._workflow_service = WorkflowService(settings.STORAGE_TYPE)
+        self._dispatcher = SubworkflowDispatcher(self._producer, self._workflow_service)
+        self._workflow_service.dispatcher = self._dispatcher
+        self._semaphore = DistributedSemaphore()
+        self._cancellation = CancellationChecker()
+        # run_id -> (execution task, workflow_id, triggered_at) for in-flight runs
+        self._running: dict[str, tuple[asyncio.Task, str, float | None]] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+        # run_id -> times deferred in a row, for the re-queue backoff
+        self._deferrals: dict[str, int] = {}
         self._shutdown = False
 
     async def start(self) -> None:
@@ -45,12 +86,28 @@ class WorkflowWorker:
         logger.info("Starting workflow worker...")
 
         await self._producer.start()
-        await self._consumer.start()
+        for consumer in self._consumers.values():
+            await consumer.start()
+        ConnectorFactory.set_producer(self._producer)
 
-        logger.info("Workflow worker started. Waiting for messages...")
+        logger.info(
+            f"Workflow worker started on lanes {self._scheduler.lanes}. "
+            "Waiting for messages..."
+        )
 
         try:
-            await self._consumer.consume(self._handle_message)
+            await asyncio.gather(
+                self._scheduler.run(),
+                self._watch_cancellations(),
+                *(
+                    consumer.consume_with_ack(
+                        lambda message, ack, lane=lane: self._scheduler.submit(
+                            lane, message, ack
+                        )
+                    )
+                    for lane, consumer in self._consumers.items()
+                ),
+            )
         except asyncio.CancelledError:
             logger.info("Worker received cancellation")
         finally:
@@ -60,49 +117,188 @@ class WorkflowWorker:
         """Stop the worker and clean up resources."""
         logger.info("Stopping workflow worker...")
         self._shutdown = True
-        await self._consumer.stop()
-        await self._producer.stop()
+        for consumer in self._consumers.values():
+            await consumer.stop()
+        await self._dispatcher.stop()
+        ConnectorFactory.set_producer(None)
+        if self._owns_producer:
+            await self._producer.stop()
+        # Commit the in-process broker's offsets (no-op with Kafka)
+        close_in_memory_broker()
+        shutdown_transform_pool()
         logger.info("Workflow worker stopped")
 
-    async def _handle_message(self, message: dict) -> None:
+    async def _handle_message(
+        self, message: dict, ack: Callable[[], None] = lambda: None
+    ) -> None:
         """
         Handle a workflow trigger event.
 
+        The message is acknowledged once its run has finished (or failed to
+        start), not when it is deferred or interrupted by shutdown, so the
+        broker redelivers it after a crash.
+
         Args:
-            message: The raw message payload from Kafka.
+            message: The raw message payload from the broker.
+            ack: Callback acknowledging the message to the broker.
         """
         try:
             event = WorkflowTriggerEvent(**message)
-            logger.info(f"Processing workflow trigger: run_id={event.run_id}")
-
-            # Execute the workflow
-            await self._workflow_service.execute_workflow(event.run_id)
-
-            # Get the final status
-            run = self._workflow_service.load_workflow_run(event.run_id)
-            status = run.status if run else WorkflowStatus.FAILED
-            error = run.error if run else "Run not found"
-
-            # Publish completion event
-            completed_event = WorkflowCompletedEvent(
-                run_id=event.run_id,
-                workflow_id=event.workflow_id,
-                status=status,
-                error=error if status == WorkflowStatus.FAILED else None,
-            )
-
-            await self._producer.send(
-                topic=settings.KAFKA_TOPIC_WORKFLOW_COMPLETED,
-                value=completed_event.model_dump(),
-                key=event.run_id,
-            )
-
-            logger.info(f"Workflow completed: run_id={event.run_id}, status={status}")
+            # A run cancelled while queued (or deferred) is recorded by _execute
+            # without taking a concurrency slot
+            if event.max_concurrency is None or await self._cancellation.is_cancelled(
+                event.run_id, event.workflow_id, event.triggered_at
+            ):
+                await self._execute(event)
+            else:
+                # Enforce the workflow's fleet-wide concurrency limit. Over-limit runs
+                # are deferred and re-queued, freeing this slot for other workflows.
+                semaphore_name = f"workflow:{event.workflow_id}"
+                token = await self._semaphore.acquire(
+                    semaphore_name, event.max_concurrency
+                )
+                if token is None:
+                    self._defer(event, message, ack)
+                    return
+                renewer = asyncio.create_task(self._renew_lease(semaphore_name, token))
+                try:
+                    await self._execute(event)
+                finally:
+                    renewer.cancel()
+                    await self._semaphore.release(semaphore_name, token)
 
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             # In production, you might want to send to a dead-letter queue
+            ack()
             raise
+        else:
+            ack()
+
+    async def _execute(self, event: WorkflowTriggerEvent) -> None:
+        """
+        Execute a triggered run and publish its completion event.
+
+        Args:
+            event: The validated trigger event.
+        """
+        logger.info(f"Processing workflow trigger: run_id={event.run_id}")
+        self._deferrals.pop(event.run_id, None)
+
+        try:
+            if await self._cancellation.is_cancelled(
+                event.run_id, event.workflow_id, event.triggered_at
+            ):
+                # Cancelled while queued: record it without executing any step
+                logger.info(f"Skipping cancelled run_id={event.run_id}")
+                run = self._workflow_service.load_workflow_run(event.run_id)
+                if run and run.status in (
+                    WorkflowStatus.PENDING,
+                    WorkflowStatus.RUNNING,
+                ):
+                    self._workflow_service.mark_run_cancelled(run)
+            else:
+                # Execute the workflow in its own task so it can be cancelled mid-flight
+                task = asyncio.create_task(
+                    self._workflow_service.execute_workflow(event.run_id)
+                )
+                self._running[event.run_id] = (
+                    task,
+                    event.workflow_id,
+                    event.triggered_at,
+                )
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise
+                    logger.info(f"Run cancelled mid-flight: run_id={event.run_id}")
+                finally:
+                    self._running.pop(event.run_id, None)
+        finally:
+            self._cancellation.forget(event.run_id)
+
+        # Get the final status
+        run = self._workflow_service.load_workflow_run(event.run_id)
+        status = run.status if run else WorkflowStatus.FAILED
+        error = run.error if run else "Run not found"
+
+        # Publish completion event
+        completed_event = WorkflowCompletedEvent(
+            run_id=event.run_id,
+            workflow_id=event.workflow_id,
+            status=status,
+            error=error
+            if status in (WorkflowStatus.FAILED, WorkflowStatus.TIMED_OUT)
+            else None,
+        )
+
+        await self._producer.send(
+            topic=settings.KAFKA_TOPIC_WORKFLOW_COMPLETED,
+            value=completed_event.model_dump(),
+            key=event.run_id,
+        )
+
+        logger.info(f"Workflow completed: run_id={event.run_id}, status={status}")
+
+    def _defer(
+        self, event: WorkflowTriggerEvent, message: dict, ack: Callable[[], None]
+    ) -> None:
+        """
+        Re-queue a run whose workflow is at its concurrency limit, after a
+        jittered delay.
+
+        The delay doubles each time the same run is deferred, from
+        WORKFLOW_CONCURRENCY_DEFER_SECONDS up to WORKFLOW_CONCURRENCY_DEFER_MAX_SECONDS,
+        so runs waiting on a long-held limit stop polling the semaphore.
+
+        Args:
+            event: The validated trigger event.
+            message: The raw message payload to re-submit.
+            ack: Callback acknowledging the message, passed along with it.
+        """
+        attempt = self._deferrals.get(event.run_id, 0)
+        self._deferrals[event.run_id] = attempt + 1
+        delay = min(
+            settings.WORKFLOW_CONCURRENCY_DEFER_SECONDS * 2 ** min(attempt, 32),
+            settings.WORKFLOW_CONCURRENCY_DEFER_MAX_SECONDS,
+        ) * (0.5 + random.random())
+        logger.info(
+            f"Workflow {event.workflow_id} at max_concurrency={event.max_concurrency}, "
+            f"deferring run_id={event.run_id} by {delay:.2f}s"
+        )
+
+        def resubmit():
+            task = asyncio.create_task(
+                self._scheduler.submit(event.priority.value, message, ack)
+            )
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+        asyncio.get_running_loop().call_later(delay, resubmit)
+
+    async def _watch_cancellations(self) -> None:
+        """Periodically check in-flight runs and cancel the flagged ones."""
+        while True:
+            await asyncio.sleep(settings.CANCEL_POLL_INTERVAL_SECONDS)
+            if not self._running:
+                continue
+            cancelled = await self._cancellation.check_many(
+                {
+                    run_id: (workflow_id, triggered_at)
+                    for run_id, (_, workflow_id, triggered_at) in self._running.items()
+                }
+            )
+            for run_id in cancelled:
+                entry = self._running.get(run_id)
+                if entry is not None:
+                    entry[0].cancel()
+
+    async def _renew_lease(self, name: str, token: str) -> None:
+        """Keep a semaphore lease alive while its run executes."""
+        while True:
+            await asyncio.sleep(self._semaphore.lease_seconds / 3)
+            await self._semaphore.renew(name, token)
 
 
 async def main() -> None:
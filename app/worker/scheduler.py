@@ -0,0 +1,194 @@
+"""
+Weighted fair scheduling of trigger events across priority lanes.
+
+Each lane is fed by its own broker consumer and buffers at most its
+in-flight limit, so a backlog in one lane applies backpressure to that
+lane's consumer only. The dispatcher picks among lanes that have work
+and spare capacity using smooth weighted round-robin, which is
+work-conserving: an idle high lane leaves its share to the others.
+Within a lane, messages are queued per workflow and dispatched
+round-robin across workflows, so one noisy workflow cannot monopolise
+its lane.
+
+Each message travels with the ack callback of the consumer that read it
+and is handed to the handler with it, so the broker can be told once the
+message is fully processed rather than when it is buffered here.
+"""
+import asyncio
+import logging
+from collections import deque
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _ignore_ack() -> None:
+    pass
+
+
+@dataclass
+class Lane:
+    """
+    A priority lane.
+
+    Attributes:
+        name (str): Lane name (the priority value).
+        weight (int): Share of dispatches when lanes compete for capacity.
+        max_in_flight (int): Maximum concurrently executing messages of this lane.
+        flows (OrderedDict[str, deque]): Queued (message, ack) pairs per
+            workflow, in round-robin order.
+        buffered (int): Number of queued messages.
+        capacity (asyncio.Semaphore): Free buffer slots; bounds queued messages
+            to max_in_flight.
+        in_flight (int): Currently executing messages of this lane.
+        current_weight (int): Smooth weighted round-robin state.
+    """
+
+    name: str
+    weight: int
+    max_in_flight: int
+    flows: OrderedDict = field(default_factory=OrderedDict)
+    buffered: int = 0
+    capacity: asyncio.Semaphore = field(init=False)
+    in_flight: int = 0
+    current_weight: int = 0
+
+    def __post_init__(self):
+        self.capacity = asyncio.Semaphore(self.max_in_flight)
+
+    @property
+    def eligible(self) -> bool:
+        """Whether the lane has queued work and spare in-flight capacity."""
+        return self.buffered > 0 and self.in_flight < self.max_in_flight
+
+    def push(self, message: dict[str, Any], ack: Callable[[], None]) -> None:
+        """Queue a message behind earlier messages of the same workflow."""
+        flow_key = message.get("workflow_id", "")
+        flow = self.flows.get(flow_key)
+        if flow is None:
+            flow = self.flows[flow_key] = deque()
+        flow.append((message, ack))
+        self.buffered += 1
+
+    def pop(self) -> tuple[dict[str, Any], Callable[[], None]]:
+        """Take the next message and its ack, rotating to the next workflow."""
+        flow_key, flow = next(iter(self.flows.items()))
+        entry = flow.popleft()
+        if flow:
+            self.flows.move_to_end(flow_key)
+        else:
+            del self.flows[flow_key]
+        self.buffered -= 1
+        self.capacity.release()
+        return entry
+
+
+class LaneScheduler:
+    """
+    Dispatches messages from priority lanes to a handler with bounded concurrency.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict[str, Any], Callable[[], None]], Awaitable[None]],
+        weights: dict[str, int],
+        lane_limits: dict[str, int],
+        max_in_flight: int,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            handler: Async function executing one message, given the message
+                and its ack callback to call once the message is processed.
+            weights: Scheduling weight per lane name.
+            lane_limits: In-flight limit per lane name.
+            max_in_flight: In-flight limit across all lanes.
+        """
+        self._handler = handler
+        self._max_in_flight = max_in_flight
+        self._lanes: dict[str, Lane] = {
+            name: Lane(
+                name=name,
+                weight=max(weight, 1),
+                max_in_flight=min(lane_limits.get(name, max_in_flight), max_in_flight),
+            )
+            for name, weight in weights.items()
+        }
+        self._in_flight = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+    @property
+    def lanes(self) -> list[str]:
+        """Names of the configured lanes."""
+        return list(self._lanes)
+
+    async def submit(
+        self, lane: str, message: dict[str, Any], ack: Callable[[], None] | None = None
+    ) -> None:
+        """
+        Queue a message on a lane, waiting while the lane's buffer is full.
+
+        Args:
+            lane: The lane name.
+            message: The raw message payload.
+            ack: Callback acknowledging the message to the broker.
+        """
+        target = self._lanes[lane]
+        await target.capacity.acquire()
+        target.push(message, ack or _ignore_ack)
+        self._wakeup.set()
+
+    def _pick(self) -> Lane | None:
+        """Select the next lane to dispatch from (smooth weighted round-robin)."""
+        eligible = [lane for lane in self._lanes.values() if lane.eligible]
+        if not eligible:
+            return None
+        total = 0
+        best = None
+        for lane in eligible:
+            lane.current_weight += lane.weight
+            total += lane.weight
+            if best is None or lane.current_weight > best.current_weight:
+                best = lane
+        best.current_weight -= total
+        return best
+
+    async def run(self) -> None:
+        """Dispatch queued messages until cancelled."""
+        try:
+            while True:
+                lane = self._pick() if self._in_flight < self._max_in_flight else None
+                if lane is None:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                message, ack = lane.pop()
+                lane.in_flight += 1
+                self._in_flight += 1
+                task = asyncio.create_task(self._execute(lane, message, ack))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+
+    async def _execute(
+        self, lane: Lane, message: dict[str, Any], ack: Callable[[], None]
+    ) -> None:
+        """Run the handler for one message and release its slot."""
+        try:
+            await self._handler(message, ack)
+        except Exception as e:
+            logger.error(f"Error processing message from lane {lane.name}: {e}")
+        finally:
+            lane.in_flight -= 1
+            self._in_flight -= 1
+            self._wakeup.set()
@@ -47,10 +47,13 @@ pub async fn run_migrations(pool: &PgPool) -> Result<(), sqlx::Error> {
     .execute(pool)
     .await?;
 
+    // Range-partitioned on created_at like the Python model (app/db/models/run.py).
+    // Period partitions are created by the Python scheduler's maintenance job;
+    // until then rows land in the DEFAULT partition.
     sqlx::query(
         r#"
         CREATE TABLE IF NOT EXISTS workflow_runs (
-            uuid VARCHAR PRIMARY KEY,
+            uuid VARCHAR NOT NULL,
             id VARCHAR,
             workflow_id VARCHAR NOT NULL,
             status VARCHAR NOT NULL,
@@ -58,13 +61,54 @@ pub async fn run_migrations(pool: &PgPool) -> Result<(), sqlx::Error> {
             started_at VARCHAR NOT NULL,
             completed_at VARCHAR,
             error VARCHAR,
-            step_results JSONB NOT NULL DEFAULT '{}'::jsonb
-        )
+            step_results JSONB NOT NULL DEFAULT '{}'::jsonb,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (uuid, created_at)
+        ) PARTITION BY RANGE (created_at)
         "#,
     )
     .execute(pool)
     .await?;
 
+    sqlx::query("CREATE TABLE IF NOT EXISTS workflow_runs_default PARTITION OF workflow_runs DEFAULT")
+        .execute(pool)
+        .await?;
+
+    // Step results of Python-executed runs (app/db/models/step_result.py), read
+    // by WorkflowRunStorage. created_at is the run's created_at.
+    sqlx::query(
+        r#"
+        CREATE TABLE IF NOT EXISTS workflow_step_results (
+            id BIGSERIAL NOT NULL,
+            run_uuid VARCHAR NOT NULL,
+            step_name VARCHAR NOT NULL,
+            attempt INTEGER NOT NULL,
+            status VARCHAR NOT NULL,
+            started_at VARCHAR NOT NULL,
+            completed_at VARCHAR,
+            output JSONB,
+            error VARCHAR,
+            created_at TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (id, created_at),
+            CONSTRAINT uq_step_results_attempt UNIQUE (run_uuid, step_name, attempt, created_at)
+        ) PARTITION BY RANGE (created_at)
+        "#,
+    )
+    .execute(pool)
+    .await?;
+
+    sqlx::query(
+        "CREATE TABLE IF NOT EXISTS workflow_step_results_default PARTITION OF workflow_step_results DEFAULT",
+    )
+    .execute(pool)
+    .await?;
+
+    sqlx::query(
+        "CREATE INDEX IF NOT EXISTS idx_step_results_run ON workflow_step_results (run_uuid)",
+    )
+    .execute(pool)
+    .await?;
+
     // Create indexes matching the Python models (wrapped to handle pre-existing indexes)
     sqlx::query(
         r#"
@@ -166,6 +166,26 @@ impl Storage<WorkflowDefinition> for WorkflowDefinitionStorage {
     }
 }
 
+/// Columns of a `workflow_runs r` row, with its step results merged.
+///
+/// The Python service stores step results as append-only rows in
+/// workflow_step_results (the latest row per step wins) instead of the
+/// step_results column, which only holds the results this service writes.
+/// Outputs the Python service moved to its blob store are left out.
+const RUN_COLUMNS: &str = r#"r.uuid, r.id, r.workflow_id, r.status, r.payload, r.started_at,
+    r.completed_at, r.error, r.step_results || COALESCE((
+        SELECT jsonb_object_agg(s.step_name, jsonb_build_object(
+            'step_name', s.step_name, 'status', s.status, 'started_at', s.started_at,
+            'completed_at', s.completed_at, 'error', s.error,
+            'output', CASE WHEN s.output->>'type' = 'blob' THEN NULL ELSE s.output END
+        ))
+        FROM (
+            SELECT DISTINCT ON (step_name) * FROM workflow_step_results
+            WHERE run_uuid = r.uuid AND created_at = r.created_at
+            ORDER BY step_name, id DESC
+        ) s
+    ), '{}'::jsonb) AS step_results"#;
+
 /// PostgreSQL-backed storage for WorkflowRun.
 ///
 /// Single Responsibility: only handles DB persistence for WorkflowRun.
@@ -182,12 +202,11 @@ impl WorkflowRunStorage {
 #[async_trait]
 impl Storage<WorkflowRun> for WorkflowRunStorage {
     async fn get(&self, uuid: &str) -> Result<Option<WorkflowRun>, StorageError> {
-        let row = sqlx::query_as::<_, WorkflowRunRow>(
-            "SELECT uuid, id, workflow_id, status, payload, started_at, completed_at, error, step_results FROM workflow_runs WHERE uuid = $1",
-        )
-        .bind(uuid)
-        .fetch_optional(&self.pool)
-        .await?;
+        let sql = format!("SELECT {RUN_COLUMNS} FROM workflow_runs r WHERE r.uuid = $1");
+        let row = sqlx::query_as::<_, WorkflowRunRow>(&sql)
+            .bind(uuid)
+            .fetch_optional(&self.pool)
+            .await?;
 
         match row {
             Some(r) => Ok(Some(row_to_workflow_run(r)?)),
@@ -225,6 +244,10 @@ impl Storage<WorkflowRun> for WorkflowRunStorage {
             .bind(uuid)
             .execute(&self.pool)
             .await?;
+        sqlx::query("DELETE FROM workflow_step_results WHERE run_uuid = $1")
+            .bind(uuid)
+            .execute(&self.pool)
+            .await?;
 
         Ok(result.rows_affected() > 0)
     }
@@ -256,11 +279,10 @@ impl Storage<WorkflowRun> for WorkflowRunStorage {
     }
 
     async fn list_all(&self) -> Result<Vec<WorkflowRun>, StorageError> {
-        let rows = sqlx::query_as::<_, WorkflowRunRow>(
-            "SELECT uuid, id, workflow_id, status, payload, started_at, completed_at, error, step_results FROM workflow_runs",
-        )
-        .fetch_all(&self.pool)
-        .await?;
+        let sql = format!("SELECT {RUN_COLUMNS} FROM workflow_runs r");
+        let rows = sqlx::query_as::<_, WorkflowRunRow>(&sql)
+            .fetch_all(&self.pool)
+            .await?;
 
         let mut results = Vec::with_capacity(rows.len());
         for r in rows {
@@ -276,21 +298,22 @@ impl Storage<WorkflowRun> for WorkflowRunStorage {
     ) -> Result<(Vec<WorkflowRun>, Option<String>), StorageError> {
         let rows = match cursor {
             Some(c) => {
-                sqlx::query_as::<_, WorkflowRunRow>(
-                    "SELECT uuid, id, workflow_id, status, payload, started_at, completed_at, error, step_results FROM workflow_runs WHERE uuid > $1 ORDER BY uuid LIMIT $2",
-                )
-                .bind(c)
-                .bind(limit + 1)
-                .fetch_all(&self.pool)
-                .await?
+                let sql = format!(
+                    "SELECT {RUN_COLUMNS} FROM workflow_runs r WHERE r.uuid > $1 ORDER BY r.uuid LIMIT $2"
+                );
+                sqlx::query_as::<_, WorkflowRunRow>(&sql)
+                    .bind(c)
+                    .bind(limit + 1)
+                    .fetch_all(&self.pool)
+                    .await?
             }
             None => {
-                sqlx::query_as::<_, WorkflowRunRow>(
-                    "SELECT uuid, id, workflow_id, status, payload, started_at, completed_at, error, step_results FROM workflow_runs ORDER BY uuid LIMIT $1",
-                )
-                .bind(limit + 1)
-                .fetch_all(&self.pool)
-                .await?
+                let sql =
+                    format!("SELECT {RUN_COLUMNS} FROM workflow_runs r ORDER BY r.uuid LIMIT $1");
+                sqlx::query_as::<_, WorkflowRunRow>(&sql)
+                    .bind(limit + 1)
+                    .fetch_all(&self.pool)
+                    .await?
             }
         };
 
@@ -0,0 +1,195 @@
+"""
+Tests for the cold-run archive.
+"""
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from app.archive.job import archive_runs
+from app.archive.store import RunArchive
+from app.core.config import Settings
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+
+
+def make_run(n: int) -> WorkflowRun:
+    return WorkflowRun(
+        uuid=f"{n * 7919 % 1000:04d}{n:028x}",
+        workflow_id="wf",
+        status=WorkflowStatus.SUCCESS,
+        payload={"n": n},
+        started_at=f"2026-01-{n % 28 + 1:02d}T00:00:00",
+    )
+
+
+class TestRunArchive:
+    """Tests for segment writes and indexed lookups."""
+
+    def test_lookup_reads_indexed_block(self, tmp_path):
+        """Test archived runs are found by uuid and unknown uuids miss."""
+        runs = [make_run(n) for n in range(500)]
+        with patch("app.archive.store.settings.ARCHIVE_BLOCK_RUNS", 16):
+            archive = RunArchive(str(tmp_path))
+            archive.append(runs)
+
+        segment = next(iter(archive._segments.values()))
+        assert len(segment.index.offsets) == 32
+        for run in runs[::37]:
+            assert archive.get(run.uuid) == run
+        assert archive.get("f" * 32) is None
+
+    def test_segments_from_other_processes_found(self, tmp_path):
+        """Test a miss picks up other instances' segments once the listing is stale."""
+        reader = RunArchive(str(tmp_path))
+        RunArchive(str(tmp_path)).append([make_run(1)])
+
+        with patch("app.archive.store.settings.ARCHIVE_REFRESH_SECONDS", 60):
+            assert reader.get(make_run(1).uuid) is None
+        with patch("app.archive.store.settings.ARCHIVE_REFRESH_SECONDS", 0):
+            assert reader.get(make_run(1).uuid).payload == {"n": 1}
+
+    def test_scan_skips_segments_outside_range(self, tmp_path):
+        """Test time-bounded scans only return runs in the range."""
+        archive = RunArchive(str(tmp_path))
+        archive.append([make_run(n) for n in range(28)])
+
+        runs = list(archive.scan(since="2026-01-05", until="2026-01-07T23:59:59"))
+        assert sorted(run.payload["n"] for run in runs) == [4, 5, 6]
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class FakeConnection:
+    """A connection answering the archive job's queries from in-memory tables."""
+
+    def __init__(self, attached: dict[str, list[str]], tables: dict[str, list[dict]]):
+        self.attached = attached
+        self.tables = tables
+        self.statements: list[str] = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        params = params or {}
+        result = MagicMock()
+        if "pg_inherits" in sql:
+            result.scalars.return_value = list(self.attached.get(params["table"], []))
+        elif sql.startswith("ALTER TABLE"):
+            table, name = sql.split()[2], sql.split()[-1]
+            self.attached[table].remove(name)
+        elif "FROM pg_class" in sql:
+            attached = {name for names in self.attached.values() for name in names}
+            result.scalars.return_value = [
+                name
+                for name in self.tables
+                if name.startswith("workflow_runs_p") and name not in attached
+            ]
+        elif "to_regclass" in sql:
+            result.scalar.return_value = (
+                params["name"] if params["name"] in self.tables else None
+            )
+        elif sql.startswith("SELECT * FROM workflow_runs_p"):
+            rows = sorted(self.tables[sql.split()[3]], key=lambda row: row["uuid"])
+            rows = [row for row in rows if row["uuid"] > params["after"]][
+                : params["limit"]
+            ]
+            result.mappings.return_value.all.return_value = rows
+        elif sql.startswith("SELECT * FROM workflow_step_results_p"):
+            result.mappings.return_value = [
+                row
+                for row in self.tables[sql.split()[3]]
+                if row["run_uuid"] in params["uuids"]
+            ]
+        elif sql.startswith("DROP TABLE"):
+            self.tables.pop(sql.split()[-1], None)
+        return result
+
+
+def fake_engine(conn: FakeConnection) -> MagicMock:
+    engine = MagicMock()
+    engine.begin.return_value.__enter__.return_value = conn
+    engine.connect.return_value.__enter__.return_value = conn
+    return engine
+
+
+class TestArchiveJob:
+    """Tests for moving cold run partitions out of the live tables."""
+
+    def test_archives_cold_partitions_then_drops_them(self, tmp_path):
+        """Test a cold period is archived in batches before its tables are dropped."""
+        runs = [make_run(n) for n in range(5)]
+        runs[4].status = WorkflowStatus.RUNNING
+        conn = FakeConnection(
+            attached={
+                "workflow_runs": [
+                    "workflow_runs_default",
+                    "workflow_runs_p20260101",
+                    "workflow_runs_p20260108",
+                ],
+                "workflow_step_results": ["workflow_step_results_p20260101"],
+            },
+            tables={
+                "workflow_runs_p20260101": [
+                    {**run.model_dump(), "created_at": utc(2026, 1, 2)} for run in runs
+                ],
+                "workflow_runs_p20260108": [],
+                "workflow_step_results_p20260101": [
+                    {
+                        "run_uuid": runs[0].uuid,
+                        "step_name": "a",
+                        "status": "success",
+                        "started_at": "t",
+                    }
+                ],
+            },
+        )
+        archive = RunArchive(str(tmp_path))
+
+        with patch("app.archive.job.settings.ARCHIVE_BATCH_SIZE", 2), patch(
+            "app.archive.job.settings.ARCHIVE_AFTER_DAYS", 30
+        ), patch("app.archive.job.settings.RUN_PARTITION_DAYS", 7):
+            # Cutoff 2026-02-07: only the 01-01 period ended before it
+            archived = archive_runs(fake_engine(conn), archive, utc(2026, 2, 7))
+
+        assert archived == 5
+        assert conn.attached["workflow_runs"] == [
+            "workflow_runs_default",
+            "workflow_runs_p20260108",
+        ]
+        assert "workflow_runs_p20260101" not in conn.tables
+        assert "workflow_step_results_p20260101" not in conn.tables
+        assert len(archive._segments) == 3
+        # Non-terminal runs are archived too, and step results come along
+        assert archive.get(runs[4].uuid).status == WorkflowStatus.RUNNING
+        assert archive.get(runs[0].uuid).step_results["a"].status == "success"
+        assert not any(statement.startswith("DELETE") for statement in conn.statements)
+
+    def test_resumes_interrupted_period(self, tmp_path):
+        """Test tables detached by an earlier, interrupted pass are archived."""
+        run = make_run(1)
+        conn = FakeConnection(
+            attached={"workflow_runs": [], "workflow_step_results": []},
+            tables={
+                "workflow_runs_p20250102": [
+                    {**run.model_dump(), "created_at": utc(2025, 1, 3)}
+                ]
+            },
+        )
+        archive = RunArchive(str(tmp_path))
+
+        with patch("app.archive.job.settings.ARCHIVE_AFTER_DAYS", 30):
+            assert archive_runs(fake_engine(conn), archive, utc(2026, 2, 7)) == 1
+
+        assert archive.get(run.uuid) == run
+        assert conn.tables == {}
+
+    def test_archive_must_precede_retention(self):
+        """Test archiving after the retention period is rejected."""
+        with pytest.raises(ValidationError):
+            Settings(ARCHIVE_AFTER_DAYS=90, RUN_RETENTION_DAYS=30)
@@ -0,0 +1,685 @@
+"""
+Tests for the workflow execution engine (WorkflowService.execute_workflow).
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from app.connector.factory import ConnectorFactory
+from app.connector.kafka_publish_models import KafkaPublishConfig
+from app.connector.webhook import WebhookConnector
+from app.connector.webhook_models import WebhookResponse
+from app.schemas.common import StepStatus
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import WorkflowDefinition
+from app.services.workflow import WorkflowService
+from app.storage.enum import StorageType
+
+
+@pytest.fixture
+def service():
+    """Fixture to provide a WorkflowService backed by in-memory storage."""
+    return WorkflowService(StorageType.IN_MEMORY)
+
+
+def create_run(
+    service: WorkflowService,
+    steps: list[dict],
+    payload: dict | None = None,
+    **workflow_fields,
+) -> str:
+    """Create a workflow with the given steps and a pending run of it."""
+    workflow = WorkflowDefinition(name="Test Workflow", steps=steps, **workflow_fields)
+    service.create_workflow(workflow)
+    run = WorkflowRun(
+        workflow_id=workflow.uuid,
+        status=WorkflowStatus.PENDING,
+        payload=payload or {"user_id": "user123"},
+        started_at=datetime.now().isoformat(),
+    )
+    return service.create_workflow_run(run)
+
+
+class TestCancellation:
+    """Tests for run cancellation in the engine."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_marks_run_and_step(self, service):
+        """Test cancelling the executing task records CANCELLED on run and step."""
+        run_id = create_run(
+            service,
+            [
+                {"name": "wait", "type": "delay", "config": {"duration": 60}},
+                {"name": "after", "type": "delay", "config": {"duration": 0}},
+            ],
+        )
+
+        task = asyncio.create_task(service.execute_workflow(run_id))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.CANCELLED
+        assert run.step_results["wait"].status == StepStatus.CANCELLED
+        assert "after" not in run.step_results
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_is_not_executed(self, service):
+        """Test a run already marked CANCELLED executes no steps."""
+        run_id = create_run(
+            service, [{"name": "wait", "type": "delay", "config": {"duration": 0}}]
+        )
+        service.mark_run_cancelled(service.load_workflow_run(run_id))
+
+        await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.CANCELLED
+        assert run.step_results == {}
+
+
+class TestTimeouts:
+    """Tests for per-step timeouts and run deadlines."""
+
+    @pytest.mark.asyncio
+    async def test_step_timeout(self, service):
+        """Test a step exceeding its timeout is TIMED_OUT and stops the run."""
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "slow",
+                    "type": "delay",
+                    "config": {"duration": 5},
+                    "timeout": 0.05,
+                },
+                {"name": "after", "type": "delay", "config": {"duration": 0}},
+            ],
+        )
+
+        await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.TIMED_OUT
+        assert run.step_results["slow"].status == StepStatus.TIMED_OUT
+        assert "after" not in run.step_results
+
+    @pytest.mark.asyncio
+    async def test_run_deadline_caps_step_timeouts(self, service):
+        """Test the workflow deadline bounds the total run duration."""
+        run_id = create_run(
+            service,
+            [
+                {"name": "first", "type": "delay", "config": {"duration": 0}},
+                {
+                    "name": "second",
+                    "type": "delay",
+                    "config": {"duration": 5},
+                    "timeout": 60,
+                },
+            ],
+            deadline=0.05,
+        )
+
+        await asyncio.wait_for(service.execute_workflow(run_id), timeout=1)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.TIMED_OUT
+        assert run.step_results["first"].status == StepStatus.SUCCESS
+        assert run.step_results["second"].status == StepStatus.TIMED_OUT
+
+
+def map_step(concurrency: int = 10, **config) -> dict:
+    """A map step calling a webhook per item of payload.ids."""
+    return {
+        "name": "fan_out",
+        "type": "map",
+        "config": {
+            "items": "payload.ids",
+            "concurrency": concurrency,
+            "step": {
+                "name": "fetch",
+                "type": "webhook",
+                "config": {
+                    "url": "https://api.example.com/items/${item}",
+                    "method": "GET",
+                },
+            },
+            **config,
+        },
+    }
+
+
+class TestMapStep:
+    """Tests for the map (fan-out/fan-in) step."""
+
+    @pytest.mark.asyncio
+    async def test_ordered_results_with_bounded_parallelism(self, service):
+        """Test items run at most `concurrency` at a time, results in input order."""
+        active = 0
+        peak = 0
+
+        async def fake_execute(self, step, context, timeout=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Later items finish first
+            await asyncio.sleep(0.01 * (10 - context["index"]))
+            active -= 1
+            url = step.config.url.replace("${item}", str(context["item"]))
+            return WebhookResponse(
+                status_code=200,
+                response_data={"id": context["item"]},
+                url=url,
+                method="GET",
+            )
+
+        run_id = create_run(
+            service,
+            [map_step(concurrency=3, result_path="response_data.id")],
+            payload={"ids": list(range(10))},
+        )
+        with patch.object(WebhookConnector, "execute", fake_execute):
+            await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        output = run.step_results["fan_out"].output
+        assert run.status == WorkflowStatus.SUCCESS
+        assert output.results == list(range(10))
+        assert (output.count, output.succeeded, output.failed) == (10, 10, 0)
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_item_failure(self, service):
+        """Test a failed item fails the step unless allow_failures is set."""
+
+        async def fake_execute(self, step, context, timeout=None):
+            if context["item"] == 2:
+                raise ValueError("boom")
+            return WebhookResponse(
+                status_code=200, response_data=None, url="u", method="GET"
+            )
+
+        failing = create_run(service, [map_step()], payload={"ids": [1, 2, 3]})
+        tolerant = create_run(
+            service, [map_step(allow_failures=True)], payload={"ids": [1, 2, 3]}
+        )
+        with patch.object(WebhookConnector, "execute", fake_execute):
+            await service.execute_workflow(failing)
+            await service.execute_workflow(tolerant)
+
+        run = service.load_workflow_run(failing)
+        assert run.status == WorkflowStatus.FAILED
+        assert run.error == "Map item 1 failed: boom"
+
+        run = service.load_workflow_run(tolerant)
+        output = run.step_results["fan_out"].output
+        assert run.status == WorkflowStatus.SUCCESS
+        assert output.errors == {1: "boom"}
+        assert output.results[1] is None
+        assert output.results[0]["status_code"] == 200
+
+
+def create_workflow(service: WorkflowService, steps: list[dict]) -> str:
+    """Create a workflow with the given steps and return its UUID."""
+    workflow = WorkflowDefinition(name="Child Workflow", steps=steps)
+    return service.create_workflow(workflow)
+
+
+class TestSubworkflowStep:
+    """Tests for inline sub-workflow execution."""
+
+    @pytest.mark.asyncio
+    async def test_inline_child_outputs(self, service):
+        """Test the child runs in-process with the rendered payload, no run record."""
+        child_id = create_workflow(
+            service, [{"name": "pause", "type": "delay", "config": {"duration": 0}}]
+        )
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "child",
+                    "type": "subworkflow",
+                    "config": {
+                        "workflow_id": child_id,
+                        "payload": {"user": "${payload.user_id}"},
+                    },
+                },
+            ],
+        )
+
+        await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        output = run.step_results["child"].output
+        assert run.status == WorkflowStatus.SUCCESS
+        assert output.status == WorkflowStatus.SUCCESS
+        assert output.run_id is None
+        assert output.outputs["pause"]["message"] == "Delayed for 0 seconds"
+        assert len(service.list_runs()) == 1
+
+    @pytest.mark.asyncio
+    async def test_child_timeout_times_out_parent(self, service):
+        """Test a child step timeout surfaces as a TIMED_OUT parent step."""
+        child_id = create_workflow(
+            service,
+            [
+                {
+                    "name": "slow",
+                    "type": "delay",
+                    "config": {"duration": 5},
+                    "timeout": 0.05,
+                }
+            ],
+        )
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "child",
+                    "type": "subworkflow",
+                    "config": {"workflow_id": child_id},
+                }
+            ],
+        )
+
+        await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.TIMED_OUT
+        assert run.step_results["child"].status == StepStatus.TIMED_OUT
+        assert "step slow" in run.error
+
+    @pytest.mark.asyncio
+    async def test_recursion_is_rejected(self, service):
+        """Test a workflow calling itself fails instead of recursing."""
+        workflow_id = create_workflow(service, [])
+        workflow = service.load_workflow(workflow_id)
+        workflow.steps = WorkflowDefinition(
+            name="Self",
+            steps=[
+                {
+                    "name": "again",
+                    "type": "subworkflow",
+                    "config": {"workflow_id": workflow_id},
+                }
+            ],
+        ).steps
+        service.workflow_repository.update_workflow(workflow)
+        run_id = service.create_workflow_run(
+            WorkflowRun(
+                workflow_id=workflow_id,
+                status=WorkflowStatus.PENDING,
+                payload={},
+                started_at=datetime.now().isoformat(),
+            )
+        )
+
+        await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.FAILED
+        assert run.error.startswith("Recursive subworkflow")
+
+
+def switch_workflow() -> list[dict]:
+    """A switch routing on payload.amount to one of two steps, then a join step."""
+    return [
+        {
+            "name": "route",
+            "type": "switch",
+            "config": {
+                "cases": [{"when": "payload.amount > 100", "then": ["review"]}],
+                "default": ["approve"],
+            },
+        },
+        {"name": "review", "type": "delay", "config": {"duration": 0}},
+        {"name": "approve", "type": "delay", "config": {"duration": 0}},
+        {"name": "notify", "type": "delay", "config": {"duration": 0}},
+    ]
+
+
+class TestSwitchStep:
+    """Tests for conditional branching."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "amount, ran, skipped, case",
+        [(500, "review", "approve", 0), (20, "approve", "review", None)],
+    )
+    async def test_branch_selection(self, service, amount, ran, skipped, case):
+        """Test the chosen branch runs, the other is SKIPPED, unbranched steps run."""
+        run_id = create_run(service, switch_workflow(), payload={"amount": amount})
+
+        await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.SUCCESS
+        assert run.step_results["route"].output.case == case
+        assert run.step_results[ran].status == StepStatus.SUCCESS
+        assert run.step_results[skipped].status == StepStatus.SKIPPED
+        assert run.step_results["notify"].status == StepStatus.SUCCESS
+
+    def test_invalid_definitions_are_rejected(self):
+        """Test unsafe expressions and backward branch targets fail validation."""
+        steps = switch_workflow()
+        steps[0]["config"]["cases"][0]["when"] = "payload.__class__"
+        with pytest.raises(ValueError, match="Private attribute"):
+            WorkflowDefinition(name="Bad", steps=steps)
+
+        steps = switch_workflow()
+        steps[0]["config"]["cases"][0]["when"] = "payload['__class__']"
+        with pytest.raises(ValueError, match="Private key"):
+            WorkflowDefinition(name="Bad", steps=steps)
+
+        steps = switch_workflow()
+        steps[0]["config"]["default"] = ["route"]
+        with pytest.raises(ValueError, match="not a later step"):
+            WorkflowDefinition(name="Bad", steps=steps)
+
+    def test_expression_guards(self):
+        """Test runtime private keys and oversized repetition are refused."""
+        from app.connector.expression import MAX_REPEAT_LENGTH, compile_expression
+
+        assert (
+            compile_expression("payload.tag * 3")({"payload": {"tag": "ab"}})
+            == "ababab"
+        )
+        with pytest.raises(ValueError, match="Private key"):
+            compile_expression("payload[payload.key]")(
+                {"payload": {"key": "__class__"}}
+            )
+        with pytest.raises(ValueError, match="Repetition"):
+            compile_expression("'x' * payload.n")(
+                {"payload": {"n": MAX_REPEAT_LENGTH + 1}}
+            )
+        with pytest.raises(ValueError, match="Repetition"):
+            compile_expression("['x', 'y'] * 6000")({})
+        with pytest.raises(ValueError, match="String formatting"):
+            compile_expression("'%0999999999d' % 1")({})
+        assert compile_expression("payload.n % 3")({"payload": {"n": 7}}) == 1
+
+
+class TestTransformStep:
+    """Tests for the transform connector."""
+
+    ORDERS = [
+        {"id": "a", "total": 120, "region": "eu"},
+        {"id": "b", "total": 40, "region": "us"},
+        {"id": "c", "total": 300, "region": "us"},
+    ]
+
+    def transform_step(self, operations: list[dict]) -> dict:
+        return {
+            "name": "shape",
+            "type": "transform",
+            "config": {"input": "payload.orders", "operations": operations},
+        }
+
+    @pytest.mark.asyncio
+    async def test_pipeline(self, service):
+        """Test filter, sort and map stages with element-scoped expressions."""
+        run_id = create_run(
+            service,
+            [
+                self.transform_step(
+                    [
+                        {"op": "filter", "expr": "total > 100"},
+                        {"op": "sort", "expr": "total", "reverse": True},
+                        {"op": "map", "expr": "{'id': id, 'gross': total * 2}"},
+                    ]
+                )
+            ],
+            payload={"orders": self.ORDERS},
+        )
+
+        await service.execute_workflow(run_id)
+
+        output = service.load_workflow_run(run_id).step_results["shape"].output
+        assert output.result == [{"id": "c", "gross": 600}, {"id": "a", "gross": 240}]
+        assert output.offloaded is False
+
+    def test_offload_threshold_counts_serialized_bytes(self):
+        """Test inputs are sized by their JSON, stopping once past the threshold."""
+        import json
+
+        from app.connector.transform import _serialized_size
+
+        for data in (self.ORDERS, {"eu": self.ORDERS[:1], "us": []}, [], {}, "text"):
+            assert _serialized_size(data, 10_000) == len(
+                json.dumps(data, separators=(",", ":"))
+            )
+        # A few large elements weigh more than many small ones
+        assert _serialized_size(["x" * 5000] * 2, 10_000) > _serialized_size(
+            [0] * 1000, 10_000
+        )
+        assert _serialized_size([{"n": n} for n in range(100_000)], 100) < 200
+
+    @pytest.mark.asyncio
+    async def test_large_input_offloaded_to_process_pool(self, service):
+        """Test inputs over the threshold run in the process pool, same result."""
+        from app.connector import transform
+
+        run_id = create_run(
+            service,
+            [
+                self.transform_step(
+                    [
+                        {"op": "group_by", "expr": "region"},
+                    ]
+                ),
+                {
+                    "name": "total",
+                    "type": "transform",
+                    "config": {
+                        "input": "payload.orders",
+                        "operations": [
+                            {"op": "aggregate", "function": "sum", "expr": "total"}
+                        ],
+                    },
+                },
+            ],
+            payload={"orders": self.ORDERS},
+        )
+
+        with patch.object(
+            transform.settings, "TRANSFORM_OFFLOAD_MIN_BYTES", 100
+        ), patch.object(transform.settings, "TRANSFORM_POOL_WORKERS", 1):
+            try:
+                await service.execute_workflow(run_id)
+            finally:
+                transform.shutdown_transform_pool()
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.SUCCESS
+        grouped = run.step_results["shape"].output
+        assert grouped.offloaded is True
+        assert [order["id"] for order in grouped.result["us"]] == ["b", "c"]
+        assert run.step_results["total"].output.result == 460
+
+
+class TestPublishConnectors:
+    """Tests for the kafka_publish and redis connectors."""
+
+    @pytest.mark.asyncio
+    async def test_kafka_publish_batches_items(self, service):
+        """Test one templated message per item, sent as one batch by the producer."""
+        producer = AsyncMock()
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "notify",
+                    "type": "kafka_publish",
+                    "config": {
+                        "topic": "orders.${payload.region}",
+                        "key": "${item.id}",
+                        "value": {"order": "${item.id}", "user": "${payload.user_id}"},
+                        "items": "payload.orders",
+                    },
+                }
+            ],
+            payload={
+                "region": "eu",
+                "user_id": "u1",
+                "orders": [{"id": "a"}, {"id": "b"}],
+            },
+        )
+
+        ConnectorFactory.set_producer(producer)
+        try:
+            await service.execute_workflow(run_id)
+        finally:
+            ConnectorFactory.set_producer(None)
+
+        run = service.load_workflow_run(run_id)
+        assert run.step_results["notify"].output.count == 2
+        producer.send_many.assert_awaited_once_with(
+            "orders.eu",
+            [("a", {"order": "a", "user": "u1"}), ("b", {"order": "b", "user": "u1"})],
+        )
+
+    @pytest.mark.asyncio
+    async def test_redis_pipelines_commands(self, service):
+        """Test templated keys, JSON-encoded values and a single pipeline round-trip."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        client = MagicMock()
+        client.pipeline.return_value = pipe
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "store",
+                    "type": "redis",
+                    "config": {
+                        "command": "set",
+                        "key": "user:${payload.user_id}",
+                        "value": {"seen": True},
+                        "ttl": 60,
+                    },
+                }
+            ],
+        )
+
+        with patch(
+            "app.connector.redis_command.get_async_redis_client", return_value=client
+        ):
+            await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.SUCCESS
+        pipe.set.assert_called_once_with("steps:user:user123", '{"seen": true}', ex=60)
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_internal_topics_rejected(self, service):
+        """Test steps cannot publish to the service's topics, even once rendered."""
+        with pytest.raises(ValueError, match="internal topic"):
+            KafkaPublishConfig(topic="workflow.trigger.high", value={})
+
+        producer = AsyncMock()
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "inject",
+                    "type": "kafka_publish",
+                    "config": {"topic": "${payload.topic}", "value": {}},
+                }
+            ],
+            payload={"topic": "workflow.trigger"},
+        )
+
+        ConnectorFactory.set_producer(producer)
+        try:
+            await service.execute_workflow(run_id)
+        finally:
+            ConnectorFactory.set_producer(None)
+
+        assert service.load_workflow_run(run_id).status == WorkflowStatus.FAILED
+        producer.send.assert_not_awaited()
+
+
+class TestBlobOffload:
+    """Tests for moving large step outputs to the blob store."""
+
+    @pytest.mark.asyncio
+    async def test_large_output_stored_as_reference(self, service, tmp_path):
+        """Test outputs over the threshold are saved as blob references, resolvable."""
+        from app.blob.base import BlobRef
+        from app.blob.filesystem import FileBlobStore
+
+        service.blob_store = FileBlobStore(str(tmp_path))
+        run_id = create_run(
+            service,
+            [
+                {
+                    "name": "big",
+                    "type": "transform",
+                    "config": {
+                        "input": "payload.items",
+                        "operations": [{"op": "map", "expr": "{'n': n}"}],
+                    },
+                },
+                {
+                    "name": "small",
+                    "type": "transform",
+                    "config": {
+                        "input": "big.result",
+                        "operations": [{"op": "limit", "count": 1}],
+                    },
+                },
+            ],
+            payload={"items": [{"n": n} for n in range(100)]},
+        )
+
+        with patch("app.blob.offload.settings.BLOB_OFFLOAD_MIN_BYTES", 500):
+            await service.execute_workflow(run_id)
+
+        run = service.load_workflow_run(run_id)
+        assert run.status == WorkflowStatus.SUCCESS
+        ref = run.step_results["big"].output
+        assert isinstance(ref, BlobRef) and ref.output_type == "transform"
+        # Later steps saw the full output, not the reference
+        assert run.step_results["small"].output.result == [{"n": 0}]
+
+        service.resolve_outputs(run)
+        assert len(run.step_results["big"].output.result) == 100
+
+    def test_sweep_keeps_reused_blobs(self, tmp_path):
+        """Test the sweep deletes blobs unused since the cutoff, not re-stored ones."""
+        import os
+
+        from app.blob.filesystem import FileBlobStore
+
+        store = FileBlobStore(str(tmp_path))
+        old, reused = store.put(b"old"), store.put(b"reused")
+        for key in (old, reused):
+            os.utime(store._path(key), (1_000_000, 1_000_000))
+        store.put(b"reused")
+
+        assert store.delete_unused_since(datetime(2000, 1, 1)) == 1
+        assert store.get(old) is None
+        assert store.get(reused) == b"reused"
+
+    def test_blob_retention_must_cover_run_retention(self):
+        """Test sweeping blobs before their runs are dropped is rejected."""
+        from pydantic import ValidationError
+
+        from app.core.config import Settings
+
+        with pytest.raises(ValidationError):
+            Settings(BLOB_RETENTION_DAYS=30, RUN_RETENTION_DAYS=90)
+        assert (
+            Settings(BLOB_RETENTION_DAYS=90, RUN_RETENTION_DAYS=90).BLOB_RETENTION_DAYS
+            == 90
+        )
@@ -1,11 +1,21 @@
 """
 Tests for Kafka producer and consumer.
 """
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.messaging.kafka import KafkaProducer, KafkaConsumer
-from app.messaging.events import WorkflowTriggerEvent, WorkflowCompletedEvent
+from app.messaging.enum import BrokerType
+from app.messaging.events import WorkflowCompletedEvent
+from app.messaging.events import WorkflowTriggerEvent
+from app.messaging.factory import BrokerFactory
+from app.messaging.in_memory import InMemoryBroker
+from app.messaging.in_memory import InMemoryConsumer
+from app.messaging.in_memory import InMemoryProducer
+from app.messaging.kafka import KafkaConsumer
+from app.messaging.kafka import KafkaProducer
 
 
 class TestWorkflowTriggerEvent:
@@ -153,3 +163,160 @@ class TestKafkaConsumer:
                 mock_consumer.start.assert_called_once()
 
             mock_consumer.stop.assert_called_once()
+
+
+class TestInMemoryBroker:
+    """Tests for the in-process broker backend."""
+
+    @pytest.mark.asyncio
+    async def test_send_and_consume(self):
+        """Test messages sent by the producer reach the consumer handler."""
+        broker = InMemoryBroker()
+        producer = InMemoryProducer(broker=broker)
+        consumer = InMemoryConsumer(topic="test-topic", broker=broker)
+        received = []
+        done = asyncio.Event()
+
+        async def handler(message):
+            received.append(message)
+            if len(received) == 2:
+                done.set()
+
+        await consumer.start()
+        await producer.send("test-topic", {"n": 1}, key="a")
+        await producer.send("test-topic", {"n": 2}, key="b")
+
+        task = asyncio.create_task(consumer.consume(handler))
+        await asyncio.wait_for(done.wait(), timeout=1)
+        task.cancel()
+        await consumer.stop()
+
+        assert received == [{"n": 1}, {"n": 2}]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_topic_is_bounded(self):
+        """Test topics without consumers only keep the newest messages."""
+        broker = InMemoryBroker(max_queue_size=2)
+        producer = InMemoryProducer(broker=broker)
+        for n in range(5):
+            await producer.send("orphan-topic", {"n": n})
+
+        queue = broker.subscribe("orphan-topic")
+        assert [queue.get_nowait()[1]["n"] for _ in range(queue.qsize())] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_log_replays_unacknowledged_messages(self, tmp_path):
+        """Test logged messages that were never consumed survive a restart."""
+        broker = InMemoryBroker(log_dir=str(tmp_path))
+        producer = InMemoryProducer(broker=broker)
+        await producer.send("durable-topic", {"n": 1})
+        await producer.send("durable-topic", {"n": 2})
+        broker.close()
+
+        restarted = InMemoryBroker(log_dir=str(tmp_path))
+        queue = restarted.subscribe("durable-topic")
+        assert queue.qsize() == 2
+
+        restarted.ack("durable-topic", queue.get_nowait()[2])
+        restarted.close()
+
+        again = InMemoryBroker(log_dir=str(tmp_path))
+        queue = again.subscribe("durable-topic")
+        assert queue.get_nowait()[1] == {"n": 2}
+
+    @pytest.mark.asyncio
+    async def test_replay_waits_for_queue_space(self, tmp_path):
+        """Test a backlog larger than the queue is replayed in full as it drains."""
+        broker = InMemoryBroker(log_dir=str(tmp_path), max_queue_size=10)
+        producer = InMemoryProducer(broker=broker)
+        for n in range(5):
+            await producer.send("durable-topic", {"n": n})
+        broker.close()
+
+        restarted = InMemoryBroker(log_dir=str(tmp_path), max_queue_size=2)
+        queue = restarted.subscribe("durable-topic")
+        received = [
+            (await asyncio.wait_for(queue.get(), timeout=1))[1]["n"] for _ in range(5)
+        ]
+
+        assert received == [0, 1, 2, 3, 4]
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_log_compacted_below_committed_offset(self, tmp_path):
+        """Test acknowledged messages are dropped from the log, offsets survive it."""
+        broker = InMemoryBroker(log_dir=str(tmp_path))
+        producer = InMemoryProducer(broker=broker)
+        for n in range(6):
+            await producer.send("durable-topic", {"n": n})
+        queue = broker.subscribe("durable-topic")
+        with patch(
+            "app.messaging.in_memory.settings.IN_MEMORY_BROKER_COMMIT_INTERVAL", 2
+        ):
+            for _ in range(4):
+                broker.ack("durable-topic", queue.get_nowait()[2])
+        broker.close()
+
+        lines = (tmp_path / "durable-topic.log").read_text().splitlines()
+        assert lines[0] == '{"base": 4}' and len(lines) == 3
+        restarted = InMemoryBroker(log_dir=str(tmp_path))
+        queue = restarted.subscribe("durable-topic")
+        assert [queue.get_nowait()[1]["n"] for _ in range(queue.qsize())] == [4, 5]
+
+    @pytest.mark.asyncio
+    async def test_offset_commits_only_processed_prefix(self, tmp_path):
+        """Test out-of-order acks are not committed past an unfinished message."""
+        broker = InMemoryBroker(log_dir=str(tmp_path))
+        producer = InMemoryProducer(broker=broker)
+        for n in range(3):
+            await producer.send("durable-topic", {"n": n})
+        queue = broker.subscribe("durable-topic")
+        first, second, third = [queue.get_nowait() for _ in range(3)]
+        broker.ack("durable-topic", third[2])
+        broker.ack("durable-topic", second[2])
+        broker.close()
+
+        restarted = InMemoryBroker(log_dir=str(tmp_path))
+        queue = restarted.subscribe("durable-topic")
+        assert queue.qsize() == 3
+        for _ in range(3):
+            restarted.ack("durable-topic", queue.get_nowait()[2])
+        restarted.close()
+        assert (tmp_path / "durable-topic.offset").read_text() == "3"
+
+    @pytest.mark.asyncio
+    async def test_consume_with_ack_waits_for_handler_ack(self, tmp_path):
+        """Test a message consumed with manual acks is committed only once acked."""
+        broker = InMemoryBroker(log_dir=str(tmp_path))
+        producer = InMemoryProducer(broker=broker)
+        consumer = InMemoryConsumer(topic="durable-topic", broker=broker)
+        acks = []
+        received = asyncio.Event()
+
+        async def handler(message, ack):
+            acks.append(ack)
+            received.set()
+
+        await producer.send("durable-topic", {"n": 1})
+        task = asyncio.create_task(consumer.consume_with_ack(handler))
+        await asyncio.wait_for(received.wait(), timeout=1)
+        broker.commit("durable-topic")
+        assert not (tmp_path / "durable-topic.offset").exists()
+
+        acks[0]()
+        broker.commit("durable-topic")
+        task.cancel()
+        assert (tmp_path / "durable-topic.offset").read_text() == "1"
+
+    def test_factory_selects_backend(self):
+        """Test the factory returns the configured backend."""
+        assert isinstance(
+            BrokerFactory.create_producer(BrokerType.IN_MEMORY), InMemoryProducer
+        )
+        assert isinstance(
+            BrokerFactory.create_producer(BrokerType.KAFKA), KafkaProducer
+        )
+        consumer = BrokerFactory.create_consumer(
+            "test-topic", broker_type=BrokerType.IN_MEMORY
+        )
+        assert isinstance(consumer, InMemoryConsumer)
@@ -0,0 +1,142 @@
+"""
+Tests for run table partition maintenance.
+"""
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from app.db.partitions import create_partitions
+from app.db.partitions import expire_partitions
+from app.db.partitions import partition_start
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def mock_engine(partitions: list[str] = ()) -> tuple[MagicMock, MagicMock]:
+    """An engine whose connection lists the given partitions."""
+    engine = MagicMock()
+    conn = engine.begin.return_value.__enter__.return_value
+    conn.execute.return_value.scalars.return_value = partitions
+    return engine, conn
+
+
+def statements(conn: MagicMock) -> list[str]:
+    return [str(call.args[0]) for call in conn.execute.call_args_list]
+
+
+class TestPartitions:
+    """Tests for creating and expiring time-range partitions."""
+
+    def test_periods_aligned_to_epoch(self):
+        """Test every time in a period maps to the same start."""
+        with patch("app.db.partitions.settings.RUN_PARTITION_DAYS", 7):
+            # 1970-01-01 was a Thursday, so 7-day periods start on Thursdays
+            assert partition_start(utc(2026, 10, 15, 0, 0)) == utc(2026, 10, 15)
+            assert partition_start(utc(2026, 10, 21, 23, 59)) == utc(2026, 10, 15)
+            assert partition_start(utc(2026, 10, 22, 0, 0)) == utc(2026, 10, 22)
+
+    def test_creates_current_and_upcoming_partitions(self):
+        """Test both tables get a default partition and one per period ahead."""
+        engine, conn = mock_engine()
+        with patch("app.db.partitions.settings.RUN_PARTITION_DAYS", 7), patch(
+            "app.db.partitions.settings.RUN_PARTITIONS_AHEAD", 1
+        ):
+            names = create_partitions(engine, utc(2026, 10, 19))
+
+        assert names == [
+            "workflow_runs_default",
+            "workflow_runs_p20261015",
+            "workflow_runs_p20261022",
+            "workflow_step_results_default",
+            "workflow_step_results_p20261015",
+            "workflow_step_results_p20261022",
+        ]
+        executed = statements(conn)
+        assert executed[0] == "SELECT pg_advisory_xact_lock(:key)"
+        assert (
+            "CREATE TABLE workflow_runs_default PARTITION OF workflow_runs DEFAULT"
+            in executed
+        )
+        # Rows already in the default partition move to the new period
+        create = executed.index(
+            "CREATE TABLE workflow_runs_p20261015 "
+            "(LIKE workflow_runs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        assert executed[create + 1].startswith(
+            "WITH moved AS (DELETE FROM workflow_runs_default"
+        )
+        assert executed[create + 2] == (
+            "ALTER TABLE workflow_runs ATTACH PARTITION workflow_runs_p20261015 "
+            "FOR VALUES FROM ('2026-10-15T00:00:00+00:00') "
+            "TO ('2026-10-22T00:00:00+00:00')"
+        )
+
+    def test_existing_partitions_left_alone(self):
+        """Test periods that already have a partition issue no DDL."""
+        engine, conn = mock_engine(
+            [
+                "workflow_runs_default",
+                "workflow_runs_p20261015",
+                "workflow_runs_p20261022",
+            ]
+        )
+        with patch("app.db.partitions.settings.RUN_PARTITION_DAYS", 7), patch(
+            "app.db.partitions.settings.RUN_PARTITIONS_AHEAD", 1
+        ), patch("app.db.partitions.PARTITIONED_TABLES", ("workflow_runs",)):
+            names = create_partitions(engine, utc(2026, 10, 19))
+
+        assert names == []
+        assert not any(
+            statement.startswith(("CREATE", "ALTER")) for statement in statements(conn)
+        )
+
+    def test_expires_only_whole_periods_past_retention(self):
+        """Test partitions are dropped once their whole range is past retention."""
+        engine, conn = mock_engine(
+            [
+                "workflow_runs_default",
+                "workflow_runs_p20260702",
+                "workflow_runs_p20260709",
+                "legacy",
+            ]
+        )
+        with patch("app.db.partitions.settings.RUN_PARTITION_DAYS", 7), patch(
+            "app.db.partitions.settings.RUN_RETENTION_DAYS", 100
+        ), patch("app.db.partitions.settings.RUN_RETENTION_MODE", "drop"), patch(
+            "app.db.partitions.settings.ARCHIVE_AFTER_DAYS", None
+        ), patch(
+            "app.db.partitions.PARTITIONED_TABLES", ("workflow_runs",)
+        ):
+            # Cutoff 2026-07-11: the 07-02 period ended on 07-09, 07-09 ends on 07-16
+            removed = expire_partitions(engine, utc(2026, 10, 19))
+
+        assert removed == ["workflow_runs_p20260702"]
+        assert statements(conn)[-1] == "DROP TABLE workflow_runs_p20260702"
+
+    def test_detach_mode_keeps_table(self):
+        """Test detach mode detaches expired partitions instead of dropping them."""
+        engine, conn = mock_engine(["workflow_runs_p20250102"])
+        with patch("app.db.partitions.settings.RUN_RETENTION_MODE", "detach"), patch(
+            "app.db.partitions.settings.ARCHIVE_AFTER_DAYS", None
+        ), patch("app.db.partitions.PARTITIONED_TABLES", ("workflow_runs",)):
+            expire_partitions(engine, utc(2026, 10, 19))
+
+        assert (
+            statements(conn)[-1]
+            == "ALTER TABLE workflow_runs DETACH PARTITION workflow_runs_p20250102"
+        )
+
+    def test_unarchived_partitions_kept_when_archiving(self):
+        """Test retention never drops a partition while archival is enabled."""
+        engine, conn = mock_engine(["workflow_runs_p20250102"])
+        with patch("app.db.partitions.settings.ARCHIVE_AFTER_DAYS", 30), patch(
+            "app.db.partitions.PARTITIONED_TABLES", ("workflow_runs",)
+        ):
+            assert expire_partitions(engine, utc(2026, 10, 19)) == []
+
+        assert not any(
+            statement.startswith(("DROP", "ALTER")) for statement in statements(conn)
+        )
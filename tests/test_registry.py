@@ -0,0 +1,96 @@
+"""
+Tests for the connector registry.
+"""
+import subprocess
+import sys
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from app.connector.delay import DelayConnector
+from app.connector.delay_models import DelayOutput
+from app.connector.delay_models import DelayWorkflowStep
+from app.connector.registry import BUILTIN_CONNECTORS
+from app.connector.registry import ConnectorRegistry
+from app.connector.registry import ConnectorSpec
+
+DELAY_SPEC = ConnectorSpec(
+    type="delay",
+    connector="app.connector.delay:DelayConnector",
+    step="app.connector.delay_models:DelayWorkflowStep",
+    output="app.connector.delay_models:DelayOutput",
+)
+
+
+class TestConnectorRegistry:
+    """Tests for connector lookup, lazy creation and plugins."""
+
+    def test_connector_created_on_first_use(self):
+        """Test a connector is only instantiated when first requested, then reused."""
+        registry = ConnectorRegistry(BUILTIN_CONNECTORS, load_plugins=False)
+
+        assert not registry.is_loaded("delay")
+        connector = registry.get("delay")
+
+        assert isinstance(connector, DelayConnector)
+        assert registry.is_loaded("delay")
+        assert registry.get("delay") is connector
+
+    def test_unknown_type(self):
+        """Test an unregistered type raises ValueError."""
+        registry = ConnectorRegistry(BUILTIN_CONNECTORS, load_plugins=False)
+        with pytest.raises(ValueError, match="Unknown connector type"):
+            registry.get("nope")
+
+    def test_duplicate_type_rejected(self):
+        """Test a type cannot be registered twice."""
+        registry = ConnectorRegistry([DELAY_SPEC], load_plugins=False)
+        with pytest.raises(ValueError, match="already registered"):
+            registry.register(DELAY_SPEC)
+
+    def test_type_must_match_step_model(self):
+        """Test a spec whose type differs from its step model's literal is rejected."""
+        registry = ConnectorRegistry(load_plugins=False)
+        with pytest.raises(ValueError, match="does not match"):
+            registry.register(
+                ConnectorSpec(
+                    type="pause",
+                    connector=DELAY_SPEC.connector,
+                    step=DELAY_SPEC.step,
+                    output=DELAY_SPEC.output,
+                )
+            )
+
+    def test_schemas_do_not_import_connectors(self):
+        """Test building the workflow schemas leaves built-in connectors unimported."""
+        code = (
+            "import sys\n"
+            "import app.schemas.workflow\n"
+            "from app.connector.registry import BUILTIN_CONNECTORS\n"
+            "modules = [s.connector.partition(':')[0] for s in BUILTIN_CONNECTORS]\n"
+            "print([module for module in modules if module in sys.modules])\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "[]"
+
+    def test_entry_point_plugins(self):
+        """Test specs from entry points are registered and broken plugins skipped."""
+        plugin = MagicMock()
+        plugin.name = "delay"
+        plugin.load.return_value = DELAY_SPEC
+        broken = MagicMock()
+        broken.name = "broken"
+        broken.load.side_effect = ImportError("missing dependency")
+
+        with patch(
+            "app.connector.registry.entry_points", return_value=[plugin, broken]
+        ) as eps:
+            registry = ConnectorRegistry()
+
+        eps.assert_called_once_with(group="workflow_automation.connectors")
+        assert registry.step_models() == [DelayWorkflowStep]
+        assert registry.output_models() == [DelayOutput]
+        assert not registry.is_loaded("delay")
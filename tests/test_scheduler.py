@@ -0,0 +1,219 @@
+"""
+Tests for cron parsing and the scheduler service.
+"""
+import time
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from app.scheduler.cron import CronExpression
+from app.scheduler.main import scheduled_run_id
+from app.scheduler.main import SchedulerService
+from app.schemas.common import Priority
+from app.schemas.common import WorkflowStatus
+from app.schemas.schedule import WorkflowSchedule
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def scheduler():
+    """A scheduler with mocked broker and storage."""
+    with patch(
+        "app.scheduler.main.BrokerFactory.create_consumer"
+    ) as mock_consumer_class, patch(
+        "app.scheduler.main.BrokerFactory.create_producer"
+    ) as mock_producer_class, patch(
+        "app.scheduler.main.WorkflowService"
+    ) as mock_service_class:
+        mock_consumer_class.return_value = AsyncMock()
+        mock_producer_class.return_value = AsyncMock()
+        mock_service = MagicMock()
+        mock_service.load_workflow.return_value = MagicMock(max_concurrency=None)
+        stored = {}
+
+        def create_missing(runs):
+            created = [run for run in runs if run.uuid not in stored]
+            stored.update((run.uuid, run.model_copy()) for run in created)
+            return [run.uuid for run in created]
+
+        mock_service.create_missing_workflow_runs.side_effect = create_missing
+        mock_service.load_workflow_run.side_effect = stored.get
+        mock_service_class.return_value = mock_service
+        yield SchedulerService()
+
+
+class TestCronExpression:
+    """Tests for CronExpression."""
+
+    def test_next_after_steps_and_ranges(self):
+        """Test step and range fields resolve to the next matching minute."""
+        cron = CronExpression.parse("*/15 9-17 * * *")
+        assert cron.next_after(utc(2026, 1, 5, 9, 7)) == utc(2026, 1, 5, 9, 15)
+        assert cron.next_after(utc(2026, 1, 5, 17, 45)) == utc(2026, 1, 6, 9, 0)
+
+    def test_next_after_day_or_weekday(self):
+        """Test restricted day-of-month and day-of-week match either (Vixie cron)."""
+        cron = CronExpression.parse("0 0 13 * 5")
+        # 2026-01-02 is a Friday, before the 13th
+        assert cron.next_after(utc(2026, 1, 1, 12, 0)) == utc(2026, 1, 2, 0, 0)
+
+    def test_invalid_expression(self):
+        """Test malformed expressions are rejected."""
+        with pytest.raises(ValueError):
+            CronExpression.parse("61 * * * *")
+        with pytest.raises(ValueError):
+            WorkflowSchedule(workflow_id="wf", cron="* * *")
+
+
+class TestSchedulerService:
+    """Tests for SchedulerService."""
+
+    def test_pop_due_orders_and_advances(self, scheduler):
+        """Test due schedules come out in fire order and are re-armed."""
+        hourly = WorkflowSchedule(uuid="hourly", workflow_id="wf", cron="@hourly")
+        minutely = WorkflowSchedule(uuid="minutely", workflow_id="wf", cron="* * * * *")
+        scheduler.load([hourly, minutely], after=utc(2026, 1, 1, 0, 58, 30))
+
+        due = scheduler.pop_due(utc(2026, 1, 1, 1, 0), limit=10)
+
+        assert [(s.uuid, t) for s, t in due] == [
+            ("minutely", utc(2026, 1, 1, 0, 59)),
+            ("hourly", utc(2026, 1, 1, 1, 0)),
+            ("minutely", utc(2026, 1, 1, 1, 0)),
+        ]
+        assert scheduler.next_fire_time() == utc(2026, 1, 1, 1, 1)
+
+    def test_removed_and_disabled_schedules_never_fire(self, scheduler):
+        """Test removal invalidates heap entries lazily, disabled schedules skipped."""
+        scheduler.load(
+            [
+                WorkflowSchedule(uuid="a", workflow_id="wf", cron="* * * * *"),
+                WorkflowSchedule(
+                    uuid="b", workflow_id="wf", cron="* * * * *", enabled=False
+                ),
+            ],
+            after=utc(2026, 1, 1, 0, 0),
+        )
+        scheduler.remove("a")
+
+        assert scheduler.pop_due(utc(2026, 1, 1, 0, 5), limit=10) == []
+        assert scheduler.next_fire_time() is None
+
+    @pytest.mark.asyncio
+    async def test_fire_bulk_inserts_and_publishes_per_lane(self, scheduler):
+        """Test one bulk insert and one batched publish per priority lane."""
+        fire_at = utc(2026, 1, 1, 0, 0)
+        due = [
+            (WorkflowSchedule(uuid="a", workflow_id="wf", cron="@daily"), fire_at),
+            (WorkflowSchedule(uuid="b", workflow_id="wf", cron="@daily"), fire_at),
+            (
+                WorkflowSchedule(
+                    uuid="c", workflow_id="wf", cron="@daily", priority=Priority.HIGH
+                ),
+                fire_at,
+            ),
+        ]
+
+        assert await scheduler.fire(due) == 3
+
+        service = scheduler._workflow_service
+        service.create_missing_workflow_runs.assert_called_once()
+        assert service.load_workflow.call_count == 1
+        sent = {
+            call.args[0]: [key for key, _ in call.args[1]]
+            for call in scheduler._producer.send_many.call_args_list
+        }
+        assert sent == {
+            "workflow.trigger": [
+                scheduled_run_id("a", fire_at),
+                scheduled_run_id("b", fire_at),
+            ],
+            "workflow.trigger.high": [scheduled_run_id("c", fire_at)],
+        }
+
+    @pytest.mark.asyncio
+    async def test_replayed_fires_create_no_duplicates(self, scheduler):
+        """Test replayed fires reuse their runs and only re-trigger pending ones."""
+        fire_at = utc(2026, 1, 1, 0, 0)
+        due = [
+            (WorkflowSchedule(uuid="a", workflow_id="wf", cron="@daily"), fire_at),
+            (WorkflowSchedule(uuid="b", workflow_id="wf", cron="@daily"), fire_at),
+        ]
+        assert await scheduler.fire(due) == 2
+        service = scheduler._workflow_service
+        service.load_workflow_run(
+            scheduled_run_id("a", fire_at)
+        ).status = WorkflowStatus.RUNNING
+        scheduler._producer.send_many.reset_mock()
+
+        assert await scheduler.fire(due) == 0
+
+        sent = [
+            key
+            for call in scheduler._producer.send_many.call_args_list
+            for key, _ in call.args[1]
+        ]
+        assert sent == [scheduled_run_id("b", fire_at)]
+
+    @pytest.mark.asyncio
+    async def test_maintenance_stops_when_lease_lost(self, scheduler):
+        """Test archival stops between batches once the lease is lost, none expire."""
+        redis = AsyncMock()
+        redis.eval.return_value = 0
+        batches = []
+
+        def archive(engine, archive, now, keep_going):
+            while keep_going() and len(batches) < 100:
+                batches.append(now)
+                time.sleep(0.01)
+
+        with patch(
+            "app.scheduler.main.get_async_redis_client", return_value=redis
+        ), patch(
+            "app.scheduler.main.settings.SCHEDULER_LEADER_TTL_SECONDS", 0.06
+        ), patch(
+            "app.scheduler.main.create_partitions"
+        ), patch(
+            "app.scheduler.main.get_run_archive"
+        ), patch(
+            "app.scheduler.main.archive_runs", side_effect=archive
+        ), patch(
+            "app.scheduler.main.expire_partitions"
+        ) as expire:
+            await scheduler._maintain(utc(2026, 1, 1))
+
+        assert 0 < len(batches) < 100
+        expire.assert_not_called()
+        # A lost lease is not extended to the maintenance interval
+        assert redis.eval.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_maintenance_holds_lease_until_next_run(self, scheduler):
+        """Test completed maintenance keeps the lease for the maintenance interval."""
+        redis = AsyncMock()
+        redis.eval.return_value = 1
+
+        with patch(
+            "app.scheduler.main.get_async_redis_client", return_value=redis
+        ), patch(
+            "app.scheduler.main.settings.RUN_PARTITION_MAINTENANCE_SECONDS", 3600
+        ), patch(
+            "app.scheduler.main.create_partitions"
+        ), patch(
+            "app.scheduler.main.get_run_archive"
+        ), patch(
+            "app.scheduler.main.archive_runs"
+        ), patch(
+            "app.scheduler.main.expire_partitions"
+        ) as expire:
+            await scheduler._maintain(utc(2026, 1, 1))
+
+        expire.assert_called_once()
+        assert redis.eval.await_args.args[-1] == 3_600_000
@@ -0,0 +1,141 @@
+"""
+Tests for the CachedStorage decorator.
+"""
+import pytest
+
+from app.core.config import settings
+from app.schemas.common import StepStatus
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import StepResult
+from app.storage import cached_storage
+from app.storage.cached_storage import CachedStorage
+from app.storage.durability import Durability
+from app.storage.enum import StorageType
+from app.storage.factory import StorageFactory
+from app.storage.in_memory import InMemoryStorage
+
+
+@pytest.fixture(autouse=True)
+def fake_cache(monkeypatch):
+    """Keep cached values in a dict instead of Redis."""
+    values = {}
+    monkeypatch.setattr(cached_storage, "cache_get", lambda key: values.get(key))
+    monkeypatch.setattr(
+        cached_storage,
+        "cache_set",
+        lambda key, value, ttl: values.__setitem__(key, value),
+    )
+    monkeypatch.setattr(
+        cached_storage, "cache_delete", lambda key: values.pop(key, None)
+    )
+    monkeypatch.setattr(
+        cached_storage,
+        "cache_delete_many",
+        lambda keys: [values.pop(key, None) for key in keys],
+    )
+    return values
+
+
+def _run(status=WorkflowStatus.RUNNING):
+    return WorkflowRun(
+        workflow_id="wf",
+        status=status,
+        payload={"key": "value"},
+        started_at="2024-01-01T10:00:00Z",
+        step_results={
+            "wait": StepResult(
+                step_name="wait",
+                status=StepStatus.SUCCESS,
+                started_at="2024-01-01T10:00:00Z",
+                output={"type": "delay", "duration": 1, "message": "waited"},
+            )
+        },
+    )
+
+
+class TestCachedStorage:
+    """Tests for CachedStorage."""
+
+    def test_read_through(self, fake_cache):
+        """Test that a miss is loaded from the backend and later reads hit the cache."""
+        backend = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        uuid = backend.create(_run())
+        storage = CachedStorage(backend)
+
+        assert storage.get(uuid).step_results["wait"].output.duration == 1
+        assert f"storage:run:{uuid}" in fake_cache
+        backend.delete(uuid)
+        assert storage.get(uuid) is not None
+
+    def test_write_through_and_invalidation(self, fake_cache):
+        """Test that updates refresh the cached copy and deletes drop it."""
+        storage = CachedStorage(InMemoryStorage[WorkflowRun](t_type=WorkflowRun))
+        run = _run()
+        uuid = storage.create(run)
+
+        run.status = WorkflowStatus.SUCCESS
+        assert storage.update(run) is True
+        assert fake_cache[f"storage:run:{uuid}"]["status"] == "success"
+
+        assert storage.delete(uuid) is True
+        assert f"storage:run:{uuid}" not in fake_cache
+        assert storage.get(uuid) is None
+
+    def test_write_behind_queues_active_runs(self, fake_cache):
+        """Test that active run updates are queued and finished ones written through."""
+        backend = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        storage = CachedStorage(backend, write_behind=True)
+        run = _run(WorkflowStatus.PENDING)
+        uuid = storage.create(run)
+
+        # The in-memory backend keeps the created object, so update copies
+        run = run.model_copy(update={"status": WorkflowStatus.RUNNING})
+        assert storage.update(run) is True
+        assert backend.get(uuid).status == WorkflowStatus.PENDING
+        assert storage.get(uuid).status == WorkflowStatus.RUNNING
+
+        storage.flush()
+        assert backend.get(uuid).status == WorkflowStatus.RUNNING
+
+        storage.update(run.model_copy(update={"status": WorkflowStatus.SUCCESS}))
+        assert backend.get(uuid).status == WorkflowStatus.SUCCESS
+        assert storage._pending == {}
+
+    def test_write_behind_drops_missing_runs(self, fake_cache, monkeypatch):
+        """Test that queueing skips the cache and a missing run is dropped on flush."""
+        backend = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        storage = CachedStorage(backend, write_behind=True)
+        run = _run()
+        run.uuid = "missing"
+        monkeypatch.setattr(cached_storage, "cache_get", pytest.fail)
+
+        assert storage.update(run) is True
+        storage.flush()
+        assert backend.get("missing") is None
+        assert "storage:run:missing" not in fake_cache
+
+    def test_durable_update_skips_write_behind(self, fake_cache):
+        """Test that an update with a durability level is always written through."""
+        backend = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        storage = CachedStorage(backend, write_behind=True)
+        run = _run(WorkflowStatus.PENDING)
+        uuid = storage.create(run)
+        storage.update(run.model_copy(update={"status": WorkflowStatus.RUNNING}))
+
+        storage.update(
+            run.model_copy(update={"step_results": {}}), Durability.IMMEDIATE
+        )
+        assert backend.get(uuid).step_results == {}
+        assert storage._pending == {}
+
+    def test_factory_wraps_configured_backends(self, monkeypatch):
+        """Test that StorageFactory.create caches only STORAGE_CACHE_BACKENDS."""
+        assert isinstance(
+            StorageFactory.create(StorageType.IN_MEMORY, WorkflowRun), InMemoryStorage
+        )
+
+        monkeypatch.setattr(settings, "STORAGE_CACHE_BACKENDS", ["in_memory"])
+        storage = StorageFactory.create(StorageType.IN_MEMORY, WorkflowRun)
+        assert isinstance(storage, CachedStorage)
+        assert storage.ttl == settings.STORAGE_CACHE_TTL_SECONDS["run"]
@@ -1,10 +1,19 @@
 # Unit tests for FileSystem storage backend
+import os
+import threading
+import time
+
 import pytest
 
-from app.schemas.workflow import WorkflowDefinition
-from app.schemas.run import WorkflowRun
+from app.core.config import settings
 from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import WorkflowDefinition
+from app.storage.durability import atomic_write
+from app.storage.durability import Durability
 from app.storage.file_storage import FileStorage
+from app.storage.log_store import INDEX_FILE
+from app.storage.log_store import LogStore
 
 
 @pytest.fixture
@@ -96,3 +105,185 @@ class TestFileSystemStorage:
 
         assert uuid is not None
         assert sample_workflow_run.uuid == uuid
+
+    def test_update_with_durability(self, sample_workflow_run):
+        """Test that an update can ask for a sync the storage default would skip."""
+        storage = FileStorage[WorkflowRun](
+            t_type=WorkflowRun, durability=Durability.NONE
+        )
+        storage.create(sample_workflow_run)
+        fsyncs = storage.store._writer.fsyncs
+
+        sample_workflow_run.status = WorkflowStatus.SUCCESS
+        assert storage.update(sample_workflow_run, Durability.IMMEDIATE) is True
+        assert storage.store._writer.fsyncs > fsyncs
+
+    def test_create_missing_skips_stored_items(self, sample_workflow_run):
+        """Test that items with preset UUIDs are created once, even when replayed."""
+        storage = FileStorage[WorkflowRun](t_type=WorkflowRun)
+        replayed = sample_workflow_run.model_copy(update={"uuid": "run-0"})
+        fresh = sample_workflow_run.model_copy(update={"uuid": "run-1"})
+
+        assert storage.create_missing([replayed]) == ["run-0"]
+        assert storage.create_missing([replayed, fresh, fresh]) == ["run-1"]
+        assert storage.get("run-1") is not None
+
+    def test_update_missing_workflow(self, sample_workflow_definition):
+        """Test updating a workflow that was never created."""
+        storage = FileStorage[WorkflowDefinition](t_type=WorkflowDefinition)
+        sample_workflow_definition.uuid = "missing"
+
+        assert storage.update(sample_workflow_definition) is False
+
+
+class TestLogStore:
+    """Test suite for the log-structured store behind FileStorage."""
+
+    def test_reopen_recovers_index(self, tmp_path):
+        """Test that a reopened store loads its saved index and replays the tail."""
+        store = LogStore(tmp_path)
+        store.put("a", b"1")
+        store.put("b", b"2")
+        store.save_index()
+        store.put("a", b"3")
+        store.delete("b")
+        store.put("c", b"4")
+        store.close()
+
+        reopened = LogStore(tmp_path)
+        assert reopened.keys() == ["a", "c"]
+        assert reopened.get("a") == b"3"
+        assert reopened.get("b") is None
+        reopened.close()
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        """Test that a partially written record is dropped on open."""
+        store = LogStore(tmp_path)
+        store.put("a", b"1")
+        store.close()
+        (tmp_path / INDEX_FILE).unlink()
+        with open(tmp_path / "segment-000001.log", "ab") as file:
+            file.write(b"\x00\x01\x02")
+
+        reopened = LogStore(tmp_path)
+        reopened.put("b", b"2")
+        assert reopened.get("a") == b"1"
+        reopened.close()
+
+        assert LogStore(tmp_path).get("b") == b"2"
+
+    def test_compaction_keeps_live_records(self, tmp_path, monkeypatch):
+        """Test that compaction drops overwritten and deleted records."""
+        monkeypatch.setattr(settings, "FILE_STORAGE_SEGMENT_BYTES", 64)
+        store = LogStore(tmp_path)
+        for i in range(20):
+            store.put("a", f"value-{i}".encode())
+        store.put("b", b"kept")
+        store.put("c", b"deleted")
+        store.delete("c")
+        size = sum(path.stat().st_size for path in tmp_path.glob("segment-*.log"))
+        assert store.needs_compaction()
+
+        store.compact()
+        store.put("d", b"after")
+        assert (
+            sum(path.stat().st_size for path in tmp_path.glob("segment-*.log")) < size
+        )
+        assert [store.get(key) for key in ("a", "b", "c", "d")] == [
+            b"value-19",
+            b"kept",
+            None,
+            b"after",
+        ]
+        store.close()
+
+        reopened = LogStore(tmp_path)
+        assert reopened.keys() == ["a", "b", "d"]
+        assert reopened.get("a") == b"value-19"
+        reopened.close()
+
+    def test_compacted_small_values_stay_compacted(self, tmp_path, monkeypatch):
+        """Test that record headers and keys count as live, so compaction settles."""
+        monkeypatch.setattr(settings, "FILE_STORAGE_SEGMENT_BYTES", 256)
+        store = LogStore(tmp_path)
+        for i in range(50):
+            store.put(f"key-{i}", b"x" * 4)
+        store.put("key-0", b"y" * 4)
+        store.compact()
+
+        assert not store.needs_compaction()
+        store.close()
+        reopened = LogStore(tmp_path)
+        assert not reopened.needs_compaction()
+        reopened.close()
+
+    def test_interrupted_compaction_is_completed(self, tmp_path, monkeypatch):
+        """Test that a synced merged segment replaces the segments it covers on open."""
+        monkeypatch.setattr(settings, "FILE_STORAGE_SEGMENT_BYTES", 1)
+        store = LogStore(tmp_path)
+        store.put("a", b"old")
+        store.put("a", b"new")
+        store.put("b", b"x")
+        store.close()
+        (tmp_path / "segment-000002.log").rename(tmp_path / "segment-000002.merged")
+
+        reopened = LogStore(tmp_path)
+        assert reopened.get("a") == b"new"
+        assert not (tmp_path / "segment-000001.log").exists()
+        reopened.close()
+
+    def test_second_open_is_refused(self, tmp_path):
+        """Test that a store cannot be opened again until it is closed."""
+        store = LogStore(tmp_path)
+        with pytest.raises(RuntimeError, match="already open"):
+            LogStore(tmp_path)
+        store.close()
+
+        LogStore(tmp_path).close()
+
+
+class TestDurability:
+    """Test suite for atomic writes and group commit."""
+
+    def test_atomic_write_replaces_file(self, tmp_path):
+        """Test that atomic_write replaces content and leaves no temp file."""
+        path = tmp_path / "index.bin"
+        path.write_bytes(b"old")
+        atomic_write(path, b"new")
+
+        assert path.read_bytes() == b"new"
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_immediate_writes_share_fsyncs(self, tmp_path, monkeypatch):
+        """Test that concurrent immediate writes are group-committed."""
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.01)
+            fsync(fd)
+
+        store = LogStore(tmp_path, durability=Durability.IMMEDIATE)
+        monkeypatch.setattr(os, "fsync", slow_fsync)
+        threads = [
+            threading.Thread(target=store.put, args=(f"k{i}", b"v")) for i in range(32)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(store) == 32
+        assert store._writer.fsyncs < 32
+        store.close()
+
+    def test_none_durability_is_not_flushed(self, tmp_path):
+        """Test that the background flush skips writes with durability NONE."""
+        store = LogStore(tmp_path)
+        store.put("a", b"1", Durability.NONE)
+        time.sleep(3 * settings.FILE_STORAGE_GROUP_COMMIT_MS / 1000)
+        assert store._writer.fsyncs == 0
+
+        store.put("b", b"2", Durability.BATCHED)
+        time.sleep(3 * settings.FILE_STORAGE_GROUP_COMMIT_MS / 1000)
+        assert store._writer.fsyncs == 1
+        store.close()
@@ -1,9 +1,9 @@
 # Unit tests for InMemory storage backend
 import pytest
 
-from app.schemas.workflow import WorkflowDefinition
-from app.schemas.run import WorkflowRun
 from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import WorkflowDefinition
 from app.storage.in_memory import InMemoryStorage
 
 
@@ -96,3 +96,133 @@ class TestInMemoryStorage:
 
         assert uuid is not None
         assert sample_workflow_run.uuid == uuid
+
+
+def _runs(count):
+    return [
+        WorkflowRun(
+            workflow_id=f"wf{i}",
+            status=WorkflowStatus.PENDING,
+            payload={},
+            started_at="2024-01-01T10:00:00Z",
+        )
+        for i in range(count)
+    ]
+
+
+class TestBoundedInMemoryStorage:
+    """Test suite for pagination, eviction and snapshots of InMemoryStorage."""
+
+    def test_paginate_in_insertion_order(self):
+        """Test that cursors walk items in insertion order, skipping deleted ones."""
+        storage = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        uuids = [storage.create(run) for run in _runs(8)]
+        storage.delete(uuids[3])
+
+        first, cursor = storage.list_paginated(limit=3)
+        second, cursor2 = storage.list_paginated(limit=3, cursor=cursor)
+        third, cursor3 = storage.list_paginated(limit=3, cursor=cursor2)
+
+        assert [run.uuid for run in first + second + third] == uuids[:3] + uuids[4:]
+        assert cursor3 is None
+
+    def test_lru_eviction_by_entries(self):
+        """Test that the least recently used item is evicted past max_entries."""
+        storage = InMemoryStorage[WorkflowRun](t_type=WorkflowRun, max_entries=2)
+        first, second, third = _runs(3)
+        storage.create(first)
+        storage.create(second)
+        storage.get(first.uuid)
+        storage.create(third)
+
+        assert storage.get(second.uuid) is None
+        assert [run.uuid for run in storage.list_all()] == [first.uuid, third.uuid]
+
+    def test_eviction_by_bytes(self):
+        """Test that items are evicted to stay under max_bytes."""
+        runs = _runs(3)
+        size = len(runs[0].model_copy(update={"uuid": "0" * 32}).model_dump_json())
+        storage = InMemoryStorage[WorkflowRun](
+            t_type=WorkflowRun, max_bytes=2 * size + 10
+        )
+        for run in runs:
+            storage.create(run)
+
+        assert len(storage.list_all()) == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Test that items expire ttl_seconds after their last write."""
+        now = [1000.0]
+        monkeypatch.setattr("app.storage.in_memory.time.monotonic", lambda: now[0])
+        storage = InMemoryStorage[WorkflowRun](t_type=WorkflowRun, ttl_seconds=10)
+        old, fresh = _runs(2)
+        storage.create(old)
+        now[0] += 5
+        storage.create(fresh)
+        now[0] += 6
+
+        assert storage.get(old.uuid) is None
+        assert storage.get(fresh.uuid) is not None
+
+    def test_snapshot_warm_start(self, tmp_path):
+        """Test that a new storage reloads the snapshot of a previous one."""
+        storage = InMemoryStorage[WorkflowRun](
+            t_type=WorkflowRun, snapshot_path=str(tmp_path)
+        )
+        uuids = [storage.create(run) for run in _runs(3)]
+        storage.snapshot()
+
+        restored = InMemoryStorage[WorkflowRun](
+            t_type=WorkflowRun, snapshot_path=str(tmp_path)
+        )
+        assert [run.uuid for run in restored.list_all()] == uuids
+
+    def test_paginate_after_compaction(self):
+        """Test that deleting most items compacts the order and keeps pages correct."""
+        storage = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        uuids = [storage.create(run) for run in _runs(10)]
+        for uuid in uuids[:7]:
+            storage.delete(uuid)
+
+        page, cursor = storage.list_paginated(limit=2)
+        rest, _ = storage.list_paginated(limit=2, cursor=cursor)
+
+        assert len(storage._order) < 10
+        assert [run.uuid for run in page + rest] == uuids[7:]
+
+    def test_invalid_cursor(self):
+        """Test that a cursor not issued by the storage is rejected."""
+        storage = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            storage.list_paginated(cursor="not-a-cursor")
+
+    def test_exit_snapshot_by_latest_storage(self, tmp_path):
+        """Test that at exit only the storage created last writes a snapshot file."""
+        from app.storage.in_memory import snapshot_all
+
+        stale = InMemoryStorage[WorkflowRun](
+            t_type=WorkflowRun, snapshot_path=str(tmp_path)
+        )
+        stale.create(_runs(1)[0])
+        latest = InMemoryStorage[WorkflowRun](
+            t_type=WorkflowRun, snapshot_path=str(tmp_path)
+        )
+        uuid = latest.create(_runs(1)[0])
+        snapshot_all()
+
+        restored = InMemoryStorage[WorkflowRun](
+            t_type=WorkflowRun, snapshot_path=str(tmp_path)
+        )
+        assert [run.uuid for run in restored.list_all()] == [uuid]
+
+    def test_create_missing_skips_stored_items(self):
+        """Test that items with preset UUIDs are created once, even when replayed."""
+        storage = InMemoryStorage[WorkflowRun](t_type=WorkflowRun)
+        runs = _runs(2)
+        for index, run in enumerate(runs):
+            run.uuid = f"run-{index}"
+
+        assert storage.create_missing(runs[:1]) == ["run-0"]
+        assert storage.create_missing(runs) == ["run-1"]
+        assert [run.uuid for run in storage.list_all()] == ["run-0", "run-1"]
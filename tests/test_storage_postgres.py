@@ -1,14 +1,21 @@
 # Unit tests for PostgreSQL storage backend
 import os
+
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
 
-from app.schemas.workflow import WorkflowDefinition
-from app.schemas.run import WorkflowRun
+from app.db.models.run import WorkflowRunModel
+from app.db.models.step_result import WorkflowStepResultModel
+from app.db.partitions import create_partitions
+from app.db.session import Base
+from app.schemas.common import StepStatus
 from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import StepResult
+from app.schemas.workflow import WorkflowDefinition
 from app.storage.db_storage import DBStorage
-from app.db.session import Base
 
 
 # Test database configuration - uses test_ prefix for isolation
@@ -37,6 +44,7 @@ def test_engine():
     # Create engine for test database
     engine = create_engine(TEST_DB_URL)
     Base.metadata.create_all(bind=engine)
+    create_partitions(engine)
 
     yield engine
 
@@ -89,14 +97,24 @@ class TestPostgresStorage:
 
         # Clear tables before each test
         with test_session_factory() as db:
-            db.execute(text("TRUNCATE TABLE workflow_definitions, workflow_runs CASCADE"))
+            db.execute(
+                text(
+                    "TRUNCATE TABLE workflow_definitions, workflow_runs, "
+                    "workflow_step_results CASCADE"
+                )
+            )
             db.commit()
 
         yield
 
         # Cleanup after test
         with test_session_factory() as db:
-            db.execute(text("TRUNCATE TABLE workflow_definitions, workflow_runs CASCADE"))
+            db.execute(
+                text(
+                    "TRUNCATE TABLE workflow_definitions, workflow_runs, "
+                    "workflow_step_results CASCADE"
+                )
+            )
             db.commit()
 
     def _get_storage(self, t_type):
@@ -198,3 +216,37 @@ class TestPostgresStorage:
 
         runs = storage.list_all()
         assert len(runs) >= 1
+
+    def test_step_results_appended_and_assembled(self, sample_workflow_run):
+        """Test step results are inserted per change and assembled on read."""
+        storage = self._get_storage(WorkflowRun)
+        uuid = storage.create(sample_workflow_run)
+
+        sample_workflow_run.step_results["step1"] = StepResult(
+            step_name="step1", status=StepStatus.FAILED, started_at="t1", error="boom"
+        )
+        storage.update(sample_workflow_run)
+        storage.update(sample_workflow_run)  # unchanged: no new row
+        sample_workflow_run.step_results["step1"] = StepResult(
+            step_name="step1",
+            status=StepStatus.SUCCESS,
+            started_at="t2",
+            completed_at="t3",
+        )
+        storage.update(sample_workflow_run)
+
+        with self._session_factory() as db:
+            rows = db.query(WorkflowStepResultModel).filter_by(run_uuid=uuid).all()
+        assert [(row.attempt, row.status) for row in rows] == [
+            (1, "failed"),
+            (2, "success"),
+        ]
+        with self._session_factory() as db:
+            run_created_at = (
+                db.query(WorkflowRunModel.created_at).filter_by(uuid=uuid).scalar()
+            )
+        # Step rows share the run's period, whenever they were written
+        assert {row.created_at for row in rows} == {run_created_at}
+
+        retrieved = storage.get(uuid)
+        assert retrieved.step_results["step1"].status == StepStatus.SUCCESS
@@ -0,0 +1,146 @@
+# Unit tests for SQLite storage backend
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.common import WorkflowStatus
+from app.schemas.run import WorkflowRun
+from app.schemas.workflow import WorkflowDefinition
+from app.storage import sqlite_storage
+from app.storage.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture(autouse=True)
+def database_path(tmp_path, monkeypatch):
+    """Give each test its own database file."""
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "workflow.db"))
+    yield
+    sqlite_storage.close_databases()
+
+
+@pytest.fixture
+def sample_workflow_definition():
+    """Sample workflow definition for testing."""
+    return WorkflowDefinition(
+        id="test_workflow",
+        name="Test Workflow",
+        description="A workflow for testing storage",
+        steps=[
+            {"name": "step1", "type": "delay", "config": {"duration": 1}},
+        ],
+    )
+
+
+def _run(status=WorkflowStatus.PENDING):
+    return WorkflowRun(
+        workflow_id="wf",
+        status=status,
+        payload={"key": "value"},
+        started_at="2024-01-01T10:00:00Z",
+    )
+
+
+class TestSQLiteStorage:
+    """Test suite for SQLiteStorage."""
+
+    def test_create_get_update_delete(self, sample_workflow_definition):
+        """Test the item lifecycle."""
+        storage = SQLiteStorage[WorkflowDefinition](t_type=WorkflowDefinition)
+        uuid = storage.create(sample_workflow_definition)
+        assert storage.get(uuid).name == "Test Workflow"
+
+        sample_workflow_definition.name = "Updated Workflow"
+        assert storage.update(sample_workflow_definition) is True
+        assert storage.get(uuid).name == "Updated Workflow"
+
+        assert storage.delete(uuid) is True
+        assert storage.get(uuid) is None
+        assert storage.delete(uuid) is False
+
+    def test_update_missing(self, sample_workflow_definition):
+        """Test updating an item that was never created."""
+        storage = SQLiteStorage[WorkflowDefinition](t_type=WorkflowDefinition)
+        sample_workflow_definition.uuid = "missing"
+
+        assert storage.update(sample_workflow_definition) is False
+
+    def test_list_paginated(self):
+        """Test that keyset pagination walks all items in uuid order."""
+        storage = SQLiteStorage[WorkflowRun](t_type=WorkflowRun)
+        uuids = storage.create_many([_run() for _ in range(7)])
+
+        pages, cursor = [], None
+        while True:
+            items, cursor = storage.list_paginated(limit=3, cursor=cursor)
+            pages.append(items)
+            if cursor is None:
+                break
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [run.uuid for page in pages for run in page] == sorted(uuids)
+
+    def test_delete_many(self):
+        """Test deleting several runs in one write."""
+        storage = SQLiteStorage[WorkflowRun](t_type=WorkflowRun)
+        done = storage.create(_run(WorkflowStatus.SUCCESS))
+        running = storage.create(_run(WorkflowStatus.RUNNING))
+
+        assert storage.delete_many([done, "missing"]) == 1
+        assert storage.get(done) is None
+        assert storage.get(running) is not None
+
+    def test_create_missing_skips_stored_items(self):
+        """Test that runs with preset UUIDs are inserted once, keeping the first."""
+        storage = SQLiteStorage[WorkflowRun](t_type=WorkflowRun)
+        first, second = _run(), _run(WorkflowStatus.RUNNING)
+        first.uuid, second.uuid = "run-0", "run-1"
+        assert storage.create_missing([first]) == ["run-0"]
+
+        first.status = WorkflowStatus.SUCCESS
+        assert storage.create_missing([first, second]) == ["run-1"]
+        assert storage.get("run-0").status == WorkflowStatus.PENDING
+        assert storage.get("run-1").status == WorkflowStatus.RUNNING
+
+    def test_indexes_are_used(self):
+        """Test that run lookups by status use the indexes shared with DBStorage."""
+        storage = SQLiteStorage[WorkflowRun](t_type=WorkflowRun)
+        plan = (
+            storage.database.reader()
+            .execute(
+                "EXPLAIN QUERY PLAN SELECT body FROM workflow_runs "
+                "WHERE status = ? ORDER BY started_at",
+                ("success",),
+            )
+            .fetchall()
+        )
+
+        assert "idx_workflow_runs_status_started" in str(plan)
+
+    def test_concurrent_writes_are_batched(self):
+        """Test that writes from many threads commit and a failed one is isolated."""
+        storage = SQLiteStorage[WorkflowRun](t_type=WorkflowRun)
+        errors = []
+
+        def create():
+            try:
+                storage.create(_run())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=create) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        def fail(conn):
+            conn.execute(
+                "INSERT INTO workflow_runs (uuid, body, created_at) "
+                "VALUES ('x', 'not json', '')"
+            )
+
+        with pytest.raises(Exception):
+            storage.database.write(fail)
+        assert errors == []
+        assert len(storage.list_all()) == 50
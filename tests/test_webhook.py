@@ -0,0 +1,361 @@
+"""
+Tests for the webhook connector's outbound call policies.
+"""
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.cache.response_cache import ResponseCache
+from app.connector.webhook import WebhookConnector
+from app.connector.webhook_models import WebhookWorkflowStep
+
+_AsyncClient = httpx.AsyncClient
+
+
+def mock_transport(handler):
+    """Patch the connector's httpx client to answer with a handler."""
+    return patch(
+        "app.connector.webhook.httpx.AsyncClient",
+        lambda **kwargs: _AsyncClient(transport=httpx.MockTransport(handler), **kwargs),
+    )
+
+
+def webhook_step(
+    url: str = "https://api.example.com/v1/items", method: str = "GET", **config
+):
+    return WebhookWorkflowStep(
+        name="call", config={"url": url, "method": method, **config}
+    )
+
+
+def ok(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"path": request.url.path})
+
+
+class TestRateLimiting:
+    """Tests for per-host token bucket throttling."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_reserved_token(self):
+        """Test a call over the limit sleeps for its reservation instead of failing."""
+        connector = WebhookConnector()
+        connector._rate_limiter.reserve = AsyncMock(return_value=0.25)
+
+        with mock_transport(ok), patch(
+            "app.connector.webhook.asyncio.sleep", new=AsyncMock()
+        ) as mock_sleep:
+            response = await connector.execute(
+                webhook_step(rate_limit={"rate": 5, "burst": 2}), {}
+            )
+
+        assert response.status_code == 200
+        connector._rate_limiter.reserve.assert_awaited_once_with(
+            "step:api.example.com:5:2", 5, 2
+        )
+        mock_sleep.assert_awaited_once_with(0.25)
+
+    @pytest.mark.asyncio
+    async def test_refunds_token_when_cancelled_while_waiting(self):
+        """Test a step cancelled (or timed out) during its wait gives its token back."""
+        connector = WebhookConnector()
+        connector._rate_limiter.reserve = AsyncMock(return_value=60)
+        connector._rate_limiter.refund = AsyncMock()
+
+        with mock_transport(ok), pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                await connector.execute(webhook_step(rate_limit={"rate": 5}), {})
+
+        connector._rate_limiter.refund.assert_awaited_once_with(
+            "step:api.example.com:5:5", 5, 5
+        )
+
+    @pytest.mark.asyncio
+    async def test_settings_longest_prefix_wins(self):
+        """Test the most specific configured URL prefix selects the bucket."""
+        connector = WebhookConnector()
+        connector._rate_limiter.reserve = AsyncMock(return_value=0)
+        limits = {
+            "api.example.com": {"rate": 100},
+            "https://api.example.com/v1/": {"rate": 10, "burst": 20},
+        }
+
+        with mock_transport(ok), patch(
+            "app.connector.webhook.settings.WEBHOOK_RATE_LIMITS", limits
+        ):
+            await connector.execute(webhook_step(), {})
+            await connector.execute(webhook_step(url="https://other.example.com/"), {})
+
+        connector._rate_limiter.reserve.assert_awaited_once_with(
+            "https://api.example.com/v1/", 10, 20
+        )
+
+
+class TestHedging:
+    """Tests for hedged requests to slow idempotent endpoints."""
+
+    def test_rejects_non_idempotent_method(self):
+        """Test hedging is refused for POST, which may not be safe to repeat."""
+        with pytest.raises(ValueError, match="idempotent"):
+            webhook_step(method="POST", hedge={"delay": 0.1})
+
+    def test_delay_is_observed_percentile(self):
+        """Test the hedge delay follows the host's latency percentile once warmed up."""
+        connector = WebhookConnector()
+        with patch("app.connector.hedging.settings.WEBHOOK_HEDGE_MIN_SAMPLES", 10):
+            for ms in range(1, 10):
+                connector._hedging.record_latency("api.example.com", ms / 1000)
+            assert connector._hedging.hedge_delay("api.example.com", 0.95) is None
+            connector._hedging.record_latency("api.example.com", 0.010)
+            assert connector._hedging.hedge_delay("api.example.com", 0.95) == 0.010
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_over_slow_request(self):
+        """Test a hedge is sent after the delay and its faster answer is used."""
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+            return httpx.Response(200, json={"call": calls})
+
+        connector = WebhookConnector()
+        connector._hedging._host("api.example.com").credit = 1
+
+        with mock_transport(handler):
+            response = await connector.execute(webhook_step(hedge={"delay": 0.01}), {})
+
+        assert response.hedged and response.hedge_won
+        assert response.response_data == {"call": 2}
+        assert connector._hedging._hosts["api.example.com"].wins == 1
+        # The cancelled first request counts with the time it had been running
+        latencies = sorted(connector._hedging._host("api.example.com").latencies)
+        assert len(latencies) == 2 and latencies[1] >= 0.01
+
+    @pytest.mark.asyncio
+    async def test_hedge_takes_a_rate_limit_token(self):
+        """Test the hedge request is throttled like the first one."""
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={})
+
+        connector = WebhookConnector()
+        connector._hedging._host("api.example.com").credit = 1
+        connector._rate_limiter.reserve = AsyncMock(return_value=0)
+
+        with mock_transport(handler):
+            response = await connector.execute(
+                webhook_step(hedge={"delay": 0.01}, rate_limit={"rate": 5}), {}
+            )
+
+        assert response.hedged
+        assert connector._rate_limiter.reserve.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_budget_limits_hedges(self):
+        """Test no hedge is sent once the host's hedge credit is spent."""
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={})
+
+        connector = WebhookConnector()
+
+        with mock_transport(handler):
+            response = await connector.execute(webhook_step(hedge={"delay": 0.01}), {})
+
+        assert not response.hedged
+        assert calls == 1
+
+
+class TestResponseCache:
+    """Tests for memoized webhook responses."""
+
+    @staticmethod
+    def connector_without_redis() -> WebhookConnector:
+        connector = WebhookConnector()
+        connector._cache._get_remote = AsyncMock(return_value=None)
+        connector._cache._put_remote = AsyncMock()
+        return connector
+
+    def test_rejects_non_get(self):
+        """Test caching is refused for methods other than GET."""
+        with pytest.raises(ValueError, match="GET"):
+            webhook_step(method="PUT", cache={"ttl": 60})
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_collapse(self):
+        """Test identical concurrent calls share one request."""
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"id": 7})
+
+        connector = self.connector_without_redis()
+        step = webhook_step(cache={"ttl": 60})
+
+        with mock_transport(handler):
+            responses = await asyncio.gather(
+                *(connector.execute(step, {}) for _ in range(5))
+            )
+            again = await connector.execute(step, {})
+
+        assert calls == 1
+        assert [r.cached for r in responses].count(False) == 1
+        assert again.cached and again.response_data == {"id": 7}
+        connector._cache._put_remote.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_respects_cache_control(self):
+        """Test max-age enables caching without a step TTL and no-store disables it."""
+        cache_control = {"/fresh": "public, max-age=30", "/private": "no-store"}
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            return httpx.Response(
+                200, json={}, headers={"Cache-Control": cache_control[request.url.path]}
+            )
+
+        connector = self.connector_without_redis()
+
+        with mock_transport(handler):
+            for path, cache in (("/fresh", {}), ("/private", {"ttl": 60})):
+                step = webhook_step(url=f"https://api.example.com{path}", cache=cache)
+                await connector.execute(step, {})
+                await connector.execute(step, {})
+
+        assert calls == ["/fresh", "/private", "/private"]
+
+    @pytest.mark.asyncio
+    async def test_shared_entry_skips_request(self):
+        """Test a response cached in Redis by another worker is reused."""
+        connector = self.connector_without_redis()
+        shared = {
+            "type": "webhook",
+            "status_code": 200,
+            "response_data": {"id": 7},
+            "url": "https://api.example.com/v1/items",
+            "method": "GET",
+        }
+        connector._cache._get_remote = AsyncMock(return_value=(shared, 30.0))
+        handler = AsyncMock()
+
+        with mock_transport(handler):
+            response = await connector.execute(webhook_step(cache={}), {})
+
+        handler.assert_not_called()
+        assert response.cached and response.response_data == {"id": 7}
+
+    @staticmethod
+    def cache_without_redis() -> ResponseCache:
+        cache = ResponseCache(max_size=16)
+        cache._get_remote = AsyncMock(return_value=None)
+        cache._put_remote = AsyncMock()
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_waiter_fetches_when_leader_cancelled(self):
+        """Test cancelling the fetching caller makes a waiter fetch, not fail."""
+        cache = self.cache_without_redis()
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        async def fast():
+            return {"id": 7}, 60
+
+        leader = asyncio.create_task(cache.get_or_fetch("k", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == ({"id": 7}, False)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    @pytest.mark.asyncio
+    async def test_waiter_retries_after_leader_timeout(self):
+        """Test a waiter with its own budget outlives the fetching caller's timeout."""
+        cache = self.cache_without_redis()
+
+        async def timed_out():
+            await asyncio.sleep(0.01)
+            raise TimeoutError("budget spent")
+
+        async def fetch():
+            return {"id": 7}, 60
+
+        results = await asyncio.gather(
+            cache.get_or_fetch("k", timed_out),
+            cache.get_or_fetch("k", fetch),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], TimeoutError)
+        assert results[1] == ({"id": 7}, False)
+
+
+class TestResponseHandling:
+    """Tests for streamed, size-capped response bodies."""
+
+    @pytest.mark.asyncio
+    async def test_oversized_body_fails_while_streaming(self):
+        """Test a body over the limit fails the step even without Content-Length."""
+
+        async def chunks():
+            for _ in range(10):
+                yield b"x" * 100
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=chunks())
+
+        with mock_transport(handler):
+            with pytest.raises(ValueError, match="500 byte limit"):
+                await WebhookConnector().execute(
+                    webhook_step(max_response_bytes=500), {}
+                )
+
+    @pytest.mark.asyncio
+    async def test_select_keeps_only_requested_fields(self):
+        """Test only the selected JSON fields are kept as response_data."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "customer": {"id": 7, "tier": "gold"},
+                        "history": [1] * 1000,
+                    }
+                },
+            )
+
+        step = webhook_step(select={"id": "data.customer.id", "missing": "data.nope"})
+        with mock_transport(handler):
+            response = await WebhookConnector().execute(step, {})
+
+        assert response.response_data == {"id": 7, "missing": None}
+
+    @pytest.mark.asyncio
+    async def test_discard_skips_body(self):
+        """Test discard mode keeps the status but not the body."""
+        with mock_transport(ok):
+            response = await WebhookConnector().execute(
+                webhook_step(response_mode="discard"), {}
+            )
+
+        assert response.status_code == 200
+        assert response.response_data is None
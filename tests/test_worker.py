@@ -1,12 +1,27 @@
 """
 Tests for the workflow worker service.
 """
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.worker.main import WorkflowWorker
 from app.messaging.events import WorkflowTriggerEvent
 from app.schemas.common import WorkflowStatus
+from app.worker.main import WorkflowWorker
+from app.worker.scheduler import LaneScheduler
+
+
+@pytest.fixture(autouse=True)
+def mock_cancellation():
+    """Report every run as not cancelled without reaching Redis."""
+    with patch("app.worker.main.CancellationChecker") as mock_checker_class:
+        mock_checker = MagicMock()
+        mock_checker.is_cancelled = AsyncMock(return_value=False)
+        mock_checker_class.return_value = mock_checker
+        yield mock_checker
 
 
 class TestWorkflowWorker:
@@ -15,10 +30,13 @@ class TestWorkflowWorker:
     @pytest.mark.asyncio
     async def test_handle_message_success(self):
         """Test worker handles successful workflow execution."""
-        with patch("app.worker.main.KafkaConsumer") as mock_consumer_class, \
-             patch("app.worker.main.KafkaProducer") as mock_producer_class, \
-             patch("app.worker.main.WorkflowService") as mock_service_class:
-
+        with patch(
+            "app.worker.main.BrokerFactory.create_consumer"
+        ) as mock_consumer_class, patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ) as mock_producer_class, patch(
+            "app.worker.main.WorkflowService"
+        ) as mock_service_class:
             # Setup mocks
             mock_consumer = AsyncMock()
             mock_producer = AsyncMock()
@@ -56,10 +74,13 @@ class TestWorkflowWorker:
     @pytest.mark.asyncio
     async def test_handle_message_failure(self):
         """Test worker handles failed workflow execution."""
-        with patch("app.worker.main.KafkaConsumer") as mock_consumer_class, \
-             patch("app.worker.main.KafkaProducer") as mock_producer_class, \
-             patch("app.worker.main.WorkflowService") as mock_service_class:
-
+        with patch(
+            "app.worker.main.BrokerFactory.create_consumer"
+        ) as mock_consumer_class, patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ) as mock_producer_class, patch(
+            "app.worker.main.WorkflowService"
+        ) as mock_service_class:
             # Setup mocks
             mock_consumer = AsyncMock()
             mock_producer = AsyncMock()
@@ -100,10 +121,13 @@ class TestWorkflowWorker:
     @pytest.mark.asyncio
     async def test_handle_invalid_message(self):
         """Test worker handles invalid message gracefully."""
-        with patch("app.worker.main.KafkaConsumer") as mock_consumer_class, \
-             patch("app.worker.main.KafkaProducer") as mock_producer_class, \
-             patch("app.worker.main.WorkflowService") as mock_service_class:
-
+        with patch(
+            "app.worker.main.BrokerFactory.create_consumer"
+        ) as mock_consumer_class, patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ) as mock_producer_class, patch(
+            "app.worker.main.WorkflowService"
+        ) as mock_service_class:
             mock_consumer = AsyncMock()
             mock_producer = AsyncMock()
             mock_service = MagicMock()
@@ -120,3 +144,365 @@ class TestWorkflowWorker:
 
             with pytest.raises(Exception):
                 await worker._handle_message(message)
+
+
+class TestLaneScheduler:
+    """Tests for weighted fair scheduling across priority lanes."""
+
+    @pytest.mark.asyncio
+    async def test_weighted_share_under_contention(self):
+        """Test backlogged lanes are dispatched in proportion to their weights."""
+        order = []
+        release = asyncio.Event()
+
+        async def handler(message, ack):
+            order.append(message["lane"])
+            await release.wait()
+
+        scheduler = LaneScheduler(
+            handler=handler,
+            weights={"high": 3, "low": 1},
+            lane_limits={"high": 8, "low": 8},
+            max_in_flight=8,
+        )
+        for _ in range(8):
+            await scheduler.submit("high", {"lane": "high"})
+            await scheduler.submit("low", {"lane": "low"})
+
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.01)
+
+        assert len(order) == 8
+        assert order.count("high") == 6
+        assert order.count("low") == 2
+
+        release.set()
+        task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_lane_limit_keeps_capacity_for_other_lanes(self):
+        """Test a saturated low lane cannot take every worker slot."""
+        started = []
+        release = asyncio.Event()
+
+        async def handler(message, ack):
+            started.append(message["lane"])
+            await release.wait()
+
+        scheduler = LaneScheduler(
+            handler=handler,
+            weights={"high": 6, "low": 1},
+            lane_limits={"high": 4, "low": 2},
+            max_in_flight=4,
+        )
+        task = asyncio.create_task(scheduler.run())
+        for _ in range(2):
+            await scheduler.submit("low", {"lane": "low"})
+        await asyncio.sleep(0.01)
+        await scheduler.submit("high", {"lane": "high"})
+        await asyncio.sleep(0.01)
+
+        assert started == ["low", "low", "high"]
+
+        release.set()
+        task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_workflows_in_lane(self):
+        """Test a burst from one workflow does not delay another workflow's run."""
+        order = []
+
+        async def handler(message, ack):
+            order.append(message["workflow_id"])
+
+        scheduler = LaneScheduler(
+            handler=handler,
+            weights={"normal": 1},
+            lane_limits={"normal": 4},
+            max_in_flight=4,
+        )
+        for workflow_id in ["noisy", "noisy", "noisy", "quiet"]:
+            await scheduler.submit("normal", {"workflow_id": workflow_id})
+
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.01)
+
+        assert order == ["noisy", "quiet", "noisy", "noisy"]
+        task.cancel()
+
+
+class TestWorkflowConcurrency:
+    """Tests for per-workflow concurrency limits in the worker."""
+
+    @pytest.mark.asyncio
+    async def test_over_limit_run_is_deferred(self):
+        """Test a run is re-queued, not executed, when its workflow is at the limit."""
+        with patch("app.worker.main.BrokerFactory.create_consumer"), patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ), patch("app.worker.main.WorkflowService") as mock_service_class:
+            mock_service = MagicMock()
+            mock_service.execute_workflow = AsyncMock()
+            mock_service_class.return_value = mock_service
+
+            worker = WorkflowWorker()
+            worker._semaphore = MagicMock()
+            worker._semaphore.acquire = AsyncMock(return_value=None)
+            worker._defer = MagicMock()
+
+            message = {
+                "run_id": "run-123",
+                "workflow_id": "workflow-456",
+                "payload": {},
+                "max_concurrency": 2,
+            }
+            ack = MagicMock()
+            await worker._handle_message(message, ack)
+
+            mock_service.execute_workflow.assert_not_called()
+            worker._defer.assert_called_once()
+            # The deferred message is acknowledged only once it runs
+            ack.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_deferral_backs_off_exponentially(self):
+        """Test each deferral of the same run doubles the delay, up to the cap."""
+        with patch("app.worker.main.BrokerFactory.create_consumer"), patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ), patch("app.worker.main.WorkflowService"), patch(
+            "app.worker.main.random.random", return_value=0.5
+        ), patch(
+            "app.worker.main.settings.WORKFLOW_CONCURRENCY_DEFER_SECONDS", 0.5
+        ), patch(
+            "app.worker.main.settings.WORKFLOW_CONCURRENCY_DEFER_MAX_SECONDS", 3
+        ):
+            worker = WorkflowWorker()
+            event = WorkflowTriggerEvent(
+                run_id="run-123", workflow_id="workflow-456", payload={}
+            )
+            loop = MagicMock()
+            with patch("app.worker.main.asyncio.get_running_loop", return_value=loop):
+                for _ in range(4):
+                    worker._defer(event, {}, lambda: None)
+
+            assert [call.args[0] for call in loop.call_later.call_args_list] == [
+                0.5,
+                1,
+                2,
+                3,
+            ]
+
+    @pytest.mark.asyncio
+    async def test_lease_released_after_run(self):
+        """Test the semaphore lease is released once the run completes."""
+        with patch("app.worker.main.BrokerFactory.create_consumer"), patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ), patch("app.worker.main.WorkflowService") as mock_service_class:
+            mock_service = MagicMock()
+            mock_service.execute_workflow = AsyncMock()
+            mock_service.load_workflow_run.return_value = None
+            mock_service_class.return_value = mock_service
+
+            worker = WorkflowWorker()
+            worker._producer = AsyncMock()
+            worker._semaphore = MagicMock(lease_seconds=60)
+            worker._semaphore.acquire = AsyncMock(return_value="token")
+            worker._semaphore.release = AsyncMock()
+
+            message = {
+                "run_id": "run-123",
+                "workflow_id": "workflow-456",
+                "payload": {},
+                "max_concurrency": 2,
+            }
+            ack = MagicMock()
+            await worker._handle_message(message, ack)
+
+            mock_service.execute_workflow.assert_called_once_with("run-123")
+            worker._semaphore.release.assert_called_once_with(
+                "workflow:workflow-456", "token"
+            )
+            ack.assert_called_once_with()
+
+
+class TestRunCancellation:
+    """Tests for cooperative run cancellation in the worker."""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_is_skipped_when_dequeued(self, mock_cancellation):
+        """Test a run cancelled while queued executes no steps."""
+        with patch("app.worker.main.BrokerFactory.create_consumer"), patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ), patch("app.worker.main.WorkflowService") as mock_service_class:
+            mock_service = MagicMock()
+            mock_service.execute_workflow = AsyncMock()
+            mock_run = MagicMock(status=WorkflowStatus.PENDING)
+            mock_service.load_workflow_run.return_value = mock_run
+            mock_service_class.return_value = mock_service
+            mock_cancellation.is_cancelled.return_value = True
+
+            worker = WorkflowWorker()
+            worker._producer = AsyncMock()
+
+            await worker._handle_message(
+                {"run_id": "run-123", "workflow_id": "workflow-456", "payload": {}}
+            )
+
+            mock_service.execute_workflow.assert_not_called()
+            mock_service.mark_run_cancelled.assert_called_once_with(mock_run)
+            worker._producer.send.assert_called_once()
+            mock_cancellation.forget.assert_called_once_with("run-123")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_takes_no_concurrency_slot(self, mock_cancellation):
+        """Test a cancelled run of a limited workflow skips the semaphore."""
+        with patch("app.worker.main.BrokerFactory.create_consumer"), patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ), patch("app.worker.main.WorkflowService") as mock_service_class:
+            mock_run = MagicMock(status=WorkflowStatus.PENDING, error=None)
+            mock_service_class.return_value.load_workflow_run.return_value = mock_run
+            mock_cancellation.is_cancelled.return_value = True
+            worker = WorkflowWorker()
+            worker._producer = AsyncMock()
+            worker._semaphore = AsyncMock()
+
+            await worker._handle_message(
+                {
+                    "run_id": "run-123",
+                    "workflow_id": "workflow-456",
+                    "payload": {},
+                    "max_concurrency": 1,
+                }
+            )
+
+            worker._semaphore.acquire.assert_not_called()
+            worker._workflow_service.mark_run_cancelled.assert_called_once_with(
+                mock_run
+            )
+
+    @pytest.mark.asyncio
+    async def test_checker_reads_per_run_and_workflow_keys(self):
+        """Test flags are read from per-run keys and workflow cutoffs as epochs."""
+        from app.cache.cancellation import CancellationChecker
+
+        client = MagicMock()
+        # run-1 flagged; run-2 and run-3 only match their workflow's cutoff of 100
+        client.mget = AsyncMock(return_value=["1", None, None, None, "100.0", "100.0"])
+        with patch(
+            "app.cache.cancellation.get_async_redis_client", return_value=client
+        ):
+            cancelled = await CancellationChecker().check_many(
+                {
+                    "run-1": ("wf-1", 50.0),
+                    "run-2": ("wf-2", 99.5),
+                    "run-3": ("wf-2", 100.5),
+                }
+            )
+
+        assert cancelled == {"run-1", "run-2"}
+        assert client.mget.call_args.args[0] == [
+            "cancel:run:run-1",
+            "cancel:run:run-2",
+            "cancel:run:run-3",
+            "cancel:workflow:wf-1",
+            "cancel:workflow:wf-2",
+            "cancel:workflow:wf-2",
+        ]
+
+    def test_trigger_event_converts_iso_timestamps(self):
+        """Test an ISO triggered_at is stored as epoch seconds."""
+        event = WorkflowTriggerEvent(
+            run_id="run-1",
+            workflow_id="wf-1",
+            payload={},
+            triggered_at="2026-10-19T12:00:00+00:00",
+        )
+        assert event.triggered_at == 1792411200.0
+
+    @pytest.mark.asyncio
+    async def test_in_flight_run_is_interrupted(self):
+        """Test cancelling the execution task stops the run but not the worker."""
+        with patch("app.worker.main.BrokerFactory.create_consumer"), patch(
+            "app.worker.main.BrokerFactory.create_producer"
+        ), patch("app.worker.main.WorkflowService") as mock_service_class:
+            started = asyncio.Event()
+
+            async def execute_workflow(run_id):
+                started.set()
+                await asyncio.sleep(60)
+
+            mock_service = MagicMock()
+            mock_service.execute_workflow = execute_workflow
+            mock_service.load_workflow_run.return_value = MagicMock(
+                status=WorkflowStatus.CANCELLED, error="Run cancelled"
+            )
+            mock_service_class.return_value = mock_service
+
+            worker = WorkflowWorker()
+            worker._producer = AsyncMock()
+
+            handler = asyncio.create_task(
+                worker._handle_message(
+                    {"run_id": "run-123", "workflow_id": "workflow-456", "payload": {}}
+                )
+            )
+            await started.wait()
+            worker._running["run-123"][0].cancel()
+            await asyncio.wait_for(handler, timeout=1)
+
+            call_args = worker._producer.send.call_args
+            assert call_args.kwargs["value"]["status"] == WorkflowStatus.CANCELLED
+            assert "run-123" not in worker._running
+
+
+class TestSubworkflowDispatcher:
+    """Tests for asynchronous sub-workflow dispatch."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_and_wait_for_completion(self):
+        """Test a dispatched child run is published and its completion event awaited."""
+        from app.schemas.workflow import WorkflowDefinition
+        from app.worker.dispatcher import SubworkflowDispatcher
+
+        with patch(
+            "app.worker.dispatcher.BrokerFactory.create_consumer",
+            return_value=AsyncMock(),
+        ) as create_consumer, patch(
+            "app.worker.dispatcher.settings.WORKER_ID", "worker-1"
+        ):
+            producer = AsyncMock()
+            service = MagicMock()
+            uuids = iter(["child-0", "child-1", "child-2"])
+            service.create_workflow_run.side_effect = lambda run: setattr(
+                run, "uuid", next(uuids)
+            )
+            dispatcher = SubworkflowDispatcher(producer, service)
+            workflow = WorkflowDefinition(uuid="wf-child", name="Child", steps=[])
+
+            # The completion consumer starts with the first dispatch that waits
+            await dispatcher.dispatch(workflow, {"a": 1}, wait=False)
+            create_consumer.assert_not_called()
+            run_id = await dispatcher.dispatch(workflow, {"a": 1})
+            await dispatcher.dispatch(workflow, {"a": 1}, wait=True)
+            create_consumer.assert_called_once()
+            assert create_consumer.call_args.kwargs["group_id"].endswith(
+                "-dispatch-worker-1"
+            )
+            waiter = asyncio.create_task(dispatcher.wait(run_id))
+            await dispatcher._handle_completed(
+                {"run_id": "other", "workflow_id": "x", "status": "success"}
+            )
+            await dispatcher._handle_completed(
+                {
+                    "run_id": "child-1",
+                    "workflow_id": "wf-child",
+                    "status": "failed",
+                    "error": "boom",
+                }
+            )
+            completed = await asyncio.wait_for(waiter, timeout=1)
+            await dispatcher.stop()
+
+        assert run_id == "child-1"
+        assert producer.send.call_args_list[1].kwargs["value"]["run_id"] == "child-1"
+        assert completed.status == "failed"
+        assert dispatcher._waiting == {}
@@ -1,17 +1,17 @@
 # create API testcases
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
 import pytest
-from sqlalchemy import text
 from fastapi.testclient import TestClient
 
-from unittest.mock import AsyncMock, patch
-
 from app.api.deps import get_workflow_service
 from app.main import app
+from app.schemas.common import WorkflowStatus
 from app.schemas.workflow import TriggerRequest
 from app.schemas.workflow import WorkflowDefinition
-from app.schemas.common import WorkflowStatus
-from app.storage.enum import StorageType
 from app.services.workflow import WorkflowService
+from app.storage.enum import StorageType
 
 
 @pytest.fixture
@@ -21,7 +21,9 @@ def client():
         yield c
 
 
-@pytest.fixture(params=[StorageType.IN_MEMORY, StorageType.FILE_SYSTEM, StorageType.POSTGRES])
+@pytest.fixture(
+    params=[StorageType.IN_MEMORY, StorageType.FILE_SYSTEM, StorageType.POSTGRES]
+)
 def workflow_service(request):
     """Fixture to provide a fresh WorkflowService instance for each test."""
     storage_type = request.param
@@ -36,10 +38,10 @@ def workflow_service(request):
 
 @pytest.fixture(autouse=True)
 def mock_kafka():
-    """Mock Kafka producer for all tests in this module."""
-    with patch("app.api.v1.endpoints.trigger.KafkaProducer") as mock_producer_class:
+    """Mock the broker producer for all tests in this module."""
+    with patch("app.main.BrokerFactory.create_producer") as mock_create_producer:
         mock_producer = AsyncMock()
-        mock_producer_class.return_value = mock_producer
+        mock_create_producer.return_value = mock_producer
         yield mock_producer
 
 